@@ -9,13 +9,18 @@ import atexit
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from output_handler import write_output
+from output_handler import write_output, install_sigterm_handler
 from agents.shared.tool_check import verify_tools
-from agents.shared.sister_comm import SisterCommManager, Message
+from agents.shared.tool_runner import pause_tool, resume_tool
+from agents.shared.tool_executor import get_tool_executor, submit_tool
+from agents.shared.output_stream import tool_output_sinks
+from agents.shared.phase_worker import PhaseWorker
+from agents.shared.sister_comm import SisterCommManager, Message, PhaseWorkConsumer, get_instance_id, get_instance_concurrency
 
 SISTER_NAME = "Alice"
+INSTANCE_ID = get_instance_id(SISTER_NAME)
 PID_DIR = os.path.join(os.path.expanduser("~"), ".7sisters", "pids")
-PID_FILE = os.path.join(PID_DIR, f"{SISTER_NAME}.pid")
+PID_FILE = os.path.join(PID_DIR, f"{INSTANCE_ID}.pid")
 CONFIG_PATH = "seven_sisters.config.json"
 BANTER_ENGINE = os.path.abspath("banter_engine.py")
 FAIL_COUNTER_PATH = os.path.join(os.path.dirname(__file__), "alice_fail.count")
@@ -143,29 +148,65 @@ def setup_commands(comm_manager):
         write_output(SISTER_NAME, "unknown", "🎩 Sister activated by Seven")
         return {"success": True, "message": "Activated"}
     
+    def handle_pause_action(args):
+        """Pause this sister's tool runs for an action: queued ones wait, running ones get SIGSTOP."""
+        action_id = args.get('action_id')
+        held = get_tool_executor().pause_key(action_id)
+        paused = pause_tool(action_id) or held > 0
+        if paused:
+            speak(f"⏸️ Pausing {action_id}", "command")
+        return {'success': paused, 'action_id': action_id}
+    
+    def handle_cancel_action(args):
+        """Stop this sister's tool runs for an action (queued ones never start)."""
+        action_id = args.get('action_id')
+        cancelled = get_tool_executor().cancel_key(action_id)
+        return {'success': cancelled > 0, 'action_id': action_id}
+    
+    def handle_resume_action(args):
+        """Resume this sister's paused tool runs for an action (SIGCONT, and let queued ones start)."""
+        action_id = args.get('action_id')
+        resumed = resume_tool(action_id)
+        resumed = get_tool_executor().resume_key(action_id) > 0 or resumed
+        if resumed:
+            speak(f"▶️ Resuming {action_id}", "command")
+        return {'success': resumed, 'action_id': action_id}
+    
     # Register command handlers
     comm_manager.command_handler.register_command('status', handle_status_query)
     comm_manager.command_handler.register_command('recon', handle_recon_command)
     comm_manager.command_handler.register_command('safe_mode_change', handle_safe_mode_change)
     comm_manager.command_handler.register_command('level_change', handle_level_change)
     comm_manager.command_handler.register_command('activate', handle_activate_command)
+    comm_manager.command_handler.register_command('pause_action', handle_pause_action)
+    comm_manager.command_handler.register_command('resume_action', handle_resume_action)
+    comm_manager.command_handler.register_command('cancel_action', handle_cancel_action)
 
 def trigger_banter(event_type="start"):
     subprocess.run(["python", BANTER_ENGINE, SISTER_NAME, event_type])
 
-def run_tool(target):
+def run_tool(target, action_id=None, use_cache=True):
     tool_exists, _ = verify_tools([TOOL_NAME], SISTER_NAME, speak)
     if tool_exists:
         speak(f"🐇 Starting reconnaissance on target: {target}", "command")
         write_output(SISTER_NAME, target, "🐇 Beginning reconnaissance operations")
         speak("Following the white rabbit...", "thought")
-        subprocess.run(["bash", TOOL_NAME, target])
-        write_output(SISTER_NAME, target, "✅ Reconnaissance complete")
-        speak("The rabbit has led us to interesting places...", "thought")
+        sinks = tool_output_sinks(SISTER_NAME, target, action_id, comm_manager)
+
+        def finished(job):
+            if job.succeeded:
+                write_output(SISTER_NAME, target, "✅ Reconnaissance complete")
+                speak("The rabbit has led us to interesting places...", "thought")
+
+        return submit_tool(SISTER_NAME, ["bash", TOOL_NAME, target], action_id or target,
+                           sinks=sinks, callback=finished, target=target, use_cache=use_cache,
+                           run_id=action_id)
     else:
         speak("🐇 My reconnaissance tools are missing...", "command")
         write_output(SISTER_NAME, target, "❌ Tool script not found: alice_recon.sh")
         speak("The rabbit hole seems to be blocked...", "thought")
+        # Fail the phase, so Seven sees the action go wrong instead of complete
+        raise FileNotFoundError("Tool script not found: alice_recon.sh")
 
 def cleanup_pid_file():
     if os.path.exists(PID_FILE):
@@ -187,11 +228,18 @@ def main():
     
     write_pid_file()
     atexit.register(cleanup_pid_file)
+    install_sigterm_handler()
 
     # Set up communication
     comm_manager = SisterCommManager(SISTER_NAME)
     comm_manager.setup()
     setup_commands(comm_manager)
+    phase_worker = PhaseWorker(SISTER_NAME, comm_manager, run_tool)
+    phase_worker.register()
+    work_consumer = PhaseWorkConsumer(SISTER_NAME, INSTANCE_ID, phase_worker.handle_execute_phase,
+                                      max_in_flight=max(get_instance_concurrency(),
+                                                        get_tool_executor().sister_limit(SISTER_NAME)))
+    work_consumer.start()
     
     # Send initial status
     comm_manager.send_status("initializing")
@@ -272,6 +320,7 @@ def main():
             time.sleep(1)  # Prevent rapid error messages
     
     # Cleanup
+    work_consumer.stop()
     comm_manager.cleanup()
     cleanup_pid_file()
 
@@ -2,8 +2,16 @@ import os
 import sys
 import datetime
 from typing import Dict, Callable, Optional, List, Tuple, Any
+from output_handler import write_output
 from agents.shared.sister_status import SisterStatusManager, SisterActivity
 from agents.shared.action_manager import ActionManager
+from agents.shared.autoscaler import Autoscaler
+from agents.shared.batch_runner import load_scope_file
+from agents.shared.correlation import get_correlator
+from agents.shared.pipeline import PipelineRun, load_pipelines
+from agents.shared.records import Host, URL
+from agents.shared.seen_set import get_seen_set
+from agents.shared.task_queue import ActionPriority
 from agents.Seven.interface import display_error, display_success, display_warning, display_status_prompt, confirm_dangerous_operation
 
 # Secret command for unlocking advanced capabilities
@@ -13,19 +21,21 @@ CAPABILITIES_UNLOCKED = False
 class CommandParser:
     """Parser for Seven's command interface."""
     
-    def __init__(self, action_manager: ActionManager):
+    def __init__(self, action_manager: ActionManager, autoscaler: Optional[Autoscaler] = None):
         self.action_manager = action_manager
+        self.autoscaler = autoscaler
         self.status_manager = SisterStatusManager()
         self.commands: Dict[str, Dict[str, Any]] = {}
         self.capabilities_unlocked = False
-        self.dangerous_actions = {
-            'assimilate': True,
-            'chaos': True,
-            'ghost': True,
-            'recon': False
-        }
+        self.pipelines = load_pipelines()
+        self.pipeline_runs: Dict[str, PipelineRun] = {}
         self.register_default_commands()
 
+    @property
+    def dangerous_actions(self) -> Dict[str, bool]:
+        """Whether each configured action type is dangerous."""
+        return {plan.name: plan.dangerous for plan in self.action_manager.catalog.all()}
+
     def register_command(self, command: str, handler: Callable, help_text: str, usage: str = ""):
         """Register a new command with its handler and help text."""
         self.commands[command.lower()] = {
@@ -60,8 +70,39 @@ class CommandParser:
             "history <sister_name> [count]")
             
         self.register_command('execute', self._handle_execute_command,
-            "Execute an action",
-            "execute <action> <target>")
+            "Execute an action on a target or on every target in a scope file",
+            "execute <action> <target> [--priority <urgent|high|normal|bulk>] [--force] [--no-cache] | execute <action> --scope <file> [--concurrency <n>]")
+            
+        self.register_command('queue', self._handle_queue_command,
+            "Show running, queued and paused actions")
+            
+        self.register_command('pause', self._handle_pause_command,
+            "Pause a queued or running action",
+            "pause <action_id>")
+            
+        self.register_command('resume', self._handle_resume_command,
+            "Resume a paused action",
+            "resume <action_id>")
+            
+        self.register_command('output', self._handle_output_command,
+            "Show the latest tool output of an action",
+            "output <action_id> [lines]")
+            
+        self.register_command('delta', self._handle_delta_command,
+            "Show what changed in an action's results since the previous run",
+            "delta <action_id>")
+            
+        self.register_command('pipeline', self._handle_pipeline_command,
+            "Stream a target through a pipeline of sister tools, or show or stop pipeline runs",
+            "pipeline [<name> <target> [--scope <file>] | stop <run_id>]")
+            
+        self.register_command('seen', self._handle_seen_command,
+            "Show the size, memory and false positive rate of a target's seen-set",
+            "seen <target>")
+            
+        self.register_command('summary', self._handle_summary_command,
+            "Show one consolidated view per asset of everything the sisters found on a target",
+            "summary <target> [host]")
             
         self.register_command('summon', self._handle_summon_command,
             "Summon a sister to activate her",
@@ -156,8 +197,58 @@ class CommandParser:
             
         status_text = self.status_manager.display_status(sister_name)
         print("\n" + status_text)
+        
+        # Workload as seen by the action manager
+        print("\nSister Load:")
+        print("-" * 50)
+        names = [sister_name] if sister_name else sorted(self.status_manager.get_all_sister_statuses())
+        for name in names:
+            load = self.action_manager.get_sister_load(name)
+            latency = f"{load['latency']:.1f}s" if load['latency'] is not None else "n/a"
+            reported = f" (reported {load['reported']})" if load['reported'] is not None else ""
+            print(f"{name:<10} x{load['instances']}  In flight: {load['in_flight']}{reported}  "
+                  f"Backlog: {load['backlog']}  Phase latency: {latency}")
+            instances = self.action_manager.get_sister_instances(name)
+            if len(instances) > 1 or any(instance != name for instance in instances):
+                for instance, info in sorted(instances.items()):
+                    in_flight = info['in_flight'] if info['in_flight'] is not None else "?"
+                    print(f"  {instance:<12} In flight: {in_flight}  Dispatched: {info['dispatched']}")
+        
+        self._display_timeout_estimates(sister_name)
+        if self.autoscaler and self.autoscaler.enabled:
+            self._display_autoscaling(sister_name)
         return True, "Status displayed"
     
+    def _display_timeout_estimates(self, sister_name: Optional[str] = None):
+        """Print the learned action deadlines and tool durations."""
+        print("\nTimeout Estimates:")
+        print("-" * 50)
+        for action_type, estimate in sorted(self.action_manager.get_timeout_estimates().items()):
+            deadline = f"{estimate['deadline']:.0f}s" if estimate['deadline'] is not None else "learning"
+            print(f"{action_type:<10} Deadline: {deadline}  (static cap {estimate['static']}s)")
+            for name, tool in sorted(estimate['tools'].items()):
+                if sister_name and name != sister_name:
+                    continue
+                print(f"  {name:<10} Tool p50: {tool['p50']:.0f}s  p95: {tool['p95']:.0f}s  ({tool['samples']} runs)")
+    
+    def _display_autoscaling(self, sister_name: Optional[str] = None):
+        """Print the autoscaler's view of the sisters and its recent decisions."""
+        host = self.autoscaler.host
+        print("\nAutoscaling:")
+        print("-" * 50)
+        print(f"Host CPU: {host['cpu_percent']:.0f}%  Memory: {host['memory_percent']:.0f}%")
+        for name, info in sorted(self.autoscaler.get_summary().items()):
+            if sister_name and name != sister_name:
+                continue
+            print(f"{name:<10} Instances: {info['instances']} (min {info['min']}, max {info['max']})  "
+                  f"Spawned: {info['spawned']}  Pressure: {info['pressure']:+d}")
+        decisions = [d for d in self.autoscaler.get_recent_decisions(5)
+                     if not sister_name or d.sister == sister_name]
+        if decisions:
+            print("Recent decisions:")
+            for decision in decisions:
+                print(f"  {decision.describe()}")
+    
     def _handle_safe_mode_command(self, args: List[str]) -> Tuple[bool, str]:
         """Handle the safe_mode command."""
         if len(args) < 2:
@@ -277,29 +368,315 @@ class CommandParser:
     def _handle_execute_command(self, args: List[str]) -> Tuple[bool, str]:
         """Handle the execute command to run an action."""
         if len(args) < 2:
-            return False, "Usage: execute <action> <target>"
+            return False, ("Usage: execute <action> <target> | "
+                           "execute <action> --scope <file> [--concurrency <n>] [--order <fifo|sejf|ljf>]")
         
         action = args[0]
-        target = args[1]
         
         # Validate action type
-        valid_actions = ["assimilate", "recon", "chaos", "ghost"]
+        valid_actions = self.action_manager.catalog.names()
         if action not in valid_actions:
             return False, f"Invalid action: {action}. Valid actions are: {', '.join(valid_actions)}"
         
+        if "--scope" in args:
+            return self._execute_scope_action(action, args[1:])
+        
+        target = args[1]
+        
+        priority = ActionPriority.NORMAL
+        if "--priority" in args:
+            try:
+                priority = ActionPriority.from_name(args[args.index("--priority") + 1])
+            except IndexError:
+                return False, "Usage: execute <action> <target> --priority <urgent|high|normal|bulk>"
+            except ValueError as e:
+                return False, str(e)
+        
         # Check if target is valid
         if target.lower() == "test":
             # Special case for test target
             return self._execute_test_action(action)
         
-        # For real targets, we need to validate the sister exists
-        if not self.action_manager.is_sister_available(target):
-            return False, f"Sister {target} is not available"
+        # Plan the action (this asks for confirmation)
+        success, message, sisters = self.action_manager.plan_action(action, target)
+        if not success:
+            return False, message
+        
+        # Execute the action (or attach to an identical one unless --force is given);
+        # --no-cache wants fresh results, so it doesn't attach either
+        no_cache = "--no-cache" in args
+        success, message = self.action_manager.execute_action(action, target, sisters, priority=priority,
+                                                              reuse="--force" not in args and not no_cache,
+                                                              use_cache=not no_cache)
+        return success, message
+    
+    def _execute_scope_action(self, action: str, args: List[str]) -> Tuple[bool, str]:
+        """Execute an action on every target listed in a scope file."""
+        scope_path = None
+        concurrency = None
+        ordering = None
+        try:
+            scope_path = args[args.index("--scope") + 1]
+            if "--concurrency" in args:
+                concurrency = int(args[args.index("--concurrency") + 1])
+                if concurrency < 1:
+                    return False, "Concurrency must be at least 1"
+            if "--order" in args:
+                ordering = args[args.index("--order") + 1]
+        except IndexError:
+            return False, "Usage: execute <action> --scope <file> [--concurrency <n>] [--order <fifo|sejf|ljf>]"
+        except ValueError:
+            return False, "Concurrency must be a number"
         
-        # Execute the action
-        success, message = self.action_manager.execute_action(action, target)
+        try:
+            targets = load_scope_file(scope_path)
+        except OSError as e:
+            return False, f"Could not read scope file {scope_path}: {e}"
+        
+        # One confirmation for the whole scope
+        success, message, sisters = self.action_manager.plan_batch_action(action, targets)
+        if not success:
+            return False, message
+        
+        def report_progress(target, progress):
+            print(f"\n[Seven] 🕷️ » {action} {target}: {progress.summary()}")
+        
+        success, message, _ = self.action_manager.execute_batch_action(
+            action, targets, sisters,
+            max_concurrency=concurrency,
+            progress_callback=report_progress,
+            ordering=ordering
+        )
         return success, message
     
+    def _handle_queue_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the queue command."""
+        snapshot = self.action_manager.get_queue_snapshot()
+        
+        print(f"\nRunning ({len(snapshot['running'])}/{self.action_manager.max_running_actions}):")
+        print("-" * 50)
+        for entry in snapshot['running']:
+            phase = entry['phase'] or "starting"
+            print(f"  {entry['action_id']:<45} {entry['priority']:<7} {phase}")
+        
+        print(f"\nQueued ({len(snapshot['queued'])}, {self.action_manager.action_queue.policy.description}):")
+        print("-" * 50)
+        for entry in snapshot['queued']:
+            resume = " (preempted)" if entry['status'] == 'paused' else ""
+            print(f"  {entry['action_id']:<45} {entry['priority']:<7} "
+                  f"effective {entry['effective_priority']:.1f}, waiting {entry['waiting']:.0f}s, "
+                  f"expected ~{entry['expected_runtime'] or 0:.0f}s{resume}")
+        
+        print(f"\nPaused ({len(snapshot['paused'])}):")
+        print("-" * 50)
+        for entry in snapshot['paused']:
+            print(f"  {entry['action_id']:<45} {entry['priority']:<7} {entry['pause_reason']}")
+        
+        return True, "Queue displayed"
+    
+    def _handle_pause_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the pause command."""
+        if not args:
+            return False, "Usage: pause <action_id>"
+        
+        action_id = self.action_manager.resolve_action_id(args[0])
+        if not action_id:
+            return False, f"Action not found (or ambiguous): {args[0]}"
+        
+        return self.action_manager.pause_action(action_id)
+    
+    def _handle_resume_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the resume command."""
+        if not args:
+            return False, "Usage: resume <action_id>"
+        
+        action_id = self.action_manager.resolve_action_id(args[0])
+        if not action_id:
+            return False, f"Action not found (or ambiguous): {args[0]}"
+        
+        return self.action_manager.resume_action(action_id)
+    
+    def _handle_output_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the output command."""
+        if not args:
+            return False, "Usage: output <action_id> [lines]"
+        
+        action_id = self.action_manager.resolve_action_id(args[0]) or args[0]
+        count = int(args[1]) if len(args) > 1 else 20
+        
+        output = self.action_manager.get_tool_output(action_id, count)
+        if output is None:
+            return False, f"No tool output for: {args[0]}"
+        
+        print(f"\nTool output for {action_id} (last {len(output['lines'])} of {output['received']} lines):")
+        print("-" * 50)
+        for sister_name, stream, line in output['lines']:
+            marker = "!" if stream == "stderr" else " "
+            print(f"{sister_name:<8}{marker} {line}")
+        if output['dropped']:
+            print(f"({output['dropped']} lines not forwarded; see the sisters' tool logs in the output directory)")
+        
+        return True, "Output displayed"
+    
+    def _handle_delta_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the delta command."""
+        if not args:
+            return False, "Usage: delta <action_id>"
+        
+        action_id = self.action_manager.resolve_action_id(args[0]) or args[0]
+        deltas = self.action_manager.get_deltas(action_id)
+        if not deltas:
+            return False, f"No result deltas for: {args[0]}"
+        
+        for sister_name, delta in deltas.items():
+            first_run = " (first run)" if delta['first_run'] else ""
+            print(f"\n{sister_name} {delta['tool']}{first_run}: +{delta['added']} new, "
+                  f"-{delta['removed']} gone, ~{delta['changed']} changed of {delta['total']}")
+            print("-" * 50)
+            for marker, kind in (("+", "added"), ("~", "changed"), ("-", "removed")):
+                for line in delta['sample'][kind]:
+                    print(f"  {marker} {line}")
+        
+        return True, "Deltas displayed"
+    
+    def _handle_pipeline_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the pipeline command."""
+        if not args:
+            return self._display_pipelines()
+        
+        if args[0] == "stop":
+            if len(args) < 2:
+                return False, "Usage: pipeline stop <run_id>"
+            run = self.pipeline_runs.get(args[1])
+            if run is None:
+                return False, f"No pipeline run: {args[1]}"
+            run.cancel()
+            return True, f"Pipeline run {args[1]} stopped"
+        
+        if len(args) < 2:
+            return False, "Usage: pipeline <name> <target> [--scope <file>]"
+        pipeline = self.pipelines.get(args[0])
+        if pipeline is None:
+            return False, f"Unknown pipeline: {args[0]}. Pipelines are: {', '.join(self.pipelines) or 'none'}"
+        target = args[1]
+        
+        # With a scope file, every host in it is a seed; the results go under the target
+        seeds = None
+        if "--scope" in args:
+            try:
+                scope_path = args[args.index("--scope") + 1]
+            except IndexError:
+                return False, "Usage: pipeline <name> <target> [--scope <file>]"
+            try:
+                scope = load_scope_file(scope_path)
+            except OSError as e:
+                return False, f"Could not read scope file {scope_path}: {e}"
+            seeds = [URL(entry) if "://" in entry else Host(entry) for entry in scope]
+        
+        # The pipeline's action type decides the confirmation and whether its sisters may run
+        if pipeline.action:
+            if seeds is not None:
+                success, message, _ = self.action_manager.plan_batch_action(pipeline.action, scope)
+            else:
+                success, message, _ = self.action_manager.plan_action(pipeline.action, target)
+            if not success:
+                return False, message
+        
+        def report(run: PipelineRun):
+            status = run.describe()
+            results = ", ".join(f"{count} {kind}s" for kind, count in status['results'].items()) or "no results"
+            message = f"Pipeline {run.pipeline.name} on {run.target} {status['state']} in {status['elapsed']:.0f}s: {results}"
+            write_output("Seven", run.target, message)
+            print(f"\n[Seven] 🕷️ » {message} ({status['results_path']})")
+        
+        run = pipeline.start(target, seeds, on_finished=report)
+        self.pipeline_runs[run.run_id] = run
+        return True, f"Pipeline {pipeline.name} started on {target} (run {run.run_id})"
+    
+    def _display_pipelines(self) -> Tuple[bool, str]:
+        """List the configured pipelines and their runs."""
+        print("\nPipelines:")
+        print("-" * 50)
+        for pipeline in self.pipelines.values():
+            stages = " → ".join(f"{stage.name} ({getattr(stage, 'sister_name', 'Seven')})" for stage in pipeline.stages)
+            print(f"  {pipeline.name:<12} {pipeline.description}")
+            print(f"  {'':<12} {stages}")
+        
+        print(f"\nRuns ({len(self.pipeline_runs)}):")
+        print("-" * 50)
+        for run in self.pipeline_runs.values():
+            status = run.describe()
+            print(f"  {status['run_id']:<24} {status['pipeline']:<12} {status['target']:<24} "
+                  f"{status['state']:<9} {status['elapsed']:.0f}s")
+            for name, counts in status['stages'].items():
+                shared = f" (shared {counts['shared']})" if counts['shared'] else ""
+                print(f"    {name:<12} in {counts['in']:<7} runs {counts['runs']:<5}{shared} out {counts['out']}")
+        
+        return True, "Pipelines displayed"
+    
+    def _handle_seen_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the seen command."""
+        if not args:
+            return False, "Usage: seen <target>"
+        
+        stats = get_seen_set(args[0]).get_stats()
+        print(f"\nSeen-set for {args[0]}:")
+        print("-" * 50)
+        print(f"  Entries:              {stats['entries']}")
+        print(f"  Filter memory:        {stats['filter_memory'] / 1024:.0f} KB in {stats['filters']} filter(s)"
+              + (f", {stats['memory_per_million'] / 1048576:.2f} MB per million entries" if stats['capacity'] else ""))
+        print(f"  Exact store:          {stats['store_size'] / 1048576:.1f} MB")
+        print(f"  Checked this session: {stats['checked']} ({stats['new']} new)")
+        fp_rate = stats['false_positive_rate']
+        print(f"  False positive rate:  {'n/a' if fp_rate is None else f'{fp_rate:.4%}'} "
+              f"(configured {stats['error_rate']:.4%})")
+        
+        return True, "Seen-set displayed"
+    
+    def _handle_summary_command(self, args: List[str]) -> Tuple[bool, str]:
+        """Handle the summary command."""
+        if not args:
+            return False, "Usage: summary <target> [host]"
+        
+        correlator = get_correlator(args[0])
+        correlator.refresh()
+        host = args[1].lower() if len(args) > 1 else None
+        # A single host gets all its endpoints, the whole target a few per asset
+        assets = correlator.summary(host, max_endpoints=None if host else 5)
+        if not assets:
+            return False, f"No results for {args[1]} on {args[0]}" if host else f"No results for {args[0]} yet"
+        
+        stats = correlator.get_stats()
+        print(f"\nSummary of {args[0]}: {stats['assets']} assets, {stats['endpoints']} endpoints, "
+              f"{stats['services']} services from {stats['records']} records")
+        print("-" * 50)
+        for asset in assets:
+            findings = ", ".join(f"{count} {severity}" for severity, count in asset['findings'].items())
+            print(f"\n{asset['host']}" + (f" ({', '.join(asset['ips'])})" if asset['ips'] else "")
+                  + (f"  [{findings}]" if findings else ""))
+            print(f"  Sources: {', '.join(asset['sources'])}")
+            for service in asset['services']:
+                name = "/".join(service['names']) or "?"
+                banner = f" {service['banners'][0]}" if service['banners'] else ""
+                endpoints = f", {service['endpoints']} endpoints" if service['endpoints'] else ""
+                print(f"  {service['port']}/{service['protocol']:<4} {name}{banner} "
+                      f"({', '.join(service['sources'])}{endpoints})")
+                for finding in service['findings']:
+                    print(f"      ⚠️ [{finding['severity']}] {finding['template']} ({', '.join(finding['sources'])})")
+            for finding in asset['host_findings']:
+                print(f"  ⚠️ [{finding['severity']}] {finding['template']} {finding['location']} "
+                      f"({', '.join(finding['sources'])})")
+            for endpoint in asset['endpoints']:
+                statuses = ", ".join(f"{source} {status}" for source, status in endpoint['status'].items())
+                print(f"  {endpoint['url']}  ({statuses or ', '.join(endpoint['sources'])})")
+                for finding in endpoint['findings']:
+                    print(f"      ⚠️ [{finding['severity']}] {finding['template']} ({', '.join(finding['sources'])})")
+            hidden = asset['endpoint_count'] - len(asset['endpoints'])
+            if hidden > 0:
+                print(f"  ... and {hidden} more endpoints (summary {args[0]} {asset['host']})")
+        
+        return True, "Summary displayed"
+    
     def _execute_test_action(self, action: str) -> Tuple[bool, str]:
         """Execute a test action without a real target."""
         if action == "recon":
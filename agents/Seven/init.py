@@ -12,19 +12,25 @@ from typing import Dict, List, Optional, Any, Tuple
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from output_handler import write_output
+from output_handler import write_output, install_sigterm_handler
 from agents.shared.tool_check import verify_tools
+from agents.shared.tool_runner import pause_tool, resume_tool
+from agents.shared.tool_executor import get_tool_executor, submit_tool
+from agents.shared.output_stream import tool_output_sinks
+from agents.shared.phase_worker import PhaseWorker
 from agents.Seven.interface import display_borg_interface, display_help, display_status_prompt, display_error, display_success, display_warning, confirm_dangerous_operation
 from agents.Seven.command_parser import CommandParser
-from agents.shared.sister_comm import SisterCommManager, Message
+from agents.shared.sister_comm import SisterCommManager, Message, PhaseWorkBroker, PhaseWorkConsumer, get_instance_id, get_instance_concurrency
 from agents.shared.action_manager import ActionManager
+from agents.shared.autoscaler import Autoscaler
 from agents.shared.horizon.seven_log_viewer import SevenLogViewer
 from agents.shared.horizon.logger import logger
 from agents.shared.configuration_manager import ConfigurationManager, ConfigChangeType
 
 SISTER_NAME = "Seven"
+INSTANCE_ID = get_instance_id(SISTER_NAME)
 PID_DIR = os.path.join(os.path.expanduser("~"), ".7sisters", "pids")
-PID_FILE = os.path.join(PID_DIR, f"{SISTER_NAME}.pid")
+PID_FILE = os.path.join(PID_DIR, f"{INSTANCE_ID}.pid")
 CONFIG_PATH = "seven_sisters.config.json"
 BANTER_ENGINE = os.path.abspath("banter_engine.py")
 FAIL_COUNTER_PATH = os.path.join(os.path.dirname(__file__), "seven_fail.count")
@@ -42,6 +48,7 @@ IS_BOSS = os.environ.get("SEVEN_IS_BOSS", "false").lower() == "true"
 # Initialize communication manager
 comm_manager = None
 action_manager = None
+autoscaler = None
 
 # Initialize configuration manager
 config_manager = ConfigurationManager()
@@ -230,26 +237,62 @@ def setup_commands():
         action_manager.update_action_status(action_id, 'complete')
         return {'status': 'complete', 'action_id': action_id}
     
+    def handle_pause_action(args):
+        """Pause this sister's tool runs for an action: queued ones wait, running ones get SIGSTOP."""
+        action_id = args.get('action_id')
+        held = get_tool_executor().pause_key(action_id)
+        paused = pause_tool(action_id) or held > 0
+        if paused:
+            speak(f"⏸️ Holding assimilation of {action_id}")
+        return {'success': paused, 'action_id': action_id}
+    
+    def handle_cancel_action(args):
+        """Stop this sister's tool runs for an action (queued ones never start)."""
+        action_id = args.get('action_id')
+        cancelled = get_tool_executor().cancel_key(action_id)
+        return {'success': cancelled > 0, 'action_id': action_id}
+    
+    def handle_resume_action(args):
+        """Resume this sister's paused tool runs for an action (SIGCONT, and let queued ones start)."""
+        action_id = args.get('action_id')
+        resumed = resume_tool(action_id)
+        resumed = get_tool_executor().resume_key(action_id) > 0 or resumed
+        if resumed:
+            speak(f"▶️ Assimilation of {action_id} resumed")
+        return {'success': resumed, 'action_id': action_id}
+    
     # Register command handlers
     comm_manager.command_handler.register_command('status', handle_status_query)
     comm_manager.command_handler.register_command('safe_mode', handle_safe_mode_toggle)
     comm_manager.command_handler.register_command('safe_mode_change', handle_safe_mode_change)
     comm_manager.command_handler.register_command('level', handle_level_change)
     comm_manager.command_handler.register_command('execute_action', handle_action_execution)
+    comm_manager.command_handler.register_command('pause_action', handle_pause_action)
+    comm_manager.command_handler.register_command('resume_action', handle_resume_action)
+    comm_manager.command_handler.register_command('cancel_action', handle_cancel_action)
 
 def trigger_banter(event_type="start"):
     subprocess.run(["python", BANTER_ENGINE, SISTER_NAME, event_type])
 
-def run_tool(target):
+def run_tool(target, action_id=None, use_cache=True):
     tool_exists, _ = verify_tools([TOOL_NAME], SISTER_NAME, speak)
     if tool_exists:
         speak(f"🕷️ Assimilating target: {target}")
         write_output(SISTER_NAME, target, "🕷️ Starting assimilation operations on target")
-        subprocess.run(["bash", TOOL_NAME, target])
-        write_output(SISTER_NAME, target, "✅ Target assimilated")
+        sinks = tool_output_sinks(SISTER_NAME, target, action_id, comm_manager)
+
+        def finished(job):
+            if job.succeeded:
+                write_output(SISTER_NAME, target, "✅ Target assimilated")
+
+        return submit_tool(SISTER_NAME, ["bash", TOOL_NAME, target], action_id or target,
+                           sinks=sinks, callback=finished, target=target, use_cache=use_cache,
+                           run_id=action_id)
     else:
         speak("🕷️ My assimilation tools are missing...")
         write_output(SISTER_NAME, target, "❌ Tool script not found: assimilate.sh")
+        # Fail the phase, so Seven sees the action go wrong instead of complete
+        raise FileNotFoundError("Tool script not found: assimilate.sh")
 
 def cleanup_pid_file():
     if os.path.exists(PID_FILE):
@@ -267,7 +310,7 @@ def boot_sequence():
 def run_interface():
     """Run Seven's command interface."""
     display_borg_interface()
-    parser = CommandParser(action_manager)
+    parser = CommandParser(action_manager, autoscaler)
     
     while True:
         try:
@@ -280,7 +323,7 @@ def run_interface():
                 break
                 
             if command.lower() == "help":
-                display_help()
+                display_help(action_manager.catalog)
                 continue
                 
             success, message = parser.parse_command(command)
@@ -298,24 +341,36 @@ def run_interface():
             logger.error(f"Interface error: {str(e)}")
 
 def main():
-    global comm_manager, action_manager
+    global comm_manager, action_manager, autoscaler
     
     write_pid_file()
     atexit.register(cleanup_pid_file)
+    install_sigterm_handler()
 
     # Set up communication
     comm_manager = SisterCommManager(SISTER_NAME)
     comm_manager.setup()
     
     # Set up action management
+    work_broker = PhaseWorkBroker()
+    work_broker.start()
     action_manager = ActionManager()
-    action_manager.setup(comm_manager)
+    action_manager.setup(comm_manager, work_broker)
+    autoscaler = Autoscaler(action_manager, action_manager.config.get("autoscaling"))
+    if autoscaler.enabled:
+        autoscaler.start()
     
     # Set up commands
     setup_commands()
+    phase_worker = PhaseWorker(SISTER_NAME, comm_manager, run_tool)
+    phase_worker.register()
+    work_consumer = PhaseWorkConsumer(SISTER_NAME, INSTANCE_ID, phase_worker.handle_execute_phase,
+                                      max_in_flight=max(get_instance_concurrency(),
+                                                        get_tool_executor().sister_limit(SISTER_NAME)))
+    work_consumer.start()
     
     # Initialize command parser
-    parser = CommandParser(action_manager)
+    parser = CommandParser(action_manager, autoscaler)
     
     # Send initial status
     comm_manager.send_status("initializing")
@@ -389,7 +444,7 @@ def main():
                 print("\n🧹 Mischief Managed: Shutting down the Sisterhood...")
                 break
             elif command.lower() == "help":
-                display_help()
+                display_help(action_manager.catalog)
             elif not success:
                 display_error(message)
             elif message != "help" and message != "Status displayed":
@@ -402,6 +457,10 @@ def main():
             display_error(f"Error: {str(e)}")
     
     # Cleanup
+    work_consumer.stop()
+    if autoscaler.enabled:
+        autoscaler.stop()
+    work_broker.stop()
     comm_manager.cleanup()
     cleanup_pid_file()
 
@@ -2,6 +2,7 @@ import os
 import sys
 import time
 from typing import Optional
+from agents.shared.action_catalog import ActionCatalog
 from agents.shared.sister_status import SisterStatusManager
 
 # Initialize the status manager
@@ -31,24 +32,55 @@ def display_borg_interface():
     print("'status' to view sister status.")
     print("'mischief managed' to shut down all sisters.")
 
-def display_help():
+def format_action_help(catalog: ActionCatalog) -> str:
+    """List the action types defined in the config, one line each."""
+    entries = [(f"- {plan.name}: {plan.summary}", plan.dangerous) for plan in catalog.all()]
+    width = max((len(entry) for entry, _ in entries), default=0) + 4
+    return "\n".join(
+        f"{entry:<{width}}{'(⚠️ Dangerous)' if dangerous else '(🟢 Safe)'}" for entry, dangerous in entries
+    )
+
+def display_help(catalog: Optional[ActionCatalog] = None):
     """Display help information for available commands."""
-    help_text = """
+    catalog = catalog or ActionCatalog()
+    help_text = f"""
 Available Commands:
 ------------------
 status <sister>                - Check status of a sister
 safe_mode <sister> on/off      - Toggle safe mode for a sister
 level <sister> <level>         - Change sister's operation level (0-5)
-execute <action> <target>      - Execute an action (requires confirmation)
+execute <action> <target> [--priority <p>] [--force] [--no-cache]
+                               - Execute an action (requires confirmation)
+                                 priorities: urgent, high, normal, bulk
+                                 --force runs it even if an identical action is
+                                 running or finished recently
+                                 --no-cache reruns the tools even if they have
+                                 cached results for the target
+execute <action> --scope <file> [--concurrency <n>] [--order <o>]
+                               - Execute an action on every target in a scope file
+                                 (one confirmation for the whole scope)
+                                 orders: fifo, sejf (shortest expected first),
+                                 ljf (largest expected first)
+queue                          - Show running, queued and paused actions
+pause <action_id>              - Pause an action (stops its tools)
+resume <action_id>             - Resume a paused action
+output <action_id> [lines]     - Show the latest tool output of an action
+delta <action_id>              - Show new, changed and gone results since the last run
+pipeline [<name> <target>]     - Stream a target through a pipeline of sister tools
+                                 (no arguments lists pipelines and runs)
+pipeline <name> <target> --scope <file>
+                               - Stream every host in a scope file through a pipeline,
+                                 with the results under the target
+pipeline stop <run_id>         - Stop a pipeline run
+seen <target>                  - Show how much a target's seen-set holds and costs
+summary <target> [host]        - Show one consolidated view per asset: services,
+                                 endpoints and findings, with the sisters that saw them
 help                           - Show this help message
 mischief managed               - Exit the interface and shut down all sisters
 
 Actions:
 --------
-- assimilate: Aggressive system modification    (⚠️ Dangerous)
-- recon: System reconnaissance                  (🟢 Safe)
-- chaos: System disruption                      (⚠️ Dangerous)
-- ghost: System obfuscation                     (⚠️ Dangerous)
+{format_action_help(catalog)}
 
 Examples:
 ---------
@@ -56,6 +88,10 @@ status Alice
 safe_mode Harley off
 level Luna 2
 execute recon /path/to/target
+execute recon --scope scope.txt --concurrency 4
+pipeline web example.com
+pipeline ports example.com --scope scope.txt
+summary example.com
 """
     print(help_text)
 
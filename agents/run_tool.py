@@ -1,9 +1,13 @@
 import os
-import subprocess
 import sys
 import platform
 import json
 
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.shared.tool_runner import run_tool_process, ToolTimeoutError
+
 # Determine bash path based on platform
 if platform.system() == "Windows":
     # Try common Git Bash locations on Windows
@@ -65,12 +69,15 @@ def run_agent_tool(agent, target=None):
         return
 
     try:
-        subprocess.run([bash_path, tool_path, target], check=True)
+        returncode = run_tool_process([bash_path, tool_path, target], f"{agent}:{target}")
     except FileNotFoundError:
         print(f"\n[{agent}] » Uh-oh! Couldn't find Bash at: {bash_path}")
         sys.exit(1)
-    except subprocess.CalledProcessError as e:
-        print(f"\n[{agent}] » Tool failed with exit code {e.returncode}!")
+    except ToolTimeoutError as e:
+        print(f"\n[{agent}] » {e}")
+        return
+    if returncode != 0:
+        print(f"\n[{agent}] » Tool failed with exit code {returncode}!")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
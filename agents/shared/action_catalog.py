@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# Seconds between checks of the config file for changes
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+class ActionPhase(Enum):
+    """Enum for action phases in multi-sister coordination."""
+    INITIALIZATION = "initialization"
+    PREPARATION = "preparation"
+    EXECUTION = "execution"
+    VERIFICATION = "verification"
+    CLEANUP = "cleanup"
+
+class ErrorType(Enum):
+    """Enum for different types of errors that can occur during action execution."""
+    CONNECTION = "connection_error"
+    TIMEOUT = "timeout_error"
+    EXECUTION = "execution_error"
+    VALIDATION = "validation_error"
+    COORDINATION = "coordination_error"
+    SYSTEM = "system_error"
+
+# Error types an action doesn't configure are not retried
+NO_RECOVERY = MappingProxyType({"max_retries": 0, "backoff_time": 0})
+
+
+@dataclass(frozen=True)
+class ActionPlan:
+    """
+    Compiled, immutable definition of one action type.
+
+    Built from the "actions" section of the config by compile_actions. The
+    phase order, the sisters of each phase and the phases of each sister are
+    worked out once here, so planning and phase dispatch only look them up.
+    """
+    name: str
+    description: str
+    summary: str
+    dangerous: bool
+    impact: str
+    duration: str
+    reversibility: str
+    required_level: int
+    required_sisters: Tuple[str, ...]
+    optional_sisters: Tuple[str, ...]
+    preferred_order: Tuple[str, ...]
+    candidate_order: Tuple[str, ...]  # optional sisters in order of preference
+    min_sisters: int
+    max_sisters: int
+    timeout: float
+    retry_count: int
+    phase_order: Tuple[ActionPhase, ...]
+    phase_sisters: Mapping[ActionPhase, Tuple[str, ...]]
+    sister_phases: Mapping[str, Tuple[ActionPhase, ...]]
+    error_recovery: Mapping[ErrorType, Mapping[str, Any]]
+
+    def next_phase(self, phase: Optional[ActionPhase]) -> Optional[ActionPhase]:
+        """The phase after the given one (the first phase for None), or None after the last."""
+        if phase is None:
+            return self.phase_order[0] if self.phase_order else None
+        index = self.phase_order.index(phase) + 1
+        return self.phase_order[index] if index < len(self.phase_order) else None
+
+    def preference(self, sister_name: str) -> int:
+        """Position of a sister in the preferred order (unlisted sisters come last)."""
+        try:
+            return self.preferred_order.index(sister_name)
+        except ValueError:
+            return len(self.preferred_order)
+
+
+def _order_phases(name: str, phases: Dict[ActionPhase, Tuple[str, ...]],
+                  dependencies: Dict[str, List[str]]) -> Tuple[ActionPhase, ...]:
+    """
+    Put the phases in an order that respects their dependencies.
+
+    A phase without an explicit "depends_on" entry depends on the phase listed
+    before it; among the phases that are ready, the one listed first goes first.
+    """
+    listed = list(phases)
+    requires = {}
+    for index, phase in enumerate(listed):
+        if phase.value in dependencies:
+            try:
+                requires[phase] = {ActionPhase(dep) for dep in dependencies[phase.value]}
+            except ValueError as e:
+                raise ValueError(f"Action {name}: {e}")
+            unknown = requires[phase] - set(listed)
+            if unknown:
+                raise ValueError(f"Action {name}: phase {phase.value} depends on undefined phase "
+                                 f"{', '.join(sorted(p.value for p in unknown))}")
+        else:
+            requires[phase] = {listed[index - 1]} if index else set()
+
+    order = []
+    while len(order) < len(listed):
+        ready = [p for p in listed if p not in order and requires[p] <= set(order)]
+        if not ready:
+            raise ValueError(f"Action {name}: phase dependencies form a cycle")
+        order.append(ready[0])
+    return tuple(order)
+
+
+def compile_action(name: str, definition: Dict[str, Any]) -> ActionPlan:
+    """
+    Compile one action definition from the config.
+
+    Raises:
+        ValueError: If the definition is incomplete or inconsistent
+    """
+    try:
+        phases = {ActionPhase(phase): tuple(sisters) for phase, sisters in definition["phases"].items()}
+        error_recovery = {ErrorType(error): MappingProxyType(dict(policy))
+                          for error, policy in definition.get("error_recovery", {}).items()}
+        required = tuple(definition.get("required_sisters", []))
+        optional = tuple(definition.get("optional_sisters", []))
+        preferred = tuple(definition.get("preferred_order", required + optional))
+        timeout = float(definition["timeout"])
+    except KeyError as e:
+        raise ValueError(f"Action {name}: missing {e}")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Action {name}: {e}")
+
+    phase_order = _order_phases(name, phases, definition.get("depends_on", {}))
+    for error_type in ErrorType:
+        error_recovery.setdefault(error_type, NO_RECOVERY)
+
+    sister_phases = {}
+    for phase in phase_order:
+        for sister in phases[phase]:
+            sister_phases.setdefault(sister, []).append(phase)
+
+    min_sisters = definition.get("min_sisters", 1)
+    max_sisters = definition.get("max_sisters", len(required) + len(optional))
+    if min_sisters > max_sisters:
+        raise ValueError(f"Action {name}: min_sisters ({min_sisters}) is above max_sisters ({max_sisters})")
+
+    return ActionPlan(
+        name=name,
+        description=definition.get("description", ""),
+        summary=definition.get("summary", definition.get("description", "")),
+        dangerous=bool(definition.get("dangerous", False)),
+        impact=definition.get("impact", "LOW"),
+        duration=definition.get("duration", "Unknown"),
+        reversibility=definition.get("reversibility", "Unknown"),
+        required_level=definition.get("required_level", 0),
+        required_sisters=required,
+        optional_sisters=optional,
+        preferred_order=preferred,
+        candidate_order=tuple(s for s in preferred if s in optional and s not in required),
+        min_sisters=min_sisters,
+        max_sisters=max_sisters,
+        timeout=timeout,
+        retry_count=definition.get("retry_count", 0),
+        phase_order=phase_order,
+        phase_sisters=MappingProxyType(phases),
+        sister_phases=MappingProxyType({s: tuple(p) for s, p in sister_phases.items()}),
+        error_recovery=MappingProxyType(error_recovery)
+    )
+
+
+def compile_actions(definitions: Dict[str, Dict[str, Any]]) -> Dict[str, ActionPlan]:
+    """Compile the "actions" section of the config into plans keyed by action type."""
+    return {name: compile_action(name, definition) for name, definition in definitions.items()}
+
+
+class ActionCatalog:
+    """
+    The action types defined in the config, compiled into ActionPlans.
+
+    The plans are compiled when the catalog is created and again only when
+    the config file changes (checked at most every RELOAD_CHECK_INTERVAL
+    seconds). If a changed config doesn't compile, the previous plans stay in
+    use. Plans are immutable, so callers may keep one for as long as an
+    action runs.
+    """
+
+    def __init__(self, config_path: str = "seven_sisters.config.json"):
+        """
+        Initialize the ActionCatalog.
+
+        Args:
+            config_path: Path to the configuration file
+        """
+        self.config_path = config_path
+        self.plans: Dict[str, ActionPlan] = {}
+        self.lock = threading.Lock()
+        self.signature = None
+        self.last_checked = 0.0
+        self.reload(force=True)
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Recompile the plans if the config file changed.
+
+        Returns:
+            True if the plans were recompiled
+        """
+        with self.lock:
+            self.last_checked = time.monotonic()
+            signature = self._file_signature()
+            if signature == self.signature and not force:
+                return False
+            self.signature = signature
+            try:
+                with open(self.config_path, "r", encoding="utf-8") as f:
+                    definitions = json.load(f).get("actions", {})
+                self.plans = compile_actions(definitions)
+            except (OSError, ValueError) as e:
+                print(f"Error loading action definitions: {e}")
+                return False
+            return True
+
+    def _refresh(self):
+        if time.monotonic() - self.last_checked >= RELOAD_CHECK_INTERVAL:
+            self.reload()
+
+    def get(self, action_type: str) -> Optional[ActionPlan]:
+        """The plan of an action type, or None if it isn't defined."""
+        self._refresh()
+        return self.plans.get(action_type)
+
+    def names(self) -> List[str]:
+        """The defined action types, in config order."""
+        self._refresh()
+        return list(self.plans)
+
+    def all(self) -> List[ActionPlan]:
+        """Every defined plan, in config order."""
+        self._refresh()
+        return list(self.plans.values())
@@ -7,6 +7,7 @@ from typing import Dict, List, Optional, Any, Tuple
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from agents.shared.action_catalog import ActionCatalog
 from output_handler import write_output
 
 class ActionConfirmation:
@@ -16,15 +17,17 @@ class ActionConfirmation:
     and requires explicit user approval before proceeding.
     """
     
-    def __init__(self, config_path: str = "seven_sisters.config.json"):
+    def __init__(self, config_path: str = "seven_sisters.config.json", catalog: Optional[ActionCatalog] = None):
         """
         Initialize the ActionConfirmation system.
         
         Args:
             config_path: Path to the configuration file
+            catalog: Action definitions to describe (loaded from config_path if not given)
         """
         self.config_path = config_path
         self.config = self._load_config()
+        self.catalog = catalog or ActionCatalog(config_path)
         self.sister_emojis = {
             "Alice": "🐇",
             "Bride": "🔮",
@@ -34,38 +37,6 @@ class ActionConfirmation:
             "Marla": "🧹",
             "Seven": "🕷️"
         }
-        
-        # Action type descriptions and impact levels
-        self.action_types = {
-            "assimilate": {
-                "description": "Complete system takeover and control",
-                "impact": "HIGH",
-                "duration": "Long-term",
-                "reversibility": "Difficult",
-                "required_level": 4
-            },
-            "recon": {
-                "description": "Information gathering and analysis",
-                "impact": "LOW",
-                "duration": "Short-term",
-                "reversibility": "Immediate",
-                "required_level": 0
-            },
-            "chaos": {
-                "description": "System disruption and disorder",
-                "impact": "MEDIUM",
-                "duration": "Medium-term",
-                "reversibility": "Moderate",
-                "required_level": 2
-            },
-            "ghost": {
-                "description": "Stealth operations and silent infiltration",
-                "impact": "MEDIUM",
-                "duration": "Medium-term",
-                "reversibility": "Moderate",
-                "required_level": 1
-            }
-        }
     
     def _load_config(self) -> Dict:
         """Load the configuration file."""
@@ -119,7 +90,7 @@ class ActionConfirmation:
                 max_level = max(max_level, level)
                 
                 # Check if sister's level is below required level for action
-                required_level = self.action_types[action_type]["required_level"]
+                required_level = self.catalog.get(action_type).required_level
                 if level < required_level:
                     risk_factors.append(f"{sister_name} is below required level {required_level}")
         
@@ -134,8 +105,8 @@ class ActionConfirmation:
             risk_factors.append(f"Sisters not in safe mode: {', '.join(unsafe_sisters)}")
         
         # Determine risk level based on action type and sister properties
-        action_info = self.action_types[action_type]
-        base_risk = action_info["impact"]
+        action_info = self.catalog.get(action_type)
+        base_risk = action_info.impact
         
         if base_risk == "HIGH" or (unsafe_sisters and max_level >= 4):
             risk_level = "HIGH"
@@ -173,13 +144,13 @@ class ActionConfirmation:
         print(f"TARGET: {target}\n")
         
         # Display action type information
-        action_info = self.action_types[action_type]
+        action_info = self.catalog.get(action_type)
         print("ACTION TYPE INFORMATION:")
-        print(f"  • Description: {action_info['description']}")
-        print(f"  • Impact Level: {action_info['impact']}")
-        print(f"  • Duration: {action_info['duration']}")
-        print(f"  • Reversibility: {action_info['reversibility']}")
-        print(f"  • Required Level: {action_info['required_level']}\n")
+        print(f"  • Description: {action_info.description}")
+        print(f"  • Impact Level: {action_info.impact}")
+        print(f"  • Duration: {action_info.duration}")
+        print(f"  • Reversibility: {action_info.reversibility}")
+        print(f"  • Required Level: {action_info.required_level}\n")
         
         # Display the sisters involved
         print("SISTERS ASSIGNED:")
@@ -204,9 +175,9 @@ class ActionConfirmation:
         print(f"  • Target: {target}")
         print(f"  • Sisters: {', '.join(sisters)}")
         print(f"  • Risk Level: {risk_level}")
-        print(f"  • Impact: {action_info['impact']}")
-        print(f"  • Duration: {action_info['duration']}")
-        print(f"  • Reversibility: {action_info['reversibility']}")
+        print(f"  • Impact: {action_info.impact}")
+        print(f"  • Duration: {action_info.duration}")
+        print(f"  • Reversibility: {action_info.reversibility}")
         print()
         
         # Request confirmation
@@ -226,6 +197,79 @@ class ActionConfirmation:
             write_output("Seven", target, f"❌ Action cancelled: {action_type} operation on {target} with sisters {', '.join(sisters)}")
             return False
     
+    def confirm_batch_action(self, action_type: str, targets: List[str], sisters: List[str],
+                             preview_count: int = 10) -> bool:
+        """
+        Display a summary of an action over a whole scope and request a single confirmation.
+
+        Args:
+            action_type: The type of action to be performed
+            targets: All in-scope targets
+            sisters: List of sisters involved in every action
+            preview_count: Number of targets to list before summarizing the rest
+
+        Returns:
+            True if the batch is confirmed, False otherwise
+        """
+        # Clear the screen for better visibility
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+        # Print the batch confirmation header
+        print("\n" + "=" * 80)
+        print(f"BATCH CONFIRMATION: {action_type.upper()} OPERATION ON {len(targets)} TARGETS")
+        print("=" * 80 + "\n")
+
+        # Display the scope
+        print("SCOPE:")
+        for target in targets[:preview_count]:
+            print(f"  • {target}")
+        if len(targets) > preview_count:
+            print(f"  ... and {len(targets) - preview_count} more")
+        print()
+
+        # Display action type information
+        action_info = self.catalog.get(action_type)
+        print("ACTION TYPE INFORMATION:")
+        print(f"  • Description: {action_info.description}")
+        print(f"  • Impact Level: {action_info.impact}")
+        print(f"  • Duration: {action_info.duration}")
+        print(f"  • Reversibility: {action_info.reversibility}")
+        print(f"  • Required Level: {action_info.required_level}\n")
+
+        # Display the sisters involved
+        print("SISTERS ASSIGNED:")
+        for sister in sisters:
+            print(f"  {self._format_sister_status(sister)}")
+        print()
+
+        # Calculate and display the risk level
+        risk_level, risk_description, risk_factors = self._calculate_risk_level(action_type, sisters)
+        risk_emoji = "🔴" if risk_level == "HIGH" else "🟡" if risk_level == "MEDIUM" else "🟢"
+        print(f"RISK ASSESSMENT: {risk_emoji} {risk_level}")
+        print(f"  {risk_description}")
+        if risk_factors:
+            print("\n  Risk Factors:")
+            for factor in risk_factors:
+                print(f"    • {factor}")
+        print()
+
+        # Request confirmation
+        print("=" * 80)
+        print("CONFIRMATION REQUIRED")
+        print("=" * 80)
+        print(f"\nDo you want to proceed with this {action_type} operation on all {len(targets)} targets? (yes/no): ")
+
+        # Get user input
+        response = input().strip().lower()
+
+        # Log the confirmation result once for the whole scope
+        if response == "yes":
+            write_output("Seven", "scope", f"✅ Batch confirmed: {action_type} operation on {len(targets)} targets with sisters {', '.join(sisters)}")
+            return True
+        else:
+            write_output("Seven", "scope", f"❌ Batch cancelled: {action_type} operation on {len(targets)} targets with sisters {', '.join(sisters)}")
+            return False
+
     def display_action_summary(self, action_type: str, target: str, sisters: List[str]) -> None:
         """
         Display a summary of the planned action without requesting confirmation.
@@ -248,13 +292,13 @@ class ActionConfirmation:
         print(f"TARGET: {target}\n")
         
         # Display action type information
-        action_info = self.action_types[action_type]
+        action_info = self.catalog.get(action_type)
         print("ACTION TYPE INFORMATION:")
-        print(f"  • Description: {action_info['description']}")
-        print(f"  • Impact Level: {action_info['impact']}")
-        print(f"  • Duration: {action_info['duration']}")
-        print(f"  • Reversibility: {action_info['reversibility']}")
-        print(f"  • Required Level: {action_info['required_level']}\n")
+        print(f"  • Description: {action_info.description}")
+        print(f"  • Impact Level: {action_info.impact}")
+        print(f"  • Duration: {action_info.duration}")
+        print(f"  • Reversibility: {action_info.reversibility}")
+        print(f"  • Required Level: {action_info.required_level}\n")
         
         # Display the sisters involved
         print("SISTERS ASSIGNED:")
@@ -279,9 +323,9 @@ class ActionConfirmation:
         print(f"  • Target: {target}")
         print(f"  • Sisters: {', '.join(sisters)}")
         print(f"  • Risk Level: {risk_level}")
-        print(f"  • Impact: {action_info['impact']}")
-        print(f"  • Duration: {action_info['duration']}")
-        print(f"  • Reversibility: {action_info['reversibility']}")
+        print(f"  • Impact: {action_info.impact}")
+        print(f"  • Duration: {action_info.duration}")
+        print(f"  • Reversibility: {action_info.reversibility}")
         print()
         
         print("=" * 80)
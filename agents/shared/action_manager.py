@@ -2,33 +2,28 @@ import os
 import sys
 import json
 import time
+import uuid
 import threading
+from collections import OrderedDict, deque
 from typing import Dict, List, Optional, Any, Tuple
-from enum import Enum
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from agents.shared.action_catalog import ActionCatalog, ActionPhase, ActionPlan, ErrorType
 from agents.shared.action_confirmation import ActionConfirmation
-from agents.shared.sister_comm import SisterCommManager, Message
+from agents.shared.sister_comm import SisterCommManager, Message, PhaseWorkBroker
+from agents.shared.batch_runner import BatchRunner, DEFAULT_MAX_CONCURRENT_ACTIONS, DEFAULT_SISTER_LIMIT
+from agents.shared.task_queue import ActionQueue, ActionPriority, QueuedAction, DEFAULT_AGING_SECONDS, get_ordering_policy
+from agents.shared.runtime_predictor import RuntimePredictor
+from agents.shared.clock import SystemClock
+from agents.shared.phase_latch import PhaseLatch
+from agents.shared.duration_stats import DurationStore, DEFAULT_STORE_PATH
+from agents.shared.targets import normalize_target
 from output_handler import write_output
 
-class ActionPhase(Enum):
-    """Enum for action phases in multi-sister coordination."""
-    INITIALIZATION = "initialization"
-    PREPARATION = "preparation"
-    EXECUTION = "execution"
-    VERIFICATION = "verification"
-    CLEANUP = "cleanup"
-
-class ErrorType(Enum):
-    """Enum for different types of errors that can occur during action execution."""
-    CONNECTION = "connection_error"
-    TIMEOUT = "timeout_error"
-    EXECUTION = "execution_error"
-    VALIDATION = "validation_error"
-    COORDINATION = "coordination_error"
-    SYSTEM = "system_error"
+# How long wait_for_action lets an action stay paused before the pause counts against its timeout
+DEFAULT_MAX_PAUSED_WAIT = 3600.0
 
 class ActionManager:
     """
@@ -36,22 +31,75 @@ class ActionManager:
     Handles action planning, sister assignment, and execution coordination.
     """
     
-    def __init__(self, config_path: str = "seven_sisters.config.json"):
+    def __init__(self, config_path: str = "seven_sisters.config.json", clock: Optional[SystemClock] = None):
         """
         Initialize the ActionManager.
         
         Args:
             config_path: Path to the configuration file
+            clock: Source of time, timers and background threads (the simulator passes a virtual one)
         """
         self.config_path = config_path
+        self.clock = clock or SystemClock()
         self.config = self._load_config()
-        self.confirmation = ActionConfirmation(config_path)
+        
+        # Action types come from the "actions" section of the config, compiled into immutable plans
+        self.catalog = ActionCatalog(config_path)
+        self.confirmation = ActionConfirmation(config_path, self.catalog)
         self.action_history = []
         self.comm_manager = None
+        self.work_broker = None
         self.action_status = {}
         self.action_timeouts = {}
         self.action_threads = {}
         self.coordination_locks = {}
+        self.batches = {}
+        
+        # Pending actions wait here until an execution slot is free
+        queue_config = self.config.get("queue", {})
+        self.action_queue = ActionQueue(queue_config.get("aging_seconds", DEFAULT_AGING_SECONDS),
+                                        get_ordering_policy(queue_config.get("ordering", "fifo")))
+        self.max_running_actions = queue_config.get("max_running_actions", DEFAULT_MAX_CONCURRENT_ACTIONS)
+        self.preemption_enabled = queue_config.get("preemption", True)
+        self.max_paused_wait = queue_config.get("max_paused_wait", DEFAULT_MAX_PAUSED_WAIT)
+        self.running_actions = set()
+        self.queue_lock = threading.RLock()
+        
+        # Recent phase latency per sister (EWMA, seconds) for load-aware assignment
+        scheduling_config = self.config.get("scheduling", {})
+        self.latency_alpha = scheduling_config.get("latency_alpha", 0.3)
+        self.default_phase_latency = scheduling_config.get("default_phase_latency", 30.0)
+        self.load_report_max_age = scheduling_config.get("load_report_max_age", 30.0)
+        self.sister_latency = {}
+        
+        # Phase and tool duration history, used to derive action deadlines
+        timeout_config = self.config.get("timeouts", {})
+        self.adaptive_timeouts = timeout_config.get("adaptive", True)
+        self.timeout_percentile = timeout_config.get("percentile", 95)
+        self.timeout_margin_ratio = timeout_config.get("margin_ratio", 0.25)
+        self.timeout_margin_seconds = timeout_config.get("margin_seconds", 15)
+        self.timeout_min_samples = timeout_config.get("min_samples", 10)
+        self.min_timeout = timeout_config.get("min_timeout", 30)
+        self.duration_store = DurationStore(timeout_config.get("store_path", DEFAULT_STORE_PATH))
+        self.runtime_predictor = RuntimePredictor(self.duration_store, queue_config.get("predictor_min_samples", 3),
+                                                  queue_config.get("class_runtimes"))
+        
+        # Singleflight: identical requests attach to the action already running (or just finished)
+        singleflight_config = self.config.get("singleflight", {})
+        self.singleflight_enabled = singleflight_config.get("enabled", True)
+        self.freshness_seconds = singleflight_config.get("freshness_seconds", 0)
+        self.inflight_actions = {}  # singleflight key -> action ID
+        self.recent_actions = {}  # singleflight key -> (action ID, completion time)
+        self.action_aliases = {}  # attached request ID -> action ID it shares
+        self.singleflight_lock = threading.Lock()
+        
+        # Latest tool output lines streamed by the sisters, per action, for the live view
+        output_config = self.config.get("tool_output", {})
+        self.tool_output_lines = output_config.get("live_view_lines", 200)
+        self.tool_output_actions = output_config.get("live_view_actions", 50)
+        self.tool_output = OrderedDict()  # action ID -> {'lines': deque, 'dropped': int, ...}
+        self.tool_output_lock = threading.Lock()
+        
         self.error_recovery_strategies = {
             ErrorType.CONNECTION: self._handle_connection_error,
             ErrorType.TIMEOUT: self._handle_timeout_error,
@@ -60,110 +108,18 @@ class ActionManager:
             ErrorType.COORDINATION: self._handle_coordination_error,
             ErrorType.SYSTEM: self._handle_system_error
         }
-        
-        # Action type capabilities and requirements
-        self.action_capabilities = {
-            "assimilate": {
-                "required_sisters": ["Seven"],
-                "optional_sisters": ["Harley", "Lisbeth"],
-                "min_sisters": 1,
-                "max_sisters": 3,
-                "preferred_order": ["Seven", "Harley", "Lisbeth"],
-                "timeout": 300,  # 5 minutes
-                "retry_count": 2,
-                "phases": {
-                    ActionPhase.INITIALIZATION: ["Seven"],
-                    ActionPhase.PREPARATION: ["Seven", "Harley"],
-                    ActionPhase.EXECUTION: ["Seven", "Harley", "Lisbeth"],
-                    ActionPhase.VERIFICATION: ["Seven"],
-                    ActionPhase.CLEANUP: ["Seven", "Harley"]
-                },
-                "error_recovery": {
-                    ErrorType.CONNECTION: {"max_retries": 3, "backoff_time": 5},
-                    ErrorType.TIMEOUT: {"max_retries": 2, "backoff_time": 10},
-                    ErrorType.EXECUTION: {"max_retries": 2, "backoff_time": 15},
-                    ErrorType.VALIDATION: {"max_retries": 1, "backoff_time": 5},
-                    ErrorType.COORDINATION: {"max_retries": 2, "backoff_time": 10},
-                    ErrorType.SYSTEM: {"max_retries": 1, "backoff_time": 30}
-                }
-            },
-            "recon": {
-                "required_sisters": [],
-                "optional_sisters": ["Alice", "Luna", "Marla"],
-                "min_sisters": 1,
-                "max_sisters": 3,
-                "preferred_order": ["Alice", "Luna", "Marla"],
-                "timeout": 180,  # 3 minutes
-                "retry_count": 1,
-                "phases": {
-                    ActionPhase.INITIALIZATION: ["Alice"],
-                    ActionPhase.PREPARATION: ["Alice", "Luna"],
-                    ActionPhase.EXECUTION: ["Alice", "Luna", "Marla"],
-                    ActionPhase.VERIFICATION: ["Alice", "Luna"],
-                    ActionPhase.CLEANUP: ["Alice"]
-                },
-                "error_recovery": {
-                    ErrorType.CONNECTION: {"max_retries": 2, "backoff_time": 5},
-                    ErrorType.TIMEOUT: {"max_retries": 1, "backoff_time": 10},
-                    ErrorType.EXECUTION: {"max_retries": 1, "backoff_time": 15},
-                    ErrorType.VALIDATION: {"max_retries": 1, "backoff_time": 5},
-                    ErrorType.COORDINATION: {"max_retries": 1, "backoff_time": 10},
-                    ErrorType.SYSTEM: {"max_retries": 1, "backoff_time": 30}
-                }
-            },
-            "chaos": {
-                "required_sisters": ["Harley"],
-                "optional_sisters": ["Lisbeth", "Marla"],
-                "min_sisters": 1,
-                "max_sisters": 3,
-                "preferred_order": ["Harley", "Lisbeth", "Marla"],
-                "timeout": 240,  # 4 minutes
-                "retry_count": 2,
-                "phases": {
-                    ActionPhase.INITIALIZATION: ["Harley"],
-                    ActionPhase.PREPARATION: ["Harley", "Lisbeth"],
-                    ActionPhase.EXECUTION: ["Harley", "Lisbeth", "Marla"],
-                    ActionPhase.VERIFICATION: ["Harley"],
-                    ActionPhase.CLEANUP: ["Harley", "Lisbeth"]
-                },
-                "error_recovery": {
-                    ErrorType.CONNECTION: {"max_retries": 3, "backoff_time": 5},
-                    ErrorType.TIMEOUT: {"max_retries": 2, "backoff_time": 10},
-                    ErrorType.EXECUTION: {"max_retries": 2, "backoff_time": 15},
-                    ErrorType.VALIDATION: {"max_retries": 1, "backoff_time": 5},
-                    ErrorType.COORDINATION: {"max_retries": 2, "backoff_time": 10},
-                    ErrorType.SYSTEM: {"max_retries": 1, "backoff_time": 30}
-                }
-            },
-            "ghost": {
-                "required_sisters": ["Lisbeth"],
-                "optional_sisters": ["Alice", "Marla"],
-                "min_sisters": 1,
-                "max_sisters": 2,
-                "preferred_order": ["Lisbeth", "Alice", "Marla"],
-                "timeout": 120,  # 2 minutes
-                "retry_count": 1,
-                "phases": {
-                    ActionPhase.INITIALIZATION: ["Lisbeth"],
-                    ActionPhase.PREPARATION: ["Lisbeth", "Alice"],
-                    ActionPhase.EXECUTION: ["Lisbeth", "Alice"],
-                    ActionPhase.VERIFICATION: ["Lisbeth"],
-                    ActionPhase.CLEANUP: ["Lisbeth"]
-                },
-                "error_recovery": {
-                    ErrorType.CONNECTION: {"max_retries": 2, "backoff_time": 5},
-                    ErrorType.TIMEOUT: {"max_retries": 1, "backoff_time": 10},
-                    ErrorType.EXECUTION: {"max_retries": 1, "backoff_time": 15},
-                    ErrorType.VALIDATION: {"max_retries": 1, "backoff_time": 5},
-                    ErrorType.COORDINATION: {"max_retries": 1, "backoff_time": 10},
-                    ErrorType.SYSTEM: {"max_retries": 1, "backoff_time": 30}
-                }
-            }
-        }
     
-    def setup(self, comm_manager: SisterCommManager):
-        """Set up the action manager with a communication manager."""
+    def setup(self, comm_manager: SisterCommManager, work_broker: Optional[PhaseWorkBroker] = None):
+        """
+        Set up the action manager with a communication manager.
+        
+        Args:
+            comm_manager: Seven's SisterCommManager
+            work_broker: Optional PhaseWorkBroker; when given, phase work goes through the
+                sisters' shared work queues so it's spread over all of their instances
+        """
         self.comm_manager = comm_manager
+        self.work_broker = work_broker
         self._setup_command_handlers()
     
     def _setup_command_handlers(self):
@@ -173,39 +129,60 @@ class ActionManager:
             sister_name = args.get('sister_name')
             status = args.get('status')
             details = args.get('details', {})
-            phase = args.get('phase')
+            phase = ActionPhase(args.get('phase'))
             
             if action_id in self.action_status:
-                self.action_status[action_id]['sister_status'][sister_name] = {
+                # Feed the sister's latency estimate with how long this phase took
+                if status == 'completed':
+                    action = self.action_status[action_id]
+                    dispatched = action.get('phase_dispatch_times', {}).get(phase)
+                    if details.get('delta'):
+                        self._record_delta(action_id, sister_name, details['delta'])
+                    if details.get('run_dir'):
+                        records = ", ".join(f"{count} {kind}s" for kind, count in details.get('records', {}).items())
+                        write_output("Seven", action['target'],
+                                     f"{sister_name} left {len(details.get('artifacts', []))} artifacts in {details['run_dir']}"
+                                     + (f" ({records})" if records else ""))
+                    if details.get('cached'):
+                        # A cached result says nothing about how long the phase or tool takes
+                        write_output("Seven", action['target'], f"{sister_name} reused a cached result")
+                    else:
+                        if dispatched is not None:
+                            self._record_phase_latency(sister_name, self.clock.time() - dispatched)
+                            self.duration_store.record(
+                                f"phase:{action['action_type']}:{sister_name}:{phase.value}", self.clock.time() - dispatched)
+                        if phase == ActionPhase.EXECUTION and 'duration' in details:
+                            self.duration_store.record(f"tool:{action['action_type']}:{sister_name}", details['duration'])
+                
+                self.action_status[action_id]['sister_status'].setdefault(sister_name, {}).update({
                     'status': status,
                     'details': details,
                     'phase': phase,
-                    'timestamp': time.time()
-                }
-                
-                # Check if current phase is complete
-                if self._is_phase_complete(action_id, phase):
-                    self._advance_to_next_phase(action_id)
+                    'timestamp': self.clock.time()
+                })
                 
-                # Check if all phases are complete
-                if self._is_action_complete(action_id):
-                    self._finalize_action(action_id)
+                # Count the sister off the phase's latch; the last one moves the action on
+                if status == 'completed':
+                    latch = self.action_status[action_id]['phase_latches'].get(phase)
+                    if latch and latch.count_down(sister_name):
+                        self._complete_phase(action_id, phase)
         
         def handle_action_error(args):
             action_id = args.get('action_id')
             sister_name = args.get('sister_name')
             error = args.get('error')
             error_type = ErrorType(args.get('error_type', ErrorType.EXECUTION.value))
-            phase = args.get('phase')
+            phase = ActionPhase(args.get('phase'))
             
             if action_id in self.action_status:
-                self.action_status[action_id]['sister_status'][sister_name] = {
+                # Update rather than replace, so the retry counters survive repeated errors
+                self.action_status[action_id]['sister_status'].setdefault(sister_name, {}).update({
                     'status': 'failed',
                     'error': error,
                     'error_type': error_type,
                     'phase': phase,
-                    'timestamp': time.time()
-                }
+                    'timestamp': self.clock.time()
+                })
                 
                 # Handle the error based on its type
                 if error_type in self.error_recovery_strategies:
@@ -215,10 +192,73 @@ class ActionManager:
                 # If error couldn't be handled, mark as failed
                 self._handle_action_failure(action_id, sister_name)
         
+        def handle_tool_output(args):
+            self._record_tool_output(args.get('action_id') or args.get('target'), args.get('sister_name'),
+                                     args.get('lines', []), args.get('dropped', 0))
+        
         # Register command handlers with the communication manager
         if self.comm_manager:
             self.comm_manager.command_handler.register_command('action_status', handle_action_status)
             self.comm_manager.command_handler.register_command('action_error', handle_action_error)
+            self.comm_manager.command_handler.register_command('tool_output', handle_tool_output)
+    
+    def _record_delta(self, action_id: str, sister_name: str, delta: Dict[str, Any]):
+        """Keep what changed in a sister's results and log it to Seven's output."""
+        action = self.action_status[action_id]
+        action.setdefault('deltas', {})[sister_name] = delta
+        if delta['first_run']:
+            message = f"{sister_name} {delta['tool']}: {delta['total']} items (first run)"
+        else:
+            message = (f"{sister_name} {delta['tool']}: +{delta['added']} new, -{delta['removed']} gone, "
+                       f"~{delta['changed']} changed of {delta['total']}")
+        write_output("Seven", action['target'], message)
+        for line in delta['sample']['added']:
+            write_output("Seven", action['target'], f"  + {line}")
+    
+    def get_deltas(self, action_id: str) -> Dict[str, Dict[str, Any]]:
+        """What changed in each sister's results for an action, by sister (see DeltaTracker)."""
+        action = self.get_action(action_id)
+        return dict(action.get('deltas', {})) if action else {}
+    
+    def _record_tool_output(self, action_id: str, sister_name: str, lines: List, dropped: int):
+        """Keep the latest tool output lines of an action (and only of the most recent actions)."""
+        with self.tool_output_lock:
+            output = self.tool_output.get(action_id)
+            if output is None:
+                output = {'lines': deque(maxlen=self.tool_output_lines), 'dropped': 0, 'received': 0}
+                self.tool_output[action_id] = output
+                while len(self.tool_output) > self.tool_output_actions:
+                    self.tool_output.popitem(last=False)
+            else:
+                self.tool_output.move_to_end(action_id)
+            for stream, line in lines:
+                output['lines'].append((sister_name, stream, line))
+            output['received'] += len(lines)
+            output['dropped'] += dropped
+            output['updated'] = self.clock.time()
+    
+    def get_tool_output(self, action_id: str, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest tool output the sisters streamed for an action.
+        
+        Args:
+            action_id: The action (or attached request) ID
+            limit: Return at most this many of the most recent lines
+            
+        Returns:
+            Dict with 'lines' as (sister, stream, line) tuples, plus how many lines were
+            'received' and 'dropped' by the sisters' rate limit; None if there was no output
+        """
+        action_id = self.action_aliases.get(action_id, action_id)
+        with self.tool_output_lock:
+            output = self.tool_output.get(action_id)
+            if output is None:
+                return None
+            lines = list(output['lines'])
+            if limit:
+                lines = lines[-limit:]
+            return {'lines': lines, 'received': output['received'], 'dropped': output['dropped'],
+                    'updated': output['updated']}
     
     def _should_retry_action(self, action_id: str, sister_name: str) -> bool:
         """Determine if an action should be retried for a sister."""
@@ -226,11 +266,9 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
         retry_count = action['sister_status'].get(sister_name, {}).get('retry_count', 0)
-        max_retries = self.action_capabilities[action_type]['retry_count']
         
-        return retry_count < max_retries
+        return retry_count < action['plan'].retry_count
     
     def _retry_action(self, action_id: str, sister_name: str):
         """Retry a failed action for a specific sister."""
@@ -245,17 +283,13 @@ class ActionManager:
             action['sister_status'][sister_name] = {}
         action['sister_status'][sister_name]['retry_count'] = retry_count
         
-        # Send retry command
-        self.comm_manager.send_command(
-            sister_name,
-            'execute_action',
-            {
-                'action_id': action_id,
-                'action_type': action['action_type'],
-                'target': action['target'],
-                'retry_count': retry_count
-            }
-        )
+        # Resend the current phase to the sisters that haven't finished it, and give them a new deadline
+        current_phase = action.get('current_phase')
+        latch = action['phase_latches'].get(current_phase)
+        if current_phase:
+            self._execute_phase(action_id, current_phase, latch.pending() if latch else None)
+        self._start_action_timer(action_id, sister_name,
+                                 action.get('deadline', action['plan'].timeout))
         
         write_output("Seven", action['target'], 
                     f"Retrying {action['action_type']} operation for {sister_name} (attempt {retry_count})")
@@ -267,7 +301,7 @@ class ActionManager:
             
         action = self.action_status[action_id]
         write_output("Seven", action['target'],
-                    f"Action failed for {sister_name} after {action['sister_status'][sister_name].get('retry_count', 0)} attempts")
+                    f"Action failed for {sister_name} after {action['sister_status'].get(sister_name, {}).get('retry_count', 0)} attempts")
         
         # Check if we should continue with other sisters
         active_sisters = [
@@ -275,7 +309,9 @@ class ActionManager:
             if status.get('status') not in ['completed', 'failed']
         ]
         
-        if not active_sisters:
+        # The current phase can never complete without this sister
+        latch = action['phase_latches'].get(action.get('current_phase'))
+        if not active_sisters or (latch and sister_name in latch.pending()):
             self._finalize_action(action_id, success=False)
     
     def _finalize_action(self, action_id: str, success: bool = True):
@@ -284,8 +320,23 @@ class ActionManager:
             return
             
         action = self.action_status[action_id]
+        if action['status'] in ('completed', 'failed'):
+            return  # Late errors or timeouts for a finished action
         action['status'] = 'completed' if success else 'failed'
-        action['completion_time'] = time.time()
+        action['completion_time'] = self.clock.time()
+        
+        # Later identical requests can reuse a successful run until it goes stale
+        key = action.get('singleflight_key')
+        with self.singleflight_lock:
+            if self.inflight_actions.get(key) == action_id:
+                del self.inflight_actions[key]
+            if success and self.freshness_seconds > 0:
+                self.recent_actions[key] = (action_id, action['completion_time'])
+        
+        # Teach the runtime predictor how long this kind of target takes
+        if success and action.get('start_time'):
+            self.runtime_predictor.record(action['action_type'], action['target'],
+                                          action['completion_time'] - action['start_time'])
         
         # Update action history
         for history_action in self.action_history:
@@ -306,13 +357,28 @@ class ActionManager:
         if action_id in self.action_threads:
             del self.action_threads[action_id]
         
+        # A failed action's tools are of no further use; stop any still running
+        if not success and self.comm_manager:
+            for sister in action['sisters']:
+                self.comm_manager.send_command(sister, 'cancel_action', {'action_id': action_id})
+        
+        # Free the execution slot and start whatever is waiting
+        with self.queue_lock:
+            self.running_actions.discard(action_id)
+            self.action_queue.remove(action_id)
+        self._dispatch_queued_actions()
+        
+        # Wake anyone waiting on this action
+        if 'done_event' in action:
+            action['done_event'].set()
+        
         # Log completion
         status_msg = "completed successfully" if success else "failed"
         write_output("Seven", action['target'],
                     f"Action {status_msg}: {action['action_type']} operation on {action['target']}")
     
-    def _execute_sister_action(self, action_id: str, sister_name: str):
-        """Execute an action for a specific sister."""
+    def _begin_action(self, action_id: str):
+        """Start the first phase of an action and its timeout."""
         if action_id not in self.action_status:
             return
             
@@ -322,13 +388,23 @@ class ActionManager:
         # Initialize the action
         action['current_phase'] = None
         action['sister_status'] = {}
+        action['phase_latches'] = {}
+        action['completed_phases'] = set()
+        
+        # Set up timeout for the entire action
+        timeout, _ = self.get_action_deadline(action_type, action['sisters'], action['plan'])
+        action['deadline'] = timeout
+        self._start_action_timer(action_id, action['sisters'][0], timeout)
         
         # Start with the first phase
         self._advance_to_next_phase(action_id)
-        
-        # Set up timeout for the entire action
-        timeout = self.action_capabilities[action_type]['timeout']
-        self.action_timeouts[action_id] = threading.Timer(
+    
+    def _start_action_timer(self, action_id: str, sister_name: str, timeout: float):
+        """Start (or restart) the timeout timer of an action."""
+        action = self.action_status[action_id]
+        action['timeout_sister'] = sister_name
+        action['timeout_deadline'] = self.clock.time() + timeout
+        self.action_timeouts[action_id] = self.clock.timer(
             timeout,
             self._handle_action_timeout,
             args=[action_id, sister_name]
@@ -393,54 +469,221 @@ class ActionManager:
         
         return True, ""
     
+    def _record_phase_latency(self, sister_name: str, latency: float):
+        """Fold a measured phase latency into the sister's EWMA."""
+        previous = self.sister_latency.get(sister_name)
+        if previous is None:
+            self.sister_latency[sister_name] = latency
+        else:
+            self.sister_latency[sister_name] = self.latency_alpha * latency + (1 - self.latency_alpha) * previous
+    
+    def get_action_deadline(self, action_type: str, sisters: List[str],
+                            plan: Optional[ActionPlan] = None) -> Tuple[float, bool]:
+        """
+        Get the timeout for an action with the given sisters.
+        
+        Each phase is expected to take as long as its slowest sister's
+        percentile duration; the sum over all phases plus a margin is the
+        deadline. The static timeout of the action type is used when adaptive
+        timeouts are off or any sister/phase has too little history, and it
+        also caps the learned value.
+        
+        Args:
+            action_type: The type of action
+            sisters: The sisters assigned to it
+            plan: The action's plan (defaults to the current one for the type)
+        
+        Returns:
+            Tuple of (timeout in seconds, whether it was learned from history)
+        """
+        plan = plan or self.catalog.get(action_type)
+        static_timeout = plan.timeout
+        if not self.adaptive_timeouts:
+            return static_timeout, False
+        
+        expected = 0.0
+        for phase in plan.phase_order:
+            estimates = []
+            for sister in plan.phase_sisters[phase]:
+                if sister not in sisters:
+                    continue
+                estimate = self.duration_store.percentile(
+                    f"phase:{action_type}:{sister}:{phase.value}",
+                    self.timeout_percentile, self.timeout_min_samples
+                )
+                if estimate is None:
+                    return static_timeout, False
+                estimates.append(estimate)
+            expected += max(estimates, default=0.0)
+        
+        deadline = expected * (1 + self.timeout_margin_ratio) + self.timeout_margin_seconds
+        return max(self.min_timeout, min(deadline, static_timeout)), True
+    
+    def get_timeout_estimates(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the current timeout estimates for display.
+        
+        Returns:
+            Dict mapping action type to its 'static' timeout, learned 'deadline'
+            (None while still learning) for its preferred sisters, and the
+            p50/p95 'tools' durations per sister
+        """
+        estimates = {}
+        for plan in self.catalog.all():
+            action_type = plan.name
+            sisters = list(plan.preferred_order[:plan.max_sisters])
+            deadline, learned = self.get_action_deadline(action_type, sisters, plan)
+            tools = {}
+            for sister in sisters:
+                key = f"tool:{action_type}:{sister}"
+                samples = self.duration_store.samples(key)
+                if samples:
+                    tools[sister] = {
+                        'p50': self.duration_store.percentile(key, 50),
+                        'p95': self.duration_store.percentile(key, 95),
+                        'samples': samples
+                    }
+            estimates[action_type] = {
+                'static': plan.timeout,
+                'deadline': deadline if learned else None,
+                'tools': tools
+            }
+        return estimates
+    
+    def get_sister_load(self, sister_name: str) -> Dict[str, Any]:
+        """
+        Get the current load of a sister.
+        
+        Combines the actions Seven has running on the sister with the in-flight
+        work her instances last reported in their status messages (if recent enough)
+        and the phase work still waiting in her work queue.
+        
+        Returns:
+            Dict with 'in_flight', 'latency' (EWMA seconds or None), 'reported',
+            'instances' and 'backlog' keys
+        """
+        with self.queue_lock:
+            local_in_flight = sum(
+                1 for action_id in self.running_actions
+                if sister_name in self.action_status[action_id]['sisters']
+            )
+        
+        reported = None
+        instances = 1
+        if self.comm_manager and hasattr(self.comm_manager, 'get_sister_load'):
+            report = self.comm_manager.get_sister_load(sister_name, self.load_report_max_age)
+            if report:
+                reported = report.get('in_flight', 0)
+                instances = max(instances, report.get('instances', 1))
+        
+        backlog = 0
+        if self.work_broker:
+            backlog = self.work_broker.get_backlog(sister_name)
+            instances = max(instances, len(self.work_broker.get_instances(sister_name)))
+        
+        return {
+            'in_flight': max(local_in_flight, reported or 0),
+            'latency': self.sister_latency.get(sister_name),
+            'reported': reported,
+            'instances': instances,
+            'backlog': backlog
+        }
+    
+    def get_sister_instances(self, sister_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the running instances of a sister.
+        
+        Returns:
+            Dict mapping instance ID to its reported 'in_flight' work (None if it
+            hasn't reported recently) and the number of phases 'dispatched' to it
+        """
+        instances = {}
+        if self.work_broker:
+            for instance, info in self.work_broker.get_instances(sister_name).items():
+                instances[instance] = {'in_flight': None, 'dispatched': info.get('dispatched', 0)}
+        if self.comm_manager and hasattr(self.comm_manager, 'get_instance_loads'):
+            for instance, load in self.comm_manager.get_instance_loads(sister_name, self.load_report_max_age).items():
+                instances.setdefault(instance, {'in_flight': None, 'dispatched': 0})
+                instances[instance]['in_flight'] = load.get('in_flight', 0)
+        return instances
+    
+    def _sister_saturation_limit(self, sister_name: str, instances: int = 1) -> int:
+        """In-flight work above which a sister (with all her instances) is skipped for optional assignments."""
+        batch_config = self.config.get("batch", {})
+        return instances * batch_config.get("sister_limits", {}).get(
+            sister_name, batch_config.get("default_sister_limit", DEFAULT_SISTER_LIMIT)
+        )
+    
     def _plan_sister_assignment(self, action_type: str, target: str) -> Tuple[List[str], str]:
         """
         Plan the optimal sister assignment for an action.
         
+        Required sisters are always assigned. Optional sisters are ranked by their
+        expected wait (queued and in-flight work times recent phase latency,
+        spread over her running instances), with the preferred order as a
+        tie-breaker, and saturated sisters are only used when they're needed
+        to reach min_sisters.
+        
         Returns:
             Tuple of (assigned_sisters, error_message)
         """
-        if action_type not in self.action_capabilities:
+        plan = self.catalog.get(action_type)
+        if not plan:
             return [], f"Unknown action type: {action_type}"
         
-        capabilities = self.action_capabilities[action_type]
         available_sisters = self._get_available_sisters()
         assigned_sisters = []
         
         # First, assign required sisters
-        for sister in capabilities["required_sisters"]:
+        for sister in plan.required_sisters:
             if sister in available_sisters:
                 assigned_sisters.append(sister)
             else:
                 return [], f"Required sister {sister} is not available"
         
-        # Then, assign optional sisters in preferred order
-        for sister in capabilities["preferred_order"]:
-            if (sister in capabilities["optional_sisters"] and 
-                sister in available_sisters and 
-                sister not in assigned_sisters and 
-                len(assigned_sisters) < capabilities["max_sisters"]):
-                assigned_sisters.append(sister)
+        # Then, assign the least loaded optional sisters
+        candidates = [sister for sister in plan.candidate_order if sister in available_sisters]
+        loads = {sister: self.get_sister_load(sister) for sister in candidates}
+        
+        def expected_wait(sister: str) -> Tuple[float, int]:
+            load = loads[sister]
+            latency = load['latency'] or self.default_phase_latency
+            wait = (load['in_flight'] + load['backlog']) * latency / load['instances']
+            return (wait, plan.preference(sister))
+        
+        ranked = sorted(candidates, key=expected_wait)
+        saturated = [
+            s for s in ranked
+            if loads[s]['in_flight'] >= self._sister_saturation_limit(s, loads[s]['instances'])
+        ]
+        
+        for sister in [s for s in ranked if s not in saturated] + saturated:
+            if len(assigned_sisters) >= plan.max_sisters:
+                break
+            if sister in saturated and len(assigned_sisters) >= plan.min_sisters:
+                break
+            assigned_sisters.append(sister)
         
         # Validate minimum sister requirement
-        if len(assigned_sisters) < capabilities["min_sisters"]:
-            return [], f"Not enough sisters available. Minimum required: {capabilities['min_sisters']}"
+        if len(assigned_sisters) < plan.min_sisters:
+            return [], f"Not enough sisters available. Minimum required: {plan.min_sisters}"
         
         return assigned_sisters, ""
     
-    def plan_action(self, action_type: str, target: str) -> Tuple[bool, str, List[str]]:
+    def assign_sisters(self, action_type: str, target: str) -> Tuple[bool, str, List[str]]:
         """
-        Plan an action, including sister assignment and validation.
+        Choose and validate the sisters for an action, without asking for
+        confirmation (e.g. for the simulator, or callers that confirm themselves).
         
         Args:
             action_type: The type of action to perform
             target: The target of the action
             
         Returns:
-            Tuple of (success, message, assigned_sisters)
+            Tuple of (success, error_message, assigned_sisters)
         """
         # Validate action type
-        if action_type not in self.action_capabilities:
+        if not self.catalog.get(action_type):
             return False, f"Unknown action type: {action_type}", []
         
         # Plan sister assignment
@@ -453,13 +696,30 @@ class ActionManager:
         if not is_valid:
             return False, error, []
         
+        return True, "", assigned_sisters
+    
+    def plan_action(self, action_type: str, target: str) -> Tuple[bool, str, List[str]]:
+        """
+        Plan an action, including sister assignment and validation.
+        
+        Args:
+            action_type: The type of action to perform
+            target: The target of the action
+            
+        Returns:
+            Tuple of (success, message, assigned_sisters)
+        """
+        success, error, assigned_sisters = self.assign_sisters(action_type, target)
+        if not success:
+            return False, error, []
+        
         # Display action summary and request confirmation
         self.confirmation.display_action_summary(action_type, target, assigned_sisters)
         
         if self.confirmation.confirm_action(action_type, target, assigned_sisters):
             # Log the planned action
             self.action_history.append({
-                "timestamp": time.time(),
+                "timestamp": self.clock.time(),
                 "action_type": action_type,
                 "target": target,
                 "sisters": assigned_sisters,
@@ -471,81 +731,517 @@ class ActionManager:
         else:
             return False, "Action cancelled by user", []
     
-    def execute_action(self, action_type: str, target: str, sisters: List[str]) -> Tuple[bool, str]:
+    def plan_batch_action(self, action_type: str, targets: List[str]) -> Tuple[bool, str, List[str]]:
+        """
+        Plan an action over a whole scope, with a single confirmation for all targets.
+        
+        Args:
+            action_type: The type of action to perform
+            targets: The in-scope targets
+            
+        Returns:
+            Tuple of (success, message, assigned_sisters)
+        """
+        if not self.catalog.get(action_type):
+            return False, f"Unknown action type: {action_type}", []
+        
+        if not targets:
+            return False, "Scope contains no targets", []
+        
+        # Sister assignment doesn't depend on the target, so plan it once
+        success, error, assigned_sisters = self.assign_sisters(action_type, targets[0])
+        if not success:
+            return False, error, []
+        
+        if self.confirmation.confirm_batch_action(action_type, targets, assigned_sisters):
+            self.action_history.append({
+                "timestamp": self.clock.time(),
+                "action_type": action_type,
+                "target": f"{len(targets)} targets",
+                "sisters": assigned_sisters,
+                "status": "planned"
+            })
+            return True, "Batch action planned successfully", assigned_sisters
+        else:
+            return False, "Action cancelled by user", []
+    
+    def execute_batch_action(self, action_type: str, targets: List[str], sisters: List[str],
+                             max_concurrency: Optional[int] = None,
+                             progress_callback=None,
+                             ordering: Optional[str] = None) -> Tuple[bool, str, Optional[str]]:
         """
-        Execute a planned action with the assigned sisters.
+        Execute a planned action on every target of a scope in the background.
+        
+        Args:
+            action_type: The type of action to perform
+            targets: The in-scope targets
+            sisters: List of sisters assigned to every action
+            max_concurrency: Override for the configured global concurrency cap
+            progress_callback: Called with (target, progress) after every finished action
+            ordering: Ordering policy for the targets (fifo, sejf or ljf); defaults to the queue's
+            
+        Returns:
+            Tuple of (success, message, batch_id)
+        """
+        is_valid, error = self._validate_sister_availability(sisters)
+        if not is_valid:
+            return False, error, None
+        
+        try:
+            policy = get_ordering_policy(ordering) if ordering else self.action_queue.policy
+        except ValueError as e:
+            return False, str(e), None
+        targets = self.order_targets(action_type, targets, policy)
+        
+        batch_config = self.config.get("batch", {})
+        plan = self.catalog.get(action_type)
+        if not plan:
+            return False, f"Unknown action type: {action_type}", None
+        batch_id = f"batch_{action_type}_{uuid.uuid4().hex[:8]}"
+        
+        runner = BatchRunner(
+            self,
+            batch_id,
+            action_type,
+            targets,
+            sisters,
+            max_concurrency=max_concurrency or batch_config.get("max_concurrent_actions", DEFAULT_MAX_CONCURRENT_ACTIONS),
+            sister_limits=batch_config.get("sister_limits", {}),
+            default_sister_limit=batch_config.get("default_sister_limit", DEFAULT_SISTER_LIMIT),
+            # Allow for every retry before giving up on a single target
+            action_timeout=plan.timeout * (plan.retry_count + 1),
+            progress_callback=progress_callback
+        )
+        self.batches[batch_id] = runner
+        runner.start()
+        
+        return True, f"Batch {batch_id} started on {len(targets)} targets ({policy.description})", batch_id
+    
+    def order_targets(self, action_type: str, targets: List[str], policy=None) -> List[str]:
+        """
+        Order a batch of targets the way the queue would order them if they
+        were all submitted at once (file order is kept between equal estimates).
+        """
+        policy = policy or self.action_queue.policy
+        aging = self.action_queue.aging_seconds
+        
+        def sort_key(target: str) -> Tuple:
+            item = QueuedAction('', action_type, target, ActionPriority.BULK, enqueued_at=0.0,
+                                expected_runtime=self.runtime_predictor.predict(action_type, target))
+            return policy.sort_key(item, aging)
+        
+        return sorted(targets, key=sort_key)
+    
+    def _find_shared_action(self, key: Tuple) -> Tuple[Optional[str], str]:
+        """
+        Find an action that can answer a request with the given singleflight key.
+        Must be called with singleflight_lock held.
+        
+        Returns:
+            Tuple of (action ID or None, message describing the match)
+        """
+        action_id = self.inflight_actions.get(key)
+        if action_id and self.action_status.get(action_id, {}).get('status') not in (None, 'completed', 'failed'):
+            return action_id, f"Attached to in-flight action {action_id}"
+        
+        recent = self.recent_actions.get(key)
+        if recent:
+            action_id, completed_at = recent
+            age = self.clock.time() - completed_at
+            if age <= self.freshness_seconds:
+                return action_id, f"Reusing results of action {action_id} (completed {age:.0f}s ago)"
+            del self.recent_actions[key]
+        return None, ""
+    
+    def generate_action_id(self, action_type: str, target: str) -> str:
+        """Generate an action ID that stays unique at any submission rate."""
+        return f"{action_type}_{target}_{int(self.clock.time())}_{uuid.uuid4().hex[:8]}"
+    
+    def get_action(self, action_id: str) -> Optional[Dict]:
+        """Get an action's status, following requests that were attached to another action."""
+        return self.action_status.get(self.action_aliases.get(action_id, action_id))
+    
+    def wait_for_action(self, action_id: str, timeout: Optional[float] = None,
+                        max_paused: Optional[float] = None) -> bool:
+        """
+        Block until an action is finalized.
+        Time the action spends queued or paused doesn't count against the
+        timeout, but only up to max_paused seconds of pause: an action that
+        stays paused longer (e.g. paused by the user and never resumed) has
+        the rest of its pause counted, and without a timeout the wait gives up.
+        
+        Args:
+            action_id: The action to wait for
+            timeout: Seconds the action may spend executing (None: no limit)
+            max_paused: Seconds of pause to disregard (None: queue.max_paused_wait
+                from the config; float('inf') to wait out any pause)
+        
+        Returns:
+            True if the action finished within the timeout, False otherwise
+        """
+        action = self.get_action(action_id)
+        if not action:
+            return False
+        if max_paused is None:
+            max_paused = self.max_paused_wait if self.max_paused_wait is not None else float('inf')
+        if timeout is None and max_paused == float('inf'):
+            return action['done_event'].wait()
+        
+        remaining = timeout if timeout is not None else float('inf')
+        paused = 0.0
+        while remaining > 0:
+            started = self.clock.time()
+            if action['done_event'].wait(min(remaining, 1.0)):
+                return True
+            elapsed = self.clock.time() - started
+            if action['status'] == 'executing':
+                remaining -= elapsed
+            elif action['status'] == 'paused':
+                paused += elapsed
+                if paused > max_paused:
+                    if timeout is None:
+                        break
+                    remaining -= elapsed
+        return action['done_event'].is_set()
+    
+    def execute_action(self, action_type: str, target: str, sisters: List[str],
+                       action_id: Optional[str] = None,
+                       priority: ActionPriority = ActionPriority.NORMAL,
+                       reuse: bool = True, use_cache: bool = True) -> Tuple[bool, str]:
+        """
+        Queue a planned action for execution with the assigned sisters.
+        The action starts as soon as an execution slot is free; urgent actions
+        may preempt running lower-priority work to get one.
+        
+        If the same action type is already queued or running on the same target
+        with the same sisters, or finished successfully within the freshness
+        window, the request attaches to that action instead of running the tools
+        again. The given action_id then refers to the shared action.
         
         Args:
             action_type: The type of action to perform
             target: The target of the action
             sisters: List of sisters assigned to the action
+            action_id: Optional pre-generated action ID (see generate_action_id)
+            priority: Dispatch priority of the action
+            reuse: Set to False to always start a new run
+            use_cache: Set to False to have the sisters run their tools even if they have cached results
             
         Returns:
             Tuple of (success, message)
         """
         # Validate the action and sisters
+        plan = self.catalog.get(action_type)
+        if not plan:
+            return False, f"Unknown action type: {action_type}"
         is_valid, error = self._validate_sister_availability(sisters)
         if not is_valid:
             return False, error
         
         # Generate action ID
-        action_id = f"{action_type}_{target}_{int(time.time())}"
+        action_id = action_id or self.generate_action_id(action_type, target)
+        
+        key = (action_type, normalize_target(target), frozenset(sisters))
+        with self.singleflight_lock:
+            if reuse and self.singleflight_enabled:
+                shared_id, message = self._find_shared_action(key)
+                if shared_id:
+                    if shared_id != action_id:
+                        self.action_aliases[action_id] = shared_id
+                    write_output("Seven", target, message)
+                    return True, message
+            self.inflight_actions[key] = action_id
         
         # Initialize action status
         self.action_status[action_id] = {
             'action_type': action_type,
+            'plan': plan,  # Kept for the whole run, even if the config changes meanwhile
             'target': target,
             'sisters': sisters,
-            'status': 'executing',
-            'start_time': time.time(),
+            'status': 'queued',
+            'priority': priority,
+            'queued_time': self.clock.time(),
+            'start_time': None,
             'sister_status': {},
-            'current_phase': None
+            'current_phase': None,
+            'pending_phase': None,
+            'phase_latches': {},
+            'completed_phases': set(),
+            'expected_runtime': self.runtime_predictor.predict(action_type, target),
+            'done_event': threading.Event(),
+            'singleflight_key': key,
+            'use_cache': use_cache
         }
         
+        self.action_queue.put(QueuedAction(action_id, action_type, target, priority,
+                                           enqueued_at=self.clock.time(),
+                                           expected_runtime=self.action_status[action_id]['expected_runtime']))
+        write_output("Seven", target,
+                    f"Queued {action_type} operation on {target} "
+                    f"({priority.name.lower()} priority, {len(self.action_queue)} waiting)")
+        
+        if priority == ActionPriority.URGENT:
+            self._preempt_for(priority)
+        self._dispatch_queued_actions()
+        
+        return True, f"Action {action_id} queued"
+    
+    def _dispatch_queued_actions(self):
+        """Start (or resume) queued actions while execution slots are free."""
+        with self.queue_lock:
+            while len(self.running_actions) < self.max_running_actions:
+                item = self.action_queue.pop()
+                if item is None:
+                    break
+                if item.action_id not in self.action_status:
+                    continue
+                if item.resume:
+                    self._resume_started_action(item.action_id)
+                else:
+                    self._start_action(item.action_id)
+    
+    def _start_action(self, action_id: str):
+        """Start executing a queued action."""
+        action = self.action_status[action_id]
+        action_type = action['action_type']
+        target = action['target']
+        sisters = action['sisters']
+        
+        action['status'] = 'executing'
+        action['start_time'] = self.clock.time()
+        self.running_actions.add(action_id)
+        
         # Update action history
-        for action in self.action_history:
-            if (action['action_type'] == action_type and
-                action['target'] == target and
-                action['sisters'] == sisters and
-                action['status'] == 'planned'):
-                action['status'] = 'executing'
-                action['execution_time'] = time.time()
+        for history_action in self.action_history:
+            if (history_action['action_type'] == action_type and
+                history_action['target'] == target and
+                history_action['sisters'] == sisters and
+                history_action['status'] == 'planned'):
+                history_action['status'] = 'executing'
+                history_action['execution_time'] = self.clock.time()
                 break
         
-        # Execute action for each sister
-        for sister in sisters:
-            thread = threading.Thread(
-                target=self._execute_sister_action,
-                args=[action_id, sister]
-            )
-            self.action_threads[action_id] = thread
-            thread.start()
+        # Phases are dispatched to the sisters from here on; their completions drive the rest
+        self.action_threads[action_id] = self.clock.spawn(self._begin_action, [action_id])
         
         write_output("Seven", target,
                     f"Executing {action_type} operation on {target} with sisters {', '.join(sisters)}")
-        return True, "Action execution started"
+    
+    def _preempt_for(self, priority: ActionPriority):
+        """Pause the lowest-priority running action if no slot is free for a new one."""
+        if not self.preemption_enabled:
+            return
+        
+        with self.queue_lock:
+            if len(self.running_actions) < self.max_running_actions:
+                return
+            
+            victims = [
+                action_id for action_id in self.running_actions
+                if self.action_status[action_id]['priority'].value > priority.value
+            ]
+            if not victims:
+                return
+            
+            # Preempt the lowest-priority action, and among those the one that started last
+            victim = max(victims, key=lambda action_id: (
+                self.action_status[action_id]['priority'].value,
+                self.action_status[action_id]['start_time']
+            ))
+            self._suspend_action(victim, reason='preempted')
+            
+            # Requeue it with a fresh enqueue time so it waits behind the urgent work
+            action = self.action_status[victim]
+            self.action_queue.put(QueuedAction(
+                victim, action['action_type'], action['target'], action['priority'], resume=True,
+                enqueued_at=self.clock.time(), expected_runtime=action['expected_runtime']
+            ))
+    
+    def _suspend_action(self, action_id: str, reason: str):
+        """Pause a running action: stop its tools and withhold further phases."""
+        action = self.action_status[action_id]
+        action['status'] = 'paused'
+        action['pause_reason'] = reason
+        action['paused_time'] = self.clock.time()
+        self.running_actions.discard(action_id)
+        
+        # Stop the clock on the action timeout while it's paused
+        timer = self.action_timeouts.pop(action_id, None)
+        if timer:
+            timer.cancel()
+            action['timeout_remaining'] = max(0.0, action['timeout_deadline'] - self.clock.time())
+        
+        # Ask the sisters to stop the tool's process group
+        if self.comm_manager:
+            for sister in action['sisters']:
+                self.comm_manager.send_command(sister, 'pause_action', {'action_id': action_id})
+        
+        write_output("Seven", action['target'],
+                    f"Paused {action['action_type']} operation on {action['target']} ({reason})")
+    
+    def _resume_started_action(self, action_id: str):
+        """Resume an action that was paused or preempted after it started."""
+        action = self.action_status[action_id]
+        action['status'] = 'executing'
+        action.pop('pause_reason', None)
+        self.running_actions.add(action_id)
+        
+        if self.comm_manager:
+            for sister in action['sisters']:
+                self.comm_manager.send_command(sister, 'resume_action', {'action_id': action_id})
+        
+        remaining = action.pop('timeout_remaining', None)
+        if remaining is not None:
+            self._start_action_timer(action_id, action['timeout_sister'], remaining)
+        
+        write_output("Seven", action['target'],
+                    f"Resumed {action['action_type']} operation on {action['target']}")
+        
+        # Dispatch the phase that was withheld while paused
+        pending_phase = action.get('pending_phase')
+        if pending_phase:
+            action['pending_phase'] = None
+            action['current_phase'] = pending_phase
+            self._execute_phase(action_id, pending_phase)
+    
+    def pause_action(self, action_id: str) -> Tuple[bool, str]:
+        """
+        Pause a queued or running action.
+        
+        Returns:
+            Tuple of (success, message)
+        """
+        with self.queue_lock:
+            action = self.action_status.get(action_id)
+            if not action:
+                return False, f"Unknown action: {action_id}"
+            
+            if action['status'] == 'queued':
+                self.action_queue.remove(action_id)
+                action['status'] = 'paused'
+                action['pause_reason'] = 'user'
+                return True, f"Action {action_id} paused before it started"
+            
+            if action['status'] == 'executing':
+                self._suspend_action(action_id, reason='user')
+                self._dispatch_queued_actions()
+                return True, f"Action {action_id} paused"
+            
+            if action['status'] == 'paused' and action.get('pause_reason') == 'preempted':
+                # Keep it paused even when the preempting action finishes
+                self.action_queue.remove(action_id)
+                action['pause_reason'] = 'user'
+                return True, f"Action {action_id} paused"
+            
+            return False, f"Action {action_id} is {action['status']} and cannot be paused"
+    
+    def resume_action(self, action_id: str) -> Tuple[bool, str]:
+        """
+        Resume a paused action. It goes back into the queue and continues
+        as soon as an execution slot is free.
+        
+        Returns:
+            Tuple of (success, message)
+        """
+        with self.queue_lock:
+            action = self.action_status.get(action_id)
+            if not action:
+                return False, f"Unknown action: {action_id}"
+            if action['status'] != 'paused' or action.get('pause_reason') != 'user':
+                return False, f"Action {action_id} is not paused"
+            
+            started = action['start_time'] is not None
+            if started:
+                action['pause_reason'] = 'resuming'
+            else:
+                action['status'] = 'queued'
+                action.pop('pause_reason', None)
+            self.action_queue.put(QueuedAction(
+                action_id, action['action_type'], action['target'], action['priority'], resume=started,
+                enqueued_at=self.clock.time(), expected_runtime=action['expected_runtime']
+            ))
+        
+        self._dispatch_queued_actions()
+        return True, f"Action {action_id} resumed"
+    
+    def cancel_action(self, action_id: str) -> Tuple[bool, str]:
+        """
+        Cancel a queued, running or paused action. It is counted as failed,
+        the sisters stop its tools and its execution slot goes to the queue.
+        
+        Returns:
+            Tuple of (success, message)
+        """
+        action = self.action_status.get(action_id)
+        if not action:
+            return False, f"Unknown action: {action_id}"
+        if action['status'] in ('completed', 'failed'):
+            return False, f"Action {action_id} is already {action['status']}"
+        
+        write_output("Seven", action['target'],
+                    f"Cancelling {action['action_type']} operation on {action['target']}")
+        self._finalize_action(action_id, success=False)
+        return True, f"Action {action_id} cancelled"
+    
+    def resolve_action_id(self, partial_id: str) -> Optional[str]:
+        """Find an action by its full ID or by a unique prefix or suffix of it."""
+        if partial_id in self.action_aliases:
+            return self.action_aliases[partial_id]
+        if partial_id in self.action_status:
+            return partial_id
+        matches = [
+            action_id for action_id in self.action_status
+            if action_id.startswith(partial_id) or action_id.endswith(partial_id)
+        ]
+        return matches[0] if len(matches) == 1 else None
+    
+    def get_queue_snapshot(self) -> Dict[str, List[Dict]]:
+        """
+        Get the running, queued and paused actions for display.
+        
+        Returns:
+            Dict with 'running', 'queued' and 'paused' lists of action summaries
+        """
+        now = self.clock.time()
+        
+        def summarize(action_id: str) -> Dict:
+            action = self.action_status[action_id]
+            return {
+                'action_id': action_id,
+                'action_type': action['action_type'],
+                'target': action['target'],
+                'priority': action['priority'].name.lower(),
+                'status': action['status'],
+                'phase': action['current_phase'].value if action['current_phase'] else None,
+                'waiting': now - action['queued_time'],
+                'expected_runtime': action.get('expected_runtime'),
+                'pause_reason': action.get('pause_reason')
+            }
+        
+        with self.queue_lock:
+            queued = []
+            for item in self.action_queue.snapshot():
+                summary = summarize(item.action_id)
+                summary['effective_priority'] = self.action_queue.effective_priority(item, now)
+                queued.append(summary)
+            return {
+                'running': [summarize(action_id) for action_id in sorted(self.running_actions)],
+                'queued': queued,
+                'paused': [
+                    summarize(action_id) for action_id, action in self.action_status.items()
+                    if action['status'] == 'paused' and action_id not in self.action_queue
+                ]
+            }
     
     def get_action_history(self) -> List[Dict]:
         """Get the history of planned and executed actions."""
         return self.action_history
     
     def _is_phase_complete(self, action_id: str, phase: ActionPhase) -> bool:
-        """Check if all sisters have completed the current phase."""
+        """Check if all sisters assigned to a phase have completed it."""
         if action_id not in self.action_status:
             return False
-            
-        action = self.action_status[action_id]
-        action_type = action['action_type']
-        required_sisters = self.action_capabilities[action_type]['phases'][phase]
-        
-        # Check if all required sisters have completed the phase
-        sister_statuses = action['sister_status']
-        return all(
-            sister_status.get('status') == 'completed' and
-            sister_status.get('phase') == phase
-            for sister, sister_status in sister_statuses.items()
-            if sister in required_sisters
-        )
+        return phase in self.action_status[action_id]['completed_phases']
     
     def _is_action_complete(self, action_id: str) -> bool:
         """Check if all phases of the action are complete."""
@@ -553,13 +1249,19 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
+        return len(action['completed_phases']) == len(action['plan'].phase_order)
+    
+    def _complete_phase(self, action_id: str, phase: ActionPhase):
+        """Mark a phase complete and move the action on to its next phase, or finish it."""
+        action = self.action_status[action_id]
+        action['completed_phases'].add(phase)
+        write_output("Seven", action['target'],
+                    f"Completed {phase.value} phase of {action['action_type']} operation")
         
-        # Check if all phases are complete
-        return all(
-            self._is_phase_complete(action_id, phase)
-            for phase in self.action_capabilities[action_type]['phases'].keys()
-        )
+        if self._is_action_complete(action_id):
+            self._finalize_action(action_id)
+        else:
+            self._advance_to_next_phase(action_id)
     
     def _advance_to_next_phase(self, action_id: str):
         """Advance the action to the next phase."""
@@ -567,19 +1269,16 @@ class ActionManager:
             return
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        current_phase = action.get('current_phase')
         
         # Get the next phase
-        phases = list(self.action_capabilities[action_type]['phases'].keys())
-        if current_phase is None:
-            next_phase = phases[0]
-        else:
-            current_index = phases.index(current_phase)
-            if current_index < len(phases) - 1:
-                next_phase = phases[current_index + 1]
-            else:
-                return  # All phases complete
+        next_phase = action['plan'].next_phase(action.get('current_phase'))
+        if next_phase is None:
+            return  # All phases complete
+        
+        # Withhold phase dispatch while the action is paused
+        if action['status'] == 'paused':
+            action['pending_phase'] = next_phase
+            return
         
         # Update current phase
         action['current_phase'] = next_phase
@@ -587,28 +1286,47 @@ class ActionManager:
         # Execute next phase
         self._execute_phase(action_id, next_phase)
     
-    def _execute_phase(self, action_id: str, phase: ActionPhase):
-        """Execute a specific phase of the action."""
+    def _execute_phase(self, action_id: str, phase: ActionPhase, sisters: Optional[List[str]] = None):
+        """
+        Execute a specific phase of the action.
+        
+        Args:
+            action_id: The action
+            phase: The phase to execute
+            sisters: Only (re)send the phase to these sisters, e.g. when retrying
+        """
         if action_id not in self.action_status:
             return
             
         action = self.action_status[action_id]
+        if phase in action['completed_phases']:
+            return
         action_type = action['action_type']
-        required_sisters = self.action_capabilities[action_type]['phases'][phase]
-        
-        # Send phase command to each required sister
-        for sister in required_sisters:
-            if sister in action['sisters']:
-                self.comm_manager.send_command(
-                    sister,
-                    'execute_phase',
-                    {
-                        'action_id': action_id,
-                        'action_type': action_type,
-                        'target': action['target'],
-                        'phase': phase.value
-                    }
-                )
+        assigned = [sister for sister in action['plan'].phase_sisters[phase] if sister in action['sisters']]
+        
+        # A retry reuses the phase's latch, so sisters that already finished aren't waited on again
+        latch = action['phase_latches'].get(phase)
+        if latch is None:
+            latch = action['phase_latches'][phase] = PhaseLatch(assigned)
+            action.setdefault('phase_dispatch_times', {})[phase] = self.clock.time()
+        
+        # Nobody is assigned to this phase, so there is nothing to wait for
+        if latch.is_open:
+            self._complete_phase(action_id, phase)
+            return
+        
+        # Hand the phase to each assigned sister, through her work queue when there is one
+        targets = latch.pending() if sisters is None else [s for s in sisters if s in latch.pending()]
+        for sister in targets:
+            work = {
+                'action_id': action_id,
+                'action_type': action_type,
+                'target': action['target'],
+                'phase': phase.value,
+                'use_cache': action.get('use_cache', True)
+            }
+            if not (self.work_broker and self.work_broker.submit(sister, work)):
+                self.comm_manager.send_command(sister, 'execute_phase', work)
         
         write_output("Seven", action['target'],
                     f"Executing {phase.value} phase of {action_type} operation")
@@ -619,8 +1337,7 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        error_config = self.action_capabilities[action_type]['error_recovery'][ErrorType.CONNECTION]
+        error_config = action['plan'].error_recovery[ErrorType.CONNECTION]
         
         # Get current retry count
         retry_count = action['sister_status'].get(sister_name, {}).get('connection_retries', 0)
@@ -631,15 +1348,12 @@ class ActionManager:
                 action['sister_status'][sister_name] = {}
             action['sister_status'][sister_name]['connection_retries'] = retry_count + 1
             
-            # Wait for backoff time
-            time.sleep(error_config['backoff_time'])
-            
             # Attempt to reconnect
             write_output("Seven", action['target'],
                         f"Attempting to reconnect to {sister_name} (attempt {retry_count + 1})")
             
             # Retry the current phase
-            self._retry_phase(action_id, sister_name)
+            self._schedule_phase_retry(action_id, sister_name, error_config['backoff_time'])
             return True
         
         return False
@@ -650,8 +1364,7 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        error_config = self.action_capabilities[action_type]['error_recovery'][ErrorType.TIMEOUT]
+        error_config = action['plan'].error_recovery[ErrorType.TIMEOUT]
         
         # Get current retry count
         retry_count = action['sister_status'].get(sister_name, {}).get('timeout_retries', 0)
@@ -662,15 +1375,12 @@ class ActionManager:
                 action['sister_status'][sister_name] = {}
             action['sister_status'][sister_name]['timeout_retries'] = retry_count + 1
             
-            # Wait for backoff time
-            time.sleep(error_config['backoff_time'])
-            
             # Retry with increased timeout
             write_output("Seven", action['target'],
                         f"Retrying {sister_name} with increased timeout (attempt {retry_count + 1})")
             
             # Retry the current phase
-            self._retry_phase(action_id, sister_name)
+            self._schedule_phase_retry(action_id, sister_name, error_config['backoff_time'])
             return True
         
         return False
@@ -681,8 +1391,7 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        error_config = self.action_capabilities[action_type]['error_recovery'][ErrorType.EXECUTION]
+        error_config = action['plan'].error_recovery[ErrorType.EXECUTION]
         
         # Get current retry count
         retry_count = action['sister_status'].get(sister_name, {}).get('execution_retries', 0)
@@ -693,15 +1402,12 @@ class ActionManager:
                 action['sister_status'][sister_name] = {}
             action['sister_status'][sister_name]['execution_retries'] = retry_count + 1
             
-            # Wait for backoff time
-            time.sleep(error_config['backoff_time'])
-            
             # Retry with error details
             write_output("Seven", action['target'],
                         f"Retrying {sister_name} after execution error: {error} (attempt {retry_count + 1})")
             
             # Retry the current phase
-            self._retry_phase(action_id, sister_name)
+            self._schedule_phase_retry(action_id, sister_name, error_config['backoff_time'])
             return True
         
         return False
@@ -712,8 +1418,7 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        error_config = self.action_capabilities[action_type]['error_recovery'][ErrorType.VALIDATION]
+        error_config = action['plan'].error_recovery[ErrorType.VALIDATION]
         
         # Get current retry count
         retry_count = action['sister_status'].get(sister_name, {}).get('validation_retries', 0)
@@ -724,15 +1429,12 @@ class ActionManager:
                 action['sister_status'][sister_name] = {}
             action['sister_status'][sister_name]['validation_retries'] = retry_count + 1
             
-            # Wait for backoff time
-            time.sleep(error_config['backoff_time'])
-            
             # Retry with validation details
             write_output("Seven", action['target'],
                         f"Retrying {sister_name} after validation error: {error} (attempt {retry_count + 1})")
             
             # Retry the current phase
-            self._retry_phase(action_id, sister_name)
+            self._schedule_phase_retry(action_id, sister_name, error_config['backoff_time'])
             return True
         
         return False
@@ -743,8 +1445,7 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        error_config = self.action_capabilities[action_type]['error_recovery'][ErrorType.COORDINATION]
+        error_config = action['plan'].error_recovery[ErrorType.COORDINATION]
         
         # Get current retry count
         retry_count = action['sister_status'].get(sister_name, {}).get('coordination_retries', 0)
@@ -755,15 +1456,12 @@ class ActionManager:
                 action['sister_status'][sister_name] = {}
             action['sister_status'][sister_name]['coordination_retries'] = retry_count + 1
             
-            # Wait for backoff time
-            time.sleep(error_config['backoff_time'])
-            
             # Retry with coordination details
             write_output("Seven", action['target'],
                         f"Retrying {sister_name} after coordination error: {error} (attempt {retry_count + 1})")
             
             # Retry the current phase
-            self._retry_phase(action_id, sister_name)
+            self._schedule_phase_retry(action_id, sister_name, error_config['backoff_time'])
             return True
         
         return False
@@ -774,8 +1472,7 @@ class ActionManager:
             return False
             
         action = self.action_status[action_id]
-        action_type = action['action_type']
-        error_config = self.action_capabilities[action_type]['error_recovery'][ErrorType.SYSTEM]
+        error_config = action['plan'].error_recovery[ErrorType.SYSTEM]
         
         # Get current retry count
         retry_count = action['sister_status'].get(sister_name, {}).get('system_retries', 0)
@@ -786,19 +1483,20 @@ class ActionManager:
                 action['sister_status'][sister_name] = {}
             action['sister_status'][sister_name]['system_retries'] = retry_count + 1
             
-            # Wait for backoff time
-            time.sleep(error_config['backoff_time'])
-            
             # Retry with system error details
             write_output("Seven", action['target'],
                         f"Retrying {sister_name} after system error: {error} (attempt {retry_count + 1})")
             
             # Retry the current phase
-            self._retry_phase(action_id, sister_name)
+            self._schedule_phase_retry(action_id, sister_name, error_config['backoff_time'])
             return True
         
         return False
     
+    def _schedule_phase_retry(self, action_id: str, sister_name: str, backoff: float):
+        """Retry the current phase for a sister once the backoff time has passed."""
+        self.clock.timer(backoff, self._retry_phase, args=[action_id, sister_name]).start()
+    
     def _retry_phase(self, action_id: str, sister_name: str):
         """Retry the current phase for a specific sister."""
         if action_id not in self.action_status:
@@ -807,8 +1505,9 @@ class ActionManager:
         action = self.action_status[action_id]
         current_phase = action.get('current_phase')
         
-        if current_phase:
-            self._execute_phase(action_id, current_phase)
+        # The action may have finished or been paused during the backoff
+        if current_phase and action['status'] == 'executing':
+            self._execute_phase(action_id, current_phase, sisters=[sister_name])
 
 
 # Example usage
@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+try:
+    import fcntl
+except ImportError:  # Windows: admission decisions are only serialized within a process
+    fcntl = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "seven_sisters.config.json")
+LEDGER_DIR = os.path.join(os.path.expanduser("~"), ".7sisters", "admission")
+
+# Defaults used when the config has no "admission" section
+DEFAULT_ADMISSION = {
+    "enabled": False,
+    "poll_interval": 1.0,
+    "max_cpu_percent": 90,
+    "min_available_memory_mb": 512,
+    "ramp_seconds": 10,
+    "starvation_seconds": 120,
+    "budgets": {
+        "cpu": None,  # cores; None means all of them
+        "memory_mb": None,  # None means memory_budget_ratio of physical memory
+        "network_mbps": 100
+    },
+    "memory_budget_ratio": 0.75,
+    "default_cost": {"cpu": 0.5, "memory_mb": 256, "network_mbps": 5},
+    "tools": {}
+}
+
+
+@dataclass(frozen=True)
+class ToolCost:
+    """Estimated resources one run of a tool needs: CPU cores, memory and network bandwidth."""
+    cpu: float = 0.0
+    memory_mb: float = 0.0
+    network_mbps: float = 0.0
+
+    def __add__(self, other: "ToolCost") -> "ToolCost":
+        return ToolCost(self.cpu + other.cpu, self.memory_mb + other.memory_mb,
+                        self.network_mbps + other.network_mbps)
+
+    @classmethod
+    def from_dict(cls, data: Dict, default: Optional["ToolCost"] = None) -> "ToolCost":
+        default = default or cls()
+        return cls(float(data.get("cpu", default.cpu)),
+                   float(data.get("memory_mb", default.memory_mb)),
+                   float(data.get("network_mbps", default.network_mbps)))
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"cpu": self.cpu, "memory_mb": self.memory_mb, "network_mbps": self.network_mbps}
+
+
+def total_cost(costs) -> ToolCost:
+    total = ToolCost()
+    for cost in costs:
+        total = total + cost
+    return total
+
+
+class TicketLedger:
+    """
+    The tool runs admitted on this host, shared by every sister process.
+
+    Each admitted run is a small JSON file in the ledger directory; files of
+    processes that died without releasing their ticket are cleaned up on read.
+    A lock file serializes admission decisions across processes.
+    """
+
+    def __init__(self, directory: str = LEDGER_DIR):
+        self.directory = directory
+        self.thread_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def locked(self):
+        """Hold the ledger lock (across processes where the platform allows)."""
+        with self.thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def tickets(self) -> List[Dict]:
+        """Read the live tickets, removing those of dead processes."""
+        tickets = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    ticket = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not psutil.pid_exists(ticket.get("pid", -1)):
+                self._remove(path)
+                continue
+            ticket["path"] = path
+            tickets.append(ticket)
+        return tickets
+
+    def add(self, tool: str, key: str, cost: ToolCost, **fields) -> Dict:
+        """Record a ticket for this process; fields are stored with it (e.g. the sister)."""
+        ticket = {
+            **fields,
+            "pid": os.getpid(),
+            "tool": tool,
+            "key": key,
+            "cost": cost.to_dict(),
+            "admitted_at": time.time()
+        }
+        path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:12]}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(ticket, f)
+        ticket["path"] = path
+        return ticket
+
+    def remove(self, ticket: Dict):
+        self._remove(ticket["path"])
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class AdmissionController:
+    """
+    Admits tool runs only while the host has room for them.
+
+    Every tool has an estimated cost (CPU cores, memory, network bandwidth)
+    from the "admission" config section. A run is admitted when the costs of
+    all runs admitted on the host plus its own stay within the configured
+    budgets, and when measured CPU use and free memory, plus the cost of runs
+    admitted within the last ramp_seconds (which may not show up in the
+    measurements yet), leave room for it. Network use is only budgeted, not
+    measured. Runs that don't fit wait in arrival order; smaller ones may
+    overtake until the oldest has waited starvation_seconds. A run is always
+    admitted when nothing else is running, so an oversized tool still gets its turn.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, ledger_dir: str = LEDGER_DIR):
+        """
+        Initialize the AdmissionController.
+
+        Args:
+            config: The "admission" config section
+            ledger_dir: Directory of the host-wide ticket ledger
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_ADMISSION, **config)
+        budgets = dict(DEFAULT_ADMISSION["budgets"], **config.get("budgets", {}))
+        total_memory_mb = psutil.virtual_memory().total / (1024 * 1024)
+        self.cores = psutil.cpu_count() or 1
+        self.budget = ToolCost(
+            budgets["cpu"] if budgets["cpu"] is not None else self.cores,
+            budgets["memory_mb"] if budgets["memory_mb"] is not None
+            else total_memory_mb * self.config["memory_budget_ratio"],
+            budgets["network_mbps"] if budgets["network_mbps"] is not None else float("inf")
+        )
+        self.default_cost = ToolCost.from_dict(self.config["default_cost"])
+        self.tool_costs = {tool: ToolCost.from_dict(cost, self.default_cost)
+                           for tool, cost in self.config["tools"].items()}
+
+        self.ledger = TicketLedger(ledger_dir) if self.enabled else None
+        self.waiting = deque()
+        self.condition = threading.Condition()
+        self.host = None
+        self.host_sampled_at = 0.0
+        psutil.cpu_percent(interval=None)  # Prime the CPU counter
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled"))
+
+    def cost_of(self, tool: str) -> ToolCost:
+        """Estimated cost of one run of a tool (by script or binary name)."""
+        return self.tool_costs.get(os.path.basename(tool), self.default_cost)
+
+    def _measure_host(self) -> Dict[str, float]:
+        """CPU use and free memory, sampled at most once per poll interval."""
+        now = time.monotonic()
+        if self.host is None or now - self.host_sampled_at >= self.config["poll_interval"]:
+            self.host = {
+                'cpu_percent': psutil.cpu_percent(interval=None),
+                'available_mb': psutil.virtual_memory().available / (1024 * 1024)
+            }
+            self.host_sampled_at = now
+        return self.host
+
+    def _fits(self, cost: ToolCost, tickets: List[Dict]) -> Tuple[bool, str]:
+        """Check a run against the budgets and the measured host headroom."""
+        if not tickets:
+            return True, ""
+
+        admitted = total_cost(ToolCost.from_dict(t["cost"]) for t in tickets) + cost
+        for dimension in ("cpu", "memory_mb", "network_mbps"):
+            if getattr(admitted, dimension) > getattr(self.budget, dimension):
+                return False, f"{dimension} budget"
+
+        # Runs admitted moments ago may not have ramped up yet, so count them on top of the measurements
+        cutoff = time.time() - self.config["ramp_seconds"]
+        ramping = total_cost(ToolCost.from_dict(t["cost"]) for t in tickets if t["admitted_at"] >= cutoff)
+        host = self._measure_host()
+        busy_cores = host['cpu_percent'] / 100.0 * self.cores + ramping.cpu + cost.cpu
+        if busy_cores > self.cores * self.config["max_cpu_percent"] / 100.0:
+            return False, "cpu headroom"
+        if host['available_mb'] - ramping.memory_mb - cost.memory_mb < self.config["min_available_memory_mb"]:
+            return False, "memory headroom"
+        return True, ""
+
+    def _may_try(self, waiter: Dict) -> bool:
+        """Whether a waiter may be admitted now (only the oldest one once it is starving)."""
+        oldest = self.waiting[0]
+        if waiter is oldest:
+            return True
+        return time.monotonic() - oldest['since'] < self.config["starvation_seconds"]
+
+    def acquire(self, tool: str, key: str) -> Optional[Dict]:
+        """
+        Wait until a run of a tool may start.
+
+        Args:
+            tool: Name of the tool (script or binary)
+            key: What the run is for, normally the action ID
+
+        Returns:
+            The ticket to pass to release(), or None when admission control is off
+        """
+        if not self.enabled:
+            return None
+
+        cost = self.cost_of(tool)
+        waiter = {'tool': tool, 'key': key, 'since': time.monotonic(), 'reason': ""}
+        with self.condition:
+            self.waiting.append(waiter)
+        try:
+            while True:
+                with self.condition:
+                    may_try = self._may_try(waiter)
+                if may_try:
+                    with self.ledger.locked():
+                        fits, reason = self._fits(cost, self.ledger.tickets())
+                        if fits:
+                            return self.ledger.add(tool, key, cost)
+                    waiter['reason'] = reason
+                # Other processes release tickets too, so poll as well as waiting for local releases
+                with self.condition:
+                    self.condition.wait(self.config["poll_interval"])
+        finally:
+            with self.condition:
+                self.waiting.remove(waiter)
+                self.condition.notify_all()
+
+    def release(self, ticket: Optional[Dict]):
+        """Give back the resources of a finished run."""
+        if ticket is None:
+            return
+        self.ledger.remove(ticket)
+        with self.condition:
+            self.condition.notify_all()
+
+    @contextmanager
+    def admitted(self, tool: str, key: str):
+        """Hold an admission ticket for the duration of a with block."""
+        ticket = self.acquire(tool, key)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def get_status(self) -> Dict:
+        """Admitted runs on the host, runs waiting in this process, budgets and last host sample."""
+        with self.condition:
+            waiting = [{'tool': w['tool'], 'key': w['key'], 'waited': time.monotonic() - w['since'],
+                        'reason': w['reason']} for w in self.waiting]
+        tickets = []
+        if self.enabled:
+            with self.ledger.locked():
+                tickets = self.ledger.tickets()
+        return {
+            'enabled': self.enabled,
+            'admitted': [{'tool': t['tool'], 'key': t['key'], 'pid': t['pid']} for t in tickets],
+            'reserved': total_cost(ToolCost.from_dict(t["cost"]) for t in tickets).to_dict(),
+            'budget': self.budget.to_dict(),
+            'waiting': waiting,
+            'host': self.host
+        }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """The process-wide controller, configured from the "admission" section of the config."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("admission", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading admission config: {e}")
+                config = {}
+            _controller = AdmissionController(config)
+        return _controller
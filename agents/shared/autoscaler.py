@@ -0,0 +1,305 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import psutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents.shared.sister_comm import INSTANCE_ENV_VAR, CONCURRENCY_ENV_VAR
+from output_handler import write_output
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPLICA_LOG_DIR = os.path.join(os.path.expanduser("~"), ".7sisters", "logs")
+
+# Defaults used when the config has no "autoscaling" section
+DEFAULT_AUTOSCALING = {
+    "enabled": False,
+    "interval": 10,
+    "cooldown": 60,
+    "sustain_checks": 3,
+    "target_drain_seconds": 120,
+    "scale_down_utilization": 0.5,
+    "max_cpu_percent": 85,
+    "max_memory_percent": 85,
+    "limits": {
+        "default": {"min": 1, "max": 4}
+    }
+}
+
+
+def launch_headless_instance(sister_name: str, instance_id: str, concurrency: int = 1,
+                             env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """
+    Launch an extra instance of a sister in the background.
+
+    Output goes to ~/.7sisters/logs/<instance>.log instead of a terminal window.
+
+    Args:
+        sister_name: The sister to launch
+        instance_id: Unique ID of the new instance, e.g. "Alice-3"
+        concurrency: Phases the instance may work on at once
+        env: Base environment (defaults to the current one)
+
+    Returns:
+        The instance's process
+    """
+    instance_env = dict(env if env is not None else os.environ)
+    instance_env["PYTHONPATH"] = PROJECT_ROOT
+    instance_env[INSTANCE_ENV_VAR] = instance_id
+    instance_env[CONCURRENCY_ENV_VAR] = str(concurrency)
+
+    os.makedirs(REPLICA_LOG_DIR, exist_ok=True)
+    with open(os.path.join(REPLICA_LOG_DIR, f"{instance_id}.log"), "a") as log_file:
+        return subprocess.Popen(
+            [sys.executable, os.path.join("agents", sister_name, "init.py")],
+            cwd=PROJECT_ROOT, env=instance_env,
+            stdout=log_file, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL
+        )
+
+
+@dataclass
+class ScalingDecision:
+    """A replica added or retired by the autoscaler."""
+    sister: str
+    action: str  # "scale_up" or "scale_down"
+    instance: str
+    reason: str
+    timestamp: float = field(default_factory=time.time)
+
+    def describe(self) -> str:
+        when = time.strftime("%H:%M:%S", time.localtime(self.timestamp))
+        verb = "added" if self.action == "scale_up" else "retired"
+        return f"[{when}] {self.sister}: {verb} {self.instance} ({self.reason})"
+
+
+class Autoscaler:
+    """
+    Grows and shrinks the number of instances of each sister.
+
+    Every interval it looks at each running sister's phase backlog, in-flight
+    work and phase latency, along with host CPU and memory. A sister gains an
+    instance when her backlog would take longer than target_drain_seconds to
+    clear, and loses one when her remaining instances could absorb the current
+    work at no more than scale_down_utilization. Either condition has to hold
+    for sustain_checks evaluations in a row, and a sister that was just scaled
+    is left alone for the cooldown, so short bursts don't cause flapping.
+    Instances are never added while the host is above its CPU or memory limit.
+    """
+
+    def __init__(self, action_manager, config: Optional[Dict] = None):
+        """
+        Initialize the Autoscaler.
+
+        Args:
+            action_manager: Seven's ActionManager (set up with a work broker)
+            config: The "autoscaling" config section
+        """
+        self.action_manager = action_manager
+        self.config = dict(DEFAULT_AUTOSCALING, **(config or {}))
+        self.instance_concurrency = action_manager.config.get("replicas", {}).get("instance_concurrency", 1)
+
+        self.spawned: Dict[str, Dict[str, subprocess.Popen]] = {}
+        self.next_index: Dict[str, int] = {}
+        self.retired = set()
+        self.pressure: Dict[str, int] = {}  # > 0: consecutive scale-up signals, < 0: scale-down
+        self.last_scaled: Dict[str, float] = {}
+        self.decisions = deque(maxlen=50)
+        self.host = {'cpu_percent': 0.0, 'memory_percent': 0.0}
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled"))
+
+    def start(self):
+        """Start evaluating in the background."""
+        psutil.cpu_percent(interval=None)  # Prime the CPU counter
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, retire: bool = True):
+        """Stop evaluating and, by default, retire every instance the autoscaler started."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        if retire:
+            with self.lock:
+                spawned = [(sister, instance) for sister, instances in self.spawned.items()
+                           for instance in instances]
+            for sister, instance in spawned:
+                self._retire(sister, instance)
+
+    def get_limits(self, sister_name: str) -> Dict[str, int]:
+        """Minimum and maximum instance count for a sister."""
+        limits = self.config.get("limits", {})
+        merged = dict(DEFAULT_AUTOSCALING["limits"]["default"], **limits.get("default", {}))
+        merged.update(limits.get(sister_name, {}))
+        return merged
+
+    def get_recent_decisions(self, count: int = 10) -> List[ScalingDecision]:
+        """The most recent scaling decisions, oldest first."""
+        with self.lock:
+            return list(self.decisions)[-count:]
+
+    def get_summary(self) -> Dict[str, Dict]:
+        """Per-sister instance counts, bounds and pending scaling pressure."""
+        summary = {}
+        for sister in self._managed_sisters():
+            limits = self.get_limits(sister)
+            summary[sister] = {
+                'instances': len(self._current_instances(sister)),
+                'spawned': len(set(self.spawned.get(sister, {})) - self.retired),
+                'min': limits['min'],
+                'max': limits['max'],
+                'pressure': self.pressure.get(sister, 0)
+            }
+        return summary
+
+    def _run(self):
+        interval = self.config.get("interval", 10)
+        while not self.stop_event.wait(interval):
+            try:
+                self.evaluate()
+            except Exception as e:
+                write_output("Seven", "autoscaler", f"Autoscaler error: {e}")
+
+    def _managed_sisters(self) -> List[str]:
+        """Running sisters with a work queue, other than Seven herself."""
+        broker = self.action_manager.work_broker
+        if not broker:
+            return []
+        return [s for s in broker.sister_names if s != "Seven" and self._current_instances(s)]
+
+    def _current_instances(self, sister_name: str) -> List[str]:
+        """Running instances of a sister, including spawned ones that haven't reported yet."""
+        instances = set(self.action_manager.get_sister_instances(sister_name))
+        instances.update(self.spawned.get(sister_name, {}))
+        return sorted(instances - self.retired)
+
+    def evaluate(self) -> List[ScalingDecision]:
+        """Run one scaling round and return the decisions it made."""
+        self._reap_exited()
+        self.host = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': psutil.virtual_memory().percent
+        }
+        host_busy = (self.host['cpu_percent'] > self.config["max_cpu_percent"] or
+                     self.host['memory_percent'] > self.config["max_memory_percent"])
+
+        decisions = []
+        for sister in self._managed_sisters():
+            decision = self._evaluate_sister(sister, host_busy)
+            if decision:
+                decisions.append(decision)
+        return decisions
+
+    def _evaluate_sister(self, sister_name: str, host_busy: bool) -> Optional[ScalingDecision]:
+        limits = self.get_limits(sister_name)
+        instances = self._current_instances(sister_name)
+        count = len(instances)
+        load = self.action_manager.get_sister_load(sister_name)
+        latency = load['latency'] or self.action_manager.default_phase_latency
+
+        drain_seconds = load['backlog'] * latency / max(count, 1)
+        spare_capacity = (count - 1) * self.instance_concurrency * self.config["scale_down_utilization"]
+
+        if count < limits['min']:
+            signal, reason = 1, f"below minimum of {limits['min']}"
+        elif count > limits['max']:
+            signal, reason = -1, f"above maximum of {limits['max']}"
+        elif drain_seconds > self.config["target_drain_seconds"] and count < limits['max'] and not host_busy:
+            signal, reason = 1, f"backlog {load['backlog']} needs ~{drain_seconds:.0f}s to drain"
+        elif load['backlog'] == 0 and load['in_flight'] <= spare_capacity and count > limits['min']:
+            signal, reason = -1, f"{load['in_flight']} in flight on {count} instances"
+        else:
+            signal, reason = 0, ""
+
+        # Hysteresis: only act on a signal that held for several rounds in a row
+        previous = self.pressure.get(sister_name, 0)
+        if signal == 0:
+            self.pressure[sister_name] = 0
+            return None
+        pressure = previous + signal if previous * signal > 0 else signal
+        self.pressure[sister_name] = pressure
+        bound_violation = count < limits['min'] or count > limits['max']
+        if abs(pressure) < self.config["sustain_checks"] and not bound_violation:
+            return None
+        if time.time() - self.last_scaled.get(sister_name, 0) < self.config["cooldown"]:
+            return None
+
+        if signal > 0:
+            instance = self._spawn(sister_name)
+            decision = ScalingDecision(sister_name, "scale_up", instance, reason)
+        else:
+            instance = self._pick_instance_to_retire(sister_name, instances)
+            if not instance:
+                return None
+            self._retire(sister_name, instance)
+            decision = ScalingDecision(sister_name, "scale_down", instance, reason)
+
+        self.pressure[sister_name] = 0
+        self.last_scaled[sister_name] = time.time()
+        with self.lock:
+            self.decisions.append(decision)
+        write_output("Seven", "autoscaler",
+                    f"{decision.describe()} | cpu {self.host['cpu_percent']:.0f}% "
+                    f"mem {self.host['memory_percent']:.0f}%")
+        return decision
+
+    def _spawn(self, sister_name: str) -> str:
+        """Start a new headless instance with a name that hasn't been used before."""
+        existing = set(self._current_instances(sister_name)) | self.retired
+        index = self.next_index.get(sister_name, 2)
+        while f"{sister_name}-{index}" in existing:
+            index += 1
+        instance = f"{sister_name}-{index}"
+        self.next_index[sister_name] = index + 1
+
+        process = launch_headless_instance(sister_name, instance, self.instance_concurrency)
+        with self.lock:
+            self.spawned.setdefault(sister_name, {})[instance] = process
+        return instance
+
+    def _pick_instance_to_retire(self, sister_name: str, instances: List[str]) -> Optional[str]:
+        """
+        Choose the idlest instance that can be retired.
+        The primary instance (the one with a terminal window) is never retired.
+        """
+        primary = {sister_name, f"{sister_name}-1"}
+        reported = self.action_manager.get_sister_instances(sister_name)
+        candidates = [i for i in instances if i not in primary]
+        if not candidates:
+            return None
+
+        def sort_key(instance: str):
+            in_flight = (reported.get(instance) or {}).get('in_flight')
+            # Prefer our own idle instances, then anything else that reports no work
+            return (in_flight or 0, instance not in self.spawned.get(sister_name, {}), instance)
+
+        return min(candidates, key=sort_key)
+
+    def _retire(self, sister_name: str, instance: str):
+        """Stop handing work to an instance and tell it to shut down."""
+        self.retired.add(instance)
+        broker = self.action_manager.work_broker
+        if broker:
+            broker.forget_instance(instance)
+        self.action_manager.comm_manager.send_command(instance, 'terminate')
+
+    def _reap_exited(self):
+        """Drop spawned instances whose process has exited."""
+        with self.lock:
+            for sister, instances in self.spawned.items():
+                for instance, process in list(instances.items()):
+                    if process.poll() is not None:
+                        del instances[instance]
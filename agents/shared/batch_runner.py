@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents.shared.task_queue import ActionPriority
+from output_handler import write_output
+
+# Defaults used when the config has no "batch" section
+DEFAULT_MAX_CONCURRENT_ACTIONS = 8
+DEFAULT_SISTER_LIMIT = 4
+
+
+def load_scope_file(scope_path: str) -> List[str]:
+    """
+    Load the in-scope targets from a scope file.
+
+    One target per line. Blank lines and anything after a '#' are ignored,
+    and duplicate targets are dropped while keeping the file order.
+
+    Args:
+        scope_path: Path to the scope file
+
+    Returns:
+        List of unique targets
+    """
+    targets = []
+    seen = set()
+    with open(scope_path, "r", encoding="utf-8") as f:
+        for line in f:
+            target = line.split("#", 1)[0].strip()
+            if target and target not in seen:
+                seen.add(target)
+                targets.append(target)
+    return targets
+
+
+@dataclass
+class BatchProgress:
+    """Running counters for a batch of actions, timed by the given clock."""
+    total: int
+    completed: int = 0
+    failed: int = 0
+    running: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    clock: Callable[[], float] = field(default=time.time, repr=False)
+
+    def __post_init__(self):
+        if self.started_at is None:
+            self.started_at = self.clock()
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed
+
+    def summary(self) -> str:
+        """Format a one-line progress summary."""
+        elapsed = (self.finished_at or self.clock()) - self.started_at
+        return (f"{self.done}/{self.total} done "
+                f"({self.completed} ok, {self.failed} failed, {self.running} running) "
+                f"in {elapsed:.0f}s")
+
+
+class BatchRunner:
+    """
+    Fans a single confirmed action out over many targets.
+    Targets are pulled from a work queue by a fixed pool of workers (the global
+    concurrency cap), and each action also holds a slot for every sister it uses
+    so no sister is handed more than its per-sister limit at once.
+    """
+
+    def __init__(self, action_manager, batch_id: str, action_type: str, targets: List[str],
+                 sisters: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENT_ACTIONS,
+                 sister_limits: Optional[Dict[str, int]] = None,
+                 default_sister_limit: int = DEFAULT_SISTER_LIMIT,
+                 action_timeout: Optional[float] = None,
+                 progress_callback: Optional[Callable[[str, BatchProgress], None]] = None):
+        """
+        Initialize the BatchRunner.
+
+        Args:
+            action_manager: The ActionManager used to execute each action
+            batch_id: Identifier of this batch, also used as its log target
+            action_type: The type of action to perform on every target
+            targets: The in-scope targets
+            sisters: Sisters assigned to every action in the batch
+            max_concurrency: Maximum number of actions running at once
+            sister_limits: Maximum concurrent actions per sister
+            default_sister_limit: Limit for sisters missing from sister_limits
+            action_timeout: Seconds to wait for a single action before counting it as failed
+            progress_callback: Called with (target, progress) after every finished action
+        """
+        self.action_manager = action_manager
+        self.batch_id = batch_id
+        self.action_type = action_type
+        self.targets = list(targets)
+        self.sisters = list(sisters)
+        self.max_concurrency = max(1, min(max_concurrency, len(self.targets) or 1))
+        self.action_timeout = action_timeout
+        self.progress_callback = progress_callback
+        self.progress = BatchProgress(total=len(self.targets), clock=action_manager.clock.time)
+        self.results: Dict[str, str] = {}
+        self.action_ids: Dict[str, str] = {}
+
+        sister_limits = sister_limits or {}
+        self.sister_slots = {
+            sister: threading.BoundedSemaphore(max(1, sister_limits.get(sister, default_sister_limit)))
+            for sister in self.sisters
+        }
+
+        self.work_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.workers: List[threading.Thread] = []
+        self.progress_lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+
+    def start(self):
+        """Queue every target and start the worker pool."""
+        for target in self.targets:
+            self.work_queue.put(target)
+        for _ in range(self.max_concurrency):
+            self.work_queue.put(None)  # One stop marker per worker
+
+        write_output("Seven", self.batch_id,
+                    f"Batch {self.action_type} started on {len(self.targets)} targets "
+                    f"with sisters {', '.join(self.sisters)} (concurrency {self.max_concurrency})")
+
+        for index in range(self.max_concurrency):
+            worker = threading.Thread(target=self._worker, name=f"{self.batch_id}-worker-{index}", daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+        threading.Thread(target=self._wait_for_workers, daemon=True).start()
+
+    def cancel(self):
+        """Stop handing out new targets. Actions already running are left to finish."""
+        self.cancelled.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the whole batch is finished."""
+        return self.finished.wait(timeout)
+
+    def _wait_for_workers(self):
+        for worker in self.workers:
+            worker.join()
+        self.progress.finished_at = self.progress.clock()
+        self.finished.set()
+        write_output("Seven", self.batch_id,
+                    f"Batch {self.action_type} finished: {self.progress.summary()}")
+
+    def _worker(self):
+        while True:
+            target = self.work_queue.get()
+            if target is None:
+                return
+            if self.cancelled.is_set():
+                self._record_result(target, "cancelled")
+                continue
+
+            # Acquire sister slots in a fixed order so workers can't deadlock each other
+            acquired = []
+            for sister in sorted(self.sister_slots):
+                self.sister_slots[sister].acquire()
+                acquired.append(sister)
+
+            with self.progress_lock:
+                self.progress.running += 1
+            try:
+                status = self._run_action(target)
+            except Exception as e:
+                write_output("Seven", target, f"Batch action error: {e}")
+                status = "failed"
+            finally:
+                for sister in acquired:
+                    self.sister_slots[sister].release()
+                with self.progress_lock:
+                    self.progress.running -= 1
+
+            self._record_result(target, status)
+
+    def _run_action(self, target: str) -> str:
+        """Execute the action for one target and wait for it to finish."""
+        action_id = self.action_manager.generate_action_id(self.action_type, target)
+        self.action_ids[target] = action_id
+        success, message = self.action_manager.execute_action(
+            self.action_type, target, self.sisters, action_id=action_id,
+            priority=ActionPriority.BULK
+        )
+        if not success:
+            write_output("Seven", target, f"Batch action not started: {message}")
+            return "failed"
+        if not self.action_manager.wait_for_action(action_id, self.action_timeout):
+            write_output("Seven", target,
+                         f"Batch action did not finish within {self.action_timeout}s or stayed paused too long")
+            # Give up on it for real, so it doesn't keep its sisters busy behind the batch's back
+            self.action_manager.cancel_action(action_id)
+            return "failed"
+        return (self.action_manager.get_action(action_id) or {}).get('status', 'failed')
+
+    def _record_result(self, target: str, status: str):
+        with self.progress_lock:
+            self.results[target] = status
+            if status == "completed":
+                self.progress.completed += 1
+            else:
+                self.progress.failed += 1
+            progress = BatchProgress(**vars(self.progress))
+
+        write_output("Seven", self.batch_id, f"{target}: {status} | {progress.summary()}")
+        if self.progress_callback:
+            try:
+                self.progress_callback(target, progress)
+            except Exception as e:
+                write_output("Seven", self.batch_id, f"Progress callback error: {e}")
@@ -0,0 +1,29 @@
+import time
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class SystemClock:
+    """
+    Wall-clock time, timers and threads as used by ActionManager.
+
+    ActionManager takes all of its time readings, timers and background work
+    from a clock object, so the simulator can swap in a virtual clock (see
+    agents/shared/simulator.py) and run the same scheduling logic on virtual time.
+    """
+
+    def time(self) -> float:
+        """Current time in seconds since the epoch."""
+        return time.time()
+
+    def timer(self, interval: float, function: Callable, args: Optional[List[Any]] = None) -> threading.Timer:
+        """Create a (not yet started) daemon timer that calls function(*args) after interval seconds."""
+        timer = threading.Timer(interval, function, args=args or [])
+        timer.daemon = True
+        return timer
+
+    def spawn(self, function: Callable, args: Optional[List[Any]] = None) -> threading.Thread:
+        """Run function(*args) in the background."""
+        thread = threading.Thread(target=function, args=args or [])
+        thread.start()
+        return thread
@@ -0,0 +1,314 @@
+import os
+import json
+import glob
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from output_handler import init_output_dir
+from agents.shared.parsers import RECORDS_NAME
+from agents.shared.records import Finding, Host, Record, Service, URL, from_wire
+from agents.shared.urls import DEFAULT_PORTS
+
+# Finding severities, least severe first
+SEVERITIES = ("unknown", "info", "low", "medium", "high", "critical")
+
+
+def severity_rank(severity: Optional[str]) -> int:
+    return SEVERITIES.index(severity) if severity in SEVERITIES else 0
+
+
+class Entity:
+    """
+    Something several tools can report on. Each source's facts about it are
+    kept apart, as its evidence, so nothing one tool says hides what another said.
+    """
+
+    __slots__ = ("evidence",)
+
+    def __init__(self):
+        self.evidence: Dict[str, Dict] = {}
+
+    def observe(self, source: Optional[str], **facts):
+        entry = self.evidence.setdefault(source or "unknown", {})
+        entry.update({name: value for name, value in facts.items() if value is not None})
+
+
+class FindingEntity(Entity):
+    """A scanner finding (template and location), with the sources that reported it."""
+
+    __slots__ = ("template", "severity", "location")
+
+    def __init__(self, template: str, severity: str, location: str):
+        super().__init__()
+        self.template = template
+        self.severity = severity
+        self.location = location
+
+    def describe(self) -> Dict:
+        return {'template': self.template, 'severity': self.severity, 'location': self.location,
+                'sources': sorted(self.evidence)}
+
+
+class Endpoint(Entity):
+    """A canonical URL: the status each source saw and the findings on it."""
+
+    __slots__ = ("url", "port", "findings")
+
+    def __init__(self, url: str, port: int):
+        super().__init__()
+        self.url = url
+        self.port = port
+        self.findings: Dict[Tuple[str, str], FindingEntity] = {}
+
+    def describe(self) -> Dict:
+        return {'url': self.url,
+                'status': {source: facts['status'] for source, facts in sorted(self.evidence.items())
+                           if 'status' in facts},
+                'sources': sorted(self.evidence),
+                'findings': [finding.describe() for finding in self.findings.values()]}
+
+
+class ServiceEntity(Entity):
+    """An open port: what each source says listens on it, and the findings on it."""
+
+    __slots__ = ("port", "protocol", "findings")
+
+    def __init__(self, port: int, protocol: str):
+        super().__init__()
+        self.port = port
+        self.protocol = protocol
+        self.findings: Dict[Tuple[str, str], FindingEntity] = {}
+
+    def describe(self) -> Dict:
+        names = {facts['name'] for facts in self.evidence.values() if facts.get('name')}
+        banners = {facts['banner'] for facts in self.evidence.values() if facts.get('banner')}
+        return {'port': self.port, 'protocol': self.protocol, 'names': sorted(names), 'banners': sorted(banners),
+                'sources': sorted(self.evidence),
+                'findings': [finding.describe() for finding in self.findings.values()]}
+
+
+class Asset(Entity):
+    """A host, and everything known about it: addresses, services, endpoints and findings."""
+
+    __slots__ = ("host", "ips", "services", "endpoints", "findings")
+
+    def __init__(self, host: str):
+        super().__init__()
+        self.host = host
+        self.ips: Set[str] = set()
+        self.services: Dict[Tuple[int, str], ServiceEntity] = {}
+        self.endpoints: Dict[str, Endpoint] = {}
+        self.findings: Dict[Tuple[str, str], FindingEntity] = {}
+
+    def all_findings(self) -> List[FindingEntity]:
+        findings = list(self.findings.values())
+        for entity in list(self.services.values()) + list(self.endpoints.values()):
+            findings.extend(entity.findings.values())
+        return findings
+
+    def sources(self) -> Set[str]:
+        sources = set(self.evidence)
+        for entity in list(self.services.values()) + list(self.endpoints.values()) + self.all_findings():
+            sources.update(entity.evidence)
+        return sources
+
+    def severity(self) -> str:
+        return max((finding.severity for finding in self.all_findings()), key=severity_rank, default="none")
+
+    def describe(self, max_endpoints: Optional[int] = None) -> Dict:
+        """
+        The consolidated view of the asset. Endpoints with findings or the
+        most sources come first; max_endpoints limits how many are included.
+        """
+        findings = self.all_findings()
+        endpoints = sorted(self.endpoints.values(),
+                           key=lambda endpoint: (-len(endpoint.findings), -len(endpoint.evidence), endpoint.url))
+        ports: Dict[int, int] = {}
+        for endpoint in endpoints:
+            ports[endpoint.port] = ports.get(endpoint.port, 0) + 1
+        severities: Dict[str, int] = {}
+        for finding in findings:
+            severities[finding.severity] = severities.get(finding.severity, 0) + 1
+        return {
+            'host': self.host,
+            'ips': sorted(self.ips),
+            'sources': sorted(self.sources()),
+            'severity': self.severity(),
+            'findings': dict(sorted(severities.items(), key=lambda item: -severity_rank(item[0]))),
+            'host_findings': [finding.describe() for finding in self.findings.values()],
+            'services': [dict(service.describe(), endpoints=ports.get(service.port, 0))
+                         for _, service in sorted(self.services.items())],
+            'endpoint_count': len(endpoints),
+            'endpoints': [endpoint.describe() for endpoint in endpoints[:max_endpoints]]
+        }
+
+
+class Correlator:
+    """
+    Merges what all the sisters' tools reported about a target into one entity per asset.
+
+    Records are joined on their canonical keys through hash indexes: hosts
+    by name, endpoints by canonical URL, services by host, port and
+    protocol, and hosts by IP. A finding attaches to the endpoint or service
+    its location names, and a URL's port links it to the service on that
+    port. Each entity keeps every source's evidence.
+
+    refresh() follows the records.jsonl files the runs leave in
+    output/<target>/<run-id>/<sister>/ (see parsers.py), reading only what
+    was appended since the last call, so the entities stay current without
+    re-reading a target's whole history.
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.assets: Dict[str, Asset] = {}
+        self.endpoints: Dict[str, Endpoint] = {}
+        self.services: Dict[Tuple[str, int, str], ServiceEntity] = {}
+        self.hosts_by_ip: Dict[str, Set[str]] = {}
+        self.urls_by_port: Dict[Tuple[str, int], Set[str]] = {}
+        self.offsets: Dict[str, int] = {}  # How far each records file has been read
+        self.records = 0
+
+    def _asset(self, host: str) -> Asset:
+        asset = self.assets.get(host)
+        if asset is None:
+            asset = self.assets[host] = Asset(host)
+        return asset
+
+    def _endpoint(self, url: str, host: str) -> Endpoint:
+        endpoint = self.endpoints.get(url)
+        if endpoint is None:
+            parts = urlsplit(url)
+            try:
+                port = parts.port or DEFAULT_PORTS.get(parts.scheme, 0)
+            except ValueError:
+                port = 0
+            endpoint = self.endpoints[url] = Endpoint(url, port)
+            self._asset(host).endpoints[url] = endpoint
+            self.urls_by_port.setdefault((host, port), set()).add(url)
+        return endpoint
+
+    def _service(self, host: str, port: int, protocol: str) -> ServiceEntity:
+        service = self.services.get((host, port, protocol))
+        if service is None:
+            service = self.services[(host, port, protocol)] = ServiceEntity(port, protocol)
+            self._asset(host).services[(port, protocol)] = service
+        return service
+
+    def add(self, record: Record, source: Optional[str] = None):
+        """Merge one record into the entities; source defaults to the record's own."""
+        source = source or record.source
+        host = getattr(record, "host", None)
+        if not host:
+            return
+        with self.lock:
+            self.records += 1
+            if isinstance(record, Host):
+                self._asset(host).observe(source, ip=record.ip)
+                if record.ip:
+                    self.assets[host].ips.add(record.ip)
+                    self.hosts_by_ip.setdefault(record.ip, set()).add(host)
+            elif isinstance(record, URL):
+                self._asset(host)
+                self._endpoint(record.url, host).observe(source, status=record.status)
+            elif isinstance(record, Service):
+                self._service(host, record.port, record.protocol).observe(source, name=record.name,
+                                                                          banner=record.banner)
+            elif isinstance(record, Finding):
+                self._add_finding(record, host, source)
+
+    def _add_finding(self, record: Finding, host: str, source: Optional[str]):
+        if "://" in record.location:
+            findings = self._endpoint(record.location, host).findings
+        else:
+            port = record.location.rsplit(":", 1)[1] if ":" in record.location else ""
+            findings = (self._service(host, int(port), "tcp").findings if port.isdigit()
+                        else self._asset(host).findings)
+        key = (record.template, record.location)
+        finding = findings.get(key)
+        if finding is None:
+            finding = findings[key] = FindingEntity(record.template, record.severity, record.location)
+        elif severity_rank(record.severity) > severity_rank(finding.severity):
+            finding.severity = record.severity
+        finding.observe(source, detail=record.detail, protocol=record.protocol)
+
+    def refresh(self) -> int:
+        """
+        Merge the records written since the last refresh.
+
+        Returns:
+            The number of records read
+        """
+        with self.refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        pattern = os.path.join(init_output_dir(self.target), "*", "*", RECORDS_NAME)
+        count = 0
+        for path in sorted(glob.glob(pattern)):
+            offset = self.offsets.get(path, 0)
+            try:
+                if os.path.getsize(path) <= offset:
+                    continue
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+            except OSError:
+                continue
+            # A tool may be writing the last line right now; leave it for the next refresh
+            complete = data[:data.rfind(b"\n") + 1]
+            self.offsets[path] = offset + len(complete)
+            for line in complete.decode("utf-8", errors="replace").splitlines():
+                try:
+                    record = from_wire(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    continue
+                self.add(record)
+                count += 1
+        return count
+
+    def urls_on_port(self, host: str, port: int) -> Set[str]:
+        """The endpoints served by a host's port, e.g. to see what a finding on host:443 may affect."""
+        with self.lock:
+            return set(self.urls_by_port.get((host, port), ()))
+
+    def hosts_for_ip(self, ip: str) -> Set[str]:
+        with self.lock:
+            return set(self.hosts_by_ip.get(ip, ()))
+
+    def summary(self, host: Optional[str] = None, max_endpoints: Optional[int] = None) -> List[Dict]:
+        """
+        The consolidated view of every asset (or just one host), most severe
+        findings first, then the assets the most sources reported on.
+        """
+        with self.lock:
+            assets = [self.assets[host]] if host in self.assets else [] if host else list(self.assets.values())
+            views = [asset.describe(max_endpoints) for asset in assets]
+        return sorted(views, key=lambda view: (-severity_rank(view['severity']), -len(view['sources']), view['host']))
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'records': self.records,
+                'assets': len(self.assets),
+                'endpoints': len(self.endpoints),
+                'services': len(self.services),
+                'ips': len(self.hosts_by_ip),
+                'files': len(self.offsets)
+            }
+
+
+_correlators: Dict[str, Correlator] = {}
+_correlators_lock = threading.Lock()
+
+
+def get_correlator(target: str) -> Correlator:
+    """The process-wide correlator of a target; call refresh() to pick up new output."""
+    with _correlators_lock:
+        correlator = _correlators.get(target)
+        if correlator is None:
+            correlator = _correlators[target] = Correlator(target)
+        return correlator
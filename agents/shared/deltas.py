@@ -0,0 +1,296 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from output_handler import init_output_dir
+from agents.shared.admission import CONFIG_PATH
+from agents.shared.output_stream import STDOUT, OutputSink
+from agents.shared.records import Record, from_wire
+
+# Defaults used when the config has no "incremental" section
+DEFAULT_INCREMENTAL = {
+    "enabled": True,
+    "max_items": 2000000,
+    "sample_size": 20,
+    "tools": {}
+}
+
+# Where a target's deltas live, under its output directory
+DELTA_SUBDIR = "deltas"
+
+# Environment variables that tell a tool where the deltas of earlier tools are
+DELTA_DIR_ENV_VAR = "SISTERS_DELTA_DIR"
+INCREMENTAL_ENV_VAR = "SISTERS_INCREMENTAL"
+
+
+class ItemSink(OutputSink):
+    """
+    Collects the items a tool reports on stdout.
+
+    With a pattern, only matching lines are items, and a "key" group (if
+    any) identifies the item, so a line with a known key but new text counts
+    as changed (e.g. a port whose service banner changed). Without one,
+    every non-empty line is an item. By record, the items are instead the
+    records parsed from the tool's output and files (see parsers.py), keyed
+    by what identifies each record.
+    """
+
+    def __init__(self, pattern: Optional[str], max_items: int, by_record: bool = False):
+        self.pattern = re.compile(pattern) if pattern else None
+        self.max_items = max_items
+        self.by_record = by_record
+        self.items: Dict[str, str] = {}
+        self.overflowed = False
+
+    def add_record(self, record: Record):
+        """Add a record parsed from the run's output (for sinks that diff by record)."""
+        if not self.overflowed:
+            self._add(json.dumps([record.kind] + list(record.key())), json.dumps(record.to_wire()))
+
+    def _add(self, key: str, line: str):
+        self.items[key] = line
+        if len(self.items) > self.max_items:
+            self.overflowed = True  # Too many to diff; the next run starts over
+            self.items = {}
+
+    def write_line(self, stream: str, line: str):
+        if stream != STDOUT or self.overflowed or self.by_record:
+            return
+        line = line.strip()
+        if not line:
+            return
+        key = line
+        if self.pattern:
+            match = self.pattern.search(line)
+            if not match:
+                return
+            if "key" in self.pattern.groupindex and match.group("key"):
+                key = match.group("key")
+        self._add(key, line)
+
+
+def read_delta_items(directory: str, tool: str, field: Optional[str] = None,
+                     known: bool = False) -> Optional[List[str]]:
+    """
+    The new and changed items of a tool's last delta in a delta directory,
+    or with known, every item of its last result set. For a tool diffed by
+    record, field picks one field of each record (e.g. "url" or "host").
+
+    Returns:
+        The items, without duplicates, or None if the tool has no results there yet
+    """
+    tool = os.path.basename(tool)
+    try:
+        if known:
+            with open(os.path.join(directory, f"{tool}.state.json"), "r", encoding="utf-8") as f:
+                lines = list(json.load(f).values())
+        else:
+            lines = []
+            for name in ("added", "changed"):
+                with open(os.path.join(directory, f"{tool}.{name}.txt"), "r", encoding="utf-8") as f:
+                    lines.extend(f.read().splitlines())
+    except (OSError, ValueError):
+        return None
+    items = {}
+    for line in lines:
+        line = line.strip()
+        if line and field:
+            line = getattr(from_wire(json.loads(line)), field, None)
+        if line:
+            items[line] = None
+    return list(items)
+
+
+class ResultDelta:
+    """What changed in a tool's results for a target since its previous run."""
+
+    def __init__(self, tool: str, target: str, added: Dict[str, str], removed: Dict[str, str],
+                 changed: Dict[str, Tuple[str, str]], total: int, first_run: bool):
+        self.tool = tool
+        self.target = target
+        self.added = added
+        self.removed = removed
+        self.changed = changed  # key -> (old line, new line)
+        self.total = total
+        self.first_run = first_run
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def describe(self) -> str:
+        if self.first_run:
+            return f"{self.tool}: {self.total} items (first run)"
+        return f"{self.tool}: +{len(self.added)} new, -{len(self.removed)} gone, ~{len(self.changed)} changed of {self.total}"
+
+    def summary(self, sample_size: int) -> Dict:
+        """A bounded description of the delta to send to Seven."""
+        return {
+            'tool': self.tool,
+            'total': self.total,
+            'first_run': self.first_run,
+            'added': len(self.added),
+            'removed': len(self.removed),
+            'changed': len(self.changed),
+            'sample': {
+                'added': list(self.added.values())[:sample_size],
+                'removed': list(self.removed.values())[:sample_size],
+                'changed': [new for _, new in list(self.changed.values())[:sample_size]]
+            }
+        }
+
+
+class DeltaTracker:
+    """
+    Keeps the last known result set of each (target, tool) and diffs every
+    new run against it.
+
+    The set lives in output/<target>/deltas/<tool>.state.json. After each
+    successful run, <tool>.added.txt, <tool>.changed.txt and
+    <tool>.removed.txt next to it hold the delta, so the tools that run
+    after it can work on just the new and changed items: every tool gets the
+    directory in SISTERS_DELTA_DIR (and SISTERS_INCREMENTAL=1) and can read it with
+    read_delta_items (see tools/delta_items.py).
+
+    A tool's "inputs" are the tools whose deltas it works on. Once all of
+    them have results, a run of the tool only covers part of the target, so
+    the items it doesn't report are kept rather than counted as removed.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Initialize the DeltaTracker.
+
+        Args:
+            config: The "incremental" config section
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_INCREMENTAL, **config)
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled"))
+
+    def tracks(self, tool: str) -> bool:
+        return self.enabled and os.path.basename(tool) in self.config["tools"]
+
+    def inputs(self, tool: str) -> List[str]:
+        """The tools whose deltas the tool works on (its "inputs" setting)."""
+        return self.config["tools"].get(os.path.basename(tool), {}).get("inputs", [])
+
+    def works_on_delta(self, target: str, tool: str) -> bool:
+        """Whether a run of the tool started now would only work on the deltas of its inputs."""
+        inputs = self.inputs(tool)
+        if not self.enabled or not inputs:
+            return False
+        directory = self.delta_dir(target)
+        return all(os.path.exists(os.path.join(directory, f"{name}.state.json")) for name in inputs)
+
+    def input_digest(self, target: str, tool: str) -> Optional[str]:
+        """
+        A digest of the delta files of the tool's inputs, for its result
+        cache key (see result_cache.py), or None if it has no inputs.
+        """
+        inputs = self.inputs(tool)
+        if not self.enabled or not inputs:
+            return None
+        directory = self.delta_dir(target)
+        digest = hashlib.sha256()
+        for name in inputs:
+            for suffix in ("state.json", "added.txt", "changed.txt"):
+                try:
+                    with open(os.path.join(directory, f"{name}.{suffix}"), "rb") as f:
+                        digest.update(f.read())
+                except OSError:
+                    pass
+                digest.update(b"\0")
+        return digest.hexdigest()
+
+    def sink_for(self, tool: str) -> ItemSink:
+        """A sink that collects the items of one run of a tracked tool."""
+        settings = self.config["tools"][os.path.basename(tool)]
+        return ItemSink(settings.get("pattern"), self.config["max_items"], settings.get("records", False))
+
+    def delta_dir(self, target: str) -> str:
+        path = os.path.join(init_output_dir(target), DELTA_SUBDIR)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def tool_env(self, target: str) -> Dict[str, str]:
+        """Environment variables that point a tool at the target's deltas."""
+        if not self.enabled:
+            return {}
+        return {DELTA_DIR_ENV_VAR: self.delta_dir(target), INCREMENTAL_ENV_VAR: "1"}
+
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def update(self, target: str, tool: str, sink: ItemSink, partial: bool = False) -> Optional[ResultDelta]:
+        """
+        Diff a finished run's items against the previous run and remember them.
+
+        Args:
+            target: The run's target
+            tool: The tool that ran
+            sink: The items the run reported
+            partial: The run only worked on the deltas of its inputs (see
+                works_on_delta), so the previous items it didn't report stay
+
+        Returns:
+            The delta, or None if the run reported too many items to track
+        """
+        if sink.overflowed:
+            return None
+        tool = os.path.basename(tool)
+        directory = self.delta_dir(target)
+        state_path = os.path.join(directory, f"{tool}.state.json")
+        current = sink.items
+        with self.lock:
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    previous = json.load(f)
+                first_run = False
+            except (OSError, ValueError):
+                previous, first_run = {}, True
+
+            added = {key: line for key, line in current.items() if key not in previous}
+            if partial:
+                current = dict(previous, **current)
+            removed = {key: line for key, line in previous.items() if key not in current}
+            changed = {key: (previous[key], line) for key, line in current.items()
+                       if key in previous and previous[key] != line}
+
+            self._write_atomic(state_path, json.dumps(current))
+            for name, lines in (("added", added.values()), ("removed", removed.values()),
+                                ("changed", [new for _, new in changed.values()])):
+                self._write_atomic(os.path.join(directory, f"{tool}.{name}.txt"),
+                                   "".join(f"{line}\n" for line in lines))
+        return ResultDelta(tool, target, added, removed, changed, len(current), first_run)
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_delta_tracker() -> DeltaTracker:
+    """The process-wide tracker, configured from the "incremental" section of the config."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("incremental", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading incremental config: {e}")
+                config = {}
+            _tracker = DeltaTracker(config)
+        return _tracker
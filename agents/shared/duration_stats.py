@@ -0,0 +1,145 @@
+import os
+import math
+import json
+import time
+import atexit
+import threading
+from typing import Dict, List, Optional
+
+# Histogram buckets grow geometrically from MIN_DURATION, so a few dozen of them
+# cover sub-second phases up to multi-hour scans with bounded relative error
+MIN_DURATION = 0.5  # seconds
+BUCKET_GROWTH = 1.2
+BUCKET_COUNT = 60  # MIN_DURATION * 1.2**59 is roughly 24 hours
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".7sisters", "durations.json")
+SAVE_INTERVAL = 30.0  # seconds between automatic saves
+
+
+class DurationHistogram:
+    """
+    Compact histogram of durations with geometrically sized buckets.
+    Percentiles are reported as the upper bound of the bucket they fall in,
+    so estimates err on the long side by at most one bucket (20%).
+    """
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+
+    @staticmethod
+    def bucket_for(duration: float) -> int:
+        if duration <= MIN_DURATION:
+            return 0
+        index = math.ceil(math.log(duration / MIN_DURATION) / math.log(BUCKET_GROWTH))
+        return min(index, BUCKET_COUNT - 1)
+
+    @staticmethod
+    def upper_bound(bucket: int) -> float:
+        return MIN_DURATION * BUCKET_GROWTH ** bucket
+
+    def add(self, duration: float):
+        """Record one duration in seconds."""
+        bucket = self.bucket_for(duration)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Duration below which p percent of the recorded durations fall."""
+        if not self.total:
+            return None
+        threshold = self.total * p / 100.0
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return self.upper_bound(bucket)
+        return self.upper_bound(max(self.counts))
+
+    def to_dict(self) -> Dict[str, int]:
+        return {str(bucket): count for bucket, count in self.counts.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> "DurationHistogram":
+        return cls({int(bucket): count for bucket, count in data.items()})
+
+
+class DurationStore:
+    """
+    Thread-safe collection of duration histograms, persisted as JSON.
+
+    Keys are plain strings such as "phase:recon:Alice:execution" or
+    "tool:recon:Alice"; see ActionManager for the keys it records.
+    A store without a path lives in memory only (used by the simulator).
+    Changes are saved by a background thread every SAVE_INTERVAL seconds and
+    at exit, so a process that is killed loses at most one interval of them.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_STORE_PATH):
+        self.path = os.path.expanduser(path) if path else None
+        self.histograms: Dict[str, DurationHistogram] = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.saver = None
+        if self.path:
+            self.load()
+            atexit.register(self.save)
+
+    def load(self):
+        """Load saved histograms, if any."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            self.histograms = {key: DurationHistogram.from_dict(counts) for key, counts in data.items()}
+
+    def save(self):
+        """Write the histograms to disk if anything changed."""
+        with self.lock:
+            if not self.dirty or not self.path:
+                return
+            data = {key: histogram.to_dict() for key, histogram in self.histograms.items()}
+            self.dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving duration history: {e}")
+
+    def record(self, key: str, duration: float):
+        """Record a duration; it is saved within SAVE_INTERVAL seconds."""
+        with self.lock:
+            self.histograms.setdefault(key, DurationHistogram()).add(duration)
+            self.dirty = True
+            if self.path and self.saver is None:
+                self.saver = threading.Thread(target=self._run_saver, name="duration-saver", daemon=True)
+                self.saver.start()
+
+    def _run_saver(self):
+        while True:
+            time.sleep(SAVE_INTERVAL)
+            self.save()
+
+    def samples(self, key: str) -> int:
+        with self.lock:
+            histogram = self.histograms.get(key)
+            return histogram.total if histogram else 0
+
+    def percentile(self, key: str, p: float, min_samples: int = 1) -> Optional[float]:
+        """Percentile of a key's durations, or None with fewer than min_samples recorded."""
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if not histogram or histogram.total < min_samples:
+                return None
+            return histogram.percentile(p)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        with self.lock:
+            return sorted(key for key in self.histograms if key.startswith(prefix))
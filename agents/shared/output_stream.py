@@ -0,0 +1,374 @@
+import os
+import sys
+import json
+import time
+import pickle
+import struct
+import datetime
+import selectors
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from output_handler import init_output_dir
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "seven_sisters.config.json")
+
+# Defaults used when the config has no "tool_output" section
+DEFAULT_TOOL_OUTPUT = {
+    "echo": True,
+    "max_line_bytes": 65536,
+    "queue_memory_lines": 10000,
+    "bus_flush_interval": 0.5,
+    "bus_max_lines_per_second": 50
+}
+
+READ_CHUNK = 65536
+STDOUT = "stdout"
+STDERR = "stderr"
+
+_output_config = None
+_output_config_lock = threading.Lock()
+
+
+def get_output_config() -> Dict:
+    """The "tool_output" config section merged with the defaults."""
+    global _output_config
+    with _output_config_lock:
+        if _output_config is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("tool_output", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading tool output config: {e}")
+                config = {}
+            _output_config = dict(DEFAULT_TOOL_OUTPUT, **config)
+        return _output_config
+
+
+class SpillQueue:
+    """
+    FIFO queue that keeps at most max_memory items in memory.
+
+    Once the in-memory part is full, new items go to a temporary file and are
+    read back in order when the consumer gets to them, so a fast producer
+    never makes the queue grow without bound in RAM.
+    """
+
+    def __init__(self, max_memory: int = 10000):
+        self.max_memory = max_memory
+        self.memory = deque()
+        self.spill_file = None
+        self.spill_read = 0
+        self.spill_write = 0
+        self.spilled_count = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        with self.condition:
+            # Once spilling, keep spilling until the file is drained so the order is kept
+            if self.spilled_count or len(self.memory) >= self.max_memory:
+                self._spill(item)
+            else:
+                self.memory.append(item)
+            self.condition.notify()
+
+    def _spill(self, item):
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(prefix="7sisters-spill-")
+        data = pickle.dumps(item)
+        self.spill_file.seek(self.spill_write)
+        self.spill_file.write(struct.pack("<I", len(data)) + data)
+        self.spill_write = self.spill_file.tell()
+        self.spilled_count += 1
+
+    def _unspill(self):
+        self.spill_file.seek(self.spill_read)
+        size, = struct.unpack("<I", self.spill_file.read(4))
+        item = pickle.loads(self.spill_file.read(size))
+        self.spill_read = self.spill_file.tell()
+        self.spilled_count -= 1
+        if not self.spilled_count:
+            # Drained: start the file over so it doesn't keep growing
+            self.spill_file.seek(0)
+            self.spill_file.truncate()
+            self.spill_read = self.spill_write = 0
+        return item
+
+    def get(self, timeout: Optional[float] = None):
+        """
+        Take the next item, waiting up to timeout seconds.
+
+        Returns:
+            The item, or None on timeout or when the queue is closed and empty
+        """
+        with self.condition:
+            if not self.memory and not self.spilled_count and not self.closed:
+                self.condition.wait(timeout)
+            if self.memory:
+                return self.memory.popleft()
+            if self.spilled_count:
+                return self._unspill()
+            return None
+
+    def close(self):
+        """No more items will be put; get() returns None once the queue is drained."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def drained(self) -> bool:
+        with self.condition:
+            return self.closed and not self.memory and not self.spilled_count
+
+    def discard(self):
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+
+class OutputSink:
+    """
+    Consumer of a tool's output lines.
+
+    Each sink gets its own SpillQueue and thread, so a slow sink (a busy bus,
+    an expensive parser) neither blocks the pipe reader nor the other sinks.
+    """
+
+    def write_line(self, stream: str, line: str):
+        raise NotImplementedError
+
+    def flush(self):
+        """Called when the queue is momentarily empty."""
+
+    def close(self):
+        """Called once after the last line."""
+
+
+class ConsoleSink(OutputSink):
+    """Echoes tool output to the sister's terminal, as when tools inherited it."""
+
+    def write_line(self, stream: str, line: str):
+        print(line, file=sys.stderr if stream == STDERR else sys.stdout)
+
+
+class OutputStoreSink(OutputSink):
+    """Appends tool output to output/<target>/<sister>_tool.log."""
+
+    def __init__(self, sister_name: str, target: str):
+        self.path = os.path.join(init_output_dir(target), f"{sister_name}_tool.log")
+        self.file = None  # Opened with the first line, so a job that never runs leaks no handle
+
+    def write_line(self, stream: str, line: str):
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8", errors="replace")
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        prefix = "!" if stream == STDERR else " "
+        self.file.write(f"[{timestamp}]{prefix} {line}\n")
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class BusSink(OutputSink):
+    """
+    Sends tool output to Seven for her live view.
+
+    Lines are batched into one 'tool_output' message per flush interval, and
+    at most max_lines_per_second are forwarded; the rest are only counted, as
+    the output store keeps the complete output.
+    """
+
+    def __init__(self, comm_manager, sister_name: str, target: str, action_id: Optional[str],
+                 flush_interval: float = 0.5, max_lines_per_second: int = 50):
+        self.comm_manager = comm_manager
+        self.sister_name = sister_name
+        self.target = target
+        self.action_id = action_id
+        self.flush_interval = flush_interval
+        self.max_lines_per_second = max_lines_per_second
+        self.batch: List[Tuple[str, str]] = []
+        self.dropped = 0
+        self.window_start = time.monotonic()
+        self.window_lines = 0
+        self.last_flush = time.monotonic()
+
+    def write_line(self, stream: str, line: str):
+        now = time.monotonic()
+        if now - self.window_start >= 1.0:
+            self.window_start, self.window_lines = now, 0
+        if self.window_lines >= self.max_lines_per_second:
+            self.dropped += 1
+        else:
+            self.window_lines += 1
+            self.batch.append((stream, line))
+        if now - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.batch and not self.dropped:
+            return
+        self.comm_manager.send_command("Seven", 'tool_output', {
+            'action_id': self.action_id,
+            'sister_name': self.sister_name,
+            'target': self.target,
+            'lines': self.batch,
+            'dropped': self.dropped
+        })
+        self.batch, self.dropped = [], 0
+
+    def close(self):
+        self.flush()
+
+
+def tool_output_sinks(sister_name: str, target: str, action_id: Optional[str] = None,
+                      comm_manager=None) -> List[OutputSink]:
+    """
+    The standard sinks for a sister's tool run: the terminal (if echo is on),
+    the per-target output store and Seven's live view (with a comm manager).
+    The tool executor adds the record parser for the tool's output format
+    (see agents/shared/parsers.py).
+    """
+    config = get_output_config()
+    sinks = []
+    if config["echo"]:
+        sinks.append(ConsoleSink())
+    sinks.append(OutputStoreSink(sister_name, target))
+    if comm_manager is not None:
+        sinks.append(BusSink(comm_manager, sister_name, target, action_id,
+                             config["bus_flush_interval"], config["bus_max_lines_per_second"]))
+    return sinks
+
+
+class OutputPump:
+    """
+    Splits a process's stdout and stderr into lines and fans them out to the sinks.
+
+    Given a process whose pipes it should read, one thread multiplexes both
+    pipes with selectors; without one, the caller feeds it chunks (the tool
+    executor reads the pipes with asyncio). Over-long lines are cut at
+    max_line_bytes, and every sink has a bounded, disk-spilling queue and a
+    thread of its own.
+    """
+
+    def __init__(self, process, sinks: List[OutputSink], max_line_bytes: Optional[int] = None,
+                 queue_memory_lines: Optional[int] = None):
+        config = get_output_config()
+        self.process = process
+        self.sinks = sinks
+        self.max_line_bytes = max_line_bytes or config["max_line_bytes"]
+        queue_memory_lines = queue_memory_lines or config["queue_memory_lines"]
+        self.queues = [SpillQueue(queue_memory_lines) for _ in sinks]
+        self.pending = {STDOUT: b"", STDERR: b""}
+        self.line_count = 0
+        self.byte_count = 0
+        self.threads = []
+
+    def start(self):
+        if self.process is not None:
+            reader = threading.Thread(target=self._read, daemon=True)
+            reader.start()
+            self.threads.append(reader)
+        for sink, queue in zip(self.sinks, self.queues):
+            thread = threading.Thread(target=self._deliver, args=(sink, queue), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait until the pipes are closed and every sink has had every line."""
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def _emit(self, stream: str, data: bytes):
+        # Cut over-long lines into pieces of at most max_line_bytes
+        for start in range(0, max(len(data), 1), self.max_line_bytes):
+            line = data[start:start + self.max_line_bytes].decode("utf-8", errors="replace").rstrip("\r")
+            self.line_count += 1
+            for queue in self.queues:
+                queue.put((stream, line))
+
+    def feed(self, stream: str, chunk: bytes):
+        """Take the next chunk read from a stream and pass on the lines it completes."""
+        self.byte_count += len(chunk)
+        *lines, rest = (self.pending[stream] + chunk).split(b"\n")
+        for line in lines:
+            self._emit(stream, line)
+        # Don't hold a runaway line in memory until its end arrives
+        if len(rest) > self.max_line_bytes:
+            cut = (len(rest) - 1) // self.max_line_bytes * self.max_line_bytes
+            self._emit(stream, rest[:cut])
+            rest = rest[cut:]
+        self.pending[stream] = rest
+
+    def end(self, stream: str):
+        """A stream reached EOF: pass on its unterminated last line, if any."""
+        if self.pending[stream]:
+            self._emit(stream, self.pending[stream])
+            self.pending[stream] = b""
+
+    def close(self):
+        """No more output: let the sinks finish their queues and close."""
+        for queue in self.queues:
+            queue.close()
+
+    def _read(self):
+        selector = selectors.DefaultSelector()
+        for stream, pipe in ((STDOUT, self.process.stdout), (STDERR, self.process.stderr)):
+            if pipe is not None:
+                os.set_blocking(pipe.fileno(), False)
+                selector.register(pipe, selectors.EVENT_READ, stream)
+        try:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    try:
+                        chunk = os.read(key.fileobj.fileno(), READ_CHUNK)
+                    except BlockingIOError:
+                        continue
+                    if chunk:
+                        self.feed(key.data, chunk)
+                    else:
+                        selector.unregister(key.fileobj)
+                        self.end(key.data)
+        finally:
+            selector.close()
+            self.close()
+
+    @staticmethod
+    def _deliver(sink: OutputSink, queue: SpillQueue):
+        # A sink that fails loses the lines it failed on, not the rest of the output
+        failures = 0
+        try:
+            while True:
+                item = queue.get(timeout=0.5)
+                if item is None and queue.drained():
+                    break
+                try:
+                    if item is None:
+                        sink.flush()
+                    else:
+                        sink.write_line(*item)
+                except Exception as e:
+                    failures += 1
+                    if failures == 1:
+                        print(f"Output sink {type(sink).__name__} failed: {e}")
+        finally:
+            if failures > 1:
+                print(f"Output sink {type(sink).__name__} failed {failures} times")
+            queue.discard()
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"Output sink {type(sink).__name__} failed to close: {e}")
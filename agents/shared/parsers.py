@@ -0,0 +1,298 @@
+import os
+import re
+import json
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, Optional, Type
+
+from agents.shared.admission import CONFIG_PATH
+from agents.shared.output_stream import STDOUT, OutputSink
+from agents.shared.records import Finding, Host, Record, Service, URL, classify_line, from_wire
+
+# Defaults used when the config has no "parsers" section
+DEFAULT_PARSERS = {
+    # Per tool script, the format of its stdout ("stdout") and of each file it writes
+    "tools": {}
+}
+
+# Where the records parsed from a run's output go, in its run directory
+RECORDS_NAME = "records.jsonl"
+
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class RecordParser:
+    """
+    Base class for incremental parsers that turn one tool's output into records.
+
+    A parser is fed the output a line at a time as it streams and yields
+    records as soon as it can; parsers of formats that span lines keep what
+    they need between lines, and close() yields anything still held back.
+    context is the record the tool was run on, if any (e.g. the host nmap
+    scanned), and source is put on every record.
+    """
+
+    def __init__(self, context: Optional[Record] = None, source: Optional[str] = None):
+        self.context = context
+        self.source = source
+
+    def feed(self, line: str) -> Iterable[Record]:
+        raise NotImplementedError
+
+    def close(self) -> Iterable[Record]:
+        return ()
+
+
+# Parser classes by format name, e.g. {"nmap": NmapParser}
+_parsers: Dict[str, Type[RecordParser]] = {}
+
+
+def register_parser(format_name: str):
+    """Class decorator that makes a parser available for a format name."""
+    def register(parser_class: Type[RecordParser]) -> Type[RecordParser]:
+        _parsers[format_name] = parser_class
+        return parser_class
+    return register
+
+
+def get_parser(format_name: str, context: Optional[Record] = None, source: Optional[str] = None) -> RecordParser:
+    """A fresh parser for a format; unknown formats get the generic one."""
+    return _parsers.get(format_name, GenericParser)(context, source)
+
+
+def record_source(sister_name: str, tool: str, format_name: str) -> str:
+    """What records parsed from a tool's output name as their source, e.g. "Lisbeth:nuclei"."""
+    if format_name in _parsers and format_name not in ("generic", "none"):
+        return f"{sister_name}:{format_name}"
+    return f"{sister_name}:{os.path.basename(tool)}"
+
+
+def parse_lines(lines: Iterable[str], format_name: str, context: Optional[Record] = None,
+                source: Optional[str] = None) -> Iterator[Record]:
+    parser = get_parser(format_name, context, source)
+    for line in lines:
+        yield from parser.feed(line.rstrip("\r\n"))
+    yield from parser.close()
+
+
+def parse_file(path: str, format_name: str, context: Optional[Record] = None,
+               source: Optional[str] = None) -> Iterator[Record]:
+    """Stream the records out of a file a tool wrote."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from parse_lines(f, format_name, context, source)
+
+
+@register_parser("generic")
+class GenericParser(RecordParser):
+    """Any line that is a URL, an nmap-style port line or a hostname (see classify_line)."""
+
+    def feed(self, line: str) -> Iterable[Record]:
+        record = classify_line(line, self.context, self.source)
+        return (record,) if record is not None else ()
+
+
+@register_parser("none")
+class NullParser(RecordParser):
+    """For output that holds no records (e.g. progress messages)."""
+
+    def feed(self, line: str) -> Iterable[Record]:
+        return ()
+
+
+@register_parser("urls")
+class UrlListParser(RecordParser):
+    """One URL per line, as gau and waybackurls print them."""
+
+    def feed(self, line: str) -> Iterable[Record]:
+        line = line.strip()
+        if line.startswith(("http://", "https://")) and " " not in line:
+            return (URL(line, source=self.source),)
+        return ()
+
+
+@register_parser("httpx")
+class HttpxParser(RecordParser):
+    """httpx -status-code lines: "https://example.com [200]" (colours stripped)."""
+
+    PATTERN = re.compile(r"^(https?://\S+)(?:\s+\[(\d{3})\])?")
+
+    def feed(self, line: str) -> Iterable[Record]:
+        match = self.PATTERN.match(_ANSI_ESCAPE.sub("", line).strip())
+        if not match:
+            return ()
+        status = int(match.group(2)) if match.group(2) else None
+        return (URL(match.group(1), status=status, source=self.source),)
+
+
+@register_parser("dirsearch")
+class DirsearchParser(RecordParser):
+    """dirsearch's plain report: "200   169B   https://example.com/admin"."""
+
+    PATTERN = re.compile(r"^(\d{3})\s+\S+\s+(https?://\S+)")
+
+    def feed(self, line: str) -> Iterable[Record]:
+        match = self.PATTERN.match(line.strip())
+        if not match:
+            return ()
+        return (URL(match.group(2), status=int(match.group(1)), source=self.source),)
+
+
+@register_parser("massdns")
+class MassdnsParser(RecordParser):
+    """massdns -o J: one JSON object per query; every A/AAAA answer becomes a Host with its address."""
+
+    def feed(self, line: str) -> Iterable[Record]:
+        line = line.strip()
+        if not line.startswith("{"):
+            return ()
+        try:
+            result = json.loads(line)
+        except ValueError:
+            return ()
+        name = result.get("name", "")
+        if result.get("status") != "NOERROR" or not name:
+            return ()
+        answers = (result.get("data") or {}).get("answers") or []
+        return [Host(name, answer["data"], self.source) for answer in answers
+                if answer.get("type") in ("A", "AAAA") and answer.get("data")]
+
+
+@register_parser("nmap")
+class NmapParser(RecordParser):
+    """
+    nmap -oN reports. "Nmap scan report for" lines start a host (a Host
+    record, with its address if nmap shows one); its open port lines become
+    Services on it.
+    """
+
+    REPORT = re.compile(r"^Nmap scan report for (\S+)(?: \(([^)]+)\))?")
+    PORT = re.compile(r"^(\d+)/(tcp|udp|sctp)\s+(open|open\|filtered)\s+(\S+)\s*(.*)$")
+
+    def __init__(self, context: Optional[Record] = None, source: Optional[str] = None):
+        super().__init__(context, source)
+        self.host = getattr(context, "host", None)
+
+    def feed(self, line: str) -> Iterable[Record]:
+        match = self.REPORT.match(line)
+        if match:
+            name, address = match.groups()
+            self.host = name
+            return (Host(name, address, self.source),)
+        match = self.PORT.match(line.strip())
+        if match and self.host:
+            port, protocol, _, service, version = match.groups()
+            return (Service(self.host, int(port), protocol, service, version or None, self.source),)
+        return ()
+
+
+@register_parser("nuclei")
+class NucleiParser(RecordParser):
+    """nuclei -o lines: "[template-id] [protocol] [severity] location [extracted]", with or without a timestamp."""
+
+    PATTERN = re.compile(r"^(?:\[\d{4}-\d{2}-\d{2}[^\]]*\]\s+)?\[([^\]]+)\]\s+\[([^\]]+)\]\s+\[([^\]]+)\]\s+(\S+)\s*(.*)$")
+
+    def feed(self, line: str) -> Iterable[Record]:
+        match = self.PATTERN.match(_ANSI_ESCAPE.sub("", line).strip())
+        if not match:
+            return ()
+        template, protocol, severity, location, detail = match.groups()
+        return (Finding(template, severity, location, protocol=protocol, detail=detail or None, source=self.source),)
+
+
+class RecordParserSink(OutputSink):
+    """Parses a tool's stdout as it streams and hands every record to a callback."""
+
+    def __init__(self, parser: RecordParser, callback: Callable[[Record], None]):
+        self.parser = parser
+        self.callback = callback
+
+    def write_line(self, stream: str, line: str):
+        if stream != STDOUT:
+            return
+        for record in self.parser.feed(line):
+            self.callback(record)
+
+    def close(self):
+        for record in self.parser.close():
+            self.callback(record)
+
+
+class RecordWriter:
+    """Appends records to a JSON lines file in their wire form and counts them by kind."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, record: Record):
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a", encoding="utf-8")
+            self.file.write(json.dumps(record.to_wire()) + "\n")
+            self.counts[record.kind] += 1
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def read_records(path: str) -> Iterator[Record]:
+    """Read back the records a RecordWriter wrote."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield from_wire(json.loads(line))
+
+
+class ParserRegistry:
+    """Which format each tool script's stdout and files are in (the "parsers" config section)."""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.config = dict(DEFAULT_PARSERS, **config)
+
+    def formats(self, tool: str) -> Dict[str, str]:
+        """The formats of a tool's outputs, e.g. {"stdout": "httpx", "scan_nmap.txt": "nmap"}."""
+        return dict(self.config["tools"].get(os.path.basename(tool), {}))
+
+    def stdout_format(self, tool: str) -> str:
+        return self.formats(tool).get("stdout", "generic")
+
+    def file_formats(self, tool: str) -> Dict[str, str]:
+        return {name: format_name for name, format_name in self.formats(tool).items() if name != "stdout"}
+
+    def parse_artifacts(self, directory: str, tool: str, callback: Callable[[Record], None],
+                        context: Optional[Record] = None, sister_name: Optional[str] = None):
+        """
+        Parse the files a run of the tool left in a directory, handing every record to a callback.
+        Records are attributed to the sister and the format they were parsed from (see record_source).
+        """
+        for name, format_name in self.file_formats(tool).items():
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                source = record_source(sister_name, tool, format_name) if sister_name else None
+                for record in parse_file(path, format_name, context, source):
+                    callback(record)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_parser_registry() -> ParserRegistry:
+    """The process-wide registry, configured from the "parsers" section of the config."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("parsers", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading parsers config: {e}")
+                config = {}
+            _registry = ParserRegistry(config)
+        return _registry
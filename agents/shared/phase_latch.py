@@ -0,0 +1,52 @@
+import threading
+from typing import Iterable, List
+
+
+class PhaseLatch:
+    """
+    Countdown latch for one phase of an action.
+
+    Starts at the number of sisters assigned to the phase and counts down as
+    their completion responses arrive. A sister is only counted once, however
+    many times her response is delivered, and exactly one count_down() call
+    sees the latch open, so the phase advances exactly once.
+    """
+
+    def __init__(self, sisters: Iterable[str]):
+        """
+        Initialize the PhaseLatch.
+
+        Args:
+            sisters: The sisters that must complete the phase
+        """
+        self._pending = set(sisters)
+        self._lock = threading.Lock()
+
+    def count_down(self, sister_name: str) -> bool:
+        """
+        Record that a sister completed the phase.
+
+        Returns:
+            True if this call opened the latch, False otherwise (including
+            repeated or unexpected completions)
+        """
+        with self._lock:
+            if sister_name not in self._pending:
+                return False
+            self._pending.discard(sister_name)
+            return not self._pending
+
+    @property
+    def count(self) -> int:
+        """Number of sisters still to complete the phase."""
+        return len(self._pending)
+
+    @property
+    def is_open(self) -> bool:
+        """Whether every assigned sister has completed the phase."""
+        return not self._pending
+
+    def pending(self) -> List[str]:
+        """The sisters still working on the phase."""
+        with self._lock:
+            return sorted(self._pending)
@@ -0,0 +1,131 @@
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from agents.shared.deltas import get_delta_tracker
+
+# The phase in which a sister actually runs her tool; the other phases are bookkeeping
+TOOL_PHASE = "execution"
+
+
+class PhaseWorker:
+    """
+    Runs the action phases Seven hands to a sister and reports back.
+    Keeps track of the sister's in-flight work and includes it in every status
+    message, so Seven can see how busy each sister is when assigning new actions.
+    """
+
+    def __init__(self, sister_name: str, comm_manager, run_tool: Callable[[str, Optional[str], bool], Any]):
+        """
+        Initialize the PhaseWorker.
+
+        Args:
+            sister_name: Name of the sister this worker belongs to
+            comm_manager: The sister's SisterCommManager
+            run_tool: The sister's run_tool(target, action_id, use_cache) function
+        """
+        self.sister_name = sister_name
+        self.comm_manager = comm_manager
+        self.run_tool = run_tool
+        self.in_flight: Dict[str, Dict] = {}
+        self.completed_count = 0
+        self.lock = threading.Lock()
+
+    def register(self):
+        """Register the execute_phase command with the sister's command handler."""
+        self.comm_manager.command_handler.register_command('execute_phase', self.handle_execute_phase)
+
+    def get_load(self) -> Dict:
+        """Describe the sister's current workload for status messages."""
+        with self.lock:
+            return {
+                'in_flight': len(self.in_flight),
+                'in_flight_tools': sum(1 for work in self.in_flight.values() if work['phase'] == TOOL_PHASE),
+                'completed': self.completed_count
+            }
+
+    def report_status(self):
+        """Send a status update that includes the current load."""
+        load = self.get_load()
+        self.comm_manager.send_status("busy" if load['in_flight'] else "ready", load)
+
+    def handle_execute_phase(self, args: Dict):
+        """
+        Run one phase of an action and report its completion (or failure) to Seven.
+
+        When run_tool hands back a ToolJob (see tool_executor.py), the phase is
+        reported once the job finishes and the job's future is returned, so
+        the caller doesn't wait on the tool; otherwise a result dict is returned.
+        """
+        action_id = args.get('action_id')
+        target = args.get('target', 'unknown')
+        phase = args.get('phase')
+        work_key = f"{action_id}:{phase}"
+
+        started = time.time()
+        with self.lock:
+            self.in_flight[work_key] = {'action_id': action_id, 'phase': phase, 'started': started}
+        self.report_status()
+
+        try:
+            job = self.run_tool(target, action_id, args.get('use_cache', True)) if phase == TOOL_PHASE else None
+        except Exception as e:
+            return self._phase_failed(work_key, action_id, phase, e)
+        if job is None:
+            if phase == TOOL_PHASE:
+                # run_tool hands back a job whenever the tool started
+                return self._phase_failed(work_key, action_id, phase,
+                                          RuntimeError(f"{self.sister_name}'s tool did not start"))
+            return self._phase_completed(work_key, action_id, phase, started)
+
+        def finished(job):
+            if job.succeeded:
+                self._phase_completed(work_key, action_id, phase, started, job.cached is not None, job.delta, job)
+            elif job.future.cancelled():
+                self._finish(work_key)  # Cancelled on purpose; Seven already knows
+            else:
+                self._phase_failed(work_key, action_id, phase, job.future.exception())
+
+        job.add_done_callback(finished)
+        return job.future
+
+    def _phase_completed(self, work_key: str, action_id: str, phase: str, started: float,
+                         cached: bool = False, delta=None, job=None) -> Dict:
+        details = {'duration': time.time() - started, 'instance': self.comm_manager.instance_id, 'cached': cached}
+        if delta is not None:
+            details['delta'] = delta.summary(get_delta_tracker().config["sample_size"])
+        if job is not None and job.run_dir is not None:
+            details['run_dir'] = job.run_dir.path
+            details['artifacts'] = [artifact['path'] for artifact in job.artifacts]
+            details['records'] = job.records
+        try:
+            self.comm_manager.send_command("Seven", 'action_status', {
+                'action_id': action_id,
+                'sister_name': self.sister_name,
+                'status': 'completed',
+                'phase': phase,
+                'details': details
+            })
+        finally:
+            self._finish(work_key)
+        return {'success': True, 'action_id': action_id, 'phase': phase}
+
+    def _phase_failed(self, work_key: str, action_id: str, phase: str, error: BaseException) -> Dict:
+        try:
+            self.comm_manager.send_command("Seven", 'action_error', {
+                'action_id': action_id,
+                'sister_name': self.sister_name,
+                'error': str(error),
+                'error_type': 'timeout_error' if isinstance(error, TimeoutError) else 'execution_error',
+                'phase': phase,
+                'instance': self.comm_manager.instance_id
+            })
+        finally:
+            self._finish(work_key)
+        return {'success': False, 'error': str(error)}
+
+    def _finish(self, work_key: str):
+        with self.lock:
+            self.in_flight.pop(work_key, None)
+            self.completed_count += 1
+        self.report_status()
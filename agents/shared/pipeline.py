@@ -0,0 +1,633 @@
+import os
+import json
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from output_handler import init_output_dir, write_output
+from agents.shared.admission import CONFIG_PATH
+from agents.shared.output_stream import STDOUT, OutputSink
+from agents.shared.parsers import RecordParser, get_parser, get_parser_registry, record_source
+from agents.shared.records import Host, URL, Record, rehost
+from agents.shared.resolver import HostResolver, get_resolver_config
+from agents.shared.run_dirs import new_run_id
+from agents.shared.seen_set import get_seen_config, get_seen_set, record_key
+from agents.shared.tool_executor import ToolJob, get_tool_executor, submit_tool
+from agents.shared.urls import UrlTable
+
+# Defaults used when the config has no "pipelines" section
+DEFAULT_PIPELINES = {
+    "queue_size": 1024,
+    "follow_interval": 0.25,
+    "definitions": {}
+}
+
+# File in a pipeline's run directory that collects every record the last stage put out
+RESULTS_NAME = "pipeline.jsonl"
+# ... and the distinct URLs among them, as a UrlTable (see urls.py)
+URLS_NAME = "urls.table"
+
+
+class PipelineCancelled(Exception):
+    """Raised inside a stage when its pipeline run is cancelled."""
+
+
+class Channel:
+    """
+    Bounded FIFO of records between two stages.
+
+    put blocks while the channel is full, so a fast stage can't run ahead of
+    a slow one by more than the channel's size; iterating ends once the
+    channel is closed and drained, or the run is cancelled.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, maxsize: int, cancelled: threading.Event):
+        self.queue = queue.Queue(maxsize)
+        self.cancelled = cancelled
+
+    def put(self, record: Record):
+        while True:
+            if self.cancelled.is_set():
+                raise PipelineCancelled()
+            try:
+                self.queue.put(record, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        # Closing never blocks, even on a full channel
+        threading.Thread(target=self._put_closed, daemon=True).start()
+
+    def _put_closed(self):
+        try:
+            self.put(self._CLOSED)
+        except PipelineCancelled:
+            pass
+
+    def __iter__(self) -> Iterator[Record]:
+        while not self.cancelled.is_set():
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is self._CLOSED:
+                return
+            yield item
+
+
+class Stage:
+    """
+    One step of a pipeline: a generator from the records of the stage before
+    to the records for the stage after. Stages get every record that reaches
+    them and should pass on the ones they don't consume.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def run(self, records: Iterator[Record], pipeline_run: "PipelineRun") -> Iterator[Record]:
+        raise NotImplementedError
+
+
+class FunctionStage(Stage):
+    """A stage made of a plain generator function, e.g. a filter."""
+
+    def __init__(self, name: str, function: Callable[[Iterator[Record]], Iterable[Record]]):
+        super().__init__(name)
+        self.function = function
+
+    def run(self, records: Iterator[Record], pipeline_run: "PipelineRun") -> Iterator[Record]:
+        return iter(self.function(records))
+
+
+class SeenFilterStage(Stage):
+    """
+    Drops records of the given kinds that the target has seen before, in this
+    run or any earlier one (see seen_set.py), so the sisters after it only
+    get what is new.
+    """
+
+    def __init__(self, name: str, kinds: List[str]):
+        super().__init__(name)
+        self.kinds = set(kinds)
+
+    def run(self, records: Iterator[Record], pipeline_run: "PipelineRun") -> Iterator[Record]:
+        if not get_seen_config()["enabled"]:
+            yield from records
+            return
+        seen = get_seen_set(pipeline_run.target)
+        try:
+            for record in records:
+                if record.kind not in self.kinds or seen.add(record_key(record)):
+                    yield record
+        finally:
+            seen.flush()
+
+
+class ResolveStage(Stage):
+    """
+    Plans around infrastructure: resolves every Host record to its address
+    (see resolver.py) and passes it on with the address filled in, so a
+    later stage with "per": "ip" runs its tool once per address instead of
+    once per name. Hosts that don't resolve pass on without one.
+    """
+
+    def run(self, records: Iterator[Record], pipeline_run: "PipelineRun") -> Iterator[Record]:
+        output = pipeline_run.channel()
+        resolver = HostResolver(pipeline_run.target, get_resolver_config())
+        lock = threading.Lock()
+        state = {'pending': 0, 'fed': False}
+        plan: Dict[str, List[str]] = {}  # Address -> the names on it
+        unresolved: List[str] = []
+
+        def finish(last: bool):
+            if not last:
+                return
+            resolver.close()
+            names = sum(len(names) for names in plan.values())
+            write_output("Seven", pipeline_run.target,
+                         f"Pipeline {pipeline_run.pipeline.name} resolved {names} hosts to {len(plan)} addresses "
+                         f"({resolver.from_massdns} from massdns, {len(unresolved)} unresolved)")
+            output.close()
+
+        def resolved(record: Host, future: "Future[List[str]]"):
+            addresses = future.result()
+            with lock:
+                if addresses:
+                    plan.setdefault(addresses[0], []).append(record.name)
+                else:
+                    unresolved.append(record.name)
+            try:
+                output.put(Host(record.name, addresses[0], record.source) if addresses else record)
+            except PipelineCancelled:
+                pass
+            with lock:
+                state['pending'] -= 1
+                last = state['fed'] and state['pending'] == 0
+            finish(last)
+
+        def feed():
+            try:
+                for record in records:
+                    if record.kind != Host.kind:
+                        output.put(record)
+                        continue
+                    if record.ip:
+                        resolver.learn(record.name, record.ip)
+                    with lock:
+                        state['pending'] += 1
+                    resolver.resolve(record.name).add_done_callback(
+                        lambda future, record=record: resolved(record, future))
+            except PipelineCancelled:
+                pass
+            finally:
+                with lock:
+                    state['fed'] = True
+                    last = state['pending'] == 0
+                finish(last)
+
+        threading.Thread(target=feed, name=f"pipeline-{self.name}", daemon=True).start()
+        return iter(output)
+
+
+class RecordSink(OutputSink):
+    """Parses the lines a tool writes into records and puts them on a channel."""
+
+    def __init__(self, channel: Channel, parser: RecordParser):
+        self.channel = channel
+        self.parser = parser
+
+    def _put(self, records: Iterable[Record]):
+        try:
+            for record in records:
+                self.channel.put(record)
+        except PipelineCancelled:
+            pass
+
+    def write_line(self, stream: str, line: str):
+        if stream == STDOUT:
+            self._put(self.parser.feed(line))
+
+    def close(self):
+        self._put(self.parser.close())
+
+
+class HostGroup:
+    """
+    The names that share an address, for a tool that runs once per address:
+    each record the run finds is handed on once for every name, and a name
+    that joins after the run gets the records found so far.
+    """
+
+    def __init__(self, ip: str):
+        self.ip = ip
+        self.hosts: List[str] = []
+        self.results: List[Record] = []
+        self.lock = threading.Lock()
+
+    def _for(self, record: Record, host: str) -> Record:
+        record = rehost(record, host)
+        if isinstance(record, Host) and not record.ip:
+            record.ip = self.ip
+        return record
+
+    def fan_out(self, record: Record) -> List[Record]:
+        with self.lock:
+            self.results.append(record)
+            hosts = list(self.hosts)
+        return [self._for(record, host) for host in hosts]
+
+    def join(self, host: str) -> List[Record]:
+        with self.lock:
+            self.hosts.append(host)
+            results = list(self.results)
+        return [self._for(record, host) for record in results]
+
+
+class FanOutSink(RecordSink):
+    """A RecordSink that hands on each record once for every name in a HostGroup."""
+
+    def __init__(self, channel: Channel, parser: RecordParser, group: HostGroup):
+        super().__init__(channel, parser)
+        self.group = group
+
+    def _put(self, records: Iterable[Record]):
+        for record in records:
+            super()._put(self.group.fan_out(record))
+
+
+class ArtifactFollower:
+    """
+    Follows the files a tool writes in its run directory (like tail -f) and
+    feeds their lines to a sink while the tool runs, for tools that write
+    their results to a file instead of stdout (e.g. urls_wayback.txt).
+    """
+
+    def __init__(self, job: ToolJob, sinks: Dict[str, OutputSink], interval: float):
+        self.job = job
+        self.sinks = sinks  # File name -> the sink for its lines
+        self.interval = interval
+        self.offsets: Dict[str, int] = {}
+        self.partial: Dict[str, str] = {}
+
+    def _read_new(self):
+        for name, sink in self.sinks.items():
+            path = os.path.join(self.job.run_dir.path, name)
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    f.seek(self.offsets.get(name, 0))
+                    data = f.read()
+                    self.offsets[name] = f.tell()
+            except OSError:
+                continue
+            if not data:
+                continue
+            lines = (self.partial.pop(name, "") + data).split("\n")
+            if lines[-1]:
+                self.partial[name] = lines[-1]
+            for line in lines[:-1]:
+                sink.write_line(STDOUT, line)
+
+    def run(self):
+        while True:
+            finished = self.job.done()
+            if self.job.run_dir is not None:
+                self._read_new()
+            if finished:
+                break
+            time.sleep(self.interval)
+        for name, line in self.partial.items():
+            self.sinks[name].write_line(STDOUT, line)
+        self.partial.clear()
+        for sink in self.sinks.values():
+            sink.close()
+
+
+class ToolStage(Stage):
+    """
+    A sister's tool as a pipeline stage.
+
+    The tool runs once per distinct argument (e.g. once per URL) as soon as
+    a record it consumes arrives, through the tool executor, so the sister's
+    concurrency limit, the result cache and the run directories all apply.
+    The records it finds are handed on while it is still running.
+
+    With per="ip", a host-level tool (e.g. a port scan) runs once per
+    address of the Host records it gets (see ResolveStage) and what it
+    finds is handed on for every name on that address.
+    """
+
+    def __init__(self, name: str, sister_name: str, tool: str, consumes: List[str],
+                 argument: str = "{host}", forward: bool = True, follow: Optional[List[str]] = None,
+                 max_parallel: int = 4, per: str = "argument"):
+        """
+        Initialize the ToolStage.
+
+        Args:
+            name: Stage name
+            sister_name: The sister whose tool it is
+            tool: Path of the tool script, as in the sister's TOOL_NAME
+            consumes: Record kinds the tool runs on, e.g. ["url"]
+            argument: The tool's argument, formatted from the record's fields
+            forward: Also pass the consumed records on to the next stage
+            follow: Files in the run directory to read records from while the tool runs
+                (defaults to the files the parsers config knows the tool's formats of)
+            max_parallel: How many runs of the tool this stage may have queued or running
+            per: "argument" to run the tool once per distinct argument, "ip" once per address
+        """
+        super().__init__(name)
+        self.sister_name = sister_name
+        self.tool = tool
+        self.consumes = set(consumes)
+        self.argument = argument
+        self.forward = forward
+        self.follow = follow
+        self.max_parallel = max(1, max_parallel)
+        self.per = per
+
+    def run(self, records: Iterator[Record], pipeline_run: "PipelineRun") -> Iterator[Record]:
+        output = pipeline_run.channel()
+        slots = threading.Semaphore(self.max_parallel)
+        lock = threading.Lock()
+        state = {'pending': 0, 'fed': False}
+        registry = get_parser_registry()
+        stdout_format = registry.stdout_format(self.tool)
+        file_formats = registry.file_formats(self.tool)
+        follow = self.follow if self.follow is not None else list(file_formats)
+
+        def parser(format_name: str, record: Record) -> RecordParser:
+            return get_parser(format_name, record, record_source(self.sister_name, self.tool, format_name))
+
+        def finish_one():
+            slots.release()
+            with lock:
+                state['pending'] -= 1
+                last = state['fed'] and state['pending'] == 0
+            if last:
+                output.close()
+
+        def sink(format_name: str, record: Record, group: Optional[HostGroup]) -> RecordSink:
+            if group is not None:
+                return FanOutSink(output, parser(format_name, record), group)
+            return RecordSink(output, parser(format_name, record))
+
+        def start(record: Record, argument: str, group: Optional[HostGroup] = None):
+            stdout_sink = sink(stdout_format, record, group)
+            job = submit_tool(self.sister_name, ["bash", self.tool, argument], pipeline_run.run_id,
+                              sinks=[stdout_sink], target=pipeline_run.target, run_id=pipeline_run.run_id,
+                              incremental=False)
+            pipeline_run.count(self.name, 'runs')
+            if follow:
+                follower = ArtifactFollower(job, {
+                    name: sink(file_formats.get(name, "generic"), record, group)
+                    for name in follow
+                }, pipeline_run.follow_interval)
+                threading.Thread(target=lambda: (follower.run(), finish_one()), daemon=True).start()
+            else:
+                job.add_done_callback(lambda _: finish_one())
+
+        def feed():
+            seen = set()
+            groups: Dict[str, HostGroup] = {}
+            try:
+                for record in records:
+                    if record.kind not in self.consumes:
+                        output.put(record)
+                        continue
+                    if self.forward:
+                        output.put(record)
+                    fields = record.fields()
+                    group = None
+                    if self.per == "ip" and record.kind == Host.kind:
+                        # Names that didn't resolve are scanned by name
+                        fields['ip'] = record.ip or record.name
+                        group = groups.get(fields['ip'])
+                        if group is not None:
+                            for result in group.join(record.name):
+                                output.put(result)
+                            pipeline_run.count(self.name, 'shared')
+                            continue
+                        group = groups[fields['ip']] = HostGroup(record.ip)
+                        group.join(record.name)
+                    argument = self.argument.format(**fields)
+                    if argument in seen:
+                        continue
+                    seen.add(argument)
+                    while not slots.acquire(timeout=0.5):
+                        if pipeline_run.cancelled.is_set():
+                            raise PipelineCancelled()
+                    with lock:
+                        state['pending'] += 1
+                    try:
+                        start(record, argument, group)
+                    except Exception as e:
+                        write_output("Seven", pipeline_run.target, f"⚠️ Pipeline stage {self.name} failed on {argument}: {e}")
+                        finish_one()
+            except PipelineCancelled:
+                pass
+            finally:
+                with lock:
+                    state['fed'] = True
+                    last = state['pending'] == 0
+                if last:
+                    output.close()
+
+        threading.Thread(target=feed, name=f"pipeline-{self.name}", daemon=True).start()
+        return iter(output)
+
+
+class Pipeline:
+    """
+    A chain of stages that records stream through.
+
+    Every stage runs on a thread of its own and the stages are joined by
+    bounded channels, so a record found by the first stage reaches the last
+    one while the first is still working: Lisbeth starts probing the first
+    URL while Alice is still crawling. End to end, a run takes about as long
+    as its slowest stage rather than the sum of all of them.
+    """
+
+    def __init__(self, name: str, stages: List[Stage], description: str = "", action: Optional[str] = None,
+                 queue_size: int = DEFAULT_PIPELINES["queue_size"],
+                 follow_interval: float = DEFAULT_PIPELINES["follow_interval"]):
+        self.name = name
+        self.stages = stages
+        self.description = description
+        self.action = action  # The action type whose confirmation and sisters the pipeline goes by
+        self.queue_size = queue_size
+        self.follow_interval = follow_interval
+
+    @classmethod
+    def from_config(cls, name: str, spec: Dict, queue_size: int, follow_interval: float) -> "Pipeline":
+        stages = []
+        for stage in spec["stages"]:
+            if stage.get("type") == "seen":
+                stages.append(SeenFilterStage(stage.get("name", "seen"), stage["kinds"]))
+            elif stage.get("type") == "resolve":
+                stages.append(ResolveStage(stage.get("name", "resolve")))
+            else:
+                stages.append(ToolStage(stage.get("name", stage["sister"]), stage["sister"], stage["tool"],
+                                        stage["consumes"], stage.get("argument", "{host}"), stage.get("forward", True),
+                                        stage.get("follow"), stage.get("max_parallel", 4),
+                                        stage.get("per", "argument")))
+        return cls(name, stages, spec.get("description", ""), spec.get("action"),
+                   spec.get("queue_size", queue_size), follow_interval)
+
+    @property
+    def sisters(self) -> List[str]:
+        return [stage.sister_name for stage in self.stages if isinstance(stage, ToolStage)]
+
+    def start(self, target: str, seeds: Optional[List[Record]] = None,
+              on_finished: Optional[Callable[["PipelineRun"], None]] = None) -> "PipelineRun":
+        """
+        Start a run of the pipeline and return without waiting for it.
+
+        Args:
+            target: The run's target; unless seeds are given, the first stage gets it as a Host (or URL)
+            seeds: The records to start from
+            on_finished: Called with the run once the last stage is done
+        """
+        if seeds is None:
+            seeds = [URL(target) if "://" in target else Host(target)]
+        pipeline_run = PipelineRun(self, target, on_finished)
+        pipeline_run.start(seeds)
+        return pipeline_run
+
+
+class PipelineRun:
+    """One run of a pipeline, with per-stage counts and the records it put out."""
+
+    def __init__(self, pipeline: Pipeline, target: str,
+                 on_finished: Optional[Callable[["PipelineRun"], None]] = None):
+        self.pipeline = pipeline
+        self.target = target
+        self.run_id = new_run_id()
+        self.queue_size = pipeline.queue_size
+        self.follow_interval = pipeline.follow_interval
+        self.on_finished = on_finished
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {stage.name: {'in': 0, 'out': 0, 'runs': 0, 'shared': 0}
+                                                 for stage in pipeline.stages}
+        self.results: Dict[str, int] = {}
+        self.started = time.time()
+        self.ended = None
+        self.error = None
+        self.results_path = None
+
+    def channel(self) -> Channel:
+        return Channel(self.queue_size, self.cancelled)
+
+    def count(self, stage_name: str, counter: str, amount: int = 1):
+        with self.lock:
+            self.stats[stage_name][counter] += amount
+
+    def _counted(self, records: Iterable[Record], stage_name: str, counter: str) -> Iterator[Record]:
+        for record in records:
+            self.count(stage_name, counter)
+            yield record
+
+    def _run_stage(self, stage: Stage, inbound: Channel, outbound: Channel):
+        try:
+            for record in self._counted(stage.run(self._counted(inbound, stage.name, 'in'), self), stage.name, 'out'):
+                outbound.put(record)
+        except PipelineCancelled:
+            pass
+        except Exception as e:
+            self.error = f"{stage.name}: {e}"
+            write_output("Seven", self.target, f"❌ Pipeline {self.pipeline.name} stage {stage.name} failed: {e}")
+            self.cancel()
+        finally:
+            outbound.close()
+
+    def start(self, seeds: List[Record]):
+        run_path = os.path.join(init_output_dir(self.target), self.run_id)
+        os.makedirs(run_path, exist_ok=True)
+        self.results_path = os.path.join(run_path, RESULTS_NAME)
+        channels = [self.channel() for _ in range(len(self.pipeline.stages) + 1)]
+        for stage, inbound, outbound in zip(self.pipeline.stages, channels, channels[1:]):
+            threading.Thread(target=self._run_stage, args=(stage, inbound, outbound),
+                             name=f"pipeline-{stage.name}", daemon=True).start()
+        threading.Thread(target=self._collect, args=(channels[-1],), name="pipeline-collect", daemon=True).start()
+
+        def seed():
+            try:
+                for record in seeds:
+                    channels[0].put(record)
+            except PipelineCancelled:
+                pass
+            channels[0].close()
+
+        threading.Thread(target=seed, daemon=True).start()
+
+    def _collect(self, channel: Channel):
+        # URLs make up most of the results, so they are deduped in a compact UrlTable
+        seen = set()
+        urls = UrlTable()
+        try:
+            with open(self.results_path, "a", encoding="utf-8") as f:
+                for record in channel:
+                    if record.kind == URL.kind:
+                        if not urls.add(record.url, canonical=True)[1]:
+                            continue
+                    elif record in seen:
+                        continue
+                    else:
+                        seen.add(record)
+                    with self.lock:
+                        self.results[record.kind] = self.results.get(record.kind, 0) + 1
+                    f.write(json.dumps(record.to_wire()) + "\n")
+                    f.flush()
+        finally:
+            if len(urls):
+                try:
+                    urls.save(os.path.join(os.path.dirname(self.results_path), URLS_NAME))
+                except OSError as e:
+                    write_output("Seven", self.target, f"⚠️ Couldn't save the URL table of pipeline run {self.run_id}: {e}")
+            self.ended = time.time()
+            self.finished.set()
+            if self.on_finished:
+                self.on_finished(self)
+
+    def cancel(self):
+        """Stop the run: nothing more is queued and the stages' running tools are cancelled."""
+        self.cancelled.set()
+        get_tool_executor().cancel_key(self.run_id)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.finished.wait(timeout)
+
+    def describe(self) -> Dict:
+        with self.lock:
+            return {
+                'run_id': self.run_id,
+                'pipeline': self.pipeline.name,
+                'target': self.target,
+                'state': ("cancelled" if self.cancelled.is_set() else "done") if self.finished.is_set() else "running",
+                'elapsed': (self.ended or time.time()) - self.started,
+                'stages': {name: dict(counts) for name, counts in self.stats.items()},
+                'results': dict(self.results),
+                'results_path': self.results_path,
+                'error': self.error
+            }
+
+
+def load_pipelines(config_path: str = CONFIG_PATH) -> Dict[str, Pipeline]:
+    """The pipelines defined in the "pipelines" section of the config, by name."""
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f).get("pipelines", {})
+    except (OSError, ValueError) as e:
+        print(f"Error loading pipelines config: {e}")
+        config = {}
+    config = dict(DEFAULT_PIPELINES, **config)
+    return {
+        name: Pipeline.from_config(name, spec, config["queue_size"], config["follow_interval"])
+        for name, spec in config["definitions"].items()
+    }
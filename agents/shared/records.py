@@ -0,0 +1,189 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from urllib.parse import urlsplit
+
+from agents.shared.urls import canonicalize_url, get_url_config
+
+
+class Record:
+    """
+    A typed, normalized tool result, as the parsers make them (see parsers.py)
+    and pipeline stages pass them on (see pipeline.py).
+
+    Records use __slots__ and have a flat wire form, [kind, field, ...], so
+    millions of them stay small in memory and they can cross process
+    boundaries as plain JSON lists.
+    """
+
+    __slots__ = ("source",)
+    kind = "record"
+    FIELDS: Tuple[str, ...] = ("source",)
+
+    def key(self) -> Tuple:
+        """What identifies the record, for dedup; the source doesn't count."""
+        return tuple(getattr(self, name) for name in self.FIELDS if name != "source")
+
+    def fields(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def to_wire(self) -> List:
+        return [self.kind] + [getattr(self, name) for name in self.FIELDS]
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.key() == self.key()
+
+    def __hash__(self):
+        return hash((self.kind,) + self.key())
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS if getattr(self, name) is not None)
+        return f"{type(self).__name__}({values})"
+
+
+def normalize_host(name: str) -> str:
+    return name.strip().rstrip(".").lower()
+
+
+class Host(Record):
+    """A hostname, and the address it resolved to if known."""
+
+    __slots__ = ("name", "ip")
+    kind = "host"
+    FIELDS = ("name", "ip", "source")
+
+    def __init__(self, name: str, ip: Optional[str] = None, source: Optional[str] = None):
+        self.name = normalize_host(name)
+        self.ip = ip
+        self.source = source
+
+    def key(self) -> Tuple:
+        return (self.name,)
+
+    @property
+    def host(self) -> str:
+        return self.name
+
+
+def normalize_url(url: str) -> str:
+    """The URL in canonical form, unless canonicalization is turned off in the "urls" config."""
+    return canonicalize_url(url) if get_url_config()["canonicalize"] else url.strip()
+
+
+class URL(Record):
+    """
+    A URL, with its host split out and the HTTP status if a tool reported one.
+    The URL is kept in canonical form, so variants of it are one record.
+    """
+
+    __slots__ = ("url", "host", "status")
+    kind = "url"
+    FIELDS = ("url", "host", "status", "source")
+
+    def __init__(self, url: str, host: Optional[str] = None, status: Optional[int] = None,
+                 source: Optional[str] = None):
+        self.url = normalize_url(url)
+        self.host = normalize_host(host if host is not None else urlsplit(self.url).hostname or "")
+        self.status = status
+        self.source = source
+
+    def key(self) -> Tuple:
+        return (self.url,)
+
+
+class Service(Record):
+    """An open port on a host and what is listening on it."""
+
+    __slots__ = ("host", "port", "protocol", "name", "banner")
+    kind = "service"
+    FIELDS = ("host", "port", "protocol", "name", "banner", "source")
+
+    def __init__(self, host: str, port: int, protocol: str = "tcp", name: Optional[str] = None,
+                 banner: Optional[str] = None, source: Optional[str] = None):
+        self.host = normalize_host(host)
+        self.port = int(port)
+        self.protocol = protocol
+        self.name = name
+        self.banner = banner
+        self.source = source
+
+    def key(self) -> Tuple:
+        return (self.host, self.port, self.protocol)
+
+
+class Finding(Record):
+    """
+    Something a scanner reported about a location (a URL or host:port), e.g.
+    a nuclei template match, with its severity.
+    """
+
+    __slots__ = ("template", "severity", "location", "host", "protocol", "detail")
+    kind = "finding"
+    FIELDS = ("template", "severity", "location", "host", "protocol", "detail", "source")
+
+    def __init__(self, template: str, severity: str, location: str, host: Optional[str] = None,
+                 protocol: Optional[str] = None, detail: Optional[str] = None, source: Optional[str] = None):
+        self.template = template
+        self.severity = severity.lower()
+        self.location = normalize_url(location) if "://" in location else location
+        if host is None:
+            host = urlsplit(self.location).hostname if "://" in location else location.rsplit(":", 1)[0]
+        self.host = normalize_host(host or "")
+        self.protocol = protocol
+        self.detail = detail
+        self.source = source
+
+    def key(self) -> Tuple:
+        return (self.template, self.location)
+
+
+RECORD_TYPES: Dict[str, Type[Record]] = {record_type.kind: record_type for record_type in (Host, URL, Service, Finding)}
+
+
+def from_wire(data: List) -> Record:
+    """Rebuild a record from its wire form (see Record.to_wire)."""
+    record_type = RECORD_TYPES[data[0]]
+    return record_type(**dict(zip(record_type.FIELDS, data[1:])))
+
+
+def rehost(record: Record, host: str) -> Record:
+    """
+    A copy of the record about another host, e.g. to fan a port scan of an
+    address out to every name that resolves to it.
+    """
+    fields = record.fields()
+    old_host = getattr(record, "host", None)
+    fields["name" if isinstance(record, Host) else "host"] = host
+    for name in ("url", "location"):
+        if old_host and fields.get(name):
+            fields[name] = fields[name].replace(old_host, host, 1)
+    return type(record)(**fields)
+
+
+_URL_PATTERN = re.compile(r"^https?://\S+$", re.IGNORECASE)
+_SERVICE_PATTERN = re.compile(r"^(\d+)/(tcp|udp)\s+open\s+(\S+)\s*(.*)$")
+_HOST_PATTERN = re.compile(r"^(?=.{1,253}$)([a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}\.?$", re.IGNORECASE)
+
+
+def classify_line(line: str, context: Optional[Record] = None, source: Optional[str] = None) -> Optional[Record]:
+    """
+    Make a record of a line of tool output, if it is one: a URL, an nmap-style
+    open port line (on the context record's host) or a bare hostname.
+    """
+    line = line.strip()
+    if _URL_PATTERN.match(line):
+        return URL(line, source=source)
+    match = _SERVICE_PATTERN.match(line)
+    if match and context is not None and getattr(context, "host", None):
+        port, protocol, name, banner = match.groups()
+        return Service(context.host, int(port), protocol, name, banner or None, source=source)
+    if _HOST_PATTERN.match(line):
+        return Host(line, source=source)
+    return None
+
+
+def classify_lines(lines: Iterable[str], context: Optional[Record] = None,
+                   source: Optional[str] = None) -> Iterable[Record]:
+    for line in lines:
+        record = classify_line(line, context, source)
+        if record is not None:
+            yield record
@@ -0,0 +1,107 @@
+import json
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from output_handler import write_output
+from agents.shared.admission import CONFIG_PATH
+from agents.shared.parsers import parse_file
+from agents.shared.run_dirs import get_run_directories
+
+# Defaults used when the config has no "resolver" section
+DEFAULT_RESOLVER = {
+    # Harley's massdns output (boom.sh), looked up in the target's run indexes
+    "massdns_artifact": "output.json",
+    # Resolve names massdns didn't answer for through the system resolver
+    "dns_fallback": True,
+    "workers": 16
+}
+
+
+class HostResolver:
+    """
+    Resolves a target's hostnames to their addresses, for planning scans
+    around infrastructure rather than names.
+
+    Addresses come from Harley's latest massdns run for the target when
+    there is one (read once, through the run index), then from what the
+    pipeline's own records said, and only then from the system resolver,
+    on a small thread pool. Every answer is remembered, including failures.
+    """
+
+    def __init__(self, target: str, config: Optional[Dict] = None):
+        """
+        Initialize the HostResolver.
+
+        Args:
+            target: The target whose massdns output is reused
+            config: The "resolver" config section
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_RESOLVER, **config)
+        self.target = target
+        self.addresses: Dict[str, List[str]] = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=max(1, self.config["workers"]), thread_name_prefix="resolve")
+        self.from_massdns = self._load_massdns()
+
+    def _load_massdns(self) -> int:
+        path = get_run_directories().find_artifact(self.target, self.config["massdns_artifact"])
+        if path is None:
+            return 0
+        try:
+            for host in parse_file(path, "massdns"):
+                self.learn(host.name, host.ip)
+        except OSError as e:
+            write_output("Seven", self.target, f"⚠️ Couldn't read massdns output {path}: {e}")
+        return len(self.addresses)
+
+    def learn(self, name: str, ip: Optional[str]):
+        """Remember an address a tool reported for a name."""
+        if not ip:
+            return
+        with self.lock:
+            addresses = self.addresses.setdefault(name, [])
+            if ip not in addresses:
+                addresses.append(ip)
+                addresses.sort()
+
+    def known(self, name: str) -> Optional[List[str]]:
+        with self.lock:
+            addresses = self.addresses.get(name)
+            return list(addresses) if addresses is not None else None
+
+    def _lookup(self, name: str) -> List[str]:
+        try:
+            _, _, addresses = socket.gethostbyname_ex(name)
+        except (OSError, UnicodeError):
+            addresses = []
+        with self.lock:
+            self.addresses.setdefault(name, sorted(set(addresses)))
+            return list(self.addresses[name])
+
+    def resolve(self, name: str) -> "Future[List[str]]":
+        """
+        The addresses of a name, sorted; an empty list if it doesn't resolve.
+        Known names resolve at once, others on the resolver's thread pool.
+        """
+        addresses = self.known(name)
+        if addresses is not None or not self.config["dns_fallback"]:
+            future: "Future[List[str]]" = Future()
+            future.set_result(addresses or [])
+            return future
+        return self.pool.submit(self._lookup, name)
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def get_resolver_config() -> Dict:
+    """The "resolver" section of the config."""
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            return dict(DEFAULT_RESOLVER, **json.load(f).get("resolver", {}))
+    except (OSError, ValueError) as e:
+        print(f"Error loading resolver config: {e}")
+        return dict(DEFAULT_RESOLVER)
@@ -0,0 +1,462 @@
+import os
+import sys
+import json
+import glob
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: cache updates are only serialized within a process
+    fcntl = None
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents.shared.admission import CONFIG_PATH
+from agents.shared.targets import normalize_target
+from agents.shared.output_stream import OutputSink
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".7sisters", "cache")
+
+# Defaults used when the config has no "result_cache" section
+DEFAULT_RESULT_CACHE = {
+    "enabled": True,
+    "directory": None,  # None means ~/.7sisters/cache
+    "max_size_mb": 2048,
+    "max_output_mb": 256,
+    "default_ttl": 0,  # Seconds; 0 means tools without an entry are never cached
+    "env": [],  # Environment variables that change what every tool does
+    "tools": {}
+}
+
+# Placeholder for the target in the arguments that go into a cache key
+TARGET_PLACEHOLDER = "{target}"
+
+# Blobs younger than this are never garbage-collected, so a concurrent store can finish
+BLOB_GRACE_SECONDS = 60
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CaptureSink(OutputSink):
+    """Records a tool's output lines to a file, to be stored with its cached result."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="capture-", suffix=".jsonl", dir=directory)
+        self.file = os.fdopen(fd, "w", encoding="utf-8")
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.overflowed = False
+
+    def write_line(self, stream: str, line: str):
+        if self.overflowed:
+            return
+        record = json.dumps([stream, line]) + "\n"
+        self.size += len(record)
+        if self.size > self.max_bytes:
+            self.overflowed = True  # Too much output to be worth caching
+            return
+        self.file.write(record)
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class CacheEntry:
+    """A cached tool result: its captured output and artifacts, as blob digests."""
+
+    def __init__(self, manifest: Dict, manifest_path: str):
+        self.manifest = manifest
+        self.manifest_path = manifest_path
+        self.key = manifest["key"]
+        self.tool = manifest["tool"]
+        self.target = manifest["target"]
+        self.created = manifest["created"]
+        self.expires = manifest["expires"]
+        self.output = manifest.get("output")  # Blob digest of the captured output, if any
+        self.artifacts: Dict[str, str] = manifest.get("artifacts", {})  # relative path -> blob digest
+        self.last_used = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+
+class ResultCache:
+    """
+    Content-addressed cache of tool results.
+
+    A result is keyed by the sha256 of the tool script, the normalized target,
+    the rest of the command line and the configured environment variables, so
+    editing a tool or changing its arguments never serves a stale result.
+    The captured output and the artifacts the run left in the target's output
+    directory (the tool's "artifacts" globs) are stored once each as blobs
+    named by their sha256; an entry's manifest lists them. Entries expire
+    after the tool's ttl; when the blobs outgrow max_size_mb, the least
+    recently used entries go first.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, directory: Optional[str] = None):
+        """
+        Initialize the ResultCache.
+
+        Args:
+            config: The "result_cache" config section
+            directory: Cache directory (overrides the config)
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_RESULT_CACHE, **config)
+        self.directory = directory or self.config["directory"] or CACHE_DIR
+        self.blob_dir = os.path.join(self.directory, "blobs")
+        self.entry_dir = os.path.join(self.directory, "entries")
+        self.tmp_dir = os.path.join(self.directory, "tmp")
+        self.max_size = self.config["max_size_mb"] * 1024 * 1024
+        self.max_output = self.config["max_output_mb"] * 1024 * 1024
+        self.script_digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.thread_lock = threading.Lock()
+        for path in (self.blob_dir, self.entry_dir, self.tmp_dir):
+            os.makedirs(path, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled"))
+
+    def policy(self, tool: str) -> Dict:
+        """The tool's cache settings: ttl, artifact globs and extra environment variables."""
+        policy = {"ttl": self.config["default_ttl"], "artifacts": [], "env": []}
+        policy.update(self.config["tools"].get(os.path.basename(tool), {}))
+        return policy
+
+    @contextmanager
+    def locked(self):
+        """Hold the cache lock (across processes where the platform allows)."""
+        with self.thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _script_digest(self, path: str) -> Optional[str]:
+        """sha256 of a tool script, recomputed only when the file changes."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self.script_digests.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        digest = _file_digest(path)
+        self.script_digests[path] = (signature, digest)
+        return digest
+
+    def key_for(self, command: List[str], target: str, tool: str, cwd: Optional[str] = None,
+                inputs: Optional[str] = None) -> Optional[str]:
+        """
+        The cache key of a tool run.
+
+        Args:
+            command: The command line of the run
+            target: The run's target
+            tool: The tool that runs
+            cwd: The directory the command's relative paths are relative to
+            inputs: A digest of the deltas the run works on (see DeltaTracker.input_digest)
+
+        Returns:
+            The key, or None if the tool isn't cached or its script can't be read
+        """
+        policy = self.policy(tool)
+        if not self.enabled or not policy["ttl"]:
+            return None
+        script = next((arg for arg in command if os.path.basename(arg) == os.path.basename(tool)), None)
+        script_digest = self._script_digest(os.path.join(cwd or os.getcwd(), script)) if script else None
+        if script_digest is None:
+            return None
+        env_names = sorted(set(self.config["env"]) | set(policy["env"]))
+        parts = {
+            "tool": os.path.basename(tool),
+            "script": script_digest,
+            "target": normalize_target(target),
+            "args": [TARGET_PLACEHOLDER if arg == target else arg for arg in command if arg != script],
+            "env": {name: os.environ.get(name) for name in env_names}
+        }
+        if inputs:
+            parts["inputs"] = inputs
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.entry_dir, f"{key}.json")
+
+    def _store_blob(self, path: str) -> str:
+        """Add a file to the blob store (once per content) and return its digest."""
+        digest = _file_digest(path)
+        blob_path = self._blob_path(digest)
+        if os.path.exists(blob_path):
+            os.utime(blob_path)  # Keep it out of a concurrent garbage collection
+            return digest
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        os.close(fd)
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, blob_path)
+        return digest
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Find an unexpired entry whose blobs are all present."""
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = CacheEntry(json.load(f), path)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        digests = list(entry.artifacts.values()) + ([entry.output] if entry.output else [])
+        if time.time() >= entry.expires or not all(os.path.exists(self._blob_path(d)) for d in digests):
+            self._remove_entry(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # The manifest's mtime is the entry's last use, for LRU eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    def store(self, key: str, tool: str, target: str, capture: Optional[CaptureSink],
+              artifact_dir: str, started: float) -> Optional[CacheEntry]:
+        """
+        Cache the result of a successful run.
+
+        Args:
+            key: The run's cache key (see key_for)
+            tool: The tool's name
+            target: The run's target
+            capture: The sink that recorded the run's output
+            artifact_dir: The target's output directory, where the tool left its artifacts
+            started: When the run started; only artifacts written since then are stored
+
+        Returns:
+            The new entry, or None if the output was too large to cache
+        """
+        policy = self.policy(tool)
+        try:
+            if capture is not None and capture.overflowed:
+                return None
+            output = self._store_blob(capture.path) if capture is not None else None
+            artifacts = {}
+            for pattern in policy["artifacts"]:
+                for path in glob.glob(os.path.join(artifact_dir, pattern), recursive=True):
+                    if os.path.isfile(path) and os.path.getmtime(path) >= started:
+                        artifacts[os.path.relpath(path, artifact_dir)] = self._store_blob(path)
+        finally:
+            if capture is not None:
+                capture.discard()
+
+        now = time.time()
+        manifest = {
+            "key": key,
+            "tool": os.path.basename(tool),
+            "target": target,
+            "created": now,
+            "expires": now + policy["ttl"],
+            "output": output,
+            "artifacts": artifacts
+        }
+        path = self._entry_path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        with self.locked():
+            os.replace(tmp_path, path)
+            self._evict()
+        return CacheEntry(manifest, path)
+
+    def read_output(self, entry: CacheEntry):
+        """Yield the (stream, line) pairs of a cached run's output."""
+        if not entry.output:
+            return
+        with open(self._blob_path(entry.output), "r", encoding="utf-8") as f:
+            for record in f:
+                stream, line = json.loads(record)
+                yield stream, line
+
+    def restore(self, entry: CacheEntry, artifact_dir: str) -> List[str]:
+        """Copy a cached run's artifacts back into the target's output directory."""
+        restored = []
+        for relative_path, digest in entry.artifacts.items():
+            path = os.path.join(artifact_dir, relative_path)
+            if os.path.isfile(path) and _file_digest(path) == digest:
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(self._blob_path(digest), path)
+            restored.append(path)
+        return restored
+
+    @staticmethod
+    def _remove_entry(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _read_entries(self) -> List[CacheEntry]:
+        entries = []
+        for name in os.listdir(self.entry_dir):
+            path = os.path.join(self.entry_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = CacheEntry(json.load(f), path)
+                entry.last_used = os.path.getmtime(path)
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append(entry)
+        return entries
+
+    def _blob_sizes(self) -> Dict[str, Tuple[int, float]]:
+        sizes = {}
+        for root, _, files in os.walk(self.blob_dir):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                sizes[name] = (stat.st_size, stat.st_mtime)
+        return sizes
+
+    def _evict(self):
+        """
+        Drop expired entries, then least recently used ones until the blobs fit
+        the size budget, and delete the blobs no entry refers to any more.
+        Call with the lock held.
+        """
+        now = time.time()
+        entries = []
+        for entry in self._read_entries():
+            if now >= entry.expires:
+                self._remove_entry(entry.manifest_path)
+            else:
+                entries.append(entry)
+        entries.sort(key=lambda e: e.last_used)
+
+        blobs = self._blob_sizes()
+        references = {}
+        for entry in entries:
+            for digest in list(entry.artifacts.values()) + ([entry.output] if entry.output else []):
+                references[digest] = references.get(digest, 0) + 1
+        total = sum(size for size, _ in blobs.values())
+
+        def collect(digest):
+            nonlocal total
+            size, mtime = blobs.get(digest, (0, now))
+            if now - mtime < BLOB_GRACE_SECONDS:
+                return
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                return
+            total -= size
+            blobs.pop(digest, None)
+
+        for digest in [d for d in blobs if d not in references]:
+            collect(digest)
+        while total > self.max_size and entries:
+            entry = entries.pop(0)
+            self._remove_entry(entry.manifest_path)
+            for digest in list(entry.artifacts.values()) + ([entry.output] if entry.output else []):
+                references[digest] -= 1
+                if not references[digest]:
+                    collect(digest)
+
+    def evict(self):
+        """Apply expiry and the size budget now (stores do this as they go)."""
+        with self.locked():
+            self._evict()
+
+    def clear(self):
+        """Remove every entry and blob."""
+        with self.locked():
+            for path in (self.blob_dir, self.entry_dir):
+                shutil.rmtree(path, ignore_errors=True)
+                os.makedirs(path, exist_ok=True)
+
+    def get_status(self) -> Dict:
+        """Entry count, blob size against the budget, and this process's hits and misses."""
+        entries = self._read_entries()
+        return {
+            'enabled': self.enabled,
+            'directory': self.directory,
+            'entries': len(entries),
+            'size_mb': sum(size for size, _ in self._blob_sizes().values()) / (1024 * 1024),
+            'max_size_mb': self.config["max_size_mb"],
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """The process-wide cache, configured from the "result_cache" section of the config."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("result_cache", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading result cache config: {e}")
+                config = {}
+            _cache = ResultCache(config)
+        return _cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clean the tool result cache.")
+    parser.add_argument("--clear", action="store_true", help="remove every cached result")
+    parser.add_argument("--evict", action="store_true", help="drop expired entries and enforce the size budget")
+    args = parser.parse_args()
+
+    cache = get_result_cache()
+    if args.clear:
+        cache.clear()
+    elif args.evict:
+        cache.evict()
+    status = cache.get_status()
+    print(f"{status['entries']} entries, {status['size_mb']:.1f} of {status['max_size_mb']} MB in {status['directory']}")
+
+
+if __name__ == "__main__":
+    main()
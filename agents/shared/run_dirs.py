@@ -0,0 +1,270 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import datetime
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: index updates are only serialized within a process
+    fcntl = None
+
+from output_handler import init_output_dir
+from agents.shared.admission import CONFIG_PATH
+
+# Defaults used when the config has no "run_dirs" section
+DEFAULT_RUN_DIRS = {
+    "enabled": True,
+    # Files the tools expect in their working directory (e.g. massdns's resolvers.txt);
+    # they are linked into every run directory from the sister's own working directory
+    "shared_files": []
+}
+
+# Name of the artifact index in each run directory
+INDEX_NAME = "index.json"
+
+# Environment variables that tell a tool which run it is part of
+RUN_DIR_ENV_VAR = "SISTERS_RUN_DIR"
+RUN_ID_ENV_VAR = "SISTERS_RUN_ID"
+
+
+def new_run_id() -> str:
+    """A run ID for a tool run that isn't part of an action, sortable by time."""
+    return f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def safe_name(name: str) -> str:
+    """Make a run ID or sister name safe to use as a directory name."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name).lstrip(".") or "_"
+
+
+class RunDirectory:
+    """
+    The working directory of one tool run: output/<target>/<run-id>/<sister>/.
+
+    The tool runs inside it, so the fixed filenames the tool scripts write
+    (urls_wayback.txt, scan_nmap.txt, output.json, ...) can't clobber those of
+    a run for another target, or another run for the same one.
+    """
+
+    def __init__(self, target: str, run_id: str, sister_name: str, run_path: str, path: str,
+                 shared_files: List[str]):
+        self.target = target
+        self.run_id = run_id
+        self.sister_name = sister_name
+        self.run_path = run_path  # output/<target>/<run-id>
+        self.path = path  # output/<target>/<run-id>/<sister>, with an attempt suffix if retried
+        self.shared_files = shared_files
+        self.created = time.time()
+
+    def env(self) -> Dict[str, str]:
+        return {RUN_DIR_ENV_VAR: self.path, RUN_ID_ENV_VAR: self.run_id}
+
+    def artifacts(self) -> List[Dict]:
+        """Every file the run left in its directory, except the linked shared files."""
+        artifacts = []
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                path = os.path.join(root, name)
+                relative_path = os.path.relpath(path, self.path)
+                if relative_path in self.shared_files or os.path.islink(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                artifacts.append({
+                    'path': os.path.relpath(path, self.run_path).replace(os.sep, "/"),
+                    'size': stat.st_size,
+                    'modified': stat.st_mtime
+                })
+        return sorted(artifacts, key=lambda artifact: artifact['path'])
+
+
+class RunDirectories:
+    """
+    Hands out per-run working directories and keeps the artifact index of each run.
+
+    All the sisters working on one action share its run directory
+    (output/<target>/<action-id>/), each in a subdirectory of her own; a
+    sister that runs her tool again for the same action gets a fresh one
+    (<sister>.2, ...). Once a tool finishes, the files it left are listed in
+    the run's index.json, along with the tool, exit code, timing and record counts.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        Initialize RunDirectories.
+
+        Args:
+            config: The "run_dirs" config section
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_RUN_DIRS, **config)
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.config.get("enabled"))
+
+    def allocate(self, target: str, sister_name: str, run_id: Optional[str] = None,
+                 base: Optional[str] = None) -> RunDirectory:
+        """
+        Create the working directory for a tool run.
+
+        Args:
+            target: The run's target
+            sister_name: The sister running the tool
+            run_id: The run it is part of, normally the action ID (a new one if None)
+            base: Where the shared files are found (defaults to the current directory)
+
+        Returns:
+            The RunDirectory
+        """
+        run_id = safe_name(run_id) if run_id else new_run_id()
+        run_path = os.path.join(init_output_dir(target), run_id)
+        os.makedirs(run_path, exist_ok=True)
+        name = safe_name(sister_name)
+        attempt = 1
+        while True:
+            path = os.path.join(run_path, name if attempt == 1 else f"{name}.{attempt}")
+            try:
+                os.mkdir(path)
+                break
+            except FileExistsError:
+                attempt += 1
+
+        base = base or os.getcwd()
+        shared_files = []
+        for shared_file in self.config["shared_files"]:
+            source = os.path.join(base, shared_file)
+            if not os.path.exists(source):
+                continue
+            destination = os.path.join(path, shared_file)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            try:
+                os.symlink(os.path.abspath(source), destination)
+            except OSError:  # No symlinks here (e.g. Windows without privileges)
+                shutil.copy2(source, destination)
+            shared_files.append(os.path.normpath(shared_file))
+        return RunDirectory(target, run_id, sister_name, run_path, path, shared_files)
+
+    @staticmethod
+    def absolutize(command: List[str], target: Optional[str] = None, base: Optional[str] = None) -> List[str]:
+        """
+        Make the command's relative paths (e.g. "tools/alice_recon.sh") absolute,
+        so it still works from inside a run directory.
+        """
+        base = base or os.getcwd()
+        return [os.path.abspath(os.path.join(base, arg))
+                if arg != target and not os.path.isabs(arg) and os.path.exists(os.path.join(base, arg))
+                else arg
+                for arg in command]
+
+    @contextmanager
+    def _locked(self, run_path: str):
+        """Hold a run's index lock (across processes where the platform allows)."""
+        with self.lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(run_path, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_index(run_path: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(run_path, INDEX_NAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def index(self, run_dir: RunDirectory, tool: str, returncode: Optional[int],
+              started: Optional[float] = None, cached: bool = False,
+              records: Optional[Dict[str, int]] = None) -> List[Dict]:
+        """
+        Add a finished run's artifacts to its run's index, with the number of
+        records of each kind parsed from its output (see parsers.py).
+
+        Returns:
+            The artifacts, with paths relative to the run directory
+        """
+        artifacts = run_dir.artifacts()
+        entry = {
+            'sister': run_dir.sister_name,
+            'directory': os.path.basename(run_dir.path),
+            'tool': os.path.basename(tool),
+            'returncode': returncode,
+            'cached': cached,
+            'started': started or run_dir.created,
+            'finished': time.time(),
+            'artifacts': artifacts,
+            'records': records or {}
+        }
+        with self._locked(run_dir.run_path):
+            index = self._read_index(run_dir.run_path) or {
+                'run_id': run_dir.run_id,
+                'target': run_dir.target,
+                'created': run_dir.created,
+                'runs': []
+            }
+            index['runs'] = [run for run in index['runs'] if run['directory'] != entry['directory']] + [entry]
+            fd, tmp_path = tempfile.mkstemp(dir=run_dir.run_path)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, os.path.join(run_dir.run_path, INDEX_NAME))
+        return artifacts
+
+    def list_runs(self, target: str) -> List[Dict]:
+        """The indexes of a target's runs, oldest first."""
+        target_dir = init_output_dir(target)
+        indexes = []
+        for name in os.listdir(target_dir):
+            run_path = os.path.join(target_dir, name)
+            if os.path.isdir(run_path):
+                index = self._read_index(run_path)
+                if index is not None:
+                    indexes.append(index)
+        return sorted(indexes, key=lambda index: index['created'])
+
+    def find_artifact(self, target: str, name: str) -> Optional[str]:
+        """
+        The path of the most recent artifact with the given filename for a target,
+        e.g. find_artifact("example.com", "urls_wayback.txt").
+        """
+        target_dir = init_output_dir(target)
+        for index in reversed(self.list_runs(target)):
+            for run in sorted(index['runs'], key=lambda run: run['finished'], reverse=True):
+                for artifact in run['artifacts']:
+                    if os.path.basename(artifact['path']) == name:
+                        return os.path.join(target_dir, safe_name(index['run_id']), artifact['path'])
+        return None
+
+
+_run_dirs = None
+_run_dirs_lock = threading.Lock()
+
+
+def get_run_directories() -> RunDirectories:
+    """The process-wide RunDirectories, configured from the "run_dirs" section of the config."""
+    global _run_dirs
+    with _run_dirs_lock:
+        if _run_dirs is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("run_dirs", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading run_dirs config: {e}")
+                config = {}
+            _run_dirs = RunDirectories(config)
+        return _run_dirs
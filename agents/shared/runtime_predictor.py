@@ -0,0 +1,94 @@
+import ipaddress
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Rough runtimes (seconds) per target size class, used until there is history
+DEFAULT_CLASS_RUNTIMES = {
+    "ip": 30.0,
+    "host": 60.0,
+    "url": 60.0,
+    "domain": 120.0,
+    "wildcard": 300.0,
+    "cidr-small": 120.0,
+    "cidr-medium": 600.0,
+    "cidr-large": 3600.0
+}
+
+
+def classify_target(target: str) -> str:
+    """
+    Put a target into a size class that predicts how much work it is.
+
+    Classes: ip, cidr-small (/28 or smaller), cidr-medium (down to /24),
+    cidr-large, url, wildcard (*.example.com), domain (apex, e.g. example.com)
+    and host (a deeper name such as api.example.com).
+    """
+    target = target.strip().lower()
+
+    if "/" in target and "://" not in target:
+        try:
+            network = ipaddress.ip_network(target, strict=False)
+            size = network.num_addresses
+            if size <= 16:
+                return "cidr-small"
+            if size <= 256:
+                return "cidr-medium"
+            return "cidr-large"
+        except ValueError:
+            pass
+
+    if "://" in target:
+        parsed = urlparse(target)
+        if parsed.path.strip("/") or parsed.query:
+            return "url"
+        target = parsed.hostname or target
+
+    try:
+        ipaddress.ip_address(target)
+        return "ip"
+    except ValueError:
+        pass
+
+    if target.startswith("*."):
+        return "wildcard"
+    return "domain" if target.rstrip(".").count(".") <= 1 else "host"
+
+
+class RuntimePredictor:
+    """
+    Predicts how long an action will take on a target.
+
+    Uses the median runtime of past actions of the same type on targets of
+    the same size class (recorded by ActionManager under
+    "size:<action_type>:<class>"), and a per-class default until enough of
+    those have been seen.
+    """
+
+    def __init__(self, duration_store, min_samples: int = 3,
+                 class_defaults: Optional[Dict[str, float]] = None):
+        """
+        Initialize the RuntimePredictor.
+
+        Args:
+            duration_store: DurationStore holding the recorded runtimes
+            min_samples: Runs of a class needed before its history is trusted
+            class_defaults: Override for DEFAULT_CLASS_RUNTIMES
+        """
+        self.duration_store = duration_store
+        self.min_samples = min_samples
+        self.class_defaults = dict(DEFAULT_CLASS_RUNTIMES, **(class_defaults or {}))
+
+    @staticmethod
+    def history_key(action_type: str, target: str) -> str:
+        return f"size:{action_type}:{classify_target(target)}"
+
+    def record(self, action_type: str, target: str, duration: float):
+        """Record how long an action took on a target."""
+        self.duration_store.record(self.history_key(action_type, target), duration)
+
+    def predict(self, action_type: str, target: str) -> float:
+        """Expected runtime of an action on a target, in seconds."""
+        learned = self.duration_store.percentile(self.history_key(action_type, target), 50, self.min_samples)
+        if learned is not None:
+            return learned
+        return self.class_defaults.get(classify_target(target), self.class_defaults["host"])
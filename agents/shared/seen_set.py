@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import math
+import time
+import struct
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from output_handler import init_output_dir
+from agents.shared.admission import CONFIG_PATH
+from agents.shared.records import Record
+
+# Defaults used when the config has no "seen_set" section
+DEFAULT_SEEN_SET = {
+    "enabled": True,
+    "initial_capacity": 1000000,  # Entries the first filter is sized for; later ones double
+    "error_rate": 0.001,  # Target false positive rate of the whole filter
+    "flush_every": 50000  # Save the filter after this many new entries (and on close)
+}
+
+# Where a target's seen-set lives, under its output directory
+SEEN_SUBDIR = "seen"
+
+# Each filter added when the last one is full gets this fraction of the previous one's error rate,
+# so the rates sum to at most error_rate
+TIGHTENING = 0.5
+GROWTH = 2
+
+_HEADER = struct.Struct("<I")
+
+
+def record_key(record: Record) -> str:
+    """The seen-set key of a record: its kind and what identifies it."""
+    return "\x1f".join([record.kind] + [str(part) for part in record.key()])
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings, using double hashing of a blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None, count: int = 0):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key: str):
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def memory(self) -> int:
+        return len(self.bits)
+
+
+class ScalableBloomFilter:
+    """
+    A Bloom filter that grows: when its newest filter is full, it adds one
+    twice as large with half the error rate, so the false positive rate
+    stays under error_rate however many entries it ends up with.
+    """
+
+    def __init__(self, initial_capacity: int, error_rate: float):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters: List[BloomFilter] = []
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in bloom for bloom in self.filters)
+
+    def add(self, key: str):
+        if not self.filters or self.filters[-1].full:
+            index = len(self.filters)
+            self.filters.append(BloomFilter(self.initial_capacity * GROWTH ** index,
+                                            self.error_rate * (1 - TIGHTENING) * TIGHTENING ** index))
+        self.filters[-1].add(key)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def memory(self) -> int:
+        return sum(bloom.memory for bloom in self.filters)
+
+    def save(self, path: str):
+        """Write the filter to a file atomically: a JSON header, then each filter's bits."""
+        header = json.dumps({
+            'initial_capacity': self.initial_capacity,
+            'error_rate': self.error_rate,
+            'filters': [[bloom.capacity, bloom.error_rate, bloom.count] for bloom in self.filters]
+        }).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(len(header)))
+            f.write(header)
+            for bloom in self.filters:
+                f.write(bloom.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ScalableBloomFilter":
+        with open(path, "rb") as f:
+            (length,) = _HEADER.unpack(f.read(_HEADER.size))
+            header = json.loads(f.read(length))
+            scalable = cls(header['initial_capacity'], header['error_rate'])
+            for capacity, error_rate, count in header['filters']:
+                bloom = BloomFilter(capacity, error_rate, count=count)
+                bits = f.read(len(bloom.bits))
+                if len(bits) != len(bloom.bits):
+                    raise ValueError(f"Truncated filter file: {path}")
+                bloom.bits = bytearray(bits)
+                scalable.filters.append(bloom)
+        return scalable
+
+
+class SeenSet:
+    """
+    Everything ever seen for one target, e.g. every URL any run found.
+
+    A scalable Bloom filter in memory answers "never seen" for new entries
+    without a lookup; only the entries it thinks it has seen are checked
+    against the exact store, an SQLite table of all entries, which also
+    catches the filter's false positives. A million entries cost about 2 MB
+    of filter at the default error rate (more if the filter had to grow to
+    hold them), against the hundreds of megabytes a Python set of a million
+    URLs takes. The filter is saved next to the store and rebuilt from it if
+    it is missing or out of date.
+    """
+
+    def __init__(self, directory: str, config: Optional[Dict] = None):
+        """
+        Initialize the SeenSet.
+
+        Args:
+            directory: Where the store and the filter are kept
+            config: The "seen_set" config section
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_SEEN_SET, **config)
+        os.makedirs(directory, exist_ok=True)
+        self.store_path = os.path.join(directory, "seen.sqlite")
+        self.filter_path = os.path.join(directory, "seen.bloom")
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.store_path, check_same_thread=False, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, first_seen REAL) WITHOUT ROWID")
+        self.connection.commit()
+        self.unsaved = 0
+        self.counters = {'checked': 0, 'new': 0, 'filter_negative': 0, 'store_lookups': 0, 'false_positive': 0}
+        self.bloom = self._load_filter()
+
+    def _count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def _load_filter(self) -> ScalableBloomFilter:
+        entries = self._count()
+        try:
+            bloom = ScalableBloomFilter.load(self.filter_path)
+            if len(bloom) == entries and bloom.error_rate == self.config["error_rate"]:
+                return bloom
+        except (OSError, ValueError, KeyError):
+            pass
+        # Missing, out of date (e.g. another process added entries) or configured differently: rebuild
+        bloom = ScalableBloomFilter(self.config["initial_capacity"], self.config["error_rate"])
+        for (key,) in self.connection.execute("SELECT key FROM seen"):
+            bloom.add(key)
+        bloom.save(self.filter_path)
+        return bloom
+
+    def check_and_add(self, keys: Iterable[str]) -> List[bool]:
+        """
+        Record a batch of entries as seen.
+
+        A key the filter has never seen is new: it goes into the filter and
+        is inserted with the rest of the batch, without a lookup. Only keys
+        the filter thinks it has seen are looked up in the store, which tells
+        the ones seen before from the filter's false positives.
+
+        Returns:
+            For each key, whether it was new (never seen before, nor earlier in the batch)
+        """
+        keys = list(keys)
+        now = time.time()
+        results = []
+        with self.lock:
+            cursor = self.connection.cursor()
+            inserts = {}  # New key -> its index in results
+            for key in keys:
+                self.counters['checked'] += 1
+                if key in inserts:
+                    results.append(False)
+                    continue
+                if key not in self.bloom:
+                    self.counters['filter_negative'] += 1
+                    new = True
+                else:
+                    self.counters['store_lookups'] += 1
+                    new = cursor.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is None
+                    if new:
+                        self.counters['false_positive'] += 1
+                if new:
+                    self.bloom.add(key)
+                    inserts[key] = len(results)
+                results.append(new)
+            if inserts:
+                cursor.executemany("INSERT OR IGNORE INTO seen (key, first_seen) VALUES (?, ?)",
+                                   ((key, now) for key in inserts))
+                if cursor.rowcount != len(inserts):
+                    # Another process stored some of them first; they weren't new after all
+                    for key, index in inserts.items():
+                        if cursor.execute("SELECT 1 FROM seen WHERE key = ? AND first_seen != ?",
+                                          (key, now)).fetchone() is not None:
+                            results[index] = False
+                self.connection.commit()
+            added = sum(results)
+            self.counters['new'] += added
+            self.unsaved += len(inserts)
+            if self.unsaved >= self.config["flush_every"]:
+                self._save()
+        return results
+
+    def add(self, key: str) -> bool:
+        """Record one entry as seen; True if it was new."""
+        return self.check_and_add([key])[0]
+
+    def __contains__(self, key: str) -> bool:
+        # Like check_and_add, this trusts the filter's "never seen"; entries another process
+        # added since the filter was loaded show up once the filter is rebuilt
+        with self.lock:
+            if key not in self.bloom:
+                return False
+            return self.connection.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def _save(self):
+        self.bloom.save(self.filter_path)
+        self.unsaved = 0
+
+    def flush(self):
+        """Save the filter if it has entries that aren't saved yet."""
+        with self.lock:
+            if self.unsaved:
+                self._save()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.connection.close()
+
+    def get_stats(self) -> Dict:
+        """
+        Size, memory and false positive figures.
+
+        The observed false positive rate is the share of new entries the
+        filter wrongly thought it had seen, i.e. that needed a store lookup to
+        find out they were new; it should stay under the configured error
+        rate. Every other new entry was added without a lookup.
+        """
+        with self.lock:
+            entries = len(self.bloom)
+            memory = self.bloom.memory
+            capacity = sum(bloom.capacity for bloom in self.bloom.filters)
+            counters = dict(self.counters)
+        new = counters['new']
+        return {
+            'entries': entries,
+            'filters': len(self.bloom.filters),
+            'filter_memory': memory,
+            'capacity': capacity,
+            # The filters are allocated up front, so this is per million entries they are sized for
+            'memory_per_million': memory / capacity * 1000000 if capacity else None,
+            'store_size': os.path.getsize(self.store_path) if os.path.exists(self.store_path) else 0,
+            'error_rate': self.config["error_rate"],
+            'false_positive_rate': counters['false_positive'] / new if new else None,
+            **counters
+        }
+
+
+_seen_sets: Dict[str, SeenSet] = {}
+_seen_sets_lock = threading.Lock()
+_config = None
+
+
+def get_seen_config() -> Dict:
+    """The "seen_set" section of the config, read once."""
+    global _config
+    if _config is None:
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                _config = dict(DEFAULT_SEEN_SET, **json.load(f).get("seen_set", {}))
+        except (OSError, ValueError) as e:
+            print(f"Error loading seen_set config: {e}")
+            _config = dict(DEFAULT_SEEN_SET)
+    return _config
+
+
+def get_seen_set(target: str) -> SeenSet:
+    """The target's seen-set, opened once per process."""
+    with _seen_sets_lock:
+        if target not in _seen_sets:
+            _seen_sets[target] = SeenSet(os.path.join(init_output_dir(target), SEEN_SUBDIR), get_seen_config())
+        return _seen_sets[target]
+
+
+def benchmark(entries: int, error_rate: float, directory: str) -> Dict:
+    """Fill a fresh seen-set with synthetic URLs, then probe it with as many unseen ones."""
+    seen = SeenSet(directory, {"initial_capacity": max(1000, entries // 4), "error_rate": error_rate,
+                               "flush_every": entries + 1})
+    started = time.time()
+    batch = 10000
+    for start in range(0, entries, batch):
+        seen.check_and_add(f"url\x1fhttps://host{i % 997}.example.com/path/{i}" for i in range(start, min(entries, start + batch)))
+    insert_time = time.time() - started
+    false_positives = sum(1 for i in range(entries) if f"url\x1fhttps://other.example.org/{i}" in seen.bloom)
+    stats = seen.get_stats()
+    seen.close()
+    return {
+        'entries': entries,
+        'insert_seconds': insert_time,
+        'filter_memory_per_million': stats['memory_per_million'],
+        'measured_false_positive_rate': false_positives / entries,
+        'configured_error_rate': error_rate,
+        'store_bytes_per_entry': stats['store_size'] / entries
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a target's seen-set or benchmark one")
+    parser.add_argument("target", nargs="?", help="Show the seen-set stats of this target")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark a seen-set of N entries")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_SEEN_SET["error_rate"])
+    args = parser.parse_args()
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as directory:
+            print(json.dumps(benchmark(args.benchmark, args.error_rate, directory), indent=2))
+    elif args.target:
+        print(json.dumps(get_seen_set(args.target).get_stats(), indent=2))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,514 @@
+import os
+import sys
+import copy
+import json
+import math
+import heapq
+import random
+import argparse
+import itertools
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import output_handler
+from agents.shared.action_catalog import ActionCatalog, ActionPhase, ErrorType
+from agents.shared.action_manager import ActionManager
+from agents.shared.runtime_predictor import DEFAULT_CLASS_RUNTIMES, classify_target
+from agents.shared.sister_comm import CommandHandler
+from agents.shared.task_queue import ORDERING_POLICIES
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, "seven_sisters.config.json")
+
+# Share of an action's runtime spent in each phase
+PHASE_SHARES = {
+    ActionPhase.INITIALIZATION: 0.05,
+    ActionPhase.PREPARATION: 0.10,
+    ActionPhase.EXECUTION: 0.70,
+    ActionPhase.VERIFICATION: 0.10,
+    ActionPhase.CLEANUP: 0.05
+}
+
+# Mix of target size classes in a generated workload
+DEFAULT_TARGET_MIX = {
+    "ip": 0.25,
+    "host": 0.30,
+    "domain": 0.20,
+    "url": 0.10,
+    "wildcard": 0.05,
+    "cidr-small": 0.05,
+    "cidr-medium": 0.04,
+    "cidr-large": 0.01
+}
+
+BUS_LATENCY = 0.005  # seconds for a message to cross the bus
+
+
+class VirtualTimer:
+    """Timer on a VirtualClock, with the start()/cancel() interface of threading.Timer."""
+
+    def __init__(self, clock: "VirtualClock", interval: float, function: Callable, args: Optional[List[Any]] = None):
+        self.clock = clock
+        self.interval = interval
+        self.function = function
+        self.args = args or []
+        self.cancelled = False
+
+    def start(self):
+        self.clock.schedule(self.interval, self._fire)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _fire(self):
+        if not self.cancelled:
+            self.function(*self.args)
+
+
+class VirtualClock:
+    """
+    Discrete-event clock with the interface of SystemClock.
+
+    Time only moves when run() pops the next event off the heap, so hours of
+    scheduling play out in seconds, and the same seed gives the same run.
+    Spawned work runs as an event at the current time instead of on a thread.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.events = []
+        self.sequence = itertools.count()
+        self.events_processed = 0
+
+    def time(self) -> float:
+        return self.now
+
+    def schedule(self, delay: float, function: Callable, args: Optional[List[Any]] = None):
+        """Call function(*args) delay seconds from now."""
+        heapq.heappush(self.events, (self.now + max(delay, 0.0), next(self.sequence), function, args or []))
+
+    def timer(self, interval: float, function: Callable, args: Optional[List[Any]] = None) -> VirtualTimer:
+        return VirtualTimer(self, interval, function, args)
+
+    def spawn(self, function: Callable, args: Optional[List[Any]] = None) -> VirtualTimer:
+        timer = VirtualTimer(self, 0.0, function, args)
+        timer.start()
+        return timer
+
+    def run(self, until: Optional[float] = None, on_event: Optional[Callable[[], None]] = None):
+        """
+        Process events in time order.
+
+        Args:
+            until: Stop before the first event later than this time
+            on_event: Called after every event (used to sample resource usage)
+        """
+        while self.events:
+            if until is not None and self.events[0][0] > until:
+                self.now = until
+                return
+            when, _, function, args = heapq.heappop(self.events)
+            self.now = when
+            function(*args)
+            self.events_processed += 1
+            if on_event:
+                on_event()
+
+
+class FakeSister:
+    """
+    A sister that answers phase work after a sampled delay.
+
+    Work waits in a FIFO queue for one of her slots (instances times
+    concurrency, as with the real work queues). How long a phase takes is drawn
+    from a lognormal distribution around the target class's typical runtime, so
+    big targets take longer, and replies can fail or get lost at the given rates.
+    """
+
+    def __init__(self, name: str, comm: "SimulatedComm", rng: random.Random, slots: int = 1,
+                 speed: float = 1.0, sigma: float = 0.5, error_rate: float = 0.0, loss_rate: float = 0.0):
+        """
+        Initialize the FakeSister.
+
+        Args:
+            name: The sister's name
+            comm: The SimulatedComm replies are delivered through
+            rng: Random source for delays, errors and losses
+            slots: Phases she works on at once
+            speed: Multiplier on phase durations (above 1 is slower)
+            sigma: Spread of the lognormal phase duration
+            error_rate: Probability that a phase reports an execution error
+            loss_rate: Probability that a phase never replies at all
+        """
+        self.name = name
+        self.comm = comm
+        self.rng = rng
+        self.slots = slots
+        self.speed = speed
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.loss_rate = loss_rate
+        self.waiting = deque()
+        self.busy = 0
+        self.stats = Counter()
+
+    def receive(self, work: Dict):
+        self.stats['received'] += 1
+        self.waiting.append(work)
+        self._start_next()
+
+    def _start_next(self):
+        while self.busy < self.slots and self.waiting:
+            work = self.waiting.popleft()
+            self.busy += 1
+            duration = self._sample_duration(work)
+            self.comm.clock.schedule(duration, self._finish, [work, duration])
+
+    def _sample_duration(self, work: Dict) -> float:
+        typical = DEFAULT_CLASS_RUNTIMES[classify_target(work['target'])]
+        mean = typical * PHASE_SHARES[ActionPhase(work['phase'])] * self.speed
+        # Lognormal with the given mean: mu = ln(mean) - sigma^2 / 2
+        return self.rng.lognormvariate(math.log(mean) - self.sigma ** 2 / 2, self.sigma)
+
+    def _finish(self, work: Dict, duration: float):
+        self.busy -= 1
+        self._start_next()
+
+        roll = self.rng.random()
+        if roll < self.loss_rate:
+            self.stats['lost'] += 1
+            return
+        reply = {
+            'action_id': work['action_id'],
+            'sister_name': self.name,
+            'phase': work['phase']
+        }
+        if roll < self.loss_rate + self.error_rate:
+            self.stats['errors'] += 1
+            reply.update({'error': "simulated tool failure", 'error_type': ErrorType.EXECUTION.value})
+            self.comm.deliver('action_error', reply)
+        else:
+            self.stats['completed'] += 1
+            reply.update({'status': 'completed', 'details': {'duration': duration}})
+            self.comm.deliver('action_status', reply)
+
+
+class SimulatedComm:
+    """
+    Stand-in for Seven's SisterCommManager.
+
+    execute_phase commands go to the fake sisters and their replies come back
+    through the same CommandHandler the real bus feeds; every other command is
+    counted and dropped.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.sister_name = "Seven"
+        self.command_handler = CommandHandler("Seven")
+        self.sisters: Dict[str, FakeSister] = {}
+        self.ignored = Counter()
+        self.handler_errors = 0
+
+    def send_command(self, target: str, command: str, args: Any = None):
+        sister = self.sisters.get(target)
+        if command == 'execute_phase' and sister:
+            self.clock.schedule(BUS_LATENCY, sister.receive, [dict(args)])
+        else:
+            self.ignored[command] += 1
+
+    def deliver(self, command: str, args: Dict):
+        self.clock.schedule(BUS_LATENCY, self._handle, [command, args])
+
+    def _handle(self, command: str, args: Dict):
+        response = self.command_handler.handle_command(command, args)
+        if isinstance(response, dict) and response.get('success') is False:
+            self.handler_errors += 1
+
+    def get_sister_load(self, sister_name: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        return None  # Seven's own accounting is all the simulated load there is
+
+    def get_instance_loads(self, sister_name: str, max_age: Optional[float] = None) -> Dict[str, Dict]:
+        return {}
+
+
+def generate_workload(count: int, rng: random.Random, action_types: List[str],
+                      arrival_rate: Optional[float] = None, duplicate_rate: float = 0.0) -> List[Dict]:
+    """
+    Generate a list of action requests.
+
+    Args:
+        count: Number of requests
+        rng: Random source
+        action_types: Action types to draw from
+        arrival_rate: Requests per second of a Poisson arrival stream;
+            None submits everything at time 0
+        duplicate_rate: Fraction of requests that repeat an earlier one
+
+    Returns:
+        List of dicts with 'time', 'action_type' and 'target'
+    """
+    classes = list(DEFAULT_TARGET_MIX)
+    weights = list(DEFAULT_TARGET_MIX.values())
+
+    def make_target(index: int, size_class: str) -> str:
+        octet_a, octet_b = divmod(index, 250)
+        return {
+            "ip": f"10.{octet_a % 250}.{octet_b}.7",
+            "host": f"api{index}.example.com",
+            "domain": f"example{index}.com",
+            "url": f"https://app{index}.example.com/login",
+            "wildcard": f"*.corp{index}.example",
+            "cidr-small": f"10.{octet_a % 250}.{octet_b}.0/29",
+            "cidr-medium": f"172.{16 + octet_a % 16}.{octet_b}.0/24",
+            "cidr-large": f"192.{octet_a % 250}.{octet_b}.0/22"
+        }[size_class]
+
+    workload = []
+    now = 0.0
+    for index in range(count):
+        if arrival_rate:
+            now += rng.expovariate(arrival_rate)
+        if workload and rng.random() < duplicate_rate:
+            earlier = rng.choice(workload)
+            workload.append({'time': now, 'action_type': earlier['action_type'], 'target': earlier['target']})
+            continue
+        size_class = rng.choices(classes, weights)[0]
+        workload.append({
+            'time': now,
+            'action_type': rng.choice(action_types),
+            'target': make_target(index, size_class)
+        })
+    return workload
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(len(ordered) * p / 100.0))
+    return ordered[rank - 1]
+
+
+def simulate(workload: List[Dict], ordering: str = "fifo", seed: int = 0,
+             config_path: str = DEFAULT_CONFIG_PATH, slots: int = 1,
+             speeds: Optional[Dict[str, float]] = None, sigma: float = 0.5,
+             error_rate: float = 0.0, loss_rate: float = 0.0,
+             max_running_actions: Optional[int] = None, singleflight: bool = False,
+             horizon: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run a workload through a real ActionManager on virtual time.
+
+    The ActionManager is the production class, configured from a copy of the
+    config with every sister enabled, in-memory duration history and the given
+    queue ordering; only the clock and the bus are simulated.
+
+    Args:
+        workload: Requests from generate_workload
+        ordering: Queue ordering policy name
+        seed: Seed for the sisters' delays, errors and losses
+        config_path: Config to base the run on
+        slots: Phase slots per sister
+        speeds: Duration multiplier per sister (default: 1.0 each)
+        sigma: Spread of phase durations
+        error_rate: Probability that a phase reports an execution error
+        loss_rate: Probability that a phase reply is lost
+        max_running_actions: Override for queue.max_running_actions
+        singleflight: Whether identical requests may share a run
+        horizon: Stop after this many virtual seconds (default: run to completion)
+
+    Returns:
+        Dict of metrics. Failed actions are counted separately (timed_out
+        and errored) and left out of makespan, throughput and latency, so
+        failures that end early don't make a policy look fast.
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config = copy.deepcopy(config)
+    for agent in config.get("agents", []):
+        agent["enabled"] = True
+    config.setdefault("queue", {})["ordering"] = ordering
+    if max_running_actions:
+        config["queue"]["max_running_actions"] = max_running_actions
+    config.setdefault("timeouts", {})["store_path"] = None
+    config.setdefault("singleflight", {})["enabled"] = singleflight
+
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    comm = SimulatedComm(clock)
+    previous_output_dir = output_handler.BASE_OUTPUT_DIR
+    threads_before = threading.active_count()
+    peak_threads = threads_before
+
+    with tempfile.TemporaryDirectory(prefix="7sisters-sim-") as workdir:
+        run_config_path = os.path.join(workdir, "seven_sisters.config.json")
+        with open(run_config_path, "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        output_handler.BASE_OUTPUT_DIR = os.path.join(workdir, "output")
+
+        try:
+            manager = ActionManager(run_config_path, clock=clock)
+            manager.setup(comm)
+            for agent in config.get("agents", []):
+                name = agent.get("name")
+                comm.sisters[name] = FakeSister(
+                    name, comm, rng, slots=slots, speed=(speeds or {}).get(name, 1.0),
+                    sigma=sigma, error_rate=error_rate, loss_rate=loss_rate
+                )
+
+            rejected = []
+
+            def submit(request: Dict):
+                # plan_action asks for confirmation, so assign the sisters without it
+                success, message, sisters = manager.assign_sisters(request['action_type'], request['target'])
+                if success:
+                    success, message = manager.execute_action(request['action_type'], request['target'], sisters)
+                if not success:
+                    rejected.append(message)
+
+            for request in workload:
+                clock.schedule(request['time'], submit, [request])
+
+            def sample():
+                nonlocal peak_threads
+                peak_threads = max(peak_threads, threading.active_count())
+
+            tracemalloc.start()
+            wall_start = time.perf_counter()
+            clock.run(until=horizon, on_event=sample)
+            wall_time = time.perf_counter() - wall_start
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            # Buffered log lines belong to the work directory, which is about to go
+            output_handler.close_output()
+            output_handler.BASE_OUTPUT_DIR = previous_output_dir
+
+    actions = list(manager.action_status.values())
+    finished = [a for a in actions if a['status'] in ('completed', 'failed')]
+    completed = [a for a in finished if a['status'] == 'completed']
+    failed = [a for a in finished if a['status'] == 'failed']
+    # A failure without a sister's error report is one the action's timeout gave up on
+    errored = [a for a in failed if any(status.get('error') for status in a['sister_status'].values())]
+    latencies = [a['completion_time'] - a['queued_time'] for a in completed]
+    waits = [a['start_time'] - a['queued_time'] for a in actions if a.get('start_time') is not None]
+    first_arrival = min((r['time'] for r in workload), default=0.0)
+    makespan = max((a['completion_time'] for a in completed), default=first_arrival) - first_arrival
+
+    return {
+        'ordering': ordering,
+        'requests': len(workload),
+        'actions': len(actions),
+        'rejected': len(rejected),
+        'completed': len(completed),
+        'failed': len(failed),
+        'timed_out': len(failed) - len(errored),
+        'errored': len(errored),
+        'unfinished': len(actions) - len(finished),
+        'makespan': makespan,
+        'throughput_per_hour': len(completed) / makespan * 3600 if makespan > 0 else 0.0,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p99': percentile(latencies, 99),
+        'wait_p50': percentile(waits, 50),
+        'wait_p99': percentile(waits, 99),
+        'phases_sent': sum(s.stats['received'] for s in comm.sisters.values()),
+        'phase_errors': sum(s.stats['errors'] for s in comm.sisters.values()),
+        'phases_lost': sum(s.stats['lost'] for s in comm.sisters.values()),
+        'handler_errors': comm.handler_errors,
+        'events': clock.events_processed,
+        'wall_seconds': wall_time,
+        'peak_threads': peak_threads,
+        'extra_threads': peak_threads - threads_before,
+        'peak_traced_mb': peak_memory / (1024 * 1024),
+        'rss_mb': psutil.Process().memory_info().rss / (1024 * 1024)
+    }
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    """Format simulation results as a table with one column per run."""
+    def seconds(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}s"
+
+    rows = [
+        ("ordering", lambda r: r['ordering']),
+        ("completed", lambda r: f"{r['completed']}/{r['actions']}"),
+        ("failed", lambda r: f"{r['failed']} ({r['timed_out']} timeouts)"),
+        ("unfinished", lambda r: str(r['unfinished'])),
+        ("makespan", lambda r: seconds(r['makespan'])),
+        ("throughput/h", lambda r: f"{r['throughput_per_hour']:.1f}"),
+        ("latency p50", lambda r: seconds(r['latency_p50'])),
+        ("latency p99", lambda r: seconds(r['latency_p99'])),
+        ("queue wait p50", lambda r: seconds(r['wait_p50'])),
+        ("queue wait p99", lambda r: seconds(r['wait_p99'])),
+        ("phases sent", lambda r: str(r['phases_sent'])),
+        ("phase errors", lambda r: str(r['phase_errors'])),
+        ("phases lost", lambda r: str(r['phases_lost'])),
+        ("handler errors", lambda r: str(r['handler_errors'])),
+        ("events", lambda r: str(r['events'])),
+        ("wall time", lambda r: f"{r['wall_seconds']:.2f}s"),
+        ("peak threads", lambda r: f"{r['peak_threads']} (+{r['extra_threads']})"),
+        ("peak traced", lambda r: f"{r['peak_traced_mb']:.1f} MB"),
+        ("rss", lambda r: f"{r['rss_mb']:.1f} MB")
+    ]
+    label_width = max(len(label) for label, _ in rows)
+    cells = [[render(r) for r in results] for _, render in rows]
+    column_width = max(len(cell) for row in cells for cell in row)
+    lines = []
+    for (label, _), row in zip(rows, cells):
+        lines.append(f"{label:<{label_width}}  " + "  ".join(f"{cell:>{column_width}}" for cell in row))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark ActionManager scheduling policies against simulated sisters on virtual time."
+    )
+    parser.add_argument("--actions", type=int, default=200, help="Number of requests (default: 200)")
+    parser.add_argument("--ordering", nargs="+", default=["fifo", "sejf", "ljf"],
+                        choices=sorted(ORDERING_POLICIES), help="Queue orderings to compare")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Poisson arrival rate in requests per second (default: all at once)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Phase error probability")
+    parser.add_argument("--loss-rate", type=float, default=0.0, help="Lost phase reply probability")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="Fraction of repeated requests")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Spread of phase durations")
+    parser.add_argument("--slots", type=int, default=1, help="Phase slots per sister")
+    parser.add_argument("--max-running", type=int, default=None, help="Override queue.max_running_actions")
+    parser.add_argument("--singleflight", action="store_true", help="Let identical requests share a run")
+    parser.add_argument("--horizon", type=float, default=None, help="Stop after this many virtual seconds")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed (default: 7)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="Config file to base the run on")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    action_types = ActionCatalog(args.config).names()
+    workload = generate_workload(args.actions, random.Random(args.seed), action_types, args.rate, args.duplicates)
+    results = [
+        simulate(workload, ordering=ordering, seed=args.seed, config_path=args.config, slots=args.slots,
+                 sigma=args.sigma, error_rate=args.error_rate, loss_rate=args.loss_rate,
+                 max_running_actions=args.max_running, singleflight=args.singleflight, horizon=args.horizon)
+        for ordering in args.ordering
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_report(results))
+        timed_out = max(r['timed_out'] for r in results)
+        if timed_out and not args.loss_rate:
+            print(f"\nUp to {timed_out} actions timed out with no replies lost: their action types' "
+                  f"timeouts in {args.config} are shorter than this workload's runtimes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@ import queue
 import logging
 import socket
 import os
-from typing import Dict, Any, Optional, Callable
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, Callable, List
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,10 +18,46 @@ logger = logging.getLogger('sister_comm')
 IPC_PORT = 5555
 IPC_ADDRESS = f"tcp://127.0.0.1:{IPC_PORT}"
 
+# Statuses and replies from the sisters reach Seven on a PULL socket she binds here:
+# a PUB socket only delivers to subscribers, so the sisters can't answer on the PUB bus
+REPLY_PORT = 5556
+REPLY_ADDRESS = f"tcp://127.0.0.1:{REPLY_PORT}"
+
 # Connection retry settings
 MAX_RETRIES = 3
 RETRY_DELAY = 1.0  # seconds
 
+# Phase work queues: one ROUTER per sister on Seven's side, shared by all of her instances
+WORK_QUEUE_BASE_PORT = 5600
+WORK_QUEUE_PORTS = {
+    "Seven": 0,
+    "Harley": 1,
+    "Alice": 2,
+    "Marla": 3,
+    "Luna": 4,
+    "Lisbeth": 5,
+    "Bride": 6
+}
+
+# Environment variable summon.py uses to name each instance of a sister (e.g. "Alice-2")
+INSTANCE_ENV_VAR = "SISTER_INSTANCE"
+CONCURRENCY_ENV_VAR = "SISTER_CONCURRENCY"
+
+def get_work_queue_address(sister_name: str) -> str:
+    """Get the address of a sister's phase work queue."""
+    return f"tcp://127.0.0.1:{WORK_QUEUE_BASE_PORT + WORK_QUEUE_PORTS[sister_name]}"
+
+def get_instance_id(sister_name: str) -> str:
+    """Get this process's instance ID; a single instance is just the sister's name."""
+    return os.environ.get(INSTANCE_ENV_VAR, sister_name)
+
+def get_instance_concurrency() -> int:
+    """Get how many phases this instance may work on at once (set by summon.py)."""
+    try:
+        return max(1, int(os.environ.get(CONCURRENCY_ENV_VAR, 1)))
+    except ValueError:
+        return 1
+
 class SisterStatusManager:
     """Manages sister status information."""
     def __init__(self):
@@ -128,13 +166,16 @@ class CommandHandler:
 
 class SisterCommManager:
     """Manages communication between sisters."""
-    def __init__(self, sister_name: str):
+    def __init__(self, sister_name: str, instance_id: Optional[str] = None):
         self.sister_name = sister_name
-        self.pub_socket = None
+        self.instance_id = instance_id or get_instance_id(sister_name)
+        self.send_socket = None
         self.sub_socket = None
+        self.reply_socket = None  # Seven only
         self.running = False
         self.message_queue = queue.Queue()
         self.status_cache: Dict[str, str] = {}
+        self.load_cache: Dict[str, Dict] = {}
         self.error_handler = ErrorHandler(MAX_RETRIES, RETRY_DELAY)
         self.command_handler = CommandHandler(sister_name)
         self.status_manager = SisterStatusManager()
@@ -159,14 +200,10 @@ class SisterCommManager:
         if message.sender == "Seven":  # Only accept termination from Seven
             self.termination_signal_received = True
             self.running = False
-            return Message(
-                type="response",
-                data={"status": "success", "message": "Termination signal received"}
-            )
-        return Message(
-            type="response",
-            data={"status": "error", "message": "Unauthorized termination attempt"}
-        )
+            return Message('response', self.sister_name, message.sender,
+                           {"status": "success", "message": "Termination signal received"})
+        return Message('response', self.sister_name, message.sender,
+                       {"status": "error", "message": "Unauthorized termination attempt"})
 
     def setup(self):
         """Set up IPC connections."""
@@ -204,22 +241,24 @@ class SisterCommManager:
         try:
             context = zmq.Context()
             
-            # Create SUB socket for receiving messages
+            # Create SUB socket for receiving messages (Seven hears her own, e.g. commands to herself)
             self.sub_socket = context.socket(zmq.SUB)
             self.sub_socket.setsockopt_string(zmq.SUBSCRIBE, "")
             self.sub_socket.connect(IPC_ADDRESS)
             
-            # Create PUB socket for sending messages
-            self.pub_socket = context.socket(zmq.PUB)
-            # Only Seven should bind the PUB socket, others should connect
             if self.sister_name == "Seven":
-                self.pub_socket.bind(IPC_ADDRESS)
+                # Seven publishes to every sister and collects their replies
+                self.send_socket = context.socket(zmq.PUB)
+                self.send_socket.bind(IPC_ADDRESS)
+                self.reply_socket = context.socket(zmq.PULL)
+                self.reply_socket.bind(REPLY_ADDRESS)
             else:
-                self.pub_socket.connect(IPC_ADDRESS)
+                # Everything a sister sends is for Seven
+                self.send_socket = context.socket(zmq.PUSH)
+                self.send_socket.connect(REPLY_ADDRESS)
             
             # Set socket options
-            self.sub_socket.setsockopt(zmq.RCVTIMEO, 1000)  # 1 second timeout
-            self.pub_socket.setsockopt(zmq.SNDTIMEO, 1000)  # 1 second timeout
+            self.send_socket.setsockopt(zmq.SNDTIMEO, 1000)  # 1 second timeout
             
             return True
         except Exception as e:
@@ -230,10 +269,18 @@ class SisterCommManager:
         """Listen for incoming messages."""
         while self.running and not self.termination_signal_received:
             try:
-                if self.sub_socket:
-                    message = self.sub_socket.recv_json()
+                poller = zmq.Poller()
+                for sock in (self.sub_socket, self.reply_socket):
+                    if sock is not None and not sock.closed:
+                        poller.register(sock, zmq.POLLIN)
+                if not poller.sockets:
+                    time.sleep(0.1)
+                    continue
+                for sock, _ in poller.poll(1000):  # 1 second timeout
+                    message = sock.recv_json()
                     if message:
                         self.message_queue.put(message)
+                        self._dispatch_message(message)
                         
                         # Handle initialization message
                         if message.get("type") == "status" and message.get("data", {}).get("status") == "ready":
@@ -248,13 +295,44 @@ class SisterCommManager:
                 self.error_handler.handle_error("message_listener", str(e))
                 time.sleep(1)
 
+    def _dispatch_message(self, message: Dict):
+        """Route an incoming message to the status cache or to the command handlers."""
+        msg_type = message.get("type")
+        sender = message.get("sender")
+        
+        if msg_type == "status" and sender:
+            content = message.get("content")
+            if isinstance(content, dict):
+                # Status with load information (see send_status), kept per instance
+                instance = content.get("instance", sender)
+                self.load_cache[instance] = dict(content, sister=sender,
+                                                 timestamp=message.get("timestamp", time.time()))
+                content = content.get("status")
+            self.status_cache[sender] = content
+            self.status_manager.update_status(sender, content)
+        elif msg_type == "command" and message.get("target") in (self.sister_name, self.instance_id, "all"):
+            content = message.get("content") or {}
+            if content.get("command") == "terminate":
+                # Termination needs the sender, which command handlers don't get
+                self._handle_termination(Message('command', sender, message.get("target"), content))
+                return
+            # Run handlers off the listener thread so a long tool run
+            # doesn't block pause/resume or status commands behind it
+            threading.Thread(
+                target=self.command_handler.handle_command,
+                args=(content.get("command"), content.get("args")),
+                daemon=True
+            ).start()
+
     def cleanup(self):
         """Clean up resources."""
         self.running = False
         if self.sub_socket:
             self.sub_socket.close()
-        if self.pub_socket:
-            self.pub_socket.close()
+        if self.send_socket:
+            self.send_socket.close()
+        if self.reply_socket:
+            self.reply_socket.close()
         if hasattr(self, 'listener_thread'):
             self.listener_thread.join(timeout=1)
         
@@ -271,11 +349,11 @@ class SisterCommManager:
     def send_message(self, message: Message):
         """Send a message through the IPC system."""
         try:
-            if not self.pub_socket or self.pub_socket.closed:
-                logger.warning(f"{self.sister_name} pub socket is closed, attempting to reconnect before sending")
+            if not self.send_socket or self.send_socket.closed:
+                logger.warning(f"{self.sister_name} send socket is closed, attempting to reconnect before sending")
                 self._connect_socket()
             
-            self.pub_socket.send_string(message.to_json())
+            self.send_socket.send_string(message.to_json())
         except zmq.error.ZMQError as e:
             if e.errno == zmq.ECONNRESET or e.errno == zmq.ECONNREFUSED:
                 logger.warning(f"{self.sister_name} connection reset or refused while sending: {e}")
@@ -283,7 +361,7 @@ class SisterCommManager:
                 self._connect_socket()
                 # Try one more time after reconnecting
                 try:
-                    self.pub_socket.send_string(message.to_json())
+                    self.send_socket.send_string(message.to_json())
                 except Exception as retry_e:
                     logger.error(f"Failed to send message after reconnection: {retry_e}")
             else:
@@ -292,9 +370,19 @@ class SisterCommManager:
             if not self.error_handler.handle_error('connection', e):
                 logger.error(f"Failed to send message: {e}")
     
-    def send_status(self, status: str):
-        """Send a status update."""
-        message = Message('status', self.sister_name, 'all', status)
+    def send_status(self, status: str, load: Optional[Dict] = None):
+        """
+        Send a status update.
+        
+        Args:
+            status: The sister's status (e.g. "ready", "busy")
+            load: Optional workload details such as {'in_flight': 2}
+        """
+        if load is None and self.instance_id == self.sister_name:
+            content = status
+        else:
+            content = dict(load or {}, status=status, instance=self.instance_id)
+        message = Message('status', self.sister_name, 'all', content)
         self.send_message(message)
     
     def send_command(self, target: str, command: str, args: Any = None):
@@ -309,6 +397,26 @@ class SisterCommManager:
         """Get the cached status of a sister."""
         return self.status_cache.get(sister_name)
     
+    def get_instance_loads(self, sister_name: str, max_age: Optional[float] = None) -> Dict[str, Dict]:
+        """Get the last workload reported by each instance of a sister."""
+        now = time.time()
+        return {
+            instance: load for instance, load in list(self.load_cache.items())
+            if load.get("sister") == sister_name and
+            (max_age is None or now - load.get("timestamp", 0) <= max_age)
+        }
+    
+    def get_sister_load(self, sister_name: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """Get the combined workload reported by all instances of a sister, if any."""
+        loads = self.get_instance_loads(sister_name, max_age)
+        if not loads:
+            return None
+        return {
+            'in_flight': sum(load.get('in_flight', 0) for load in loads.values()),
+            'instances': len(loads),
+            'timestamp': max(load.get('timestamp', 0) for load in loads.values())
+        }
+    
     def _handle_status_command(self, args: Dict):
         """Handle a status command."""
         # Implementation of _handle_status_command method
@@ -352,4 +460,221 @@ class SisterCommManager:
     def _handle_level_change(self, args: Dict):
         """Handle a level change command."""
         # Implementation of _handle_level_change method
-        pass 
\ No newline at end of file
+        pass
+
+
+class PhaseWorkBroker:
+    """
+    Seven's side of the phase work queues.
+
+    Every sister gets a ROUTER socket that all of her instances connect to with a
+    DEALER. An instance sends a "ready" message for every free work slot it has,
+    and the broker only hands work to instances holding such a credit. Load is
+    therefore balanced by actual availability, and work that no instance can take
+    yet waits in a per-sister backlog.
+    """
+
+    def __init__(self, sister_names: Optional[List[str]] = None, poll_interval: float = 0.1):
+        self.sister_names = sister_names or list(WORK_QUEUE_PORTS)
+        self.poll_interval = poll_interval
+        self.context = zmq.Context.instance()
+        self.sockets: Dict[str, Any] = {}
+        self.pending: Dict[str, deque] = {name: deque() for name in self.sister_names}
+        self.ready: Dict[str, deque] = {name: deque() for name in self.sister_names}
+        self.instances: Dict[str, Dict] = {}
+        self.retired = set()
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Bind the work queues and start the broker thread."""
+        for name in self.sister_names:
+            router = self.context.socket(zmq.ROUTER)
+            router.setsockopt(zmq.ROUTER_MANDATORY, 1)
+            router.setsockopt(zmq.LINGER, 0)
+            router.bind(get_work_queue_address(name))
+            self.sockets[name] = router
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the broker thread and close the work queues."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        for router in self.sockets.values():
+            router.close()
+        self.sockets.clear()
+
+    def submit(self, sister_name: str, work: Dict) -> bool:
+        """
+        Queue phase work for whichever instance of a sister is free first.
+
+        Returns:
+            False if the sister has no work queue, True otherwise
+        """
+        if sister_name not in self.pending:
+            return False
+        with self.lock:
+            self.pending[sister_name].append(work)
+        return True
+
+    def get_backlog(self, sister_name: str) -> int:
+        """Number of work items waiting for a free instance of a sister."""
+        with self.lock:
+            return len(self.pending.get(sister_name, ()))
+
+    def get_instances(self, sister_name: str) -> Dict[str, Dict]:
+        """Instances of a sister that have connected to her work queue."""
+        with self.lock:
+            return {
+                instance: dict(info) for instance, info in self.instances.items()
+                if info['sister'] == sister_name
+            }
+
+    def forget_instance(self, instance_id: str):
+        """Stop handing work to an instance that is being shut down."""
+        identity = instance_id.encode()
+        with self.lock:
+            self.retired.add(instance_id)
+            info = self.instances.pop(instance_id, None)
+            if info:
+                ready = self.ready[info['sister']]
+                self.ready[info['sister']] = deque(i for i in ready if i != identity)
+
+    def _run(self):
+        poller = zmq.Poller()
+        for router in self.sockets.values():
+            poller.register(router, zmq.POLLIN)
+        names_by_socket = {router: name for name, router in self.sockets.items()}
+
+        while self.running:
+            try:
+                events = dict(poller.poll(int(self.poll_interval * 1000)))
+                for router, name in names_by_socket.items():
+                    if router in events:
+                        self._receive(name, router)
+                for name in self.sister_names:
+                    self._dispatch(name)
+            except zmq.ZMQError as e:
+                if not self.running:
+                    break
+                logger.error(f"Work broker error: {e}")
+                time.sleep(RETRY_DELAY)
+
+    def _receive(self, sister_name: str, router):
+        """Drain ready messages from a sister's instances."""
+        while True:
+            try:
+                frames = router.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            try:
+                identity, _, payload = frames
+                message = json.loads(payload)
+                instance = identity.decode()
+                if not isinstance(message, dict):
+                    raise ValueError(f"expected an object, got {type(message).__name__}")
+            except ValueError as e:
+                # One bad frame shouldn't take the broker down; drop it and carry on
+                logger.warning(f"Dropping malformed work queue message for {sister_name}: {e}")
+                continue
+            with self.lock:
+                if instance in self.retired:
+                    continue
+                info = self.instances.setdefault(instance, {'sister': sister_name, 'dispatched': 0})
+                info['last_seen'] = time.time()
+                if message.get('type') == 'ready':
+                    self.ready[sister_name].append(identity)
+
+    def _dispatch(self, sister_name: str):
+        """Hand pending work to instances that have a free slot."""
+        router = self.sockets[sister_name]
+        while True:
+            with self.lock:
+                if not self.pending[sister_name] or not self.ready[sister_name]:
+                    return
+                work = self.pending[sister_name].popleft()
+                identity = self.ready[sister_name].popleft()
+            try:
+                router.send_multipart([identity, b"", json.dumps(work).encode()])
+                with self.lock:
+                    self.instances[identity.decode()]['dispatched'] += 1
+            except zmq.ZMQError:
+                # The instance went away since it said it was ready; give the work to someone else
+                with self.lock:
+                    self.pending[sister_name].appendleft(work)
+                    self.instances.pop(identity.decode(), None)
+
+
+class PhaseWorkConsumer:
+    """
+    A sister instance's side of her phase work queue.
+    Asks the broker for one work item per free slot and runs each item on its own thread.
+    A handler may return a concurrent.futures.Future to keep its slot until the future is done.
+    """
+
+    def __init__(self, sister_name: str, instance_id: str, handler: Callable[[Dict], Any],
+                 max_in_flight: int = 1):
+        self.sister_name = sister_name
+        self.instance_id = instance_id
+        self.handler = handler
+        self.max_in_flight = max(1, max_in_flight)
+        self.slots = threading.BoundedSemaphore(self.max_in_flight)
+        self.context = zmq.Context.instance()
+        self.socket = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Connect to the sister's work queue and start pulling work."""
+        self.socket = self.context.socket(zmq.DEALER)
+        self.socket.setsockopt(zmq.IDENTITY, self.instance_id.encode())
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(get_work_queue_address(self.sister_name))
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop pulling work. Work items already running are left to finish."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        if self.socket:
+            self.socket.close()
+
+    def _run(self):
+        while self.running:
+            # Only ask for work when there is a free slot to run it in
+            if not self.slots.acquire(timeout=0.5):
+                continue
+            try:
+                self.socket.send_multipart([b"", json.dumps({'type': 'ready', 'instance': self.instance_id}).encode()])
+                work = None
+                while self.running and work is None:
+                    if self.socket.poll(500):
+                        _, payload = self.socket.recv_multipart()
+                        work = json.loads(payload)
+            except zmq.ZMQError as e:
+                logger.error(f"{self.instance_id} work queue error: {e}")
+                work = None
+            if work is None:
+                self.slots.release()
+                continue
+            threading.Thread(target=self._run_work, args=(work,), daemon=True).start()
+
+    def _run_work(self, work: Dict):
+        result = None
+        try:
+            result = self.handler(work)
+        except Exception as e:
+            logger.error(f"{self.instance_id} failed to run work item: {e}")
+        # A handler that hands the work off (e.g. to the tool executor) returns a
+        # future; the slot stays taken until it is done
+        if isinstance(result, Future):
+            result.add_done_callback(lambda _: self.slots.release())
+        else:
+            self.slots.release()
@@ -0,0 +1,3 @@
+def normalize_target(target: str) -> str:
+    """Normalize a target so trivially different spellings of it compare equal."""
+    return target.strip().lower().rstrip("/").rstrip(".")
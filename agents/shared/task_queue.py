@@ -0,0 +1,177 @@
+import math
+import time
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Tuple, Type
+
+# Seconds of waiting that are worth one priority level
+DEFAULT_AGING_SECONDS = 60.0
+
+
+class ActionPriority(Enum):
+    """Enum for action priorities. Lower values are dispatched first."""
+    URGENT = 0
+    HIGH = 1
+    NORMAL = 2
+    BULK = 3
+
+    @classmethod
+    def from_name(cls, name: str) -> "ActionPriority":
+        """Look up a priority by its (case-insensitive) name."""
+        try:
+            return cls[name.upper()]
+        except KeyError:
+            raise ValueError(f"Unknown priority: {name}. Valid priorities are: "
+                             f"{', '.join(p.name.lower() for p in cls)}")
+
+
+@dataclass
+class QueuedAction:
+    """An action waiting for a free execution slot."""
+    action_id: str
+    action_type: str
+    target: str
+    priority: ActionPriority
+    enqueued_at: float = field(default_factory=time.time)
+    resume: bool = False  # True when the action already started and was paused or preempted
+    expected_runtime: float = 0.0  # Seconds, from the RuntimePredictor
+
+
+class OrderingPolicy:
+    """
+    Decides the order of actions within the queue.
+
+    A policy turns an entry into a sort key that never changes after insertion,
+    so the heap stays valid. The key is a tuple led by the entry's aged
+    priority class (priority * aging + enqueue time, in whole aging intervals).
+    Policies may only reorder entries within a class, e.g. by expected
+    runtime, so a runtime estimate can never outweigh a priority level and no
+    entry can be overtaken indefinitely.
+    """
+    name = "fifo"
+    description = "first in, first out"
+
+    @staticmethod
+    def priority_class(item: "QueuedAction", aging_seconds: float) -> int:
+        """The aging interval the entry falls in; lower classes run first."""
+        return math.floor(OrderingPolicy.position(item, aging_seconds) / aging_seconds)
+
+    @staticmethod
+    def position(item: "QueuedAction", aging_seconds: float) -> float:
+        """Where the entry stands by priority and waiting alone."""
+        return item.priority.value * aging_seconds + item.enqueued_at
+
+    def sort_key(self, item: "QueuedAction", aging_seconds: float) -> Tuple:
+        return (self.priority_class(item, aging_seconds), self.position(item, aging_seconds))
+
+
+class ShortestExpectedFirstPolicy(OrderingPolicy):
+    """Shortest expected job first: minimizes mean completion time, so results come back sooner."""
+    name = "sejf"
+    description = "shortest expected job first"
+
+    def sort_key(self, item: "QueuedAction", aging_seconds: float) -> Tuple:
+        return (self.priority_class(item, aging_seconds), item.expected_runtime,
+                self.position(item, aging_seconds))
+
+
+class LargestFirstPolicy(OrderingPolicy):
+    """Largest expected job first: starts the long jobs early so a wave packs tightly."""
+    name = "ljf"
+    description = "largest expected job first"
+
+    def sort_key(self, item: "QueuedAction", aging_seconds: float) -> Tuple:
+        return (self.priority_class(item, aging_seconds), -item.expected_runtime,
+                self.position(item, aging_seconds))
+
+
+ORDERING_POLICIES: Dict[str, Type[OrderingPolicy]] = {
+    policy.name: policy for policy in (OrderingPolicy, ShortestExpectedFirstPolicy, LargestFirstPolicy)
+}
+
+
+def get_ordering_policy(name: str) -> OrderingPolicy:
+    """Create an ordering policy by its (case-insensitive) name."""
+    try:
+        return ORDERING_POLICIES[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown ordering: {name}. Valid orderings are: {', '.join(ORDERING_POLICIES)}")
+
+
+class ActionQueue:
+    """
+    Thread-safe priority queue of pending actions with aging.
+
+    Every waiting action gains one priority level per aging interval, so bulk
+    work is never starved by a steady stream of higher-priority actions. Since all
+    entries age at the same rate, the ordering key (priority * aging + enqueue
+    time, ordered within a class by the ordering policy) never changes after insertion and a
+    plain heap is enough.
+    """
+
+    def __init__(self, aging_seconds: float = DEFAULT_AGING_SECONDS,
+                 policy: Optional[OrderingPolicy] = None):
+        self.aging_seconds = aging_seconds
+        self.policy = policy or OrderingPolicy()
+        self._heap = []
+        self._entries: Dict[str, list] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _sort_key(self, item: QueuedAction) -> Tuple:
+        return self.policy.sort_key(item, self.aging_seconds)
+
+    def put(self, item: QueuedAction):
+        """Add an action to the queue, replacing any entry with the same ID."""
+        with self._lock:
+            if item.action_id in self._entries:
+                self._entries.pop(item.action_id)[-1] = None
+            entry = [self._sort_key(item), next(self._counter), item]
+            self._entries[item.action_id] = entry
+            heapq.heappush(self._heap, entry)
+
+    def pop(self) -> Optional[QueuedAction]:
+        """Remove and return the action that should run next, or None if empty."""
+        with self._lock:
+            while self._heap:
+                _, _, item = heapq.heappop(self._heap)
+                if item is not None:
+                    del self._entries[item.action_id]
+                    return item
+            return None
+
+    def peek(self) -> Optional[QueuedAction]:
+        """Return the action that would run next without removing it."""
+        with self._lock:
+            while self._heap and self._heap[0][-1] is None:
+                heapq.heappop(self._heap)
+            return self._heap[0][-1] if self._heap else None
+
+    def remove(self, action_id: str) -> Optional[QueuedAction]:
+        """Remove an action from the queue. Removed entries are skipped lazily by pop()."""
+        with self._lock:
+            entry = self._entries.pop(action_id, None)
+            if entry is None:
+                return None
+            item = entry[-1]
+            entry[-1] = None
+            return item
+
+    def effective_priority(self, item: QueuedAction, now: Optional[float] = None) -> float:
+        """Priority of an entry after aging (may go below zero for long-waiting actions)."""
+        waited = (now if now is not None else time.time()) - item.enqueued_at
+        return item.priority.value - waited / self.aging_seconds
+
+    def snapshot(self) -> List[QueuedAction]:
+        """List the queued actions in dispatch order."""
+        with self._lock:
+            return [entry[-1] for entry in sorted(self._entries.values())]
+
+    def __contains__(self, action_id: str) -> bool:
+        return action_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,578 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from output_handler import init_output_dir, write_output
+from agents.shared.admission import CONFIG_PATH, ToolCost, TicketLedger
+from agents.shared.deltas import ResultDelta, get_delta_tracker
+from agents.shared.output_stream import OutputPump, OutputSink
+from agents.shared.parsers import (RECORDS_NAME, RecordParserSink, RecordWriter, get_parser,
+                                   get_parser_registry, record_source)
+from agents.shared.result_cache import CacheEntry, CaptureSink, get_result_cache
+from agents.shared.run_dirs import RunDirectory, get_run_directories
+from agents.shared.tool_runner import ToolExitError, ToolTimeoutError, run_tool_process_async, tool_name
+
+# Defaults used when the config has no "executor" section
+DEFAULT_EXECUTOR = {
+    "max_concurrent": 32,
+    "per_sister": 4,
+    "callback_threads": 4,
+    "sisters": {},
+    "host_wide": True,  # Apply the limits across every sister process on the host
+    "poll_interval": 0.5  # Seconds between checks for a free host-wide slot
+}
+
+# Host-wide ledger of running executor jobs (see HostSlots)
+SLOT_LEDGER_DIR = os.path.join(os.path.expanduser("~"), ".7sisters", "executor")
+
+
+class HostSlots:
+    """
+    Executor slots shared by every sister process on the host.
+
+    Each sister (and each instance of one) is its own process with its own
+    executor, which only sees its own jobs. A job that starts also takes a
+    ticket in a host-wide ledger (see admission.TicketLedger), and it only
+    may while the tickets on the host stay within max_concurrent and within
+    its sister's limit.
+    """
+
+    def __init__(self, directory: str = SLOT_LEDGER_DIR):
+        self.ledger = TicketLedger(directory)
+
+    def try_acquire(self, job: "ToolJob", sister_limit: int, max_concurrent: int) -> Optional[Dict]:
+        """Take a slot for a job if one is free; returns its ticket, or None."""
+        with self.ledger.locked():
+            tickets = self.ledger.tickets()
+            sister_jobs = sum(1 for ticket in tickets if ticket.get("sister") == job.sister_name)
+            if len(tickets) >= max_concurrent or sister_jobs >= sister_limit:
+                return None
+            return self.ledger.add(job.tool, job.key, ToolCost(), sister=job.sister_name)
+
+    def release(self, ticket: Optional[Dict]):
+        if ticket is not None:
+            self.ledger.remove(ticket)
+
+
+class ToolJob:
+    """
+    A tool run submitted to the ToolExecutor.
+
+    The job's future resolves to the tool's exit code (0), or raises the
+    error that ended it (ToolExitError for a non-zero exit, ToolTimeoutError
+    past a deadline); it is cancelled when the job is. state is "queued",
+    "running", "done", "failed", "timeout" or "cancelled".
+    cached is the cache entry the result came from, if it wasn't run; delta
+    is what changed in the results since the previous run of a tracked tool;
+    run_dir is the directory the tool ran in and artifacts what it left there;
+    records counts the records parsed from its output, by kind.
+    """
+
+    def __init__(self, sister_name: str, command: List[str], key: str, cwd: Optional[str],
+                 tool: Optional[str], sinks: Optional[List[OutputSink]], deadline: Optional[float],
+                 target: Optional[str] = None, use_cache: bool = True, run_id: Optional[str] = None,
+                 incremental: bool = True):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.sister_name = sister_name
+        self.command = command
+        self.key = key
+        self.cwd = cwd
+        self.tool = tool or tool_name(command)
+        self.sinks = sinks
+        self.deadline = deadline
+        self.target = target
+        self.use_cache = use_cache
+        self.run_id = run_id
+        self.incremental = incremental
+        self.run_dir: Optional[RunDirectory] = None
+        self.artifacts: List[Dict] = []
+        self.records: Dict[str, int] = {}
+        self.cached: Optional[CacheEntry] = None
+        self.delta: Optional[ResultDelta] = None
+        self.state = "queued"
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = Future()
+        self.task = None  # asyncio.Task, only touched on the executor's loop
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.state == "done"
+
+    def result(self, timeout: Optional[float] = None) -> int:
+        """Wait for the tool to exit cleanly (raises what ended the job, or CancelledError)."""
+        return self.future.result(timeout)
+
+    def add_done_callback(self, callback: Callable[["ToolJob"], None]):
+        """
+        Call callback(job) once the job has finished, failed or been cancelled
+        (straight away if it already has). Callbacks run on the executor's
+        callback threads, never on its event loop.
+        """
+        self.future.add_done_callback(lambda _: callback(self))
+
+    def describe(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'sister_name': self.sister_name,
+            'tool': self.tool,
+            'key': self.key,
+            'state': self.state,
+            'cached': self.cached is not None,
+            'run_dir': self.run_dir.path if self.run_dir else None,
+            'waited': (self.started or time.time()) - self.submitted,
+            'running': time.time() - self.started if self.started and not self.finished else None
+        }
+
+
+class ToolExecutor:
+    """
+    Runs tool jobs as asyncio subprocesses on one event loop thread.
+
+    Sisters submit jobs and get a ToolJob back straight away, so a sister can
+    have many tools running while her command handlers keep answering. At
+    most max_concurrent jobs run at once, and at most the sister's limit
+    ("sisters" entry, else per_sister) for each sister; the rest wait in
+    submission order. Every sister process has its own executor, so with
+    host_wide on the limits also hold across processes (see HostSlots).
+    Jobs of a paused key (see pause_key) don't start until it is resumed. Every run still goes through the host's admission
+    controller and gets its tool's OS limits and deadline (see
+    tool_runner.py); a job may also have a deadline of its own, counted from
+    submission.
+
+    Runs of tools the result cache covers are answered from it when it has
+    an unexpired result (see result_cache.py) and stored in it when they
+    succeed. For the tools the delta tracker covers, each successful run is
+    diffed against the previous one (see deltas.py).
+
+    Jobs with a target and no working directory of their own run in a fresh
+    run directory, output/<target>/<run-id>/<sister>/, and what they leave
+    there is indexed afterwards (see run_dirs.py), so runs never share a
+    working directory. Output of tools with known formats is parsed into
+    records as it streams and from the files they leave (see parsers.py),
+    into the run directory's records.jsonl.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, ledger_dir: str = SLOT_LEDGER_DIR):
+        """
+        Initialize the ToolExecutor.
+
+        Args:
+            config: The "executor" config section
+            ledger_dir: Directory of the host-wide slot ledger
+        """
+        config = config or {}
+        self.config = dict(DEFAULT_EXECUTOR, **config)
+        self.max_concurrent = max(1, self.config["max_concurrent"])
+        self.jobs: Dict[str, ToolJob] = {}
+        self.completed_count = 0
+        self.lock = threading.Lock()
+        self.loop = None
+        self.thread = None
+        self.global_slots = None
+        self.sister_slots: Dict[str, asyncio.Semaphore] = {}
+        self.host_slots = HostSlots(ledger_dir) if self.config["host_wide"] else None
+        # Paused keys and the events set when they are resumed; only touched on the loop
+        self.paused_keys: Dict[str, asyncio.Event] = {}
+        # Jobs are completed here so their callbacks can take their time without stalling the loop
+        self.callback_pool = ThreadPoolExecutor(max_workers=max(1, self.config["callback_threads"]),
+                                                thread_name_prefix="tool-callbacks")
+
+    def sister_limit(self, sister_name: str) -> int:
+        """How many jobs a sister may have running at once."""
+        return max(1, self.config["sisters"].get(sister_name, self.config["per_sister"]))
+
+    def start(self):
+        """Start the event loop thread (submit does this on first use)."""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            # Admission waits and sink joins block, so give them a thread per possible job
+            self.loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                              thread_name_prefix="tool-executor"))
+            ready = threading.Event()
+            self.thread = threading.Thread(target=self._run_loop, args=(ready,), name="tool-executor", daemon=True)
+            self.thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        self.global_slots = asyncio.Semaphore(self.max_concurrent)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def submit(self, sister_name: str, command: List[str], key: str, cwd: Optional[str] = None,
+               tool: Optional[str] = None, sinks: Optional[List[OutputSink]] = None,
+               deadline: Optional[float] = None,
+               callback: Optional[Callable[[ToolJob], None]] = None,
+               target: Optional[str] = None, use_cache: bool = True,
+               run_id: Optional[str] = None, incremental: bool = True) -> ToolJob:
+        """
+        Queue a tool run and return without waiting for it.
+
+        Args:
+            sister_name: The sister the run is for (her concurrency limit applies)
+            command: The command line to run, e.g. ["bash", "tools/alice_recon.sh", target]
+            key: Registry key for the run, normally the action ID (see pause_tool/resume_tool)
+            cwd: Working directory for the tool (defaults to a run directory if
+                there is a target, else the current directory)
+            tool: Tool name for its cost and limits (defaults to the script name)
+            sinks: Consumers of the tool's output lines, e.g. from tool_output_sinks()
+            deadline: Seconds from now after which the job is cancelled, queued or not
+            callback: Called with the job once it has finished (see ToolJob.add_done_callback)
+            target: The run's target; needed for the result cache
+            use_cache: Set to False to run the tool even if a cached result exists
+                (the new result is still cached)
+            run_id: The run the job is part of, normally the action ID; it names
+                the run directory (a new one is made up if None)
+            incremental: Set to False for runs whose results aren't the tool's
+                whole result set for the target (e.g. one URL of it), so they
+                are not diffed against the previous run
+
+        Returns:
+            The ToolJob
+        """
+        self.start()
+        job = ToolJob(sister_name, command, key, cwd, tool, sinks, deadline, target, use_cache, run_id,
+                      incremental)
+        if callback:
+            job.add_done_callback(callback)
+        with self.lock:
+            self.jobs[job.job_id] = job
+        self.loop.call_soon_threadsafe(self._schedule, job)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job; a running tool's process group is terminated.
+
+        Returns:
+            True if the job was found and hadn't finished yet
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None or job.done():
+            return False
+        self.loop.call_soon_threadsafe(self._cancel, job)
+        return True
+
+    def cancel_key(self, key: str) -> int:
+        """Cancel every unfinished job with the given key (e.g. all runs of an action)."""
+        with self.lock:
+            job_ids = [job.job_id for job in self.jobs.values() if job.key == key]
+        cancelled = sum(1 for job_id in job_ids if self.cancel(job_id))
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resume_key, key)
+        return cancelled
+
+    def pause_key(self, key: str) -> int:
+        """
+        Hold back the jobs with the given key that haven't started yet, until
+        resume_key. Running tools are paused separately (see tool_runner.pause_tool).
+
+        Returns:
+            How many unfinished jobs the key has
+        """
+        self.start()
+        self.loop.call_soon_threadsafe(self._pause_key, key)
+        return self._count_key(key)
+
+    def resume_key(self, key: str) -> int:
+        """
+        Let the held-back jobs of a key start.
+
+        Returns:
+            How many unfinished jobs the key has
+        """
+        self.start()
+        self.loop.call_soon_threadsafe(self._resume_key, key)
+        return self._count_key(key)
+
+    def _count_key(self, key: str) -> int:
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job.key == key)
+
+    def get_status(self) -> Dict:
+        """Running and queued jobs, per-sister counts and the limits."""
+        with self.lock:
+            jobs = [job.describe() for job in self.jobs.values()]
+            completed = self.completed_count
+        per_sister = {}
+        for job in jobs:
+            counts = per_sister.setdefault(job['sister_name'], {'running': 0, 'queued': 0})
+            counts[job['state']] = counts.get(job['state'], 0) + 1
+        return {
+            'running': [job for job in jobs if job['state'] == "running"],
+            'queued': [job for job in jobs if job['state'] == "queued"],
+            'sisters': per_sister,
+            'completed': completed,
+            'max_concurrent': self.max_concurrent
+        }
+
+    def _pause_key(self, key: str):
+        self.paused_keys.setdefault(key, asyncio.Event())
+
+    def _resume_key(self, key: str):
+        resumed = self.paused_keys.pop(key, None)
+        if resumed is not None:
+            resumed.set()
+
+    async def _wait_while_paused(self, key: str):
+        while key in self.paused_keys:
+            await self.paused_keys[key].wait()
+
+    async def _acquire_host_slot(self, job: ToolJob) -> Optional[Dict]:
+        """Wait for a host-wide slot; returns its ticket (None with host_wide off)."""
+        if self.host_slots is None:
+            return None
+        loop = asyncio.get_running_loop()
+        while True:
+            trying = loop.run_in_executor(None, self.host_slots.try_acquire, job,
+                                          self.sister_limit(job.sister_name), self.max_concurrent)
+            try:
+                ticket = await asyncio.shield(trying)
+            except asyncio.CancelledError:
+                # The ledger can't be interrupted; give the slot back if it was taken
+                trying.add_done_callback(
+                    lambda f: None if f.cancelled() or f.exception() else self.host_slots.release(f.result()))
+                raise
+            if ticket is not None:
+                return ticket
+            await asyncio.sleep(self.config["poll_interval"])
+
+    def _release_host_slot(self, ticket: Optional[Dict]):
+        if self.host_slots is not None:
+            self.host_slots.release(ticket)
+
+    def _schedule(self, job: ToolJob):
+        job.task = self.loop.create_task(self._run_job(job))
+        job.task.add_done_callback(lambda task: self._cancelled_before_start(job) if task.cancelled() else None)
+
+    def _cancelled_before_start(self, job: ToolJob):
+        # A task cancelled before its first step never runs _run_job, which would finish the job
+        if job.finished is None:
+            job.state = "cancelled"
+            self._finish(job)
+            self.callback_pool.submit(job.future.cancel)
+
+    @staticmethod
+    def _cancel(job: ToolJob):
+        if job.task is not None:
+            job.task.cancel()
+
+    def _slots_for(self, sister_name: str) -> asyncio.Semaphore:
+        if sister_name not in self.sister_slots:
+            self.sister_slots[sister_name] = asyncio.Semaphore(self.sister_limit(sister_name))
+        return self.sister_slots[sister_name]
+
+    async def _execute(self, job: ToolJob) -> int:
+        loop = asyncio.get_running_loop()
+        cache = get_result_cache()
+        tracker = get_delta_tracker()
+        runs = get_run_directories()
+        cache_key = items = env = None
+        partial = False
+        if job.target:
+            if job.cwd is None and runs.enabled:
+                job.command = runs.absolutize(job.command, job.target)
+                job.run_dir = await loop.run_in_executor(None, runs.allocate, job.target, job.sister_name, job.run_id)
+                job.cwd = job.run_dir.path
+            # Only runs over the whole target get the deltas (a pipeline's run for one URL doesn't)
+            inputs = None
+            env = {}
+            if job.incremental:
+                inputs = await loop.run_in_executor(None, tracker.input_digest, job.target, job.tool)
+                partial = await loop.run_in_executor(None, tracker.works_on_delta, job.target, job.tool)
+                env = await loop.run_in_executor(None, tracker.tool_env, job.target)
+            cache_key = await loop.run_in_executor(None, cache.key_for, job.command, job.target, job.tool, job.cwd,
+                                                   inputs)
+            if job.run_dir:
+                env.update(job.run_dir.env())
+            if job.incremental and tracker.tracks(job.tool):
+                items = tracker.sink_for(job.tool)
+        writer, collect = self._record_collector(job, items)
+        stdout_format = get_parser_registry().stdout_format(job.tool)
+        parser_sink = (RecordParserSink(get_parser(stdout_format,
+                                                   source=record_source(job.sister_name, job.tool, stdout_format)),
+                                        collect)
+                       if collect else None)
+        if cache_key and job.use_cache:
+            entry = await loop.run_in_executor(None, cache.lookup, cache_key)
+            if entry is not None:
+                job.state = "running"
+                job.started = time.time()
+                job.cached = entry
+                await loop.run_in_executor(None, self._replay, job, entry, items, parser_sink)
+                await loop.run_in_executor(None, self._parse_artifacts, job, writer, collect)
+                if items:
+                    job.delta = await loop.run_in_executor(None, tracker.update, job.target, job.tool, items, partial)
+                if job.run_dir:
+                    job.artifacts = await loop.run_in_executor(None, runs.index, job.run_dir, job.tool, 0,
+                                                               job.started, True, job.records)
+                return 0
+
+        capture = CaptureSink(cache.tmp_dir, cache.max_output) if cache_key else None
+        sinks = (job.sinks or []) + [sink for sink in (capture, items, parser_sink) if sink]
+        try:
+            while True:
+                await self._wait_while_paused(job.key)
+                async with self._slots_for(job.sister_name), self.global_slots:
+                    ticket = await self._acquire_host_slot(job)
+                    try:
+                        # Paused while it waited for a slot: hand the slot on instead of starting
+                        if job.key in self.paused_keys:
+                            continue
+                        job.state = "running"
+                        job.started = time.time()
+                        returncode = await run_tool_process_async(job.command, job.key, job.cwd, job.tool,
+                                                                  sinks or None, env)
+                    finally:
+                        self._release_host_slot(ticket)
+                break
+        except BaseException:
+            if capture:
+                capture.discard()
+            if writer:
+                writer.close()
+            raise
+        await loop.run_in_executor(None, self._parse_artifacts, job, writer, collect)
+        if capture and returncode == 0:
+            await loop.run_in_executor(None, cache.store, cache_key, job.tool, job.target, capture,
+                                       self._artifact_dir(job), job.started)
+        elif capture:
+            capture.discard()
+        # A failed run's results are incomplete, so they don't replace the last known set
+        if items and returncode == 0:
+            job.delta = await loop.run_in_executor(None, tracker.update, job.target, job.tool, items, partial)
+        if job.run_dir:
+            job.artifacts = await loop.run_in_executor(None, runs.index, job.run_dir, job.tool, returncode,
+                                                       job.started, False, job.records)
+        return returncode
+
+    @staticmethod
+    def _record_collector(job: ToolJob, items) -> Tuple[Optional[RecordWriter], Optional[Callable]]:
+        """
+        Where the records parsed from a job's output go: the run directory's
+        records.jsonl (for tools with known formats) and the delta tracker
+        (for tools it diffs by record).
+
+        Returns:
+            The writer, if any, and the callback to give records to (None if nothing wants them)
+        """
+        registry = get_parser_registry()
+        writer = None
+        if job.run_dir is not None and registry.formats(job.tool):
+            writer = RecordWriter(os.path.join(job.run_dir.path, RECORDS_NAME))
+        by_record = items is not None and items.by_record
+        if writer is None and not by_record:
+            return None, None
+
+        def collect(record):
+            if writer is not None:
+                writer.write(record)
+            if by_record:
+                items.add_record(record)
+        return writer, collect
+
+    def _parse_artifacts(self, job: ToolJob, writer: Optional[RecordWriter], collect: Optional[Callable]):
+        """Parse the files the tool left and close the job's record writer."""
+        if collect is None:
+            return
+        try:
+            get_parser_registry().parse_artifacts(self._artifact_dir(job), job.tool, collect,
+                                                  sister_name=job.sister_name)
+        except OSError as e:
+            write_output(job.sister_name, job.target, f"⚠️ Could not parse {job.tool} output: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+                job.records = dict(writer.counts)
+
+    @staticmethod
+    def _artifact_dir(job: ToolJob) -> str:
+        """Where a job's tool leaves its artifacts."""
+        return job.run_dir.path if job.run_dir else job.cwd or init_output_dir(job.target)
+
+    @staticmethod
+    def _replay(job: ToolJob, entry: CacheEntry, items: Optional[OutputSink] = None,
+                parser_sink: Optional[OutputSink] = None):
+        """Serve a cached result: restore its artifacts and feed its output to the job's sinks."""
+        write_output(job.sister_name, job.target,
+                     f"♻️ Using cached {job.tool} result from {entry.age / 60:.0f} minutes ago")
+        get_result_cache().restore(entry, ToolExecutor._artifact_dir(job))
+        sinks = (job.sinks or []) + [sink for sink in (items, parser_sink) if sink]
+        if not sinks:
+            return
+        pump = OutputPump(None, sinks)
+        pump.start()
+        for stream, line in get_result_cache().read_output(entry):
+            pump.feed(stream, (line + "\n").encode("utf-8"))
+        pump.close()
+        pump.join()
+
+    async def _run_job(self, job: ToolJob):
+        try:
+            if job.deadline is not None:
+                try:
+                    returncode = await asyncio.wait_for(self._execute(job), job.deadline)
+                except asyncio.TimeoutError as e:
+                    if isinstance(e, ToolTimeoutError):
+                        raise
+                    raise ToolTimeoutError(f"{job.tool} job missed its {job.deadline:.0f}s deadline")
+            else:
+                returncode = await self._execute(job)
+            if returncode != 0:
+                raise ToolExitError(job.tool, returncode)
+            job.state = "done"
+            self._finish(job)
+            self.callback_pool.submit(job.future.set_result, returncode)
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+            self._finish(job)
+            self.callback_pool.submit(job.future.cancel)
+        except Exception as e:
+            job.state = "timeout" if isinstance(e, TimeoutError) else "failed"
+            job.error = str(e)
+            self._finish(job)
+            self.callback_pool.submit(job.future.set_exception, e)
+
+    def _finish(self, job: ToolJob):
+        job.finished = time.time()
+        with self.lock:
+            self.jobs.pop(job.job_id, None)
+            self.completed_count += 1
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """The process-wide executor, configured from the "executor" section of the config."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    config = json.load(f).get("executor", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading executor config: {e}")
+                config = {}
+            _executor = ToolExecutor(config)
+        return _executor
+
+
+def submit_tool(sister_name: str, command: List[str], key: str, **kwargs) -> ToolJob:
+    """Submit a tool run to the process-wide executor (see ToolExecutor.submit)."""
+    return get_tool_executor().submit(sister_name, command, key, **kwargs)
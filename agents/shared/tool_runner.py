@@ -0,0 +1,435 @@
+import os
+import json
+import asyncio
+import time
+import signal
+import subprocess
+import threading
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows has no rlimits
+    resource = None
+
+from agents.shared.admission import CONFIG_PATH, get_admission_controller
+from agents.shared.output_stream import OutputPump, OutputSink, READ_CHUNK, STDOUT, STDERR
+
+# Interpreters whose first argument is the actual tool
+INTERPRETERS = {"bash", "sh", "python", "python3"}
+
+# How often a running tool's deadline is checked
+DEADLINE_CHECK_INTERVAL = 1.0
+
+IONICE_CLASSES = {
+    "realtime": getattr(psutil, "IOPRIO_CLASS_RT", None),
+    "best-effort": getattr(psutil, "IOPRIO_CLASS_BE", None),
+    "idle": getattr(psutil, "IOPRIO_CLASS_IDLE", None)
+}
+
+
+class ToolTimeoutError(TimeoutError):
+    """A tool ran past its wall-clock deadline and was killed."""
+
+
+class ToolExitError(RuntimeError):
+    """A tool exited with a non-zero exit code."""
+
+    def __init__(self, tool: str, returncode: int):
+        super().__init__(f"{tool} exited with code {returncode}")
+        self.returncode = returncode
+
+
+@dataclass(frozen=True)
+class ToolLimits:
+    """
+    OS limits for one tool run. None leaves a limit unset.
+
+    address_space_mb, cpu_seconds and open_files become RLIMIT_AS, RLIMIT_CPU
+    and RLIMIT_NOFILE; nice is added to the tool's niceness; ionice_class
+    ("realtime", "best-effort" or "idle") and ionice_level set its I/O
+    priority (Linux). deadline is the wall-clock time the tool may run, not
+    counting time it spends paused, after which its whole process group gets
+    SIGTERM and, kill_grace seconds later, SIGKILL.
+    """
+    address_space_mb: Optional[int] = None
+    cpu_seconds: Optional[int] = None
+    open_files: Optional[int] = None
+    nice: Optional[int] = None
+    ionice_class: Optional[str] = None
+    ionice_level: Optional[int] = None
+    deadline: Optional[float] = None
+    kill_grace: float = 10.0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ToolLimits":
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+_limits_config = None
+_limits_config_lock = threading.Lock()
+
+
+def get_tool_limits(tool: str) -> ToolLimits:
+    """The limits for a tool: the "tool_limits" defaults merged with the tool's own entry."""
+    global _limits_config
+    with _limits_config_lock:
+        if _limits_config is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    _limits_config = json.load(f).get("tool_limits", {})
+            except (OSError, ValueError) as e:
+                print(f"Error loading tool limits: {e}")
+                _limits_config = {}
+    merged = dict(_limits_config.get("default", {}))
+    merged.update(_limits_config.get("tools", {}).get(os.path.basename(tool), {}))
+    return ToolLimits.from_dict(merged)
+
+
+def _limit_process(pid: int, limits: ToolLimits):
+    """
+    Apply the limits to a tool process that has just started.
+
+    The limits are set from this process (prlimit and psutil) rather than in
+    the child before exec, which isn't safe in a threaded program; what the
+    tool starts afterwards inherits them.
+    """
+    if resource is not None and hasattr(resource, "prlimit"):
+        for limit, value in ((getattr(resource, "RLIMIT_AS", None), (limits.address_space_mb or 0) * 1024 * 1024),
+                             (getattr(resource, "RLIMIT_CPU", None), limits.cpu_seconds),
+                             (getattr(resource, "RLIMIT_NOFILE", None), limits.open_files)):
+            if limit is None or not value:
+                continue
+            try:
+                _, hard = resource.prlimit(pid, limit)
+                if hard != resource.RLIM_INFINITY:
+                    value = min(value, hard)
+                resource.prlimit(pid, limit, (value, hard))
+            except (OSError, ValueError):
+                pass  # The tool already exited, or the limit can't be set here
+    ionice_class = IONICE_CLASSES.get(limits.ionice_class) if limits.ionice_class else None
+    if not limits.nice and ionice_class is None:
+        return
+    try:
+        process = psutil.Process(pid)
+        if limits.nice:
+            process.nice(process.nice() + limits.nice)
+        if ionice_class is not None and hasattr(process, "ionice"):
+            process.ionice(ionice_class, limits.ionice_level)
+    except (psutil.Error, ValueError, OSError):
+        pass  # Gone already, not allowed or not supported; run at normal priority
+
+
+class ToolRun:
+    """A running tool process (subprocess or asyncio) and how long it has spent paused."""
+
+    def __init__(self, process):
+        self.process = process
+        self.started = time.monotonic()
+        self.paused_at = None
+        self.paused_total = 0.0
+
+    def running(self) -> bool:
+        if isinstance(self.process, subprocess.Popen):
+            return self.process.poll() is None
+        return self.process.returncode is None
+
+    def active_seconds(self) -> float:
+        """Wall-clock time the tool has been running, not counting pauses."""
+        now = time.monotonic()
+        paused = self.paused_total + (now - self.paused_at if self.paused_at is not None else 0.0)
+        return now - self.started - paused
+
+
+# Tool processes that are currently running, keyed by action ID (or target)
+_running_tools: Dict[str, ToolRun] = {}
+_running_tools_lock = threading.Lock()
+
+
+def tool_name(command: List[str]) -> str:
+    """The tool a command line runs, e.g. "alice_recon.sh" for ["bash", "tools/alice_recon.sh", target]."""
+    if len(command) > 1 and os.path.basename(command[0]) in INTERPRETERS:
+        return os.path.basename(command[1])
+    return os.path.basename(command[0])
+
+
+def _group_alive(process: subprocess.Popen) -> bool:
+    """Whether anything is left in the tool's process group."""
+    try:
+        os.killpg(process.pid, 0)
+        return True
+    except (ProcessLookupError, PermissionError, OSError):
+        return False
+
+
+def _terminate_group(process: subprocess.Popen, grace: float):
+    """SIGTERM the tool's whole process group, then SIGKILL whatever is left after the grace period."""
+    if os.name == 'nt':
+        process.kill()
+        process.wait()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        os.killpg(process.pid, signal.SIGCONT)  # A paused group can't act on SIGTERM
+    except (ProcessLookupError, OSError):
+        return
+    give_up = time.monotonic() + grace
+    while time.monotonic() < give_up:
+        if process.poll() is not None and not _group_alive(process):
+            return
+        time.sleep(0.1)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, OSError):
+        pass
+    process.wait()
+
+
+def _popen_kwargs(capture: bool) -> Dict:
+    """Process options for a tool run: its own session and, to capture output, pipes."""
+    popen_kwargs = {}
+    if os.name != 'nt':
+        popen_kwargs['start_new_session'] = True
+    if capture:
+        popen_kwargs['stdout'] = subprocess.PIPE
+        popen_kwargs['stderr'] = subprocess.PIPE
+    return popen_kwargs
+
+
+def run_tool_process(command: List[str], key: str, cwd: Optional[str] = None,
+                     tool: Optional[str] = None, sinks: Optional[List[OutputSink]] = None) -> int:
+    """
+    Run a tool script in its own process group and wait for it to finish.
+
+    The run first waits for the host's admission controller to make room for
+    it (see agents/shared/admission.py), then starts in a new session with the
+    tool's OS limits applied (see ToolLimits). The process is registered under
+    the given key while it runs, so it can be paused, resumed or signalled as
+    a whole group from another thread. Children the tool leaves behind in its
+    group are terminated when it exits.
+
+    With sinks, the tool's stdout and stderr are captured and streamed line by
+    line to each of them while it runs (see agents/shared/output_stream.py);
+    without, the tool writes straight to the sister's terminal.
+
+    Args:
+        command: The command line to run, e.g. ["bash", "tools/alice_recon.sh", target]
+        key: Registry key for the run, normally the action ID
+        cwd: Working directory for the tool
+        tool: Tool name to look up the resource cost and limits by (defaults to the script name)
+        sinks: Consumers of the tool's output lines, e.g. from tool_output_sinks()
+
+    Returns:
+        The tool's exit code
+
+    Raises:
+        ToolTimeoutError: If the tool ran past its deadline and was killed
+    """
+    tool = tool or tool_name(command)
+    limits = get_tool_limits(tool)
+    popen_kwargs = _popen_kwargs(bool(sinks))
+
+    with get_admission_controller().admitted(tool, key):
+        process = subprocess.Popen(command, cwd=cwd, **popen_kwargs)
+        _limit_process(process.pid, limits)
+        pump = None
+        if sinks:
+            pump = OutputPump(process, sinks)
+            pump.start()
+        run = ToolRun(process)
+        with _running_tools_lock:
+            _running_tools[key] = run
+        try:
+            while True:
+                try:
+                    returncode = process.wait(timeout=DEADLINE_CHECK_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if limits.deadline and run.active_seconds() > limits.deadline:
+                        _terminate_group(process, limits.kill_grace)
+                        raise ToolTimeoutError(f"{tool} exceeded its {limits.deadline:.0f}s deadline and was killed")
+            if os.name != 'nt' and _group_alive(process):
+                _terminate_group(process, limits.kill_grace)
+            return returncode
+        except BaseException:
+            # Don't leave the tool running if we were interrupted while waiting on it
+            if process.poll() is None:
+                _terminate_group(process, limits.kill_grace)
+            raise
+        finally:
+            with _running_tools_lock:
+                if _running_tools.get(key) is run:
+                    del _running_tools[key]
+            if pump is not None:
+                # The group is gone, so the pipes are closed and the pump finishes what it has
+                pump.join()
+                process.stdout.close()
+                process.stderr.close()
+
+
+async def _terminate_group_async(process: asyncio.subprocess.Process, grace: float):
+    """Like _terminate_group, for a process started with asyncio."""
+    if os.name == 'nt':
+        process.kill()
+        await process.wait()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        os.killpg(process.pid, signal.SIGCONT)
+    except (ProcessLookupError, OSError):
+        return
+    give_up = time.monotonic() + grace
+    while time.monotonic() < give_up:
+        if process.returncode is not None and not _group_alive(process):
+            return
+        await asyncio.sleep(0.1)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, OSError):
+        pass
+    await process.wait()
+
+
+async def _admit_async(tool: str, key: str) -> Optional[Dict]:
+    """Wait for admission without blocking the event loop (the controller itself blocks)."""
+    controller = get_admission_controller()
+    if not controller.enabled:
+        return None
+    waiting = asyncio.get_running_loop().run_in_executor(None, controller.acquire, tool, key)
+    try:
+        return await asyncio.shield(waiting)
+    except asyncio.CancelledError:
+        # The controller can't be interrupted; give the ticket back once it comes through
+        waiting.add_done_callback(
+            lambda f: None if f.cancelled() or f.exception() else controller.release(f.result()))
+        raise
+
+
+async def _pump_pipe(pipe: asyncio.StreamReader, stream: str, pump: OutputPump):
+    while True:
+        chunk = await pipe.read(READ_CHUNK)
+        if not chunk:
+            pump.end(stream)
+            return
+        pump.feed(stream, chunk)
+
+
+async def run_tool_process_async(command: List[str], key: str, cwd: Optional[str] = None,
+                                 tool: Optional[str] = None, sinks: Optional[List[OutputSink]] = None,
+                                 env: Optional[Dict[str, str]] = None) -> int:
+    """
+    run_tool_process for an asyncio event loop: the same admission, limits,
+    deadline, group cleanup and output streaming, but waiting on the tool
+    doesn't hold a thread. Cancelling the task terminates the tool's group.
+    env holds extra environment variables for the tool.
+
+    Returns:
+        The tool's exit code
+
+    Raises:
+        ToolTimeoutError: If the tool ran past its deadline and was killed
+    """
+    tool = tool or tool_name(command)
+    limits = get_tool_limits(tool)
+    popen_kwargs = _popen_kwargs(bool(sinks))
+
+    ticket = await _admit_async(tool, key)
+    try:
+        process = await asyncio.create_subprocess_exec(*command, cwd=cwd, env=dict(os.environ, **env) if env else None,
+                                                       **popen_kwargs)
+        _limit_process(process.pid, limits)
+        pump = readers = None
+        if sinks:
+            pump = OutputPump(None, sinks)
+            pump.start()
+            readers = asyncio.gather(_pump_pipe(process.stdout, STDOUT, pump),
+                                     _pump_pipe(process.stderr, STDERR, pump))
+        run = ToolRun(process)
+        with _running_tools_lock:
+            _running_tools[key] = run
+        waiter = asyncio.ensure_future(process.wait())
+        try:
+            while True:
+                done, _ = await asyncio.wait({waiter}, timeout=DEADLINE_CHECK_INTERVAL)
+                if done:
+                    returncode = waiter.result()
+                    break
+                if limits.deadline and run.active_seconds() > limits.deadline:
+                    await _terminate_group_async(process, limits.kill_grace)
+                    raise ToolTimeoutError(f"{tool} exceeded its {limits.deadline:.0f}s deadline and was killed")
+            if os.name != 'nt' and _group_alive(process):
+                await _terminate_group_async(process, limits.kill_grace)
+            return returncode
+        except BaseException:
+            if process.returncode is None:
+                await _terminate_group_async(process, limits.kill_grace)
+            raise
+        finally:
+            waiter.cancel()
+            with _running_tools_lock:
+                if _running_tools.get(key) is run:
+                    del _running_tools[key]
+            if pump is not None:
+                await readers
+                pump.close()
+                await asyncio.get_running_loop().run_in_executor(None, pump.join)
+    finally:
+        get_admission_controller().release(ticket)
+
+
+def signal_tool(key: str, sig: int) -> bool:
+    """
+    Send a signal to the whole process group of a running tool.
+
+    Returns:
+        True if a running tool was found and signalled, False otherwise
+    """
+    with _running_tools_lock:
+        run = _running_tools.get(key)
+    if run is None or not run.running():
+        return False
+    try:
+        if os.name == 'nt':
+            run.process.send_signal(sig)
+        else:
+            os.killpg(os.getpgid(run.process.pid), sig)
+        return True
+    except (ProcessLookupError, OSError):
+        return False
+
+
+def pause_tool(key: str) -> bool:
+    """Stop (SIGSTOP) a running tool and all of its children."""
+    if not hasattr(signal, "SIGSTOP"):
+        return False
+    paused = signal_tool(key, signal.SIGSTOP)
+    if paused:
+        with _running_tools_lock:
+            run = _running_tools.get(key)
+            if run and run.paused_at is None:
+                run.paused_at = time.monotonic()
+    return paused
+
+
+def resume_tool(key: str) -> bool:
+    """Continue (SIGCONT) a tool previously stopped with pause_tool."""
+    if not hasattr(signal, "SIGCONT"):
+        return False
+    resumed = signal_tool(key, signal.SIGCONT)
+    if resumed:
+        with _running_tools_lock:
+            run = _running_tools.get(key)
+            if run and run.paused_at is not None:
+                run.paused_total += time.monotonic() - run.paused_at
+                run.paused_at = None
+    return resumed
+
+
+def get_running_tools() -> List[str]:
+    """List the keys of the tools that are currently running."""
+    with _running_tools_lock:
+        return [key for key, run in _running_tools.items() if run.running()]
@@ -0,0 +1,408 @@
+import os
+import re
+import sys
+import json
+import random
+import struct
+import hashlib
+import argparse
+import fnmatch
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents.shared.admission import CONFIG_PATH
+
+# Defaults used when the config has no "urls" section
+DEFAULT_URLS = {
+    "canonicalize": True,
+    # Query parameters that only track the visitor; URLs that differ only in these are the same URL
+    "drop_params": ["utm_*", "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid",
+                    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi"],
+    "sort_query": True
+}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_PERCENT_ENCODED = re.compile(r"%([0-9A-Fa-f]{2})")
+_UNRESERVED = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_url_config() -> Dict:
+    """The "urls" section of the config, read once."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            try:
+                with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                    _config = dict(DEFAULT_URLS, **json.load(f).get("urls", {}))
+            except (OSError, ValueError) as e:
+                print(f"Error loading urls config: {e}")
+                _config = dict(DEFAULT_URLS)
+        return _config
+
+
+def _normalize_percent(text: str) -> str:
+    """Decode percent-encoded unreserved characters and upper-case the rest (%2f -> %2F)."""
+    def replace(match):
+        character = chr(int(match.group(1), 16))
+        return character if character in _UNRESERVED else f"%{match.group(1).upper()}"
+    return _PERCENT_ENCODED.sub(replace, text)
+
+
+def _remove_dot_segments(path: str) -> str:
+    """Resolve "." and ".." path segments (RFC 3986, section 5.2.4)."""
+    if "." not in path:
+        return path
+    output: List[str] = []
+    segments = path.split("/")
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == ".":
+            if last:
+                output.append("")
+        elif segment == "..":
+            if len(output) > 1:
+                output.pop()
+            if last:
+                output.append("")
+        else:
+            output.append(segment)
+    return "/".join(output)
+
+
+def _dropped(name: str, patterns: List[str]) -> bool:
+    name = name.lower()
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def canonicalize_url(url: str, drop_params: Optional[List[str]] = None, sort_query: Optional[bool] = None) -> str:
+    """
+    The canonical form of an http(s) URL, so that variants of one URL compare equal.
+
+    Lower-cases the scheme and host, drops the default port, the fragment
+    and tracking parameters, normalizes percent-encoding and dot segments,
+    and sorts the query parameters by name. Anything that isn't an http(s)
+    URL is returned as is (stripped).
+    """
+    url = url.strip()
+    config = get_url_config()
+    drop_params = config["drop_params"] if drop_params is None else drop_params
+    sort_query = config["sort_query"] if sort_query is None else sort_query
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return url
+    if scheme not in DEFAULT_PORTS or not host:
+        return url
+
+    host = host.rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        pass
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    netloc = host if port is None or port == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+    if "@" in parts.netloc:
+        netloc = f"{parts.netloc.rsplit('@', 1)[0]}@{netloc}"
+
+    path = _remove_dot_segments(_normalize_percent(parts.path)) or "/"
+
+    query = ""
+    if parts.query:
+        params = [param for param in parts.query.split("&") if param]
+        params = [_normalize_percent(param) for param in params if not _dropped(param.split("=", 1)[0], drop_params)]
+        if sort_query:
+            params.sort(key=lambda param: param.split("=", 1)[0])
+        query = "&".join(params)
+
+    return f"{scheme}://{netloc}{path}" + (f"?{query}" if query else "")
+
+
+class Interner:
+    """Maps strings to small integer IDs and back, storing each string once."""
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.strings: List[str] = list(strings or [])
+        self.ids: Dict[str, int] = {string: index for index, string in enumerate(self.strings)}
+
+    def intern(self, string: str) -> int:
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.ids[string] = string_id
+            self.strings.append(string)
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def memory(self) -> int:
+        return (sys.getsizeof(self.strings) + sys.getsizeof(self.ids)
+                + sum(sys.getsizeof(string) for string in self.strings))
+
+
+# Scheme ID of URLs stored verbatim (not http(s), or with credentials) in the query arena
+_RAW = 255
+_SCHEMES = ["http", "https"]
+_EMPTY = 0
+
+_TABLE_HEADER = struct.Struct("<I")
+_COLUMNS = ("schemes", "hosts_column", "ports", "path_offsets", "path_lengths",
+            "query_offsets", "query_lengths", "segment_arena")
+
+
+def _fingerprint(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+class UrlTable:
+    """
+    A deduplicating store of canonical URLs, less than half the size of a set of strings.
+
+    Hosts and path segments are interned, so each distinct one is stored
+    once; a URL is a row of small integers (scheme, host ID, port, and the
+    offset and length of its path in an arena of segment IDs) plus its
+    query string in a byte arena. Lookups go through an open-addressing hash
+    index of 64-bit fingerprints, confirmed against the stored URL. URLs are
+    canonicalized on the way in (see canonicalize_url).
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self.hosts = Interner()
+        self.segments = Interner()
+        self.schemes = array("B")
+        self.hosts_column = array("I")
+        self.ports = array("H")
+        self.path_offsets = array("I")
+        self.path_lengths = array("H")
+        self.query_offsets = array("I")
+        self.query_lengths = array("I")
+        self.segment_arena = array("I")
+        self.query_arena = bytearray()
+        capacity = 1 << max(4, (initial_capacity * 2 - 1).bit_length())
+        self.index_fingerprints = array("Q", bytes(8 * capacity))
+        self.index_ids = array("i", [-1]) * capacity
+
+    def __len__(self) -> int:
+        return len(self.schemes)
+
+    def _append_raw(self, url: str):
+        data = url.encode("utf-8")
+        self.schemes.append(_RAW)
+        self.hosts_column.append(0)
+        self.ports.append(0)
+        self.path_offsets.append(len(self.segment_arena))
+        self.path_lengths.append(0)
+        self.query_offsets.append(len(self.query_arena))
+        self.query_lengths.append(len(data))
+        self.query_arena += data
+
+    def _append(self, url: str):
+        parts = urlsplit(url)
+        scheme = parts.scheme
+        path_segments = parts.path[1:].split("/")
+        if scheme not in _SCHEMES or "@" in parts.netloc or not parts.path.startswith("/") or len(path_segments) > 0xFFFF:
+            self._append_raw(url)
+            return
+        self.schemes.append(_SCHEMES.index(scheme))
+        self.hosts_column.append(self.hosts.intern(parts.hostname if ":" not in (parts.hostname or "")
+                                                   else f"[{parts.hostname}]"))
+        self.ports.append(parts.port or 0)
+        self.path_offsets.append(len(self.segment_arena))
+        self.path_lengths.append(len(path_segments))
+        self.segment_arena.extend(self.segments.intern(segment) for segment in path_segments)
+        query = parts.query.encode("utf-8")
+        self.query_offsets.append(len(self.query_arena))
+        self.query_lengths.append(len(query))
+        self.query_arena += query
+
+    def get(self, url_id: int) -> str:
+        """The URL with the given ID."""
+        query_offset = self.query_offsets[url_id]
+        query = self.query_arena[query_offset:query_offset + self.query_lengths[url_id]].decode("utf-8")
+        if self.schemes[url_id] == _RAW:
+            return query
+        offset = self.path_offsets[url_id]
+        path = "/".join(self.segments[segment_id]
+                        for segment_id in self.segment_arena[offset:offset + self.path_lengths[url_id]])
+        port = self.ports[url_id]
+        netloc = self.hosts[self.hosts_column[url_id]] + (f":{port}" if port else "")
+        return f"{_SCHEMES[self.schemes[url_id]]}://{netloc}/{path}" + (f"?{query}" if query else "")
+
+    def host(self, url_id: int) -> Optional[str]:
+        return None if self.schemes[url_id] == _RAW else self.hosts[self.hosts_column[url_id]]
+
+    def _slot(self, url: str, fingerprint: int) -> Tuple[int, int]:
+        """The index slot holding the URL, or the empty one where it would go; and its ID (-1 if absent)."""
+        mask = len(self.index_ids) - 1
+        slot = fingerprint & mask
+        while True:
+            url_id = self.index_ids[slot]
+            if url_id < 0:
+                return slot, -1
+            if self.index_fingerprints[slot] == fingerprint and self.get(url_id) == url:
+                return slot, url_id
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        capacity = len(self.index_ids) * 2
+        fingerprints, ids = self.index_fingerprints, self.index_ids
+        self.index_fingerprints = array("Q", bytes(8 * capacity))
+        self.index_ids = array("i", [-1]) * capacity
+        mask = capacity - 1
+        for fingerprint, url_id in zip(fingerprints, ids):
+            if url_id >= 0:
+                slot = fingerprint & mask
+                while self.index_ids[slot] >= 0:
+                    slot = (slot + 1) & mask
+                self.index_fingerprints[slot] = fingerprint
+                self.index_ids[slot] = url_id
+
+    def add(self, url: str, canonical: bool = False) -> Tuple[int, bool]:
+        """
+        Store a URL unless an equal one is stored already.
+
+        Args:
+            url: The URL
+            canonical: Set if the URL is canonical already (e.g. from a URL record)
+
+        Returns:
+            The URL's ID and whether it was new
+        """
+        if not canonical:
+            url = canonicalize_url(url)
+        fingerprint = _fingerprint(url)
+        slot, url_id = self._slot(url, fingerprint)
+        if url_id >= 0:
+            return url_id, False
+        url_id = len(self)
+        self._append(url)
+        self.index_fingerprints[slot] = fingerprint
+        self.index_ids[slot] = url_id
+        if len(self) * 10 > len(self.index_ids) * 7:
+            self._grow()
+        return url_id, True
+
+    def __contains__(self, url: str) -> bool:
+        url = canonicalize_url(url)
+        return self._slot(url, _fingerprint(url))[1] >= 0
+
+    def __iter__(self) -> Iterable[str]:
+        return (self.get(url_id) for url_id in range(len(self)))
+
+    def memory(self) -> int:
+        """Approximate bytes used, interned strings and index included."""
+        columns = sum(len(getattr(self, name)) * getattr(self, name).itemsize for name in _COLUMNS)
+        index = len(self.index_ids) * (self.index_ids.itemsize + self.index_fingerprints.itemsize)
+        return columns + index + len(self.query_arena) + self.hosts.memory() + self.segments.memory()
+
+    def save(self, path: str):
+        """Write the table to a file: a JSON header with the interned strings, then the columns."""
+        header = json.dumps({
+            'hosts': self.hosts.strings,
+            'segments': self.segments.strings,
+            'lengths': {name: len(getattr(self, name)) for name in _COLUMNS},
+            'query_arena': len(self.query_arena)
+        }).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_TABLE_HEADER.pack(len(header)))
+            f.write(header)
+            for name in _COLUMNS:
+                getattr(self, name).tofile(f)
+            f.write(self.query_arena)
+
+    @classmethod
+    def load(cls, path: str) -> "UrlTable":
+        table = cls()
+        with open(path, "rb") as f:
+            (length,) = _TABLE_HEADER.unpack(f.read(_TABLE_HEADER.size))
+            header = json.loads(f.read(length))
+            table.hosts = Interner(header['hosts'])
+            table.segments = Interner(header['segments'])
+            for name in _COLUMNS:
+                getattr(table, name).fromfile(f, header['lengths'][name])
+            table.query_arena = bytearray(f.read(header['query_arena']))
+        while len(table) * 10 > len(table.index_ids) * 7:
+            table.index_ids = array("i", [-1]) * (len(table.index_ids) * 2)
+        table.index_fingerprints = array("Q", bytes(8 * len(table.index_ids)))
+        mask = len(table.index_ids) - 1
+        for url_id in range(len(table)):
+            fingerprint = _fingerprint(table.get(url_id))
+            slot = fingerprint & mask
+            while table.index_ids[slot] >= 0:
+                slot = (slot + 1) & mask
+            table.index_fingerprints[slot] = fingerprint
+            table.index_ids[slot] = url_id
+        return table
+
+
+def _synthetic_urls(count: int, seed: int = 7) -> Iterable[str]:
+    """gau/waybackurls-like URLs, with the variants they are full of."""
+    rng = random.Random(seed)
+    hosts = [f"{name}.example.com" for name in ("www", "api", "cdn", "shop", "blog", "m", "static", "auth")]
+    words = ["assets", "js", "css", "img", "v1", "v2", "users", "products", "search", "index.php", "app.js",
+             "login", "static", "media", "uploads", "2019", "2020", "2021", "docs", "api"]
+    for _ in range(count):
+        path = "/".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+        query = "&".join(f"{rng.choice(['id', 'q', 'page', 'sort', 'lang'])}={rng.randint(0, 500)}"
+                         for _ in range(rng.randint(0, 2)))
+        variant = rng.random()
+        scheme, host = "https", rng.choice(hosts)
+        if variant < 0.1:
+            host = host.upper()
+        elif variant < 0.2:
+            host += ":443"
+        elif variant < 0.3:
+            query += ("&" if query else "") + f"utm_source=feed{rng.randint(0, 9)}"
+        yield f"{scheme}://{host}/{path}" + (f"?{query}" if query else "")
+
+
+def benchmark(count: int) -> Dict:
+    """Compare a set of raw URL strings with a UrlTable on synthetic crawl output."""
+    urls = list(_synthetic_urls(count))
+    raw = set(urls)
+    raw_memory = sys.getsizeof(raw) + sum(sys.getsizeof(url) for url in raw)
+    table = UrlTable()
+    for url in urls:
+        table.add(url)
+    return {
+        'urls': count,
+        'distinct_raw': len(raw),
+        'distinct_canonical': len(table),
+        'set_bytes_per_url': raw_memory / len(raw),
+        'table_bytes_per_url': table.memory() / len(table),
+        'memory_reduction': raw_memory / table.memory()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canonicalize URLs or benchmark the URL table")
+    parser.add_argument("urls", nargs="*", help="URLs to print in canonical form")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark the URL table on N synthetic URLs")
+    args = parser.parse_args()
+    if args.benchmark:
+        print(json.dumps(benchmark(args.benchmark), indent=2))
+    elif args.urls:
+        for url in args.urls:
+            print(canonicalize_url(url))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
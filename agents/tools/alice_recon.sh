@@ -3,5 +3,15 @@ echo "🐇 Following the white rabbit..."
 
 waybackurls "$1" > urls_wayback.txt
 gau "$1" >> urls_wayback.txt
-dirsearch -u "$1" -e php,html,js --output=dir_output.txt
+# On incremental runs, only brute-force the hosts that weren't in the last run's results
+if python3 "$(dirname "$0")/delta_items.py" --known alice_recon.sh host > hosts_known.txt; then
+    grep -oiE '^https?://[^/:?#]+' urls_wayback.txt | cut -d/ -f3 | tr 'A-Z' 'a-z' | sort -u | grep -vxFf hosts_known.txt > hosts_new.txt
+    if [ -s hosts_new.txt ]; then
+        dirsearch -l hosts_new.txt -e php,html,js --output=dir_output.txt
+    else
+        echo "🐇 No new hosts down the rabbit hole."
+    fi
+else
+    dirsearch -u "$1" -e php,html,js --output=dir_output.txt
+fi
 python3 github-dorker.py -q "$1" --token $GITHUB_TOKEN
@@ -0,0 +1,41 @@
+"""
+Print what changed in a tool's results for the target since its last run,
+one item per line, for the tool scripts to work on (see deltas.py).
+
+Usage: delta_items.py [--known] <tool> [field]
+
+Prints the new and changed items of the tool's last delta, or with --known
+every item of its last result set; for a tool diffed by record, field picks
+one field of each record, e.g. "url" or "host". Exits with 1 when the run
+isn't incremental or the tool has no results for the target yet, so the
+script should work on the whole target.
+"""
+import os
+import sys
+import argparse
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from agents.shared.deltas import DELTA_DIR_ENV_VAR, INCREMENTAL_ENV_VAR, read_delta_items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print what changed in a tool's results since its last run")
+    parser.add_argument("--known", action="store_true", help="Print every item of the last result set instead")
+    parser.add_argument("tool", help="The tool whose results to read, e.g. alice_recon.sh")
+    parser.add_argument("field", nargs="?", help="The record field to print, e.g. url or host")
+    args = parser.parse_args(argv)
+    directory = os.environ.get(DELTA_DIR_ENV_VAR)
+    if os.environ.get(INCREMENTAL_ENV_VAR) != "1" or not directory:
+        return 1
+    items = read_delta_items(directory, args.tool, args.field, args.known)
+    if items is None:
+        return 1
+    for item in items:
+        print(item)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
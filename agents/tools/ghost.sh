@@ -2,6 +2,16 @@
 echo "👻 Ghost protocol engaged."
 
 nmap -Pn -sV "$1" -oN scan_nmap.txt
-nuclei -u "$1" -o nuclei_report.txt
-httpx -u "$1" -silent -status-code
+# On incremental runs, only probe the URLs Alice found new or changed since her last run
+if python3 "$(dirname "$0")/delta_items.py" alice_recon.sh url > urls_delta.txt; then
+    if [ -s urls_delta.txt ]; then
+        nuclei -l urls_delta.txt -o nuclei_report.txt
+        httpx -l urls_delta.txt -silent -status-code
+    else
+        echo "👻 Nothing new from Alice since the last run."
+    fi
+else
+    nuclei -u "$1" -o nuclei_report.txt
+    httpx -u "$1" -silent -status-code
+fi
 python3 xsstrike/xsstrike.py -u "$1"
@@ -0,0 +1,5 @@
+#!/bin/bash
+echo "👻 Ghost sweep: mapping the services on $1."
+
+# Host-level scan, run once per address when planned by a pipeline
+nmap -Pn -sV "$1" -oN scan_nmap.txt
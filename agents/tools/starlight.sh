@@ -1,7 +1,12 @@
 #!/bin/bash
 echo "✨ Activating starlight protocol..."
 
-# Tech stack analysis
-wappalyzer "$1" > tech_report.txt
+# Tech stack analysis; on incremental runs, only of the hosts Alice found new or changed
+if python3 "$(dirname "$0")/delta_items.py" alice_recon.sh host > hosts_delta.txt; then
+    [ -s hosts_delta.txt ] || echo "✨ Nothing new from Alice since the last run."
+    while read -r host; do wappalyzer "$host" < /dev/null; done < hosts_delta.txt > tech_report.txt
+else
+    wappalyzer "$1" > tech_report.txt
+fi
 # Optional: anomaly detection scripts
 python3 anomaly.py "$1"
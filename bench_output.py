@@ -0,0 +1,58 @@
+"""Per-line cost of write_output, buffered and unbuffered, with several threads writing."""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+import output_handler
+from output_handler import write_output, flush_output, close_output
+
+
+def write_output_unbuffered(sister_name, target, content):
+    """write_output as it was before buffering: makedirs, strftime, open and close per line."""
+    target_dir = os.path.join(output_handler.BASE_OUTPUT_DIR, target)
+    os.makedirs(target_dir, exist_ok=True)
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    with open(os.path.join(target_dir, f"{sister_name}.log"), "a", encoding="utf-8") as f:
+        f.write(f"[{timestamp}] {sister_name}: {content}\n")
+
+
+def benchmark(lines=20000, threads=4):
+    """Microseconds per line for each way of writing, in a temporary output directory."""
+    previous_output_dir = output_handler.BASE_OUTPUT_DIR
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="7sisters-output-") as workdir:
+        output_handler.BASE_OUTPUT_DIR = workdir
+        try:
+            for name, write in (("unbuffered", write_output_unbuffered), ("buffered", write_output)):
+                def work(index):
+                    for line in range(lines // threads):
+                        write(f"Sister{index % 2}", "bench.example.com", f"{name} line {line} from thread {index}")
+
+                workers = [threading.Thread(target=work, args=(index,)) for index in range(threads)]
+                start = time.perf_counter()
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                flush_output()
+                results[name] = (time.perf_counter() - start) / lines * 1e6
+        finally:
+            close_output()
+            output_handler.BASE_OUTPUT_DIR = previous_output_dir
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=20000, help="Lines to write per run")
+    parser.add_argument("--threads", type=int, default=4, help="Threads writing at once")
+    args = parser.parse_args(argv)
+    for name, micros in benchmark(args.lines, args.threads).items():
+        print(f"{name:<11} {micros:8.2f} µs per line")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,184 @@
 import os
-import datetime
+import sys
+import time
+import atexit
+import signal
+import threading
+from collections import OrderedDict
 
 BASE_OUTPUT_DIR = os.path.join(os.getcwd(), "output")
 
+# Log lines are buffered and written in batches: a log is flushed once this
+# many bytes are waiting, once its oldest waiting line is FLUSH_INTERVAL
+# seconds old, and when the process exits
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 1.0
+# Log files kept open at once; the least recently written is closed first
+MAX_OPEN_FILES = 64
+
+# Output directories already created by this process
+_known_dirs = set()
+
 
 def init_output_dir(target):
     """Creates a unique output folder per target."""
     target_dir = os.path.join(BASE_OUTPUT_DIR, target)
-    os.makedirs(target_dir, exist_ok=True)
+    if target_dir not in _known_dirs:
+        os.makedirs(target_dir, exist_ok=True)
+        _known_dirs.add(target_dir)
     return target_dir
 
 
+class OutputWriter:
+    """
+    Buffers log lines per file and writes them in batches.
+
+    Each batch is a single append of whole lines to a file opened unbuffered
+    in append mode, so lines from different threads (or processes sharing a
+    log) never interleave mid-line. Open files are kept in an LRU so busy
+    logs don't pay an open and close per line. A background thread flushes
+    logs whose lines have waited FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self, max_open_files=MAX_OPEN_FILES, flush_bytes=FLUSH_BYTES, flush_interval=FLUSH_INTERVAL):
+        self.max_open_files = max(1, max_open_files)
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.files = OrderedDict()  # Path -> open file, least recently used first
+        self.buffers = {}  # Path -> lines waiting to be written
+        self.sizes = {}  # Path -> bytes waiting
+        self.since = {}  # Path -> when its oldest waiting line was written
+        self.stopped = threading.Event()
+        self.flusher = None
+
+    def write(self, path, line):
+        """Queue a complete line (with its newline) for a file."""
+        data = line.encode("utf-8")
+        with self.lock:
+            buffer = self.buffers.get(path)
+            if buffer is None:
+                buffer = self.buffers[path] = []
+                self.sizes[path] = 0
+                self.since[path] = time.monotonic()
+            buffer.append(data)
+            self.sizes[path] += len(data)
+            if self.sizes[path] >= self.flush_bytes or self.flush_interval <= 0:
+                self._flush_path(path)
+            elif self.flusher is None:
+                self.flusher = threading.Thread(target=self._run_flusher, name="output-flusher", daemon=True)
+                self.flusher.start()
+
+    def _open(self, path):
+        handle = self.files.get(path)
+        if handle is not None:
+            self.files.move_to_end(path)
+            return handle
+        try:
+            handle = open(path, "ab", buffering=0)
+        except FileNotFoundError:
+            # The directory went away (e.g. output/ was cleaned up); make it again
+            directory = os.path.dirname(path)
+            _known_dirs.discard(directory)
+            os.makedirs(directory, exist_ok=True)
+            handle = open(path, "ab", buffering=0)
+        self.files[path] = handle
+        while len(self.files) > self.max_open_files:
+            _, oldest = self.files.popitem(last=False)
+            oldest.close()
+        return handle
+
+    def _flush_path(self, path):
+        buffer = self.buffers.pop(path, None)
+        self.sizes.pop(path, None)
+        self.since.pop(path, None)
+        if not buffer:
+            return
+        data = memoryview(b"".join(buffer))
+        try:
+            handle = self._open(path)
+            while data:
+                data = data[handle.write(data):]
+        except OSError as e:
+            self.files.pop(path, None)
+            print(f"Error writing {path}: {e}", file=sys.stderr)
+
+    def flush(self, older_than=None):
+        """Write every waiting line, or only those of logs waiting longer than older_than seconds."""
+        with self.lock:
+            now = time.monotonic()
+            for path in [path for path, since in self.since.items()
+                         if older_than is None or now - since >= older_than]:
+                self._flush_path(path)
+
+    def close(self):
+        """Write every waiting line and close the open files."""
+        with self.lock:
+            for path in list(self.buffers):
+                self._flush_path(path)
+            for handle in self.files.values():
+                handle.close()
+            self.files.clear()
+
+    def _run_flusher(self):
+        while not self.stopped.wait(self.flush_interval / 2):
+            self.flush(self.flush_interval)
+
+    def _reset(self):
+        """In a forked child: start over rather than write the parent's lines again."""
+        self.lock = threading.Lock()
+        self.files = OrderedDict()
+        self.buffers, self.sizes, self.since = {}, {}, {}
+        self.flusher = None
+
+
+_writer = OutputWriter()
+atexit.register(_writer.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_writer._reset)
+
+_timestamp = [None, ""]  # The second last formatted, and how it looked
+
+
+def _format_timestamp(now):
+    second = int(now)
+    if _timestamp[0] != second:
+        _timestamp[:] = [second, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))]
+    return _timestamp[1]
+
+
 def write_output(sister_name, target, content):
     """Writes formatted output to the sister's target-specific log file."""
     target_dir = init_output_dir(target)
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = _format_timestamp(time.time())
     log_file = os.path.join(target_dir, f"{sister_name}.log")
+    _writer.write(log_file, f"[{timestamp}] {sister_name}: {content}\n")
+
+
+def flush_output():
+    """Write all buffered log lines now (e.g. before reading a log back)."""
+    _writer.flush()
+
+
+def close_output():
+    """Write all buffered log lines and close the log files (e.g. before removing an output directory)."""
+    _writer.close()
+
+
+def install_sigterm_handler():
+    """
+    Exit cleanly on SIGTERM, which is how mischief_managed stops the sisters.
+
+    Without a handler the process dies on the spot and the buffered log lines
+    are lost. The handler raises SystemExit instead, so the interrupted code
+    unwinds (releasing any lock it held) and the atexit handlers write the
+    buffered lines, remove the PID file and save what else needs saving.
+    Call it from the main thread.
+    """
+    def handle_sigterm(signum, frame):
+        sys.exit(128 + signum)
 
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {sister_name}: {content}\n")
+    signal.signal(signal.SIGTERM, handle_sigterm)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,8 @@ import zmq
 import threading
 import sys
 from agents.shared.tool_check import scan_all_tools
+from agents.shared.sister_comm import INSTANCE_ENV_VAR, CONCURRENCY_ENV_VAR
+from agents.shared.autoscaler import launch_headless_instance
 
 # Add the project root to Python path to ensure imports work
 project_root = os.path.dirname(os.path.abspath(__file__))
@@ -40,7 +42,7 @@ CONFIG_PATH = "seven_sisters.config.json"
 IPC_PORT = 5555
 IPC_ADDRESS = f"tcp://127.0.0.1:{IPC_PORT}"
 
-# Sister status tracking
+# Sister status tracking (keyed by instance)
 sister_status = {}
 sister_status_lock = threading.Lock()
 
@@ -111,6 +113,48 @@ def get_bash_path_from_user():
             return path
         print("❌ Path not found. Please try again.")
 
+def parse_replica_args(argv):
+    """
+    Parse replica counts from the command line, e.g. "Alice x4 Lisbeth x2".
+    
+    Returns:
+        Dict mapping sister name to number of instances
+    """
+    replicas = {}
+    for name, count in zip(argv, argv[1:]):
+        if count.lower().startswith("x") and count[1:].isdigit():
+            replicas[name] = max(1, int(count[1:]))
+    return replicas
+
+def get_replica_count(name, config, overrides):
+    """Number of instances to launch for a sister (Seven always runs alone)."""
+    if name == "Seven":
+        return 1
+    if name in overrides:
+        return overrides[name]
+    replica_config = config.get("replicas", {})
+    return max(1, replica_config.get("counts", {}).get(name, replica_config.get("default", 1)))
+
+def launch_replicas(name, script_path, env, count, concurrency=1):
+    """
+    Launch one or more instances of a sister.
+    
+    A single instance keeps the sister's own name and terminal window. With more
+    than one, the first instance gets the window and the rest run headless; each
+    is named "<sister>-<n>" so Seven can tell them apart.
+    """
+    for index in range(1, count + 1):
+        instance = name if count == 1 else f"{name}-{index}"
+        if index == 1:
+            instance_env = env.copy()
+            instance_env[INSTANCE_ENV_VAR] = instance
+            instance_env[CONCURRENCY_ENV_VAR] = str(concurrency)
+            launch_sister(instance, script_path, instance_env)
+        else:
+            launch_headless_instance(name, instance, concurrency, env)
+            with sister_status_lock:
+                sister_status[instance] = "starting"
+
 def launch_sister(name, script_path, env):
     """Launch a sister in a separate terminal window."""
     if os.name == 'nt':  # Windows
@@ -162,8 +206,15 @@ def listen_for_sister_status():
             print(f"Error in status listener: {e}")
             time.sleep(1)
 
-def summon_the_haunt():
-    """Summon all the sisters based on configuration."""
+def summon_the_haunt(replica_overrides=None):
+    """
+    Summon all the sisters based on configuration.
+    
+    Args:
+        replica_overrides: Optional dict of sister name to instance count, taking
+            precedence over the "replicas" section of the config
+    """
+    replica_overrides = replica_overrides or {}
     # Check for configuration file
     if not os.path.exists(CONFIG_PATH):
         print("❌ Configuration file not found. Please create seven_sisters.config.json")
@@ -186,6 +237,7 @@ def summon_the_haunt():
         config = json.load(f)
 
     agents = config.get("agents", [])
+    instance_concurrency = config.get("replicas", {}).get("instance_concurrency", 1)
     if not agents:
         print("🕳️ No agents defined. The void stares back.")
         return
@@ -252,11 +304,12 @@ def summon_the_haunt():
 
         script_path = os.path.join("agents", name, "init.py")
         if os.path.exists(script_path):
-            speak(name, "👻 Summoning...")
+            count = get_replica_count(name, config, replica_overrides)
+            speak(name, "👻 Summoning..." if count == 1 else f"👻 Summoning {count} of her...")
             print(f"DEBUG: Attempting to launch {script_path}")
             env = os.environ.copy()
             env["PYTHONPATH"] = project_root
-            launch_sister(name, script_path, env)
+            launch_replicas(name, script_path, env, count, instance_concurrency)
             time.sleep(0.5)
         else:
             vanished_lines = [
@@ -275,13 +328,19 @@ def summon_the_haunt():
     print("\nWaiting for sisters to initialize...")
     time.sleep(2)
     
-    # Check sister status
+    # Check sister status, grouping replicas under their sister
     with sister_status_lock:
         for sister, status in sister_status.items():
             print(f"{sister}: {status}")
+        groups = {}
+        for instance in sister_status:
+            groups.setdefault(instance.split("-")[0], []).append(instance)
+        for sister, instances in groups.items():
+            if len(instances) > 1:
+                print(f"{sister}: {len(instances)} instances ({', '.join(instances)})")
 
 
 if __name__ == "__main__":
     dramatic_pause("🔮 Casting startup spell: 'I solemnly swear that I am up to no good'")
     
-    summon_the_haunt()
+    summon_the_haunt(parse_replica_args(sys.argv[1:]))
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# Make the project root importable (output_handler, agents.*) however pytest is started
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import output_handler
+from agents.shared import admission
+
+
+@pytest.fixture(autouse=True)
+def output_dir(tmp_path, monkeypatch):
+    """Keep every test's output (logs, run directories, seen-sets) in its own temporary directory."""
+    monkeypatch.setattr(output_handler, "BASE_OUTPUT_DIR", str(tmp_path / "output"))
+    yield str(tmp_path / "output")
+    output_handler.close_output()
+
+
+@pytest.fixture
+def no_admission(monkeypatch):
+    """Run tools without waiting for the host's admission controller."""
+    monkeypatch.setattr(admission, "_controller", admission.AdmissionController({"enabled": False}))
@@ -0,0 +1,145 @@
+import json
+import threading
+
+import pytest
+
+from agents.shared.action_manager import ActionManager
+from agents.shared.simulator import DEFAULT_CONFIG_PATH
+
+
+@pytest.fixture
+def manager(tmp_path):
+    config_path = tmp_path / "seven_sisters.config.json"
+    config_path.write_text(json.dumps({
+        "agents": [],
+        "queue": {"max_paused_wait": 0.5},
+        "timeouts": {"store_path": None}
+    }))
+    return ActionManager(str(config_path))
+
+
+@pytest.fixture
+def assigner(tmp_path):
+    """The real action definitions with every sister enabled; recon takes at most two of its three."""
+    with open(DEFAULT_CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    for agent in config["agents"]:
+        agent["enabled"] = True
+    config["actions"]["recon"]["max_sisters"] = 2
+    config["batch"].update({"default_sister_limit": 2, "sister_limits": {}})
+    config["timeouts"]["store_path"] = None
+    config_path = tmp_path / "seven_sisters.config.json"
+    config_path.write_text(json.dumps(config))
+    return ActionManager(str(config_path))
+
+
+def occupy(manager, sister, count):
+    """Give a sister running actions to count as her load."""
+    for index in range(count):
+        action_id = f"busy-{sister}-{index}"
+        manager.action_status[action_id] = {'sisters': [sister]}
+        manager.running_actions.add(action_id)
+
+
+def add_action(manager, status):
+    manager.action_status["action-1"] = {'status': status, 'done_event': threading.Event()}
+    return manager.action_status["action-1"]
+
+
+def test_wait_returns_once_the_action_is_done(manager):
+    action = add_action(manager, 'executing')
+    threading.Timer(0.2, action['done_event'].set).start()
+    assert manager.wait_for_action("action-1", timeout=5)
+
+
+def test_wait_times_out_while_executing(manager):
+    add_action(manager, 'executing')
+    assert not manager.wait_for_action("action-1", timeout=0.3)
+
+
+def test_wait_gives_up_on_an_action_paused_too_long(manager):
+    add_action(manager, 'paused')
+    assert not manager.wait_for_action("action-1")
+
+
+def test_pause_within_the_cap_does_not_count(manager):
+    action = add_action(manager, 'paused')
+
+    def resume_and_finish():
+        action['status'] = 'executing'
+        threading.Timer(0.3, action['done_event'].set).start()
+
+    threading.Timer(1.2, resume_and_finish).start()
+    # Only the 0.3s of execution counts against the timeout
+    assert manager.wait_for_action("action-1", timeout=1.0, max_paused=5)
+
+
+def test_caller_can_wait_out_any_pause(manager):
+    action = add_action(manager, 'paused')
+    threading.Timer(1.5, action['done_event'].set).start()
+    assert manager.wait_for_action("action-1", max_paused=float('inf'))
+
+
+def test_unknown_action(manager):
+    assert not manager.wait_for_action("missing", timeout=1)
+
+
+def test_idle_sisters_are_assigned_in_preferred_order(assigner):
+    assert assigner.assign_sisters("recon", "example.com") == (True, "", ["Alice", "Luna"])
+
+
+def test_busy_sister_is_passed_over(assigner):
+    occupy(assigner, "Alice", 1)
+    assert assigner.assign_sisters("recon", "example.com")[2] == ["Luna", "Marla"]
+
+
+def test_fast_sister_wins_at_equal_load(assigner):
+    for sister in ("Alice", "Luna", "Marla"):
+        occupy(assigner, sister, 1)
+    assigner._record_phase_latency("Luna", 60)
+    assigner._record_phase_latency("Marla", 5)
+
+    # Alice has no latency measured yet, so she counts the default (30s)
+    assert assigner.assign_sisters("recon", "example.com")[2] == ["Marla", "Alice"]
+
+
+def test_saturated_sisters_only_make_up_the_minimum(assigner):
+    for sister in ("Alice", "Luna", "Marla"):
+        occupy(assigner, sister, 2)
+    assert assigner.assign_sisters("recon", "example.com")[2] == ["Alice"]
+
+
+def learn(manager, sister, seconds, count=10):
+    """Record phase durations of a sister for every recon phase she takes part in."""
+    plan = manager.catalog.get("recon")
+    for phase in plan.sister_phases[sister]:
+        for _ in range(count):
+            manager.duration_store.record(f"phase:recon:{sister}:{phase.value}", seconds)
+
+
+def test_deadline_stays_static_until_every_phase_has_history(assigner):
+    learn(assigner, "Alice", 10)
+    learn(assigner, "Luna", 20, count=9)
+    assert assigner.get_action_deadline("recon", ["Alice", "Luna"]) == (180, False)
+
+    # Sisters that aren't assigned need no history
+    assert assigner.get_action_deadline("recon", ["Alice"])[1]
+
+
+def test_deadline_follows_the_slowest_sister_of_each_phase(assigner):
+    learn(assigner, "Alice", 10)
+    learn(assigner, "Luna", 20)
+    alice = assigner.duration_store.percentile("phase:recon:Alice:initialization", 95)
+    luna = assigner.duration_store.percentile("phase:recon:Luna:preparation", 95)
+
+    # Alice alone in initialization and cleanup, Luna the slower one in the other three
+    expected = 2 * alice + 3 * luna
+    assert assigner.get_action_deadline("recon", ["Alice", "Luna"]) == (expected * 1.25 + 15, True)
+
+
+def test_learned_deadline_is_capped_and_floored(assigner):
+    learn(assigner, "Alice", 0.1)
+    assert assigner.get_action_deadline("recon", ["Alice"]) == (30, True)
+
+    learn(assigner, "Alice", 600, count=100)
+    assert assigner.get_action_deadline("recon", ["Alice"]) == (180, True)
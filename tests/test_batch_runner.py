@@ -0,0 +1,38 @@
+from agents.shared.batch_runner import BatchRunner
+from agents.shared.simulator import VirtualClock
+
+
+class FakeManager:
+    """Accepts every action and never sees one finish."""
+
+    def __init__(self):
+        self.clock = VirtualClock(start=1000.0)
+        self.cancelled = []
+
+    def generate_action_id(self, action_type, target):
+        return f"{action_type}_{target}"
+
+    def execute_action(self, action_type, target, sisters, action_id=None, priority=None):
+        return True, f"Action {action_id} queued"
+
+    def wait_for_action(self, action_id, timeout=None):
+        self.clock.now += 30.0
+        return False
+
+    def cancel_action(self, action_id):
+        self.cancelled.append(action_id)
+        return True, f"Action {action_id} cancelled"
+
+
+def test_timed_out_actions_are_cancelled():
+    manager = FakeManager()
+    runner = BatchRunner(manager, "batch_test", "recon", ["a.com", "b.com"], ["Alice"],
+                         max_concurrency=1, action_timeout=30.0)
+    runner.start()
+    assert runner.wait(timeout=5)
+
+    assert sorted(manager.cancelled) == ["recon_a.com", "recon_b.com"]
+    assert runner.results == {"a.com": "failed", "b.com": "failed"}
+    # Timed by the manager's clock, not the wall clock
+    assert runner.progress.started_at == 1000.0
+    assert runner.progress.finished_at == 1060.0
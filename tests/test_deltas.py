@@ -0,0 +1,72 @@
+import importlib.util
+import os
+
+from agents.shared.deltas import DELTA_DIR_ENV_VAR, INCREMENTAL_ENV_VAR, DeltaTracker, read_delta_items
+from agents.shared.records import URL
+
+TARGET = "example.com"
+CONFIG = {"tools": {"alice_recon.sh": {"records": True},
+                    "ghost.sh": {"records": True, "inputs": ["alice_recon.sh"]}}}
+
+
+def run(tracker, tool, urls, partial=False):
+    sink = tracker.sink_for(tool)
+    for url in urls:
+        sink.add_record(URL(url, source=tool))
+    return tracker.update(TARGET, tool, sink, partial)
+
+
+def test_delta_items_are_the_new_and_changed_records():
+    tracker = DeltaTracker(CONFIG)
+    directory = tracker.delta_dir(TARGET)
+    assert read_delta_items(directory, "alice_recon.sh", "url") is None
+    assert not tracker.works_on_delta(TARGET, "ghost.sh")
+
+    run(tracker, "alice_recon.sh", ["https://a.example.com/", "https://b.example.com/"])
+    run(tracker, "alice_recon.sh", ["https://b.example.com/", "https://c.example.com/x"])
+
+    assert read_delta_items(directory, "alice_recon.sh", "url") == ["https://c.example.com/x"]
+    assert sorted(read_delta_items(directory, "alice_recon.sh", "host", known=True)) == ["b.example.com",
+                                                                                        "c.example.com"]
+    assert tracker.works_on_delta(TARGET, "ghost.sh")
+
+
+def test_partial_run_keeps_what_it_did_not_report():
+    tracker = DeltaTracker(CONFIG)
+    run(tracker, "ghost.sh", ["https://a.example.com/", "https://b.example.com/"])
+
+    delta = run(tracker, "ghost.sh", ["https://c.example.com/"], partial=True)
+
+    assert (len(delta.added), len(delta.removed), delta.total) == (1, 0, 3)
+    assert len(run(tracker, "ghost.sh", ["https://c.example.com/"]).removed) == 2
+
+
+def test_input_digest_follows_the_inputs_deltas():
+    tracker = DeltaTracker(CONFIG)
+    assert tracker.input_digest(TARGET, "alice_recon.sh") is None
+
+    run(tracker, "alice_recon.sh", ["https://a.example.com/"])
+    digest = tracker.input_digest(TARGET, "ghost.sh")
+    assert digest == tracker.input_digest(TARGET, "ghost.sh")
+
+    run(tracker, "alice_recon.sh", ["https://b.example.com/"])
+    assert digest != tracker.input_digest(TARGET, "ghost.sh")
+
+
+def test_script_helper_needs_an_incremental_run(monkeypatch, capsys):
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents", "tools",
+                        "delta_items.py")
+    spec = importlib.util.spec_from_file_location("delta_items", path)
+    delta_items = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(delta_items)
+    tracker = DeltaTracker(CONFIG)
+    run(tracker, "alice_recon.sh", ["https://a.example.com/"])
+
+    monkeypatch.delenv(INCREMENTAL_ENV_VAR, raising=False)
+    assert delta_items.main(["alice_recon.sh", "url"]) == 1
+
+    monkeypatch.setenv(INCREMENTAL_ENV_VAR, "1")
+    monkeypatch.setenv(DELTA_DIR_ENV_VAR, tracker.delta_dir(TARGET))
+    assert delta_items.main(["alice_recon.sh", "url"]) == 0
+    assert capsys.readouterr().out == "https://a.example.com/\n"
+    assert delta_items.main(["ghost.sh"]) == 1
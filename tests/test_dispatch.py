@@ -0,0 +1,159 @@
+import json
+
+import pytest
+
+from agents.shared.action_manager import ActionManager
+from agents.shared.simulator import DEFAULT_CONFIG_PATH, SimulatedComm, VirtualClock
+from agents.shared.task_queue import ActionPriority
+
+
+def make_manager(tmp_path, singleflight=False):
+    """An ActionManager with one execution slot on virtual time; phases go nowhere."""
+    with open(DEFAULT_CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    for agent in config["agents"]:
+        agent["enabled"] = True
+    config["queue"].update({"max_running_actions": 1, "ordering": "sejf", "preemption": True})
+    config["timeouts"]["store_path"] = None
+    config["singleflight"].update({"enabled": singleflight, "freshness_seconds": 300})
+    config_path = tmp_path / "seven_sisters.config.json"
+    config_path.write_text(json.dumps(config))
+
+    clock = VirtualClock()
+    comm = SimulatedComm(clock)
+    manager = ActionManager(str(config_path), clock=clock)
+    manager.setup(comm)
+    return manager, clock
+
+
+@pytest.fixture
+def simulated(tmp_path):
+    return make_manager(tmp_path)
+
+
+@pytest.fixture
+def coalescing(tmp_path):
+    return make_manager(tmp_path, singleflight=True)
+
+
+def submit(manager, target, priority=ActionPriority.NORMAL, **options):
+    success, message, sisters = manager.assign_sisters("recon", target)
+    assert success, message
+    action_id = manager.generate_action_id("recon", target)
+    assert manager.execute_action("recon", target, sisters, action_id=action_id, priority=priority, **options)[0]
+    return action_id
+
+
+def test_urgent_action_gets_the_preempted_slot(simulated):
+    manager, clock = simulated
+    running = submit(manager, "10.0.0.1", ActionPriority.BULK)
+    queued = [submit(manager, target, ActionPriority.BULK) for target in ("10.0.0.2", "10.0.0.3")]
+    clock.run(until=1.0)
+
+    # A wildcard is expected to take much longer than an IP, but the priority class comes first
+    urgent = submit(manager, "*.urgent.com", ActionPriority.URGENT)
+
+    assert manager.running_actions == {urgent}
+    assert manager.action_status[running]['status'] == 'paused'
+    assert all(manager.action_status[action_id]['status'] == 'queued' for action_id in queued)
+
+
+def test_cancelled_action_frees_its_slot(simulated):
+    manager, clock = simulated
+    running = submit(manager, "10.0.0.1", ActionPriority.BULK)
+    queued = submit(manager, "10.0.0.2", ActionPriority.BULK)
+    clock.run(until=1.0)
+
+    assert manager.cancel_action(running)[0]
+
+    assert manager.action_status[running]['status'] == 'failed'
+    assert manager.action_status[running]['done_event'].is_set()
+    assert manager.running_actions == {queued}
+    assert not manager.cancel_action(running)[0]
+
+
+def test_higher_priority_is_dispatched_first(simulated):
+    manager, clock = simulated
+    running = submit(manager, "10.0.0.1", ActionPriority.NORMAL)
+    bulk = submit(manager, "10.0.0.2", ActionPriority.BULK)
+    high = submit(manager, "10.0.0.3", ActionPriority.HIGH)
+    clock.run(until=1.0)
+
+    # HIGH waits behind a running NORMAL action: only URGENT preempts
+    assert manager.running_actions == {running}
+
+    manager._finalize_action(running)
+    assert manager.running_actions == {high}
+    manager._finalize_action(high)
+    assert manager.running_actions == {bulk}
+
+
+def test_preempted_action_resumes_when_the_urgent_one_finishes(simulated):
+    manager, clock = simulated
+    running = submit(manager, "10.0.0.1", ActionPriority.BULK)
+    clock.run(until=1.0)
+    urgent = submit(manager, "10.0.0.3", ActionPriority.URGENT)
+    sisters = manager.action_status[running]['sisters']
+    assert manager.comm_manager.ignored['pause_action'] == len(sisters)
+
+    manager._finalize_action(urgent)
+
+    # Resumed where it was, not started over
+    assert manager.running_actions == {running}
+    assert manager.action_status[running]['status'] == 'executing'
+    assert manager.action_status[running]['start_time'] == 0.0
+    assert manager.comm_manager.ignored['resume_action'] == len(sisters)
+
+
+def test_user_pause_holds_a_preempted_action_until_resumed(simulated):
+    manager, clock = simulated
+    running = submit(manager, "10.0.0.1", ActionPriority.BULK)
+    queued = submit(manager, "10.0.0.2", ActionPriority.BULK)
+    clock.run(until=1.0)
+    urgent = submit(manager, "10.0.0.3", ActionPriority.URGENT)
+
+    assert manager.pause_action(running)[0]
+    manager._finalize_action(urgent)
+    assert manager.running_actions == {queued}
+    assert manager.action_status[running]['status'] == 'paused'
+
+    assert manager.resume_action(running)[0]
+    manager._finalize_action(queued)
+    assert manager.running_actions == {running}
+    assert manager.action_status[running]['status'] == 'executing'
+
+
+def test_identical_requests_share_one_run(coalescing):
+    manager, clock = coalescing
+    first = submit(manager, "example.com")
+    second = submit(manager, "Example.com")
+    third = submit(manager, "example.com")
+
+    assert manager.resolve_action_id(second) == first
+    assert manager.get_action(third) is manager.action_status[first]
+    assert len(manager.action_status) == 1
+
+    manager._finalize_action(first)
+    assert manager.wait_for_action(third, timeout=0)
+
+
+def test_finished_run_is_reused_while_fresh(coalescing):
+    manager, clock = coalescing
+    first = submit(manager, "example.com")
+    manager._finalize_action(first)
+
+    clock.now += 299
+    assert manager.resolve_action_id(submit(manager, "example.com")) == first
+
+    clock.now += 2
+    rerun = manager.resolve_action_id(submit(manager, "example.com"))
+    assert rerun != first
+    assert manager.resolve_action_id(submit(manager, "example.com", reuse=False)) not in (first, rerun)
+
+
+def test_failed_run_is_not_reused(coalescing):
+    manager, clock = coalescing
+    first = submit(manager, "example.com")
+    assert manager.cancel_action(first)[0]
+
+    assert manager.resolve_action_id(submit(manager, "example.com")) != first
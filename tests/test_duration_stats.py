@@ -0,0 +1,49 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+
+from agents.shared import duration_stats
+from agents.shared.duration_stats import DurationStore
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_changes_are_saved_without_further_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(duration_stats, "SAVE_INTERVAL", 0.05)
+    path = tmp_path / "durations.json"
+    store = DurationStore(str(path))
+    store.record("phase:recon:Alice:execution", 12.0)
+
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert json.loads(path.read_text()) == {"phase:recon:Alice:execution": {"18": 1}}
+
+
+def test_sigterm_saves_the_history(tmp_path):
+    path = tmp_path / "durations.json"
+    script = textwrap.dedent(f"""
+        import os, signal, time
+        import output_handler
+        from agents.shared.duration_stats import DurationStore
+        output_handler.install_sigterm_handler()
+        store = DurationStore({str(path)!r})
+        store.record("tool:recon:Alice", 90.0)
+        os.kill(os.getpid(), signal.SIGTERM)
+        time.sleep(10)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, timeout=30)
+
+    assert result.returncode == 128 + signal.SIGTERM
+    assert "tool:recon:Alice" in json.loads(path.read_text())
+
+
+def test_store_without_a_path_stays_in_memory():
+    store = DurationStore(None)
+    store.record("tool:recon:Alice", 90.0)
+    assert store.saver is None
+    assert store.percentile("tool:recon:Alice", 50) >= 90.0
@@ -0,0 +1,24 @@
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_sigterm_writes_the_buffered_lines(tmp_path):
+    script = textwrap.dedent(f"""
+        import os, signal, time
+        import output_handler
+        output_handler.BASE_OUTPUT_DIR = {str(tmp_path)!r}
+        output_handler.install_sigterm_handler()
+        output_handler.write_output("Alice", "example.com", "last words")
+        os.kill(os.getpid(), signal.SIGTERM)
+        time.sleep(10)
+    """)
+    result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, timeout=30)
+
+    assert result.returncode == 128 + signal.SIGTERM
+    with open(tmp_path / "example.com" / "Alice.log", encoding="utf-8") as f:
+        assert f.read().endswith("Alice: last words\n")
@@ -0,0 +1,48 @@
+import os
+
+from agents.shared.output_stream import OutputPump, OutputSink, OutputStoreSink, STDOUT
+
+
+class ListSink(OutputSink):
+    def __init__(self, fail_on=()):
+        self.lines = []
+        self.fail_on = set(fail_on)
+        self.closed = False
+
+    def write_line(self, stream, line):
+        if line in self.fail_on:
+            raise ValueError(f"cannot take {line}")
+        self.lines.append(line)
+
+    def close(self):
+        self.closed = True
+
+
+def pump_lines(sinks, data):
+    pump = OutputPump(None, sinks)
+    pump.start()
+    pump.feed(STDOUT, data)
+    pump.end(STDOUT)
+    pump.close()
+    pump.join(timeout=5)
+
+
+def test_failing_sink_keeps_receiving_lines():
+    flaky, healthy = ListSink(fail_on={"two"}), ListSink()
+    pump_lines([flaky, healthy], b"one\ntwo\nthree\n")
+
+    assert flaky.lines == ["one", "three"]
+    assert flaky.closed
+    assert healthy.lines == ["one", "two", "three"]
+
+
+def test_store_sink_opens_its_file_with_the_first_line(output_dir):
+    sink = OutputStoreSink("Alice", "example.com")
+    sink.flush()
+    sink.close()
+    assert sink.file is None
+    assert not os.path.exists(sink.path)
+
+    pump_lines([OutputStoreSink("Alice", "example.com")], b"found it\n")
+    with open(sink.path, encoding="utf-8") as f:
+        assert f.read().endswith(" found it\n")
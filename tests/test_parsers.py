@@ -0,0 +1,94 @@
+from agents.shared.parsers import parse_file, parse_lines, record_source
+from agents.shared.records import Finding, Host, Service, URL
+
+
+def parse(format_name, text, context=None):
+    return list(parse_lines(text.splitlines(), format_name, context, "Test:tool"))
+
+
+def test_generic_parser_classifies_lines():
+    records = parse("generic", "starting scan...\nhttps://example.com/login\nmail.example.com\n22/tcp open ssh OpenSSH 8.9",
+                    context=Host("example.com"))
+    assert records == [URL("https://example.com/login"), Host("mail.example.com"),
+                       Service("example.com", 22, "tcp")]
+    assert all(record.source == "Test:tool" for record in records)
+
+
+def test_null_parser_yields_nothing():
+    assert parse("none", "https://example.com/\nexample.com") == []
+
+
+def test_url_list_parser():
+    records = parse("urls", "https://example.com/a\nnot a url\nhttp://example.com/b c\nhttp://example.com/c")
+    assert [record.url for record in records] == ["https://example.com/a", "http://example.com/c"]
+
+
+def test_httpx_parser_strips_colours_and_reads_the_status():
+    records = parse("httpx", "https://example.com [\x1b[32m200\x1b[0m]\nhttp://api.example.com\n[INF] Current version")
+    assert [(record.url, record.status) for record in records] == [
+        ("https://example.com/", 200), ("http://api.example.com/", None)]
+
+
+def test_dirsearch_parser():
+    records = parse("dirsearch", "# Dirsearch started\n200   169B   https://example.com/admin\n"
+                                 "301     0B   https://example.com/old  ->  https://example.com/new")
+    assert [(record.url, record.status) for record in records] == [
+        ("https://example.com/admin", 200), ("https://example.com/old", 301)]
+
+
+def test_massdns_parser_keeps_address_answers():
+    text = "\n".join([
+        '{"name":"www.example.com.","type":"A","status":"NOERROR","data":{"answers":['
+        '{"name":"www.example.com.","type":"CNAME","data":"web.example.com."},'
+        '{"name":"web.example.com.","type":"A","data":"93.184.216.34"}]}}',
+        '{"name":"gone.example.com.","type":"A","status":"NXDOMAIN","data":{}}',
+        '{"name": truncated'
+    ])
+    records = parse("massdns", text)
+    assert len(records) == 1
+    assert (records[0].name, records[0].ip) == ("www.example.com", "93.184.216.34")
+
+
+def test_nmap_parser_attaches_ports_to_the_reported_host():
+    text = """Starting Nmap 7.94 ( https://nmap.org )
+Nmap scan report for example.com (93.184.216.34)
+PORT    STATE    SERVICE VERSION
+22/tcp  open     ssh     OpenSSH 8.9p1
+25/tcp  filtered smtp
+443/tcp open     https
+Nmap scan report for 10.0.0.5
+53/udp  open|filtered domain
+"""
+    records = parse("nmap", text)
+    assert records[0] == Host("example.com") and records[0].ip == "93.184.216.34"
+    services = [record for record in records if isinstance(record, Service)]
+    assert [(s.host, s.port, s.protocol, s.name) for s in services] == [
+        ("example.com", 22, "tcp", "ssh"), ("example.com", 443, "tcp", "https"), ("10.0.0.5", 53, "udp", "domain")]
+    assert services[0].banner == "OpenSSH 8.9p1"
+
+
+def test_nmap_parser_uses_the_context_host_without_a_report_line():
+    records = parse("nmap", "80/tcp open http", context=Host("scanme.example.com"))
+    assert records == [Service("scanme.example.com", 80, "tcp")]
+
+
+def test_nuclei_parser():
+    text = ("[2024-05-01 10:00:00] [git-config] [http] [MEDIUM] https://example.com/.git/config\n"
+            "[ssh-weak-cipher] [network] [low] example.com:22 [\"aes128-cbc\"]\n"
+            "[INF] Templates loaded")
+    records = parse("nuclei", text)
+    assert [(f.template, f.severity, f.location, f.host) for f in records] == [
+        ("git-config", "medium", "https://example.com/.git/config", "example.com"),
+        ("ssh-weak-cipher", "low", "example.com:22", "example.com")]
+    assert isinstance(records[1], Finding) and records[1].detail == '["aes128-cbc"]'
+
+
+def test_unknown_format_falls_back_to_generic(tmp_path):
+    path = tmp_path / "out.txt"
+    path.write_text("https://example.com/x\r\nnoise\r\n")
+    assert list(parse_file(str(path), "no-such-format")) == [URL("https://example.com/x")]
+
+
+def test_record_source_names_the_format_or_the_tool():
+    assert record_source("Lisbeth", "tools/lisbeth_scan.sh", "nuclei") == "Lisbeth:nuclei"
+    assert record_source("Alice", "tools/alice_recon.sh", "generic") == "Alice:alice_recon.sh"
@@ -0,0 +1,50 @@
+import threading
+
+from agents.shared.phase_latch import PhaseLatch
+
+
+def test_latch_opens_when_every_sister_completes():
+    latch = PhaseLatch(["Alice", "Harley", "Lisbeth"])
+    assert latch.count == 3
+    assert not latch.count_down("Alice")
+    assert not latch.count_down("Lisbeth")
+    assert latch.pending() == ["Harley"]
+    assert latch.count_down("Harley")
+    assert latch.is_open
+    assert latch.count == 0
+
+
+def test_repeated_and_unexpected_completions_are_ignored():
+    latch = PhaseLatch(["Alice", "Harley"])
+    assert not latch.count_down("Alice")
+    assert not latch.count_down("Alice")
+    assert not latch.count_down("Bettie")
+    assert latch.pending() == ["Harley"]
+    assert latch.count_down("Harley")
+    # Late duplicates after the latch opened don't open it again
+    assert not latch.count_down("Harley")
+
+
+def test_latch_without_sisters_is_open():
+    assert PhaseLatch([]).is_open
+
+
+def test_exactly_one_concurrent_count_down_opens_the_latch():
+    sisters = [f"Sister{index}" for index in range(8)]
+    latch = PhaseLatch(sisters)
+    opened = []
+    start = threading.Barrier(len(sisters) * 2)
+
+    def complete(sister):
+        start.wait()
+        if latch.count_down(sister):
+            opened.append(sister)
+
+    # Every sister reports twice, as with a redelivered response
+    threads = [threading.Thread(target=complete, args=(sister,)) for sister in sisters * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(opened) == 1
+    assert latch.is_open
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from agents.shared.phase_worker import PhaseWorker, TOOL_PHASE
+from agents.shared.tool_executor import ToolExecutor
+from agents.shared.tool_runner import ToolExitError
+
+
+class FakeCommandHandler:
+    def register_command(self, command, handler):
+        pass
+
+
+class FakeComm:
+    """Records what a PhaseWorker reports to Seven."""
+
+    def __init__(self):
+        self.instance_id = "Alice-test"
+        self.command_handler = FakeCommandHandler()
+        self.commands = []
+        self.reported = threading.Event()
+
+    def send_status(self, status, load=None):
+        pass
+
+    def send_command(self, target, command, args):
+        self.commands.append((command, args))
+        self.reported.set()
+
+
+@pytest.fixture
+def executor(no_admission, tmp_path):
+    # Its loop thread is a daemon, so the executor needs no shutdown
+    return ToolExecutor({"max_concurrent": 2}, ledger_dir=str(tmp_path / "slots"))
+
+
+def run_phase(run_tool, phase=TOOL_PHASE):
+    comm = FakeComm()
+    worker = PhaseWorker("Alice", comm, run_tool)
+    worker.handle_execute_phase({'action_id': "recon_1", 'target': "example.com", 'phase': phase})
+    assert comm.reported.wait(10)
+    return comm.commands[-1]
+
+
+def test_clean_exit_completes_the_phase(executor):
+    command, args = run_phase(lambda target, action_id, use_cache: executor.submit(
+        "Alice", ["bash", "-c", "exit 0"], action_id))
+    assert command == "action_status"
+    assert args['status'] == "completed"
+
+
+def test_non_zero_exit_fails_the_phase(executor):
+    jobs = []
+
+    def run_tool(target, action_id, use_cache):
+        jobs.append(executor.submit("Alice", ["bash", "-c", "exit 3"], action_id))
+        return jobs[-1]
+
+    command, args = run_phase(run_tool)
+    assert command == "action_error"
+    assert args['error_type'] == "execution_error"
+    assert "code 3" in args['error']
+    assert jobs[0].state == "failed"
+    assert not jobs[0].succeeded
+    with pytest.raises(ToolExitError):
+        jobs[0].result(1)
+
+
+def test_run_tool_error_fails_the_phase():
+    def run_tool(target, action_id, use_cache):
+        raise FileNotFoundError("Tool script not found: alice_recon.sh")
+
+    command, args = run_phase(run_tool)
+    assert command == "action_error"
+    assert "alice_recon.sh" in args['error']
+
+
+def test_tool_that_did_not_start_fails_the_phase():
+    command, args = run_phase(lambda target, action_id, use_cache: None)
+    assert command == "action_error"
+    assert args['error_type'] == "execution_error"
+
+
+def test_bookkeeping_phases_complete_without_a_tool():
+    command, args = run_phase(lambda *args: pytest.fail("no tool outside the execution phase"), phase="planning")
+    assert command == "action_status"
@@ -0,0 +1,108 @@
+import os
+import time
+
+import pytest
+
+from agents.shared import result_cache
+from agents.shared.output_stream import STDOUT
+from agents.shared.result_cache import CaptureSink, ResultCache
+
+TOOL = "scan.sh"
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    (tmp_path / "tools").mkdir()
+    (tmp_path / "tools" / TOOL).write_text("#!/bin/bash\necho scanning $1\n")
+    return tmp_path
+
+
+def make_cache(workdir, ttl=60, max_size_mb=2048):
+    return ResultCache({"tools": {TOOL: {"ttl": ttl, "artifacts": ["*.txt"]}}, "max_size_mb": max_size_mb},
+                       directory=str(workdir / "cache"))
+
+
+def command(target):
+    return ["bash", f"tools/{TOOL}", target]
+
+
+def artifact_dir(workdir, target):
+    return workdir / "output" / target
+
+
+def store_run(cache, workdir, target, payload=b"result\n"):
+    started = time.time() - 1
+    artifact_dir(workdir, target).mkdir(parents=True)
+    (artifact_dir(workdir, target) / "scan.txt").write_bytes(payload)
+    capture = CaptureSink(cache.tmp_dir, cache.max_output)
+    capture.write_line(STDOUT, f"scanning {target}")
+    capture.close()
+    key = cache.key_for(command(target), target, TOOL, cwd=str(workdir))
+    cache.store(key, TOOL, target, capture, str(artifact_dir(workdir, target)), started)
+    return key
+
+
+def test_key_depends_on_the_script_and_target(workdir):
+    cache = make_cache(workdir)
+    key = cache.key_for(command("example.com"), "example.com", TOOL, cwd=str(workdir))
+    assert key == cache.key_for(command("Example.com"), "Example.com", TOOL, cwd=str(workdir))
+    assert key != cache.key_for(command("other.com"), "other.com", TOOL, cwd=str(workdir))
+
+    (workdir / "tools" / TOOL).write_text("#!/bin/bash\necho scanning harder $1\n")
+    assert key != cache.key_for(command("example.com"), "example.com", TOOL, cwd=str(workdir))
+
+
+def test_tools_without_a_ttl_are_not_cached(workdir):
+    cache = make_cache(workdir, ttl=0)
+    assert cache.key_for(command("example.com"), "example.com", TOOL, cwd=str(workdir)) is None
+
+
+def test_stored_result_is_served_and_restored(workdir):
+    cache = make_cache(workdir)
+    key = store_run(cache, workdir, "example.com")
+    entry = cache.lookup(key)
+    assert entry is not None
+    assert list(cache.read_output(entry)) == [(STDOUT, "scanning example.com")]
+
+    artifact = artifact_dir(workdir, "example.com") / "scan.txt"
+    os.remove(artifact)
+    assert cache.restore(entry, str(artifact_dir(workdir, "example.com"))) == [str(artifact)]
+    assert artifact.read_bytes() == b"result\n"
+    assert cache.get_status()['hits'] == 1
+
+
+def test_entries_expire_after_their_ttl(workdir):
+    cache = make_cache(workdir, ttl=0.2)
+    key = store_run(cache, workdir, "example.com")
+    assert cache.lookup(key) is not None
+    time.sleep(0.3)
+    assert cache.lookup(key) is None
+    assert cache.get_status()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted_first(workdir, monkeypatch):
+    monkeypatch.setattr(result_cache, "BLOB_GRACE_SECONDS", 0)
+    payload = os.urandom(40000)
+    # Room for the blobs of two runs, not three
+    cache = make_cache(workdir, max_size_mb=100000 / (1024 * 1024))
+    first = store_run(cache, workdir, "first.com", payload + b"1")
+    time.sleep(0.05)
+    second = store_run(cache, workdir, "second.com", payload + b"2")
+    time.sleep(0.05)
+    assert cache.lookup(first) is not None  # Now the second is the least recently used
+    time.sleep(0.05)
+    third = store_run(cache, workdir, "third.com", payload + b"3")
+
+    assert cache.lookup(second) is None
+    assert cache.lookup(first) is not None
+    assert cache.lookup(third) is not None
+    assert cache.get_status()['size_mb'] * 1024 * 1024 <= 100000
+
+
+def test_key_depends_on_the_deltas_the_run_works_on(workdir):
+    cache = make_cache(workdir)
+    key = cache.key_for(command("example.com"), "example.com", TOOL, cwd=str(workdir))
+    with_inputs = cache.key_for(command("example.com"), "example.com", TOOL, cwd=str(workdir), inputs="digest")
+    assert key != with_inputs
+    assert with_inputs != cache.key_for(command("example.com"), "example.com", TOOL, cwd=str(workdir),
+                                        inputs="other digest")
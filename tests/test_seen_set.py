@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from agents.shared.records import Host, URL
+from agents.shared.seen_set import ScalableBloomFilter, SeenSet, record_key
+
+CONFIG = {"initial_capacity": 100, "error_rate": 0.01, "flush_every": 1000}
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "seen")
+
+
+def test_check_and_add_reports_new_keys(directory):
+    seen = SeenSet(directory, CONFIG)
+    assert seen.check_and_add(["a", "b", "a"]) == [True, True, False]
+    assert seen.check_and_add(["b", "c"]) == [False, True]
+    assert seen.add("d") and not seen.add("d")
+    assert "a" in seen and "zzz" not in seen
+    stats = seen.get_stats()
+    assert stats['entries'] == 4 and stats['new'] == 4 and stats['checked'] == 7
+    seen.close()
+
+
+def test_only_filter_positives_are_looked_up(directory):
+    seen = SeenSet(directory, CONFIG)
+    seen.check_and_add(f"key-{index}" for index in range(2000))
+    stats = seen.get_stats()
+    assert stats['new'] == 2000
+    assert stats['filter_negative'] + stats['false_positive'] == 2000
+    assert stats['store_lookups'] == stats['false_positive']
+    # The filter grew well past its initial capacity and still meets the error rate, with room for noise
+    assert stats['filters'] > 1
+    assert stats['false_positive_rate'] < 3 * CONFIG["error_rate"]
+    seen.close()
+
+
+def test_entries_survive_reopening(directory):
+    seen = SeenSet(directory, CONFIG)
+    seen.check_and_add(["a", "b"])
+    seen.close()
+
+    seen = SeenSet(directory, CONFIG)
+    assert seen.check_and_add(["a", "b", "c"]) == [False, False, True]
+    assert len(seen.bloom) == 3
+    seen.close()
+
+
+def test_filter_is_rebuilt_when_missing_or_stale(directory):
+    seen = SeenSet(directory, CONFIG)
+    seen.check_and_add(["a", "b"])
+    seen.close()
+
+    os.remove(os.path.join(directory, "seen.bloom"))
+    seen = SeenSet(directory, CONFIG)
+    assert "a" in seen.bloom and "b" in seen.bloom
+    seen.check_and_add(["c"])
+    # Don't save the filter, so the one on disk is out of date
+    seen.unsaved = 0
+    seen.close()
+
+    seen = SeenSet(directory, CONFIG)
+    assert len(seen.bloom) == 3
+    assert seen.check_and_add(["c"]) == [False]
+    seen.close()
+
+
+def test_filter_is_rebuilt_for_a_new_error_rate(directory):
+    SeenSet(directory, CONFIG).close()
+    seen = SeenSet(directory, dict(CONFIG, error_rate=0.001))
+    assert seen.bloom.error_rate == 0.001
+    seen.close()
+
+
+def test_keys_another_process_stored_are_not_new(directory):
+    first = SeenSet(directory, CONFIG)
+    second = SeenSet(directory, CONFIG)
+    assert first.check_and_add(["shared"]) == [True]
+    assert second.check_and_add(["shared", "own"]) == [False, True]
+    first.close()
+    second.close()
+
+
+def test_scalable_filter_save_and_load(tmp_path):
+    bloom = ScalableBloomFilter(10, 0.01)
+    for index in range(50):
+        bloom.add(str(index))
+    path = str(tmp_path / "filter.bloom")
+    bloom.save(path)
+
+    loaded = ScalableBloomFilter.load(path)
+    assert len(loaded) == 50
+    assert len(loaded.filters) == len(bloom.filters)
+    assert all(str(index) in loaded for index in range(50))
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(path)
+
+
+def test_record_key_ignores_the_source():
+    assert record_key(URL("https://Example.com/a", source="x")) == record_key(URL("https://example.com/a", source="y"))
+    assert record_key(Host("example.com")) != record_key(URL("https://example.com/"))
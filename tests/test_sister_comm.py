@@ -0,0 +1,129 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+import zmq
+
+from agents.shared import sister_comm
+from agents.shared.sister_comm import Message, PhaseWorkBroker, SisterCommManager
+
+
+def make_manager(name="Alice"):
+    manager = SisterCommManager(name, instance_id=f"{name}-test")
+    manager.running = True
+    return manager
+
+
+def test_terminate_from_seven_stops_the_sister():
+    manager = make_manager()
+    manager._dispatch_message({
+        'type': 'command', 'sender': 'Seven', 'target': 'Alice',
+        'content': {'command': 'terminate'}
+    })
+    assert manager.termination_signal_received
+    assert not manager.running
+
+
+def test_terminate_handler_returns_a_response():
+    manager = make_manager()
+    response = manager._handle_termination(Message('command', 'Seven', 'Alice', {'command': 'terminate'}))
+    assert isinstance(response, Message)
+    assert response.type == "response"
+    assert response.target == "Seven"
+    assert response.content['status'] == "success"
+
+
+def test_terminate_from_another_sister_is_refused():
+    manager = make_manager()
+    response = manager._handle_termination(Message('command', 'Harley', 'Alice', {'command': 'terminate'}))
+    assert response.content['status'] == "error"
+    assert not manager.termination_signal_received
+    assert manager.running
+
+
+def test_terminate_for_another_instance_is_ignored():
+    manager = make_manager()
+    manager._dispatch_message({
+        'type': 'command', 'sender': 'Seven', 'target': 'Alice-other',
+        'content': {'command': 'terminate'}
+    })
+    assert not manager.termination_signal_received
+
+
+class FakeRouter:
+    """Hands out queued multipart messages, then reports nothing left like a NOBLOCK recv."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    def recv_multipart(self, flags=0):
+        if not self.messages:
+            raise zmq.Again()
+        return self.messages.pop(0)
+
+
+def test_work_broker_drops_malformed_frames():
+    broker = PhaseWorkBroker(["Alice"])
+    ready = json.dumps({'type': 'ready'}).encode()
+    broker._receive("Alice", FakeRouter([
+        [b"Alice-1", b"", b"{not json"],
+        [b"Alice-1", b"", b"[1, 2]"],
+        [b"Alice-1", b"{\"type\": \"ready\"}"],
+        [b"\xff\xfe", b"", ready],
+        [b"Alice-2", b"", ready]
+    ]))
+    assert list(broker.ready["Alice"]) == [b"Alice-2"]
+    assert list(broker.get_instances("Alice")) == ["Alice-2"]
+
+
+def free_address():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return f"tcp://127.0.0.1:{probe.getsockname()[1]}"
+
+
+@pytest.fixture
+def bus(tmp_path, monkeypatch):
+    """Seven and Alice connected over their own ports; yields the two comm managers."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sister_comm, "IPC_ADDRESS", free_address())
+    monkeypatch.setattr(sister_comm, "REPLY_ADDRESS", free_address())
+    managers = []
+    for name in ("Seven", "Alice"):
+        manager = SisterCommManager(name)
+        manager.initialization_complete = True
+        assert manager.setup()
+        managers.append(manager)
+    yield managers
+    for manager in managers:
+        manager.cleanup()
+
+
+def test_action_status_from_a_sister_reaches_seven(bus):
+    seven, alice = bus
+    received = []
+    arrived = threading.Event()
+
+    def handle_action_status(args):
+        received.append(args)
+        arrived.set()
+
+    seven.command_handler.register_command('action_status', handle_action_status)
+    alice.send_command("Seven", 'action_status',
+                       {'action_id': "recon_1", 'sister_name': "Alice", 'phase': "execution", 'status': "completed"})
+
+    assert arrived.wait(timeout=5)
+    assert received[0]['action_id'] == "recon_1"
+
+
+def test_sister_load_reaches_seven(bus):
+    seven, alice = bus
+    alice.send_status("ready", {'in_flight': 2})
+
+    deadline = time.monotonic() + 5
+    while seven.get_sister_load("Alice") is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert seven.get_sister_load("Alice")['in_flight'] == 2
+    assert seven.get_sister_status("Alice") == "ready"
@@ -0,0 +1,116 @@
+import pytest
+
+from agents.shared.task_queue import (ActionPriority, ActionQueue, QueuedAction, get_ordering_policy)
+
+AGING = 60.0
+
+
+def item(action_id, enqueued_at, priority=ActionPriority.NORMAL, expected_runtime=0.0):
+    return QueuedAction(action_id, "recon", f"{action_id}.example.com", priority,
+                        enqueued_at=enqueued_at, expected_runtime=expected_runtime)
+
+
+def drain(queue):
+    order = []
+    while True:
+        next_item = queue.pop()
+        if next_item is None:
+            return order
+        order.append(next_item.action_id)
+
+
+def make_queue(ordering="fifo"):
+    return ActionQueue(AGING, get_ordering_policy(ordering))
+
+
+def test_same_priority_is_first_in_first_out():
+    queue = make_queue()
+    for index, action_id in enumerate(["a", "b", "c"]):
+        queue.put(item(action_id, 100.0 + index))
+    assert drain(queue) == ["a", "b", "c"]
+
+
+def test_higher_priority_goes_first():
+    queue = make_queue()
+    queue.put(item("bulk", 100.0, ActionPriority.BULK))
+    queue.put(item("normal", 101.0))
+    queue.put(item("urgent", 102.0, ActionPriority.URGENT))
+    assert drain(queue) == ["urgent", "normal", "bulk"]
+
+
+def test_waiting_actions_age_past_newer_higher_priority_ones():
+    queue = make_queue()
+    queue.put(item("bulk", 0.0, ActionPriority.BULK))
+    # Three aging intervals later the bulk action is worth as much as a new urgent one
+    queue.put(item("urgent-later", 3 * AGING + 1, ActionPriority.URGENT))
+    queue.put(item("urgent-sooner", 3 * AGING - 1, ActionPriority.URGENT))
+    assert drain(queue) == ["urgent-sooner", "bulk", "urgent-later"]
+
+
+def test_effective_priority_drops_with_waiting():
+    queue = make_queue()
+    waiting = item("bulk", 0.0, ActionPriority.BULK)
+    assert queue.effective_priority(waiting, now=0.0) == ActionPriority.BULK.value
+    assert queue.effective_priority(waiting, now=2 * AGING) == ActionPriority.BULK.value - 2
+
+
+def test_fifo_ignores_expected_runtime():
+    queue = make_queue("fifo")
+    queue.put(item("long", 0.0, expected_runtime=3000))
+    queue.put(item("short", 1.0, expected_runtime=10))
+    assert drain(queue) == ["long", "short"]
+
+
+def test_sejf_runs_the_shortest_expected_job_first():
+    queue = make_queue("sejf")
+    queue.put(item("long", 0.0, expected_runtime=3000))
+    queue.put(item("medium", 1.0, expected_runtime=300))
+    queue.put(item("short", 2.0, expected_runtime=10))
+    assert drain(queue) == ["short", "medium", "long"]
+
+
+def test_sejf_does_not_starve_long_jobs():
+    queue = make_queue("sejf")
+    queue.put(item("long", 0.0, expected_runtime=300))
+    queue.put(item("short-later", 400.0, expected_runtime=10))
+    assert drain(queue) == ["long", "short-later"]
+
+
+def test_ljf_runs_the_largest_expected_job_first():
+    queue = make_queue("ljf")
+    queue.put(item("short", 0.0, expected_runtime=10))
+    queue.put(item("medium", 1.0, expected_runtime=300))
+    queue.put(item("long", 2.0, expected_runtime=3000))
+    assert drain(queue) == ["long", "medium", "short"]
+
+
+def test_policies_keep_priorities_within_the_runtime_shift():
+    queue = make_queue("ljf")
+    queue.put(item("bulk-long", 0.0, ActionPriority.BULK, expected_runtime=30))
+    queue.put(item("urgent-short", 0.0, ActionPriority.URGENT, expected_runtime=10))
+    assert drain(queue) == ["urgent-short", "bulk-long"]
+
+
+def test_put_replaces_and_remove_skips_entries():
+    queue = make_queue()
+    queue.put(item("a", 0.0))
+    queue.put(item("b", 1.0))
+    queue.put(item("a", 2.0))  # Requeued, e.g. after a pause
+    assert len(queue) == 2
+    assert [queued.action_id for queued in queue.snapshot()] == ["b", "a"]
+
+    assert queue.remove("b").action_id == "b"
+    assert queue.remove("b") is None
+    assert "b" not in queue
+    assert queue.peek().action_id == "a"
+    assert drain(queue) == ["a"]
+    assert queue.pop() is None
+
+
+def test_unknown_ordering_and_priority_names():
+    assert get_ordering_policy("SEJF").name == "sejf"
+    assert ActionPriority.from_name("Urgent") is ActionPriority.URGENT
+    with pytest.raises(ValueError):
+        get_ordering_policy("random")
+    with pytest.raises(ValueError):
+        ActionPriority.from_name("whenever")
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from agents.shared.tool_executor import ToolExecutor
+
+
+@pytest.fixture
+def ledger_dir(no_admission, tmp_path):
+    return str(tmp_path / "slots")
+
+
+def wait_for_state(job, state, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.state != state and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return job.state == state
+
+
+def test_queued_jobs_of_a_paused_key_wait_for_resume(ledger_dir):
+    executor = ToolExecutor({"max_concurrent": 2}, ledger_dir=ledger_dir)
+    assert executor.pause_key("recon_1") == 0
+    job = executor.submit("Alice", ["bash", "-c", "exit 0"], "recon_1")
+    other = executor.submit("Alice", ["bash", "-c", "exit 0"], "recon_2")
+
+    assert other.result(timeout=5) == 0
+    time.sleep(0.3)
+    assert job.state == "queued"
+
+    assert executor.resume_key("recon_1") == 1
+    assert job.result(timeout=5) == 0
+
+
+def test_cancelling_a_paused_key_cancels_its_queued_jobs(ledger_dir):
+    executor = ToolExecutor({"max_concurrent": 2}, ledger_dir=ledger_dir)
+    executor.pause_key("recon_1")
+    job = executor.submit("Alice", ["bash", "-c", "exit 0"], "recon_1")
+
+    assert executor.cancel_key("recon_1") == 1
+    with pytest.raises(CancelledError):
+        job.result(timeout=5)
+    assert job.state == "cancelled"
+
+
+def test_limits_hold_across_executors(ledger_dir):
+    # Two executors stand in for two sister processes sharing the host's slot ledger
+    config = {"max_concurrent": 1, "poll_interval": 0.05}
+    first = ToolExecutor(config, ledger_dir=ledger_dir)
+    second = ToolExecutor(config, ledger_dir=ledger_dir)
+    running = first.submit("Alice", ["bash", "-c", "sleep 1"], "recon_1")
+    assert wait_for_state(running, "running")
+
+    waiting = second.submit("Luna", ["bash", "-c", "exit 0"], "recon_2")
+    time.sleep(0.3)
+    assert waiting.state == "queued"
+
+    assert running.result(timeout=5) == 0
+    assert waiting.result(timeout=5) == 0
@@ -0,0 +1,41 @@
+import asyncio
+import os
+
+import pytest
+
+from agents.shared import tool_runner
+from agents.shared.tool_runner import ToolLimits, run_tool_process, run_tool_process_async
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="rlimits and niceness are POSIX only")
+
+# Give the limits time to land before the tool reports them
+REPORT_LIMITS = "sleep 0.5; ulimit -n > {out}; nice >> {out}"
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    limits = ToolLimits(open_files=128, nice=5)
+    monkeypatch.setattr(tool_runner, "get_tool_limits", lambda tool: limits)
+    return limits
+
+
+def read_limits(path):
+    with open(path) as f:
+        open_files, niceness = f.read().split()
+    return int(open_files), int(niceness)
+
+
+def test_limits_are_applied_to_the_tool(tmp_path, limits, no_admission):
+    out = tmp_path / "limits.txt"
+    returncode = run_tool_process(["sh", "-c", REPORT_LIMITS.format(out=out)], "limits-test")
+
+    assert returncode == 0
+    assert read_limits(out) == (128, os.nice(0) + 5)
+
+
+def test_limits_are_applied_to_async_tools(tmp_path, limits, no_admission):
+    out = tmp_path / "limits.txt"
+    returncode = asyncio.run(run_tool_process_async(["sh", "-c", REPORT_LIMITS.format(out=out)], "limits-test"))
+
+    assert returncode == 0
+    assert read_limits(out) == (128, os.nice(0) + 5)
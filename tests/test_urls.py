@@ -0,0 +1,76 @@
+import pytest
+
+from agents.shared.urls import UrlTable, canonicalize_url
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("HTTPS://Example.COM:443/a/./b/../c#top", "https://example.com/a/c"),
+    ("http://example.com:8080", "http://example.com:8080/"),
+    ("http://example.com.:80/%7euser/%2F", "http://example.com/~user/%2F"),
+    ("https://example.com/?b=2&utm_source=mail&a=1&fbclid=x", "https://example.com/?a=1&b=2"),
+    ("https://user:pw@example.com/", "https://user:pw@example.com/"),
+    ("https://[2001:DB8::1]:443/x", "https://[2001:db8::1]/x"),
+    ("https://bücher.example/", "https://xn--bcher-kva.example/"),
+    ("  ftp://example.com/file ", "ftp://example.com/file"),
+    ("not a url", "not a url"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_canonicalize_url_options():
+    url = "https://example.com/?z=1&utm_medium=x&a=2"
+    assert canonicalize_url(url, drop_params=[], sort_query=False) == url
+    assert canonicalize_url(url, drop_params=["z"]) == "https://example.com/?a=2&utm_medium=x"
+
+
+SAMPLE_URLS = [
+    "https://example.com/",
+    "https://example.com/login?next=%2Fadmin",
+    "http://api.example.com:8080/v1/users/42",
+    "https://example.com/static/app.js",
+    "https://[2001:db8::1]/status",
+    "https://user@example.com/private",
+    "mailto:someone@example.com",
+]
+
+
+def fill(table):
+    return [table.add(url) for url in SAMPLE_URLS]
+
+
+def test_url_table_round_trip_and_dedup():
+    table = UrlTable(initial_capacity=4)
+    added = fill(table)
+    assert [new for _, new in added] == [True] * len(SAMPLE_URLS)
+    assert [table.get(url_id) for url_id, _ in added] == [canonicalize_url(url) for url in SAMPLE_URLS]
+
+    # Variants of a stored URL are the same URL
+    assert table.add("HTTPS://EXAMPLE.COM:443/login?next=%2Fadmin&utm_source=x") == (added[1][0], False)
+    assert "https://example.com/static/../static/app.js" in table
+    assert "https://example.com/missing" not in table
+    assert len(table) == len(SAMPLE_URLS)
+    assert table.host(added[2][0]) == "api.example.com"
+    assert table.host(added[-1][0]) is None
+
+
+def test_url_table_grows_past_its_initial_capacity():
+    table = UrlTable(initial_capacity=4)
+    urls = [f"https://host{index % 7}.example.com/path/{index}?q={index}" for index in range(500)]
+    ids = [table.add(url)[0] for url in urls]
+    assert ids == list(range(500))
+    assert list(table) == urls
+    assert all(url in table for url in urls)
+
+
+def test_url_table_save_and_load(tmp_path):
+    table = UrlTable()
+    added = fill(table)
+    path = str(tmp_path / "urls.table")
+    table.save(path)
+
+    loaded = UrlTable.load(path)
+    assert len(loaded) == len(table)
+    assert list(loaded) == list(table)
+    assert loaded.add(SAMPLE_URLS[2]) == (added[2][0], False)
+    assert loaded.add("https://example.com/new") == (len(SAMPLE_URLS), True)